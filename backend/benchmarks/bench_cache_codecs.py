@@ -0,0 +1,96 @@
+"""
+Benchmark: encode/decode time and stored bytes for CacheService value codecs.
+
+Compares json (the old format), orjson and msgpack, each uncompressed and with every
+installed compressor, on representative DRP payloads:
+- balance: a single token balance (small, below the compression threshold)
+- transactions: an explorer page of transactions
+- knowledge: a human-rights knowledge query result (text heavy)
+
+Usage:
+    python benchmarks/bench_cache_codecs.py [--iterations 2000] [--transactions 200]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "drp-website-api"))
+
+from api.services.cache_codec import CacheCodec, available_compressions, available_serializers
+
+
+def payloads(transactions: int):
+    return {
+        "balance": {"balance": "1250000000000000000", "balance_formatted": 1.25, "symbol": "RIGHTS", "network": "mainnet"},
+        "transactions": [
+            {
+                "tx_hash": f"0x{i:064x}",
+                "from_address": f"0x{i * 7:040x}",
+                "to_address": f"0x{i * 13:040x}",
+                "amount": str(i * 10 ** 15),
+                "token_type": "RIGHTS" if i % 2 else "DERI",
+                "timestamp": f"2026-10-18T12:{i % 60:02d}:00",
+                "block_number": 1_000_000 + i,
+                "status": "confirmed",
+            }
+            for i in range(transactions)
+        ],
+        "knowledge": {
+            "query": "right to education",
+            "results": [
+                {
+                    "id": f"udhr-article-{i}",
+                    "title": f"Article {i}",
+                    "content": (
+                        "Everyone has the right to education. Education shall be free, at least in the "
+                        "elementary and fundamental stages. Elementary education shall be compulsory. "
+                    ) * 4,
+                    "source": "Universal Declaration of Human Rights",
+                    "score": 1.0 / (i + 1),
+                }
+                for i in range(20)
+            ],
+        },
+    }
+
+
+def measure(codec: CacheCodec, value, iterations: int):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        encoded = codec.encode(value)
+    encode_us = (time.perf_counter() - start) / iterations * 1e6
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.decode(encoded)
+    decode_us = (time.perf_counter() - start) / iterations * 1e6
+    return encode_us, decode_us, len(encoded)
+
+
+def main(args):
+    serializers = [name for name, ok in available_serializers().items() if ok]
+    compressions = [name for name, ok in available_compressions().items() if ok]
+    missing = [name for name, ok in {**available_serializers(), **available_compressions()}.items() if not ok]
+    if missing:
+        print(f"not installed (skipped): {', '.join(missing)}")
+
+    for name, value in payloads(args.transactions).items():
+        baseline = len(json.dumps(value))
+        print(f"\n{name} (json.dumps: {baseline} bytes)")
+        print(f"  {'codec':<18} {'encode us':>10} {'decode us':>10} {'bytes':>8} {'ratio':>6}")
+        for serializer in serializers:
+            for compression in compressions:
+                codec = CacheCodec(serializer, compression, compress_threshold=args.threshold)
+                encode_us, decode_us, size = measure(codec, value, args.iterations)
+                print(f"  {serializer + '+' + compression:<18} {encode_us:>10.1f} {decode_us:>10.1f} "
+                      f"{size:>8} {size / baseline:>6.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--transactions", type=int, default=200)
+    parser.add_argument("--threshold", type=int, default=1024)
+    main(parser.parse_args())
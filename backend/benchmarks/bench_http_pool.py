@@ -0,0 +1,111 @@
+"""
+Micro-benchmark: fresh httpx.AsyncClient per request vs the shared HttpClientPool.
+
+Starts a local keep-alive HTTP stub server and issues the same requests both ways,
+reporting per-request wall latency and client-side CPU time.
+
+Usage:
+    python benchmarks/bench_http_pool.py [--requests 500] [--concurrency 1]
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from clients.http_pool import HttpClientPool
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every request with a small JSON body, keeping the connection open."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    body = b'{"Hash": "QmStub", "ok": true}'
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length:
+            self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def fresh_client_request(url: str):
+    async with httpx.AsyncClient() as client:
+        response = await client.post(url, params={"arg": "QmStub"}, timeout=30.0)
+        response.raise_for_status()
+
+
+async def pooled_request(pool: HttpClientPool, url: str):
+    response = await pool.get("ipfs").post(url, params={"arg": "QmStub"})
+    response.raise_for_status()
+
+
+async def run_case(make_request, requests: int, concurrency: int):
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with slots:
+            await make_request()
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+
+async def main(requests: int, concurrency: int):
+    server = start_stub_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v0/pin/add"
+    pool = HttpClientPool()
+
+    # Warm up both paths
+    await fresh_client_request(url)
+    await pooled_request(pool, url)
+
+    results = {
+        "fresh client": await run_case(lambda: fresh_client_request(url), requests, concurrency),
+        "shared pool": await run_case(lambda: pooled_request(pool, url), requests, concurrency),
+    }
+    await pool.aclose()
+    server.shutdown()
+
+    print(f"{requests} requests, concurrency {concurrency}")
+    print(f"{'mode':<14}{'ms/request':>12}{'cpu ms/request':>16}")
+    for name, (wall, cpu) in results.items():
+        print(f"{name:<14}{wall / requests * 1000:>12.3f}{cpu / requests * 1000:>16.3f}")
+
+    fresh_wall, fresh_cpu = results["fresh client"]
+    pooled_wall, pooled_cpu = results["shared pool"]
+    print(f"latency speedup: {fresh_wall / pooled_wall:.1f}x, cpu saving: {fresh_cpu / pooled_cpu:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,103 @@
+"""
+Benchmark: per-item lookup + commit vs batched upsert for indexer writes.
+
+Writes N synthetic submissions to a fresh SQLite file both ways:
+- per-item: query(...).first() and commit() for every submission (the old path)
+- batched: indexer.persist_results, one upsert and one commit per batch
+
+Usage:
+    python benchmarks/bench_indexer_writes.py [--submissions 10000] [--batch-size 500]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+warnings.filterwarnings("ignore")
+
+_db_dir = tempfile.mkdtemp(prefix="drp-indexer-bench-")
+os.environ["DB_URL"] = f"sqlite:///{_db_dir}/bench.db"
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "indexer"))
+
+import indexer
+from indexer import IndexedSubmission, SessionLocal, persist_results
+
+
+def synthetic_rows(count: int, prefix: str):
+    for i in range(count):
+        submission_id = f"{prefix}-{i:06d}"
+        yield {
+            "id": submission_id,
+            "submission_cid": submission_id,
+            "ipfs_cid": f"Qm{i:044d}",
+            "actor_id": f"0x{i:040x}",
+            "activity_type": "poat" if i % 2 else "post",
+            "status": "assessed",
+            "ai_score": (i % 100) / 100,
+            "ai_verdict": "approved",
+            "ai_rationale": "synthetic",
+            "ai_summary_cid": None,
+            "metadata": {"submission_id": submission_id, "type": "poat"},
+        }
+
+
+def write_per_item(rows):
+    session = SessionLocal()
+    for row in rows:
+        record = session.query(IndexedSubmission).filter(
+            IndexedSubmission.submission_cid == row["submission_cid"]
+        ).first()
+        if not record:
+            session.add(IndexedSubmission(**row))
+        else:
+            record.status = "assessed"
+        session.commit()
+    session.close()
+
+
+def write_batched(rows, batch_size: int):
+    session = SessionLocal()
+    rows = list(rows)
+    for start in range(0, len(rows), batch_size):
+        persist_results(session, rows[start:start + batch_size])
+    session.close()
+
+
+def timed(label: str, fn, count: int):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22}{elapsed:>9.2f} s{count / elapsed:>12.0f} rows/s")
+    return elapsed
+
+
+def main(submissions: int, batch_size: int):
+    # Keep the benchmark output readable
+    indexer.print = lambda *args, **kwargs: None
+
+    print(f"{submissions} submissions, SQLite at {_db_dir}")
+    per_item = timed("per-item commit", lambda: write_per_item(synthetic_rows(submissions, "a")), submissions)
+    batched = timed(
+        f"batched ({batch_size}/commit)",
+        lambda: write_batched(synthetic_rows(submissions, "b"), batch_size),
+        submissions
+    )
+    rewrite = timed(
+        "batched re-index",
+        lambda: write_batched(synthetic_rows(submissions, "b"), batch_size),
+        submissions
+    )
+    print(f"speedup: {per_item / batched:.1f}x (re-index {per_item / rewrite:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    main(args.submissions, args.batch_size)
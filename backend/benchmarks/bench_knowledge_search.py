@@ -0,0 +1,159 @@
+"""
+Benchmark: knowledge base search over a synthetic corpus, inverted index vs full scan.
+
+Generates --documents synthetic documents (Zipf-distributed vocabulary, so some terms
+are common and most are rare), loads them into HumanRightsKnowledgeBase and reports:
+- index build time and memory
+- BM25 query latency for term and "phrase" queries
+- the previous search (lowercase and split every document per query) on the same corpus
+
+Usage:
+    python benchmarks/bench_knowledge_search.py [--documents 100000] [--words 80]
+        [--vocabulary 30000] [--queries 200] [--scan-queries 5]
+"""
+
+import argparse
+import random
+import resource
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+
+warnings.filterwarnings("ignore")
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "drp-website-api"))
+
+from api.knowledge.human_rights_knowledge import HumanRightsKnowledgeBase, KnowledgeDocument
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_vocabulary(size: int, rng: random.Random):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(4, 10))))
+    words = sorted(words)
+    rng.shuffle(words)
+    # Zipf: the n-th most common word appears with weight 1/n
+    weights = [1 / (rank + 1) for rank in range(size)]
+    return words, weights
+
+
+def synthetic_documents(count: int, words_per_doc: int, vocabulary, weights, rng: random.Random):
+    cumulative = []
+    total = 0.0
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    categories = ["udhr", "international_law", "drp_core", "ethics", "social_justice"]
+    for i in range(count):
+        title = rng.choices(vocabulary, cum_weights=cumulative, k=4)
+        content = rng.choices(vocabulary, cum_weights=cumulative, k=rng.randint(words_per_doc // 2, words_per_doc * 3 // 2))
+        yield KnowledgeDocument(
+            id=f"synthetic_{i:06d}",
+            title=" ".join(title),
+            content=" ".join(content),
+            source="synthetic",
+            category=categories[i % len(categories)],
+            tags=rng.choices(vocabulary[:200], k=3),
+            importance=1 + i % 5
+        )
+
+
+def scan_search(documents, query: str, limit: int = 10):
+    """The search before the inverted index: every document, every query."""
+    query_lower = query.lower()
+    results = []
+    for doc in documents:
+        if query_lower in doc.content.lower() or query_lower in doc.title.lower():
+            results.append(doc)
+        else:
+            query_words = query_lower.split()
+            doc_words = set(doc.content.lower().split() + doc.title.lower().split())
+            if any(word in doc_words for word in query_words):
+                results.append(doc)
+    results.sort(key=lambda doc: (-doc.importance, doc.title.lower().find(query_lower)))
+    return results[:limit]
+
+
+def make_queries(count: int, documents, vocabulary, rng: random.Random):
+    queries = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 3:
+            # A phrase taken from a document, plus a free term
+            words = rng.choice(documents).content.split()
+            start = rng.randrange(max(1, len(words) - 3))
+            queries.append(f'"{" ".join(words[start:start + 3])}" {rng.choice(vocabulary[:2000])}')
+        else:
+            # One to three terms, mostly from the mid-frequency range
+            queries.append(" ".join(rng.choice(vocabulary[50:5000]) for _ in range(kind + 1)))
+    return queries
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=100000)
+    parser.add_argument("--words", type=int, default=80)
+    parser.add_argument("--vocabulary", type=int, default=30000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scan-queries", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary, weights = make_vocabulary(args.vocabulary, rng)
+    kb = HumanRightsKnowledgeBase(load_from_file=False)
+    kb.documents.extend(synthetic_documents(args.documents, args.words, vocabulary, weights, rng))
+    total_words = sum(len(doc.content.split()) for doc in kb.documents)
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    kb._build_indexes()
+    build_seconds = time.perf_counter() - start
+    postings = sum(len(p.docs) for p in kb.search_index.postings.values())
+
+    queries = make_queries(args.queries, kb.documents, vocabulary, rng)
+    latencies = []
+    hits = 0
+    for query in queries:
+        start = time.perf_counter()
+        hits += bool(kb.search(query, limit=10))
+        latencies.append(time.perf_counter() - start)
+    phrase_latencies = [latency for query, latency in zip(queries, latencies) if '"' in query]
+
+    scan_latencies = []
+    for query in queries[:args.scan_queries]:
+        start = time.perf_counter()
+        scan_search(kb.documents, query.replace('"', ""))
+        scan_latencies.append(time.perf_counter() - start)
+
+    print(f"corpus:            {len(kb.documents)} documents, {total_words} content words, "
+          f"{args.vocabulary} word vocabulary")
+    print(f"index build:       {build_seconds:.1f}s, {len(kb.search_index.postings)} terms, "
+          f"{postings} postings, ~{rss_mb() - rss_before:.0f} MB")
+    print(f"indexed search:    p50 {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms over {len(queries)} queries "
+          f"({hits} with results)")
+    if phrase_latencies:
+        # A phrase of near-universal words walks its rarest word's whole postings list
+        print(f"  phrase queries:  p50 {statistics.median(phrase_latencies) * 1000:.2f} ms, "
+              f"p99 {percentile(phrase_latencies, 0.99) * 1000:.2f} ms")
+    if scan_latencies:
+        print(f"full scan search:  p50 {statistics.median(scan_latencies) * 1000:.0f} ms "
+              f"over {len(scan_latencies)} queries")
+        print(f"speedup:           {statistics.median(scan_latencies) / statistics.median(latencies):.0f}x at p50")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: HumanRightsFilter and BiasDetector throughput on long submissions.
+
+Generates --submissions synthetic submissions of --words words each (ordinary
+prose with filter terms, near-miss words such as "pharmacy" and "the", and
+inflected terms sprinkled in), then times per submission:
+- the previous checks: `term in text.lower()` for every term, `text.count(term)`
+  for every bias hit
+- check_content + detect_bias with the compiled single-pass TermMatcher
+and reports how many category hits each finds that the other does not.
+
+Usage:
+    python benchmarks/bench_term_matcher.py [--submissions 200] [--words 5000]
+        [--extra-terms 0]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+
+warnings.filterwarnings("ignore")
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "drp-website-api"))
+
+from api.services.ethical_langchain_service import BiasDetector, HumanRightsFilter
+from api.services.term_matcher import TermMatcher
+
+FILLER = """community members organised workshops to share knowledge about digital
+rights and the project documented each session with notes photos and a summary for
+the wider network of volunteers who support local schools clinics and the pharmacy
+cooperative while planning the next harvest festival with other organisations""".split()
+NEAR_MISSES = ["the", "these", "other", "pharmacy", "harmony", "shelter", "many", "bold", "skill", "theme"]
+
+
+def previous_check(content_filter: HumanRightsFilter, detector: BiasDetector, text: str):
+    """The substring checks before the compiled matcher."""
+    text_lower = text.lower()
+    banned = {category for category, terms in content_filter.banned_terms.items()
+              for term in terms if term in text_lower}
+    positive = {category for category, terms in content_filter.positive_terms.items()
+                for term in terms if term in text_lower}
+    biases = {}
+    for attribute, terms in detector.bias_indicators.items():
+        for term in terms:
+            if term in text_lower:
+                biases[attribute] = text_lower.count(term)
+    return banned, positive, set(biases)
+
+
+def compiled_check(content_filter: HumanRightsFilter, detector: BiasDetector, text: str):
+    _, details = content_filter.check_content(text)
+    bias = detector.detect_bias(text)
+    return set(details["banned_categories"]), set(details["positive_categories"]), set(bias["detected_biases"])
+
+
+def make_submission(words: int, terms, rng: random.Random) -> str:
+    out = []
+    for _ in range(words):
+        roll = rng.random()
+        if roll < 0.002:
+            out.append(rng.choice(terms))
+        elif roll < 0.05:
+            out.append(rng.choice(NEAR_MISSES))
+        else:
+            out.append(rng.choice(FILLER))
+    return " ".join(out)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=200)
+    parser.add_argument("--words", type=int, default=5000)
+    parser.add_argument("--extra-terms", type=int, default=0,
+                        help="Add this many synthetic terms per banned category (larger term sets)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    content_filter = HumanRightsFilter(strict=True)
+    detector = BiasDetector()
+    if args.extra_terms:
+        for category, terms in content_filter.banned_terms.items():
+            terms.extend(f"{category[:4]}term{i}" for i in range(args.extra_terms))
+        content_filter.banned_matcher = TermMatcher(content_filter.banned_terms)
+    terms = [term for group in (content_filter.banned_terms, content_filter.positive_terms, detector.bias_indicators)
+             for values in group.values() for term in values]
+    inflected = ["killed", "trafficking", "abusive", "learning", "supported", "hated"]
+    submissions = [make_submission(args.words, terms + inflected, rng) for _ in range(args.submissions)]
+    term_count = len(terms)
+
+    timings = {"previous": [], "compiled": []}
+    differences = {"only previous": 0, "only compiled": 0}
+    for text in submissions:
+        start = time.perf_counter()
+        old = previous_check(content_filter, detector, text)
+        timings["previous"].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        new = compiled_check(content_filter, detector, text)
+        timings["compiled"].append(time.perf_counter() - start)
+        for old_hits, new_hits in zip(old, new):
+            differences["only previous"] += len(old_hits - new_hits)
+            differences["only compiled"] += len(new_hits - old_hits)
+
+    total_mb = sum(len(text) for text in submissions) / 1e6
+    print(f"submissions:  {args.submissions} x {args.words} words ({total_mb:.1f} MB), {term_count} terms")
+    for name, values in timings.items():
+        print(f"{name:<12}  p50 {statistics.median(values) * 1000:.2f} ms, p99 {percentile(values, 0.99) * 1000:.2f} ms, "
+              f"{total_mb / sum(values):.1f} MB/s")
+    print(f"speedup:      {statistics.median(timings['previous']) / statistics.median(timings['compiled']):.1f}x at p50")
+    print(f"category hits only the substring checks found: {differences['only previous']} "
+          f"(mostly inside other words), only the compiled matcher found: {differences['only compiled']}")
+
+
+if __name__ == "__main__":
+    main()
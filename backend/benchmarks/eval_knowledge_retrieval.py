@@ -0,0 +1,164 @@
+"""
+Evaluation: knowledge base retrieval quality and latency, lexical vs semantic vs hybrid.
+
+Runs a labelled query set (mostly drawn from the UDHR, ICCPR and ICESCR documents,
+with keyword queries, paraphrases and filtered queries) against three retrievers
+over the built-in knowledge base:
+- lexical:  BM25 only
+- semantic: embedding cosine similarity only
+- hybrid:   both, fused with reciprocal-rank fusion
+
+and reports MRR, recall@k and nDCG@k, p50/p99 latency, and for the hybrid
+retriever the precision of its results per relevance band (a reliability table:
+well calibrated scores have higher precision in higher bands).
+
+--embedder model uses all-MiniLM-L6-v2 (needs sentence-transformers). --embedder
+hashing uses a hashed bag of words: a stand-in that runs anywhere but only measures
+the plumbing, since it matches words much like BM25 does.
+
+Usage:
+    python benchmarks/eval_knowledge_retrieval.py [--embedder model|hashing] [--k 5]
+        [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import math
+import re
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+warnings.filterwarnings("ignore")
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "drp-website-api"))
+
+import numpy as np
+
+from api.knowledge.embedding_index import load_embedder
+from api.knowledge.human_rights_knowledge import HumanRightsKnowledgeBase
+from api.knowledge.hybrid_retriever import HybridRetriever
+
+# (query, relevant document ids, filters)
+LABELLED_QUERIES = [
+    ("right to life liberty and security of person", {"udhr_article_03", "iccpr_001"}, {}),
+    ("freedom of speech", {"udhr_article_19", "iccpr_001"}, {}),
+    ("can I say what I think without being censored", {"udhr_article_19"}, {}),
+    ("seek receive and impart information through any media", {"udhr_article_19"}, {}),
+    ("freedom to change religion or belief", {"udhr_article_18"}, {}),
+    ("practising my faith in private or with others", {"udhr_article_18"}, {}),
+    ("equal pay for equal work", {"udhr_article_23"}, {}),
+    ("joining a trade union", {"udhr_article_23", "icescr_001"}, {}),
+    ("protection if I lose my job", {"udhr_article_23"}, {}),
+    ("just and favourable remuneration for workers", {"udhr_article_23"}, {}),
+    ("all humans are born free and equal in dignity", {"udhr_article_01"}, {}),
+    ("people should treat each other like brothers", {"udhr_article_01"}, {}),
+    ("discrimination based on race colour or sex", {"udhr_article_02", "intersectionality"}, {}),
+    ("treated differently because of my language or national origin", {"udhr_article_02"}, {}),
+    ("prohibition of torture and slavery", {"iccpr_001"}, {}),
+    ("right to a fair trial and due process", {"iccpr_001"}, {}),
+    ("can I vote in elections and gather peacefully", {"iccpr_001"}, {}),
+    ("civil and political rights treaty adopted in 1966", {"iccpr_001"}, {}),
+    ("freedom of movement", {"iccpr_001"}, {}),
+    ("right to health and education", {"icescr_001"}, {}),
+    ("adequate standard of living", {"icescr_001"}, {}),
+    ("economic social and cultural rights covenant", {"icescr_001"}, {}),
+    ("international bill of human rights", {"iccpr_001", "icescr_001", "udhr_001"}, {}),
+    ("declaration proclaimed in paris in 1948", {"udhr_001"}, {}),
+    ("freedom", {"udhr_article_18", "udhr_article_19"}, {"category": "freedom_rights"}),
+    ("rights treaty", {"iccpr_001", "icescr_001"}, {"category": "international_law"}),
+    ("covenant obligations of states", {"iccpr_001", "icescr_001"}, {"tags": ["un_treaty"]}),
+    ("how do I earn tokens for my contributions", {"drp_poat"}, {}),
+    ("verifying my identity to take part in governance", {"drp_post"}, {}),
+    ("voting on community proposals", {"drp_governance"}, {}),
+]
+
+RELEVANCE_BANDS = [(0.75, 1.0), (0.5, 0.75), (0.25, 0.5), (0.0, 0.25)]
+
+
+def hashing_embedder(dimension: int = 256):
+    """Hashed bag of words, L2-normalized by the index."""
+    def embed(texts):
+        vectors = np.zeros((len(texts), dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"[a-z0-9]+", text.lower()):
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % dimension] += 1
+        return vectors
+    return embed
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def evaluate(retriever: HybridRetriever, k: int, repeat: int):
+    reciprocal_ranks, recalls, ndcgs, latencies = [], [], [], []
+    judged = []
+    for query, relevant, filters in LABELLED_QUERIES:
+        results = retriever.search(query, k=k, **filters)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            asyncio.run(retriever.asearch(query, k=k, **filters))
+            latencies.append(time.perf_counter() - start)
+
+        ids = [result["id"] for result in results]
+        first = next((rank for rank, doc_id in enumerate(ids, 1) if doc_id in relevant), None)
+        reciprocal_ranks.append(1 / first if first else 0.0)
+        recalls.append(len(relevant & set(ids)) / len(relevant))
+        dcg = sum(1 / math.log2(rank + 1) for rank, doc_id in enumerate(ids, 1) if doc_id in relevant)
+        ideal = sum(1 / math.log2(rank + 1) for rank in range(1, min(k, len(relevant)) + 1))
+        ndcgs.append(dcg / ideal)
+        judged.extend((result["relevance"], result["id"] in relevant) for result in results)
+
+    return {
+        "mrr": statistics.mean(reciprocal_ranks),
+        "recall": statistics.mean(recalls),
+        "ndcg": statistics.mean(ndcgs),
+        "p50": statistics.median(latencies),
+        "p99": percentile(latencies, 0.99),
+        "judged": judged,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--embedder", choices=["model", "hashing"], default="model")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query")
+    args = parser.parse_args()
+
+    embed = load_embedder() if args.embedder == "model" else hashing_embedder()
+    if embed is None:
+        parser.error("sentence-transformers is not installed; use --embedder hashing")
+
+    kb = HumanRightsKnowledgeBase(load_from_file=False)
+    with tempfile.TemporaryDirectory() as index_dir:
+        retrievers = {
+            "lexical": HybridRetriever(kb, embed=embed, index_dir=index_dir, semantic_weight=0),
+            "semantic": HybridRetriever(kb, embed=embed, index_dir=index_dir, lexical_weight=0),
+            "hybrid": HybridRetriever(kb, embed=embed, index_dir=index_dir),
+        }
+        reports = {name: evaluate(retriever, args.k, args.repeat) for name, retriever in retrievers.items()}
+
+    print(f"{len(LABELLED_QUERIES)} labelled queries, {len(kb.documents)} documents, "
+          f"{args.embedder} embedder, k={args.k}")
+    print(f"{'retriever':<10} {'MRR':>6} {'recall@k':>9} {'nDCG@k':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, report in reports.items():
+        print(f"{name:<10} {report['mrr']:>6.3f} {report['recall']:>9.3f} {report['ndcg']:>7.3f} "
+              f"{report['p50'] * 1000:>8.2f} {report['p99'] * 1000:>8.2f}")
+
+    print("hybrid relevance band   results   precision")
+    for low, high in RELEVANCE_BANDS:
+        band = [hit for relevance, hit in reports["hybrid"]["judged"]
+                if low < relevance <= high or (low == 0.0 and relevance == 0.0)]
+        precision = f"{sum(band) / len(band):.2f}" if band else "-"
+        print(f"  ({low:.2f}, {high:.2f}]      {len(band):>7}   {precision:>9}")
+
+
+if __name__ == "__main__":
+    main()
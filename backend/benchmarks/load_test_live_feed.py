@@ -0,0 +1,212 @@
+"""
+Load test: live feed fan-out to many concurrent SSE clients on one worker.
+
+Opens --connections SSE streams against /live/sse, publishes --events events through
+the hub and reports connection memory, delivery latency and fan-out time per event.
+A --slow-fraction of the clients stall on every write to exercise the slow consumer
+policy: they must lose events (or be disconnected) without delaying the others.
+
+Transports:
+- asgi: drives the FastAPI app directly with in-memory ASGI connections (no sockets),
+  isolating the app and hub cost
+- tcp:  runs the app under uvicorn (one worker, in this process) and connects real
+  sockets; needs uvicorn and a file descriptor limit above --connections
+
+Usage:
+    python benchmarks/load_test_live_feed.py [--connections 10000] [--events 20]
+        [--interval 0.05] [--payload-bytes 300] [--slow-fraction 0.01]
+        [--policy drop_oldest|disconnect] [--buffer-size 256] [--transport asgi|tcp]
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+
+warnings.filterwarnings("ignore")
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "drp-website-api"))
+
+from fastapi import FastAPI
+
+from api.routers import live
+from api.services.live_feed_service import LiveFeedService
+
+
+def make_app(policy: str, buffer_size: int) -> FastAPI:
+    app = FastAPI()
+    app.include_router(live.router, prefix="/live")
+    app.state.live_feed = LiveFeedService(buffer_size=buffer_size, slow_consumer_policy=policy)
+    return app
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Client:
+    """Records when each SSE event arrives; slow clients stall on every write."""
+
+    def __init__(self, slow: bool):
+        self.slow = slow
+        self.received = []
+        self.closed = False
+
+    def on_chunk(self, chunk: bytes):
+        now = time.perf_counter()
+        for event in chunk.split(b"\n\n"):
+            if event.startswith(b"event: blocks"):
+                self.received.append((now, event))
+            elif event.startswith(b"event: closed"):
+                self.closed = True
+
+
+async def asgi_connection(app, client: Client, opened: asyncio.Event, disconnect: asyncio.Event):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/live/sse", "raw_path": b"/live/sse",
+        "query_string": b"topics=blocks", "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80), "state": {},
+    }
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            opened.set()
+        elif message["type"] == "http.response.body":
+            if client.slow:
+                await asyncio.sleep(3600)
+            client.on_chunk(message.get("body", b""))
+
+    await app(scope, receive, send)
+
+
+async def tcp_connection(port: int, client: Client, opened: asyncio.Event, disconnect: asyncio.Event):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /live/sse?topics=blocks HTTP/1.1\r\nHost: bench\r\nAccept: text/event-stream\r\n\r\n")
+    await writer.drain()
+    await reader.readuntil(b"\r\n\r\n")
+    opened.set()
+    try:
+        while not disconnect.is_set():
+            if client.slow:
+                # Stop reading: the socket buffers fill, then the server-side buffer
+                await disconnect.wait()
+                break
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            client.on_chunk(chunk)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    app = make_app(args.policy, args.buffer_size)
+    hub: LiveFeedService = app.state.live_feed
+    slow_every = int(1 / args.slow_fraction) if args.slow_fraction else 0
+    clients = [Client(slow=bool(slow_every) and i % slow_every == 0) for i in range(args.connections)]
+    disconnect = asyncio.Event()
+
+    server = None
+    if args.transport == "tcp":
+        try:
+            import uvicorn
+        except ImportError:
+            sys.exit("The tcp transport needs uvicorn (pip install uvicorn)")
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        if hard < args.connections * 2 + 100:
+            sys.exit(f"File descriptor limit {hard} is too low for {args.connections} connections")
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning",
+                                               backlog=4096, timeout_keep_alive=3600))
+        asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    tasks = []
+    for i, client in enumerate(clients):
+        opened = asyncio.Event()
+        if server is None:
+            tasks.append(asyncio.create_task(asgi_connection(app, client, opened, disconnect)))
+        else:
+            tasks.append(asyncio.create_task(tcp_connection(args.port, client, opened, disconnect)))
+        await opened.wait()
+    connect_seconds = time.perf_counter() - start
+    rss_connected = rss_mb()
+
+    payload = "x" * args.payload_bytes
+    published = []
+    for seq in range(args.events):
+        published.append(time.perf_counter())
+        await hub.publish("blocks", {"block_number": seq, "payload": payload})
+        await asyncio.sleep(args.interval)
+    await asyncio.sleep(max(1.0, args.interval * 5))
+
+    fast = [client for client in clients if not client.slow]
+    slow = [client for client in clients if client.slow]
+    latencies = []
+    fan_out = [0.0] * args.events
+    for client in fast:
+        for received_at, event in client.received:
+            seq = json.loads(event.split(b"data: ", 1)[1])["block_number"]
+            latencies.append(received_at - published[seq])
+            fan_out[seq] = max(fan_out[seq], received_at - published[seq])
+    latencies.sort()
+
+    complete = sum(1 for client in fast if len(client.received) == args.events)
+    print(f"connections:        {args.connections} ({len(slow)} slow) over {args.transport}")
+    print(f"connect time:       {connect_seconds:.2f}s")
+    print(f"memory:             {rss_connected - rss_before:.0f} MB for connections "
+          f"({(rss_connected - rss_before) * 1024 / args.connections:.1f} KB each), peak RSS {rss_mb():.0f} MB")
+    print(f"events:             {args.events} x {args.payload_bytes} bytes, every {args.interval * 1000:.0f} ms")
+    print(f"fast clients:       {complete}/{len(fast)} received every event")
+    if latencies:
+        print(f"delivery latency:   p50 {statistics.median(latencies) * 1000:.1f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+        print(f"fan-out per event:  mean {statistics.mean(fan_out) * 1000:.1f} ms "
+              f"(time until the last fast client has it)")
+    print(f"slow consumers:     {hub.dropped} events dropped, {hub.disconnected} disconnected "
+          f"(policy {args.policy}, buffer {args.buffer_size})")
+    print(f"hub:                {hub.delivered} deliveries, {hub.connections} still connected")
+
+    disconnect.set()
+    await hub.close()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if server is not None:
+        server.should_exit = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--payload-bytes", type=int, default=300)
+    parser.add_argument("--slow-fraction", type=float, default=0.01)
+    parser.add_argument("--policy", choices=("drop_oldest", "disconnect"), default="drop_oldest")
+    parser.add_argument("--buffer-size", type=int, default=8)
+    parser.add_argument("--transport", choices=("asgi", "tcp"), default="asgi")
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
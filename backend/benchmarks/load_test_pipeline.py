@@ -0,0 +1,157 @@
+"""
+Load test: sequential per-submission processing vs the indexer stage pipeline.
+
+Starts local stub IPFS / AI / OrbitDB services with configurable latencies, points
+the indexer at them (SQLite for storage) and processes the same synthetic backlog
+both ways. Sequential time is roughly the sum of the stage latencies per item; the
+pipeline should approach the slowest stage's latency divided by its concurrency.
+
+Usage:
+    python benchmarks/load_test_pipeline.py [--submissions 200] [--ai-ms 80] [--orbit-ms 40]
+        [--pin-ms 20] [--ai-concurrency 8] [--orbit-concurrency 4]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+warnings.filterwarnings("ignore")
+
+
+def make_stub_handler(latencies):
+    """Stub service answering IPFS pin/add, AI assess-* and OrbitDB add after a delay."""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            if length:
+                self.rfile.read(length)
+            if self.path.startswith("/api/v0/pin/add"):
+                time.sleep(latencies["pin"])
+                body = {"Pins": []}
+            elif self.path.startswith("/assess-"):
+                time.sleep(latencies["ai"])
+                body = {"score": 0.87, "verdict": "approved", "rationale": "stub"}
+            elif self.path.startswith("/orbit/add"):
+                time.sleep(latencies["orbit"])
+                body = {"hash": "zdpuStubSummary"}
+            else:
+                body = {}
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_server(latencies) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_stub_handler(latencies))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def synthetic_submissions(count: int, prefix: str):
+    return [
+        {
+            "submission_id": f"{prefix}-{i:05d}",
+            "type": "poat",
+            "ipfs_cid": f"Qm{prefix}{i:040d}",
+            "actor_id": f"0x{i:040x}",
+            "claim": {"title": "Load test", "description": "synthetic"},
+        }
+        for i in range(count)
+    ]
+
+
+async def run_sequential(indexer, submissions):
+    for submission in submissions:
+        row = await indexer.assess_submission(submission)
+        indexer._persist_rows([row])
+
+
+async def run_pipeline(indexer, submissions):
+    pipeline = indexer.build_pipeline()
+    pipeline.start()
+    pending = [await pipeline.submit(s) for s in submissions]
+    await asyncio.gather(*pending)
+    metrics = pipeline.format_metrics()
+    await pipeline.stop()
+    return metrics
+
+
+async def main(args):
+    latencies = {"pin": args.pin_ms / 1000, "ai": args.ai_ms / 1000, "orbit": args.orbit_ms / 1000}
+    server = start_stub_server(latencies)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    os.environ.update({
+        "DB_URL": f"sqlite:///{tempfile.mkdtemp(prefix='drp-pipeline-')}/load.db",
+        "IPFS_API_URL": f"{base}/api/v0",
+        "AI_API_URL": base,
+        "API_URL": base,
+        "ORBITDB_ADDR": base,
+        "AI_CONCURRENCY": str(args.ai_concurrency),
+        "ORBIT_CONCURRENCY": str(args.orbit_concurrency),
+        "PIN_FLUSH_INTERVAL": "0.05",
+    })
+    sys.path.insert(0, str(Path(__file__).parent.parent / "indexer"))
+    import indexer
+    indexer.print = lambda *a, **k: None
+
+    indexer.pin_manager.start()
+    n = args.submissions
+
+    sequential_n = max(1, n // 10)
+    start = time.perf_counter()
+    await run_sequential(indexer, synthetic_submissions(sequential_n, "seq"))
+    sequential = (time.perf_counter() - start) / sequential_n
+
+    start = time.perf_counter()
+    metrics = await run_pipeline(indexer, synthetic_submissions(n, "pipe"))
+    pipelined = (time.perf_counter() - start) / n
+
+    await indexer.pin_manager.stop()
+    await indexer.http_pool.aclose()
+    server.shutdown()
+
+    stage_bounds = {
+        "assess": latencies["ai"] / args.ai_concurrency,
+        "summarize": latencies["orbit"] / args.orbit_concurrency,
+    }
+    slowest = max(stage_bounds, key=stage_bounds.get)
+
+    print(f"stage latencies: pin {args.pin_ms} ms (batched), ai {args.ai_ms} ms x{args.ai_concurrency}, "
+          f"orbit {args.orbit_ms} ms x{args.orbit_concurrency}")
+    print(f"sequential: {1 / sequential:8.1f} submissions/s ({sequential * 1000:.1f} ms each, {sequential_n} items)")
+    print(f"pipeline:   {1 / pipelined:8.1f} submissions/s ({n} items)")
+    print(f"slowest stage bound ({slowest}): {1 / stage_bounds[slowest]:8.1f} submissions/s")
+    print(f"pipeline metrics: {metrics}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=200)
+    parser.add_argument("--pin-ms", type=float, default=20)
+    parser.add_argument("--ai-ms", type=float, default=80)
+    parser.add_argument("--orbit-ms", type=float, default=40)
+    parser.add_argument("--ai-concurrency", type=int, default=8)
+    parser.add_argument("--orbit-concurrency", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,81 @@
+"""
+Shared, pooled HTTP clients for DRP backend services.
+
+Each downstream service (IPFS, AI, OrbitDB, API gateway) gets one long-lived
+httpx.AsyncClient with keep-alive, its own connection limits and its own
+timeout, instead of a fresh client (and TCP/TLS handshake) per request.
+Create the pool once at startup and close it at shutdown.
+"""
+
+import os
+import httpx
+from typing import Dict, Optional
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Per-service request timeouts (seconds)
+SERVICE_TIMEOUTS = {
+    "ipfs": float(os.getenv("IPFS_TIMEOUT", "60")),
+    "ai": float(os.getenv("AI_TIMEOUT", "30")),
+    "orbit": float(os.getenv("ORBIT_TIMEOUT", "30")),
+    "api": float(os.getenv("API_TIMEOUT", "30")),
+}
+DEFAULT_TIMEOUT = 30.0
+
+# Connection limits per service; each service is a single host, so these are per-host limits
+MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+
+class HttpClientPool:
+    """Lazily created, per-service httpx.AsyncClient instances."""
+
+    def __init__(
+        self,
+        timeouts: Optional[Dict[str, float]] = None,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        http2: bool = HTTP2_AVAILABLE
+    ):
+        """
+        Args:
+            timeouts: Per-service timeouts, merged over SERVICE_TIMEOUTS
+            max_connections: Maximum open connections per service
+            max_keepalive_connections: Idle connections kept open per service
+            http2: Negotiate HTTP/2 where the server supports it (needs the h2 package)
+        """
+        self.timeouts = {**SERVICE_TIMEOUTS, **(timeouts or {})}
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY
+        )
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def get(self, service: str) -> httpx.AsyncClient:
+        """Return the shared client for a service, creating it on first use."""
+        client = self._clients.get(service)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=self.timeouts.get(service, DEFAULT_TIMEOUT),
+                limits=self.limits,
+                http2=self.http2
+            )
+            self._clients[service] = client
+        return client
+
+    async def aclose(self):
+        """Close all clients and their connections."""
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+
+# Process-wide pool shared by the indexer, OrbitClient and the API gateway
+http_pool = HttpClientPool()
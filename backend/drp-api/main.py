@@ -9,7 +9,6 @@ import base64
 import uuid
 from datetime import datetime
 from typing import Dict, Any, Optional, List
-import httpx
 from fastapi import FastAPI, HTTPException, Depends, Header, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
@@ -24,6 +23,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from crypto.crypto_adapter import sign_message, verify_signature, generate_keypair
 from orbit.orbit_client import OrbitClient
+from clients.http_pool import http_pool
+from jobs.work_queue import get_work_queue
 
 # Import elders router (relative import)
 from .elders import router as elders_router
@@ -33,6 +34,7 @@ IPFS_API_URL = os.getenv("IPFS_API_URL", "https://ipfs.decentralizedrights.com/a
 ORBITDB_ADDR = os.getenv("ORBITDB_ADDR", "")
 DB_URL = os.getenv("DB_URL", "postgresql://localhost/drp_api")
 AI_API_URL = os.getenv("AI_API_URL", "https://ai.decentralizedrights.com")
+QUEUE_URL = os.getenv("QUEUE_URL", "")
 
 # Database setup
 Base = declarative_base()
@@ -59,6 +61,9 @@ SessionLocal = sessionmaker(bind=engine)
 # OrbitDB client
 orbit_client = OrbitClient() if ORBITDB_ADDR else None
 
+# Indexer work queue
+work_queue = get_work_queue(QUEUE_URL) if QUEUE_URL else None
+
 app = FastAPI(title="DRP API Gateway", version="1.0.0")
 
 app.add_middleware(
@@ -77,6 +82,13 @@ app.add_middleware(
 # Include elder router
 app.include_router(elders_router)
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Close pooled HTTP connections and the work queue."""
+    await http_pool.aclose()
+    if work_queue:
+        await work_queue.close()
+
 # Pydantic models
 class ActivityClaim(BaseModel):
     title: str
@@ -130,18 +142,18 @@ def get_db():
 
 async def add_to_ipfs(payload: Dict[str, Any]) -> str:
     """Upload payload to IPFS and return CID."""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{IPFS_API_URL}/add",
-                files={"file": (None, str(payload))},
-                timeout=30.0
-            )
-            response.raise_for_status()
-            result = response.json()
-            return result.get("Hash") or result.get("cid", "")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"IPFS upload failed: {str(e)}")
+    client = http_pool.get("ipfs")
+    try:
+        response = await client.post(
+            f"{IPFS_API_URL}/add",
+            files={"file": (None, str(payload))},
+            timeout=30.0
+        )
+        response.raise_for_status()
+        result = response.json()
+        return result.get("Hash") or result.get("cid", "")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"IPFS upload failed: {str(e)}")
 
 async def add_to_orbitdb(db_name: str, payload: Dict[str, Any]) -> str:
     """Add entry to OrbitDB and return entry hash."""
@@ -155,9 +167,16 @@ async def add_to_orbitdb(db_name: str, payload: Dict[str, Any]) -> str:
 
 async def trigger_indexer(submission_id: str, payload: Dict[str, Any]):
     """Trigger indexer to process submission (background task)."""
-    # In production, this would send to a job queue (Redis, RabbitMQ, etc.)
-    # For now, we'll log it
-    print(f"[Indexer] Processing submission {submission_id}")
+    if not work_queue:
+        # No queue configured: the indexer picks it up on its next poll
+        print(f"[Indexer] Queued submission {submission_id} for next poll")
+        return
+    try:
+        job_id = await work_queue.enqueue(payload)
+        print(f"[Indexer] Enqueued submission {submission_id} as job {job_id}")
+    except Exception as e:
+        # The indexer's polling sweep still picks up pending submissions
+        print(f"[Indexer] Failed to enqueue submission {submission_id}: {str(e)}")
 
 @app.get("/health")
 async def health():
@@ -205,7 +224,7 @@ async def submit_activity(
     db.commit()
     
     # Trigger indexer (background)
-    background_tasks.add_task(trigger_indexer, submission_id, payload)
+    background_tasks.add_task(trigger_indexer, submission_id, {**payload, "ipfs_cid": ipfs_cid})
     
     return SubmissionResponse(
         submission_id=submission_id,
@@ -256,7 +275,7 @@ async def submit_status(
     db.commit()
     
     # Trigger indexer (background)
-    background_tasks.add_task(trigger_indexer, submission_id, payload)
+    background_tasks.add_task(trigger_indexer, submission_id, {**payload, "ipfs_cid": ipfs_cid})
     
     return SubmissionResponse(
         submission_id=submission_id,
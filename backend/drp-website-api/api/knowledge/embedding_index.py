@@ -0,0 +1,321 @@
+"""
+Persistent, memory-mapped embedding index for semantic knowledge search.
+
+An offline build step embeds the documents once and writes:
+- <name>.npy: float32 matrix of L2-normalized embeddings, one row per document
+- <name>.json: manifest with the document ids, model name and content hash
+- <name>.faiss: a flat inner-product FAISS index (only if FAISS is installed)
+
+Workers map the files read-only instead of embedding at start-up, so every worker
+on a host shares the same page-cache pages. The content hash covers the model and
+every document's id and text: the index is rebuilt only when one of them changes.
+Files are replaced atomically, so a worker never maps a half-written index.
+
+Search uses FAISS when it is installed and brute-force NumPy dot products otherwise.
+
+Usage (offline build, run before starting workers on a fresh deploy):
+    python -m api.knowledge.embedding_index [--output DIR] [--force]
+
+This builds both indexes EthicalLangChainService maps: "knowledge_base", searched by
+HybridRetriever over api.knowledge.human_rights_knowledge, and "ethical_knowledge",
+the service's built-in fallback used when that package cannot be imported. Without
+them, the first worker to start embeds the whole corpus itself.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_INDEX_DIR = os.getenv("KNOWLEDGE_EMBEDDINGS_DIR", "./knowledge_embeddings")
+# Documents embedded per model call during a build
+BUILD_BATCH_SIZE = 256
+
+# Texts -> one embedding per text
+EmbedFunction = Callable[[List[str]], Sequence[Sequence[float]]]
+
+
+def content_hash(documents: Sequence[Tuple[str, str]], model_name: str = EMBEDDING_MODEL) -> str:
+    """Hash of the model name and every (id, text) pair, in order."""
+    digest = hashlib.sha256(model_name.encode())
+    for doc_id, text in documents:
+        for part in (doc_id, text):
+            data = part.encode()
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def load_embedder(model_name: str = EMBEDDING_MODEL) -> Optional[EmbedFunction]:
+    """Sentence transformer embedding function on CPU, or None if the package is not installed."""
+    if not SENTENCE_TRANSFORMERS_AVAILABLE:
+        return None
+    model = SentenceTransformer(model_name, device="cpu")
+    return lambda texts: model.encode(list(texts), batch_size=64, show_progress_bar=False)
+
+
+class EmbeddingIndex:
+    """Read-only view of a built index: document ids and their mapped embeddings."""
+
+    def __init__(self, ids: List[str], vectors, manifest: dict, faiss_index=None):
+        self.ids = ids
+        self.vectors = vectors
+        self.manifest = manifest
+        self.faiss_index = faiss_index
+
+    @property
+    def content_hash(self) -> str:
+        return self.manifest["content_hash"]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, directory: str = DEFAULT_INDEX_DIR, name: str = "knowledge",
+             expected_hash: Optional[str] = None) -> Optional["EmbeddingIndex"]:
+        """
+        Map a built index read-only.
+
+        Returns:
+            The index, or None if it is missing, unreadable or built from other
+            content than `expected_hash`
+        """
+        if not NUMPY_AVAILABLE:
+            return None
+        base = os.path.join(directory, name)
+        try:
+            with open(f"{base}.json", "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if expected_hash is not None and manifest.get("content_hash") != expected_hash:
+                return None
+            vectors = np.load(f"{base}.npy", mmap_mode="r")
+            if vectors.shape != (len(manifest["ids"]), manifest["dimension"]):
+                logger.warning(f"Embedding index {base} does not match its manifest")
+                return None
+            faiss_index = None
+            if FAISS_AVAILABLE and os.path.exists(f"{base}.faiss"):
+                faiss_index = faiss.read_index(f"{base}.faiss", faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not load embedding index {base}: {e}")
+            return None
+        return cls(manifest["ids"], vectors, manifest, faiss_index)
+
+    def search(self, query_vector: Sequence[float], k: int = 3,
+               allowed: Optional[Iterable[int]] = None) -> List[Tuple[str, float]]:
+        """
+        Documents most similar to a query embedding.
+
+        Args:
+            query_vector: Query embedding (normalized here)
+            k: Maximum number of results
+            allowed: Only consider these rows (None: all). A filtered search scores
+                just those rows with NumPy, which is cheaper than over-fetching from FAISS.
+
+        Returns:
+            (document id, cosine similarity) pairs, most similar first
+        """
+        return [(self.ids[row], score) for row, score in self.search_rows(query_vector, k, allowed)]
+
+    def search_rows(self, query_vector: Sequence[float], k: int = 3,
+                    allowed: Optional[Iterable[int]] = None) -> List[Tuple[int, float]]:
+        """Like search(), returning row numbers (the documents' build order) instead of ids."""
+        if not len(self.ids):
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        if allowed is not None:
+            rows = np.fromiter(sorted(allowed), dtype=np.int64)
+            scores = self.vectors[rows] @ query if len(rows) else np.zeros(0, dtype=np.float32)
+        elif self.faiss_index is not None:
+            scores, found = self.faiss_index.search(query.reshape(1, -1), min(k, len(self.ids)))
+            return [(int(row), float(score)) for row, score in zip(found[0], scores[0]) if row >= 0]
+        else:
+            rows = None
+            scores = self.vectors @ query
+
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(rows[i]) if rows is not None else int(i), float(scores[i])) for i in top]
+
+
+def _replace_atomically(path: str, write: Callable[[str], None]):
+    """Write a file under a temporary name and rename it over `path`."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def build_index(
+    documents: Sequence[Tuple[str, str]],
+    embed: EmbedFunction,
+    directory: str = DEFAULT_INDEX_DIR,
+    name: str = "knowledge",
+    model_name: str = EMBEDDING_MODEL,
+    force: bool = False,
+    batch_size: int = BUILD_BATCH_SIZE
+) -> EmbeddingIndex:
+    """
+    Embed (id, text) documents and write the index, unless it is already up to date.
+
+    Concurrent builders (e.g. workers starting together) serialize on a lock file;
+    the ones that wait find the fresh index and load it instead of embedding again.
+
+    Args:
+        documents: (document id, text) pairs
+        embed: Embedding function for a batch of texts
+        directory: Index directory
+        name: Index file name (without extension)
+        model_name: Embedding model, part of the content hash
+        force: Rebuild even if the content hash matches
+        batch_size: Texts per embed() call
+
+    Returns:
+        The mapped index
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy is required to build an embedding index")
+    os.makedirs(directory, exist_ok=True)
+    expected_hash = content_hash(documents, model_name)
+    base = os.path.join(directory, name)
+
+    with open(f"{base}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if not force:
+            existing = EmbeddingIndex.load(directory, name, expected_hash)
+            if existing is not None:
+                return existing
+
+        texts = [text for _, text in documents]
+        dimension = None
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            batch = np.asarray(embed(texts[start:start + batch_size]), dtype=np.float32)
+            dimension = batch.shape[1]
+            batches.append(batch)
+        vectors = np.concatenate(batches) if batches else np.zeros((0, dimension or 0), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+
+        def write_vectors(path):
+            with open(path, "wb") as f:
+                np.save(f, vectors)
+
+        def write_faiss(path):
+            faiss_index = faiss.IndexFlatIP(vectors.shape[1])
+            faiss_index.add(vectors)
+            faiss.write_index(faiss_index, path)
+
+        def write_manifest(path):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "content_hash": expected_hash,
+                    "model": model_name,
+                    "dimension": int(vectors.shape[1]),
+                    "ids": [doc_id for doc_id, _ in documents],
+                }, f)
+
+        _replace_atomically(f"{base}.npy", write_vectors)
+        if FAISS_AVAILABLE and len(vectors):
+            _replace_atomically(f"{base}.faiss", write_faiss)
+        # The manifest goes last: until it names the new hash, readers ignore the new vectors
+        _replace_atomically(f"{base}.json", write_manifest)
+        logger.info(f"Embedding index {base} built for {len(documents)} documents")
+
+    index = EmbeddingIndex.load(directory, name, expected_hash)
+    if index is None:
+        raise RuntimeError(f"Embedding index {base} could not be loaded after building")
+    return index
+
+
+def build_knowledge_indexes(
+    directory: str = DEFAULT_INDEX_DIR,
+    force: bool = False,
+    embed: Optional[EmbedFunction] = None
+) -> Dict[str, "EmbeddingIndex"]:
+    """
+    Build (or verify) the embedding indexes workers map at start-up.
+
+    Builds through the same classes the service uses, so the documents, texts and
+    model match what workers hash.
+
+    Args:
+        directory: Index directory (KNOWLEDGE_EMBEDDINGS_DIR on the workers)
+        force: Rebuild even if the documents are unchanged
+        embed: Embedding function (default: the sentence transformer model)
+
+    Returns:
+        Index name -> mapped index, for the indexes that could be built
+    """
+    from .human_rights_knowledge import HumanRightsKnowledgeBase
+    from .hybrid_retriever import HybridRetriever
+    from ..services.ethical_langchain_service import HumanRightsKnowledgeBase as FallbackKnowledgeBase
+
+    indexes = {}
+    retriever = HybridRetriever(
+        HumanRightsKnowledgeBase(load_from_file=False), embed=embed, index_dir=directory, rebuild_index=force
+    )
+    if retriever.index is not None:
+        indexes[HybridRetriever.INDEX_NAME] = retriever.index
+    fallback = FallbackKnowledgeBase(embed=embed, index_dir=directory, rebuild_index=force)
+    if fallback.vector_store is not None:
+        indexes[FallbackKnowledgeBase.INDEX_NAME] = fallback.vector_store
+    return indexes
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the knowledge base embedding indexes")
+    parser.add_argument("--output", default=DEFAULT_INDEX_DIR)
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the documents are unchanged")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from .hybrid_retriever import HybridRetriever
+
+    built = build_knowledge_indexes(args.output, args.force)
+    for name, index in built.items():
+        print(f"{name}: {len(index)} documents, {index.vectors.shape[1]} dimensions, hash {index.content_hash[:12]}")
+    if HybridRetriever.INDEX_NAME not in built:
+        raise SystemExit("Knowledge base embedding index was not built, see the log above")
@@ -10,14 +10,20 @@ Version: 1.0.0
 Date: August 7, 2026
 """
 
+import hashlib
 import json
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
 from dataclasses import dataclass, field
 import logging
 
+from .search_index import InvertedIndex
+
 logger = logging.getLogger(__name__)
 
+# Score multiplier per importance point above 1 (importance 5 ranks 1.4x higher)
+IMPORTANCE_BOOST = 0.1
+
 
 @dataclass
 class KnowledgeDocument:
@@ -61,6 +67,7 @@ class HumanRightsKnowledgeBase:
         self.documents: List[KnowledgeDocument] = []
         self.categories: Dict[str, List[KnowledgeDocument]] = {}
         self.tags_index: Dict[str, List[KnowledgeDocument]] = {}
+        self.search_index = InvertedIndex()
         self._initialize_base_knowledge()
         
         if load_from_file:
@@ -809,75 +816,84 @@ governing.""",
                         logger.error(f"Error loading knowledge file {filename}: {e}")
     
     def _build_indexes(self):
-        """Build category and tag indexes for efficient lookup."""
+        """Build the search, id, category and tag indexes (documents are numbered by list position)."""
+        self.version = self._content_version()
         self.categories = {}
         self.tags_index = {}
+        self.search_index = InvertedIndex()
+        self._by_id: Dict[str, KnowledgeDocument] = {}
+        self._category_numbers: Dict[str, Set[int]] = {}
+        self._tag_numbers: Dict[str, Set[int]] = {}
         
-        for doc in self.documents:
+        for number, doc in enumerate(self.documents):
+            self.search_index.add(
+                doc.title, doc.content, doc.tags,
+                prior=1 + IMPORTANCE_BOOST * (doc.importance - 1)
+            )
+            self._by_id.setdefault(doc.id, doc)
+            
             # Index by category
-            if doc.category not in self.categories:
-                self.categories[doc.category] = []
-            self.categories[doc.category].append(doc)
+            self.categories.setdefault(doc.category, []).append(doc)
+            self._category_numbers.setdefault(doc.category, set()).add(number)
             
             # Index by tags
-            for tag in doc.tags:
-                tag_lower = tag.lower()
-                if tag_lower not in self.tags_index:
-                    self.tags_index[tag_lower] = []
-                if doc not in self.tags_index[tag_lower]:
-                    self.tags_index[tag_lower].append(doc)
+            for tag_lower in dict.fromkeys(tag.lower() for tag in doc.tags):
+                self.tags_index.setdefault(tag_lower, []).append(doc)
+                self._tag_numbers.setdefault(tag_lower, set()).add(number)
     
-    def search(self, query: str, category: Optional[str] = None, 
-               tags: Optional[List[str]] = None, limit: int = 10) -> List[KnowledgeDocument]:
-        """Search the knowledge base for relevant documents."""
-        query_lower = query.lower()
-        results = []
-        
-        # Filter by category if specified
-        documents_to_search = self.documents
-        if category and category in self.categories:
-            documents_to_search = self.categories[category]
+    def _content_version(self) -> str:
+        """Short hash of every document's searchable content; changes whenever the documents do."""
+        digest = hashlib.sha256()
+        for doc in self.documents:
+            digest.update(json.dumps(
+                [doc.id, doc.title, doc.content, doc.category, doc.tags, doc.importance],
+                ensure_ascii=False
+            ).encode())
+        return digest.hexdigest()[:16]
+    
+    def _allowed_numbers(self, category: Optional[str], tags: Optional[List[str]]) -> Optional[Set[int]]:
+        """Document numbers passing the category and tag filters (None: no filter)."""
+        allowed = None
+        if category and category in self._category_numbers:
+            allowed = self._category_numbers[category]
         
-        # Filter by tags if specified
+        # Documents with every known tag; unknown tags are ignored
         if tags:
-            tag_results = []
+            tagged = None
             for tag in tags:
-                tag_lower = tag.lower()
-                if tag_lower in self.tags_index:
-                    if not tag_results:
-                        tag_results = self.tags_index[tag_lower].copy()
-                    else:
-                        # Intersect with existing results
-                        tag_results = [doc for doc in tag_results if doc in self.tags_index[tag_lower]]
-            
-            if tag_results:
-                documents_to_search = tag_results
-        
-        # Search for matching documents
-        for doc in documents_to_search:
-            if query_lower in doc.content.lower() or query_lower in doc.title.lower():
-                results.append(doc)
-            else:
-                # Check if any of the query words are in the document
-                query_words = query_lower.split()
-                doc_words = set(doc.content.lower().split() + doc.title.lower().split())
-                if any(word in doc_words for word in query_words):
-                    results.append(doc)
-        
-        # Sort by importance and relevance
-        results.sort(key=lambda doc: (
-            -doc.importance,  # Higher importance first
-            doc.title.lower().find(query_lower)  # Better title matches first
-        ))
+                numbers = self._tag_numbers.get(tag.lower())
+                if numbers is not None:
+                    tagged = numbers if tagged is None else tagged & numbers
+            if tagged:
+                allowed = tagged if allowed is None else allowed & tagged
+        return allowed
+    
+    def search_with_scores(self, query: str, category: Optional[str] = None,
+                           tags: Optional[List[str]] = None,
+                           limit: int = 10) -> List[Tuple[KnowledgeDocument, float]]:
+        """
+        Search the knowledge base, returning BM25 relevance scores.
         
-        return results[:limit]
+        Args:
+            query: Search terms; "quoted phrases" must appear verbatim (after stemming)
+            category: Only documents in this category
+            tags: Only documents with all of these tags
+            limit: Maximum number of results
+            
+        Returns:
+            (document, score) pairs, most relevant first
+        """
+        hits = self.search_index.search(query, limit, self._allowed_numbers(category, tags))
+        return [(self.documents[number], score) for number, score in hits]
+    
+    def search(self, query: str, category: Optional[str] = None, 
+               tags: Optional[List[str]] = None, limit: int = 10) -> List[KnowledgeDocument]:
+        """Search the knowledge base for relevant documents, most relevant first."""
+        return [doc for doc, _ in self.search_with_scores(query, category, tags, limit)]
     
     def get_by_id(self, doc_id: str) -> Optional[KnowledgeDocument]:
         """Get a document by its ID."""
-        for doc in self.documents:
-            if doc.id == doc_id:
-                return doc
-        return None
+        return self._by_id.get(doc_id)
     
     def search_knowledge(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
         """Search the knowledge base for relevant information.
@@ -889,14 +905,13 @@ governing.""",
             k: Maximum number of results to return
             
         Returns:
-            List of dictionaries with content, metadata, and relevance
+            List of dictionaries with content, metadata, and relevance (BM25 score)
         """
-        # Use the existing search method
-        results = self.search(query, limit=k)
+        results = self.search_with_scores(query, limit=k)
         
         # Format results to match expected interface
         formatted_results = []
-        for doc in results:
+        for doc, score in results:
             formatted_results.append({
                 "content": doc.content,
                 "metadata": {
@@ -906,7 +921,7 @@ governing.""",
                     "tags": doc.tags,
                     "importance": doc.importance
                 },
-                "relevance": 1.0
+                "relevance": round(score, 4)
             })
         
         return formatted_results
@@ -938,6 +953,7 @@ governing.""",
         
         return {
             "total_documents": len(self.documents),
+            "version": self.version,
             "total_categories": len(self.categories),
             "total_tags": len(self.tags_index),
             "category_counts": category_counts,
@@ -1036,10 +1052,10 @@ if __name__ == "__main__":
     
     # Test search
     print("\nSearch Test:")
-    results = kb.search("human rights verification", limit=3)
-    for i, doc in enumerate(results):
+    results = kb.search_with_scores("human rights verification", limit=3)
+    for i, (doc, score) in enumerate(results):
         print(f"{i+1}. {doc.title} ({doc.source})")
-        print(f"   Relevance: Content contains search terms")
+        print(f"   Relevance: {score:.3f}")
         print()
     
     # Test category lookup
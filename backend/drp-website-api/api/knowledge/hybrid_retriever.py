@@ -0,0 +1,227 @@
+"""
+Hybrid lexical + semantic retrieval for the knowledge base.
+
+BM25 over the knowledge base's inverted index and cosine similarity over the
+persistent embedding index each rank the documents that pass the category and tag
+filters. The two rankings are fused with reciprocal-rank fusion (RRF):
+
+    fused(doc) = sum over rankings of  weight / (RRF_K + rank of doc)
+
+RRF only uses ranks, so unbounded BM25 scores and model-specific cosine
+similarities never have to be put on one scale to order the results.
+
+The reported relevance is on an absolute 0-1 scale instead of being relative to the
+other results: the weighted mean of the document's BM25 score as a fraction of the
+score a document saturating every query term would get, and its cosine similarity.
+A document outside one retriever's candidates scores 0 there. The evaluation harness
+(benchmarks/eval_knowledge_retrieval.py) checks it with precision per relevance band.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from .search_index import K1, parse_query
+from .embedding_index import (
+    DEFAULT_INDEX_DIR,
+    NUMPY_AVAILABLE,
+    EmbedFunction,
+    EmbeddingIndex,
+    build_index,
+    content_hash,
+    load_embedder,
+)
+
+logger = logging.getLogger(__name__)
+
+# RRF damping constant: larger values flatten the difference between top ranks
+RRF_K = 60
+# Candidates taken from each retriever before fusion
+CANDIDATE_DEPTH = 50
+
+Ranking = List[Tuple[int, float]]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Ranking], weights: Sequence[float],
+                           k: int = RRF_K) -> List[Tuple[int, float]]:
+    """
+    Fuse rankings of (document number, score) pairs, best first.
+
+    Returns:
+        (document number, fused score) pairs, best first; ties keep first-seen order
+    """
+    fused: Dict[int, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, (doc, _) in enumerate(ranking, 1):
+            fused[doc] = fused.get(doc, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: -item[1])
+
+
+class HybridRetriever:
+    """BM25 and embedding search over a HumanRightsKnowledgeBase, fused with RRF."""
+
+    INDEX_NAME = "knowledge_base"
+
+    def __init__(self, knowledge_base,
+                 embed: Optional[EmbedFunction] = None,
+                 index_dir: Optional[str] = None,
+                 lexical_weight: float = 1.0,
+                 semantic_weight: float = 1.0,
+                 rrf_k: int = RRF_K,
+                 depth: int = CANDIDATE_DEPTH,
+                 rebuild_index: bool = False):
+        """
+        Args:
+            knowledge_base: The knowledge base (documents, inverted index and filters)
+            embed: Embedding function for a batch of texts (default: all-MiniLM-L6-v2
+                if sentence-transformers is installed, loaded on first use)
+            index_dir: Directory of the persistent embedding index
+            lexical_weight: Weight of the BM25 ranking in the fusion (0 disables it)
+            semantic_weight: Weight of the embedding ranking in the fusion (0 disables it)
+            rrf_k: RRF damping constant
+            depth: Candidates taken from each retriever
+            rebuild_index: Re-embed the documents even if the index is up to date
+        """
+        self.knowledge_base = knowledge_base
+        self.index_dir = index_dir or DEFAULT_INDEX_DIR
+        self.lexical_weight = lexical_weight
+        self.semantic_weight = semantic_weight
+        self.rrf_k = rrf_k
+        self.depth = depth
+        self.index: Optional[EmbeddingIndex] = None
+        self._embed = embed
+        self._embed_loaded = embed is not None
+        self._indexed = None
+        if semantic_weight:
+            self.refresh(rebuild_index)
+
+    def _embedder(self) -> Optional[EmbedFunction]:
+        if not self._embed_loaded:
+            self._embed_loaded = True
+            try:
+                self._embed = load_embedder()
+            except Exception as e:
+                logger.warning(f"Embedding model unavailable, knowledge search is lexical only: {e}")
+        return self._embed
+
+    def refresh(self, rebuild: bool = False):
+        """Map the embedding index for the knowledge base's current documents, building it if stale."""
+        # _build_indexes() replaces the inverted index: its identity marks the document set
+        self._indexed = self.knowledge_base.search_index
+        self.index = None
+        if not NUMPY_AVAILABLE:
+            return
+        documents = [(doc.id, f"{doc.title}\n{doc.content}") for doc in self.knowledge_base.documents]
+        try:
+            index = None
+            if not rebuild:
+                index = EmbeddingIndex.load(self.index_dir, self.INDEX_NAME, content_hash(documents))
+            if index is None:
+                embed = self._embedder()
+                if embed is None:
+                    logger.warning("No embedding model installed, knowledge search is lexical only")
+                    return
+                index = build_index(documents, embed, self.index_dir, self.INDEX_NAME, force=rebuild)
+            self.index = index
+        except Exception as e:
+            logger.error(f"Error loading knowledge embedding index: {e}")
+
+    def _lexical(self, query: str, allowed: Optional[Set[int]]) -> Ranking:
+        if not self.lexical_weight:
+            return []
+        return self.knowledge_base.search_index.search(query, self.depth, allowed)
+
+    def _semantic(self, query: str, allowed: Optional[Set[int]]) -> Optional[Ranking]:
+        """Embedding ranking, or None if semantic search is off or unavailable."""
+        if not self.semantic_weight:
+            return None
+        if self._indexed is not self.knowledge_base.search_index:
+            self.refresh()
+        if self.index is None:
+            return None
+        vector = self.embed_query(query)
+        if vector is None:
+            return None
+        return self.index.search_rows(vector, self.depth, allowed)
+
+    def embed_query(self, query: str):
+        """Embedding of a query, or None without an embedding model."""
+        embed = self._embedder()
+        return embed([query])[0] if embed is not None else None
+
+    def _bm25_ceiling(self, query: str) -> float:
+        """BM25 score of a document saturating every query term (before its prior)."""
+        index = self.knowledge_base.search_index
+        terms, _ = parse_query(query)
+        return sum(index.idf(term) * (K1 + 1) for term in terms if term in index.postings)
+
+    def _fuse(self, query: str, lexical: Ranking, semantic: Optional[Ranking], k: int) -> List[Dict[str, Any]]:
+        rankings, weights = [], []
+        if self.lexical_weight:
+            rankings.append(lexical)
+            weights.append(self.lexical_weight)
+        if semantic is not None:
+            rankings.append(semantic)
+            weights.append(self.semantic_weight)
+        if not weights:
+            return []
+        bm25 = dict(lexical)
+        cosine = dict(semantic or [])
+        ceiling = self._bm25_ceiling(query) if self.lexical_weight else 0.0
+        priors = self.knowledge_base.search_index.priors
+
+        results = []
+        for number, fused in reciprocal_rank_fusion(rankings, weights, self.rrf_k)[:k]:
+            doc = self.knowledge_base.documents[number]
+            # Each retriever's evidence on a 0-1 scale, weighted like the fusion
+            evidence = 0.0
+            if self.lexical_weight and ceiling:
+                evidence += self.lexical_weight * min(1.0, bm25.get(number, 0.0) / priors[number] / ceiling)
+            if semantic is not None:
+                evidence += self.semantic_weight * max(0.0, cosine.get(number, 0.0))
+            results.append({
+                "id": doc.id,
+                "content": doc.content,
+                "metadata": {
+                    "title": doc.title,
+                    "source": doc.source,
+                    "category": doc.category,
+                    "tags": doc.tags,
+                    "importance": doc.importance
+                },
+                "relevance": round(evidence / sum(weights), 4),
+                "scores": {
+                    "rrf": round(fused, 6),
+                    "bm25": round(bm25[number], 4) if number in bm25 else None,
+                    "cosine": round(cosine[number], 4) if number in cosine else None
+                }
+            })
+        return results
+
+    def search(self, query: str, k: int = 5, category: Optional[str] = None,
+               tags: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Hybrid search of the knowledge base.
+
+        Args:
+            query: Search query; "quoted phrases" must appear verbatim in lexical results
+            k: Maximum number of results
+            category: Only documents in this category
+            tags: Only documents with all of these tags
+
+        Returns:
+            Results in the search_knowledge format (content, metadata, relevance),
+            plus the document id and each retriever's own score
+        """
+        allowed = self.knowledge_base._allowed_numbers(category, tags)
+        return self._fuse(query, self._lexical(query, allowed), self._semantic(query, allowed), k)
+
+    async def asearch(self, query: str, k: int = 5, category: Optional[str] = None,
+                      tags: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """search(), running the BM25 and embedding retrievers concurrently in worker threads."""
+        allowed = self.knowledge_base._allowed_numbers(category, tags)
+        lexical, semantic = await asyncio.gather(
+            asyncio.to_thread(self._lexical, query, allowed),
+            asyncio.to_thread(self._semantic, query, allowed)
+        )
+        return self._fuse(query, lexical, semantic, k)
@@ -0,0 +1,352 @@
+"""
+Inverted index with BM25 ranking for the knowledge base.
+
+Documents are tokenized (lowercase alphanumeric words, stop words dropped) and
+stemmed with the Porter algorithm. Each term keeps a postings list of the documents
+containing it with their term frequency and word positions, so a query only visits
+the postings of its own terms, and quoted phrases are matched exactly by position.
+
+Title and tag words count TITLE_WEIGHT times towards a term's frequency (a simple
+form of BM25F) and are kept in their own position range, so a phrase never matches
+across the end of the title into the content.
+"""
+
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Term frequency multiplier for title and tag words
+TITLE_WEIGHT = 3
+# Content positions start here, keeping title phrases apart from content phrases
+CONTENT_OFFSET = 1 << 16
+
+_WORD = re.compile(r"[a-z0-9]+")
+_PHRASE = re.compile(r'"([^"]*)"')
+
+STOP_WORDS = frozenset("""
+a an and are as at be been but by for from has have he her his i if in into is it its
+of on or our she so than that the their them then there these they this to was we were
+which while who will with you your
+""".split())
+
+
+# ============================================================================
+# TOKENIZATION AND STEMMING
+# ============================================================================
+
+def _is_consonant(word: str, i: int) -> bool:
+    ch = word[i]
+    if ch in "aeiou":
+        return False
+    if ch == "y":
+        return i == 0 or not _is_consonant(word, i - 1)
+    return True
+
+
+def _measure(stem: str) -> int:
+    """Number of vowel-consonant sequences in a stem (Porter's m)."""
+    m = 0
+    previous_vowel = False
+    for i in range(len(stem)):
+        vowel = not _is_consonant(stem, i)
+        if previous_vowel and not vowel:
+            m += 1
+        previous_vowel = vowel
+    return m
+
+
+def _has_vowel(stem: str) -> bool:
+    return any(not _is_consonant(stem, i) for i in range(len(stem)))
+
+
+def _ends_double_consonant(word: str) -> bool:
+    return len(word) >= 2 and word[-1] == word[-2] and _is_consonant(word, len(word) - 1)
+
+
+def _ends_cvc(word: str) -> bool:
+    return (
+        len(word) >= 3
+        and _is_consonant(word, len(word) - 3)
+        and not _is_consonant(word, len(word) - 2)
+        and _is_consonant(word, len(word) - 1)
+        and word[-1] not in "wxy"
+    )
+
+
+_STEP2 = sorted({
+    "ational": "ate", "tional": "tion", "enci": "ence", "anci": "ance", "izer": "ize",
+    "abli": "able", "alli": "al", "entli": "ent", "eli": "e", "ousli": "ous",
+    "ization": "ize", "ation": "ate", "ator": "ate", "alism": "al", "iveness": "ive",
+    "fulness": "ful", "ousness": "ous", "aliti": "al", "iviti": "ive", "biliti": "ble",
+}.items(), key=lambda item: -len(item[0]))
+
+_STEP3 = sorted({
+    "icate": "ic", "ative": "", "alize": "al", "iciti": "ic", "ical": "ic", "ful": "", "ness": "",
+}.items(), key=lambda item: -len(item[0]))
+
+_STEP4 = sorted((
+    "al", "ance", "ence", "er", "ic", "able", "ible", "ant", "ement", "ment", "ent",
+    "ion", "ou", "ism", "ate", "iti", "ous", "ive", "ize",
+), key=len, reverse=True)
+
+
+def _replace_suffix(word: str, rules, min_measure: int) -> str:
+    """Apply the longest matching suffix rule if the remaining stem is long enough."""
+    for suffix, replacement in rules:
+        if word.endswith(suffix):
+            stem = word[:-len(suffix)]
+            return stem + replacement if _measure(stem) > min_measure else word
+    return word
+
+
+@lru_cache(maxsize=100_000)
+def stem(word: str) -> str:
+    """Reduce a lowercase word to its Porter stem ("rights" -> "right", "verified" -> "verifi")."""
+    if len(word) <= 2 or not word.isalpha():
+        return word
+
+    # Step 1a: plurals
+    if word.endswith("sses") or word.endswith("ies"):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+
+    # Step 1b: -eed, -ed, -ing
+    if word.endswith("eed"):
+        if _measure(word[:-3]) > 0:
+            word = word[:-1]
+    else:
+        for suffix in ("ed", "ing"):
+            if word.endswith(suffix) and _has_vowel(word[:-len(suffix)]):
+                word = word[:-len(suffix)]
+                if word.endswith(("at", "bl", "iz")):
+                    word += "e"
+                elif _ends_double_consonant(word) and word[-1] not in "lsz":
+                    word = word[:-1]
+                elif _measure(word) == 1 and _ends_cvc(word):
+                    word += "e"
+                break
+
+    # Step 1c: y -> i
+    if word.endswith("y") and _has_vowel(word[:-1]):
+        word = word[:-1] + "i"
+
+    word = _replace_suffix(word, _STEP2, 0)
+    word = _replace_suffix(word, _STEP3, 0)
+
+    # Step 4: drop derivational suffixes from long stems
+    for suffix in _STEP4:
+        if word.endswith(suffix):
+            stem_ = word[:-len(suffix)]
+            if _measure(stem_) > 1 and (suffix != "ion" or stem_.endswith(("s", "t"))):
+                word = stem_
+            break
+
+    # Step 5: final -e and -ll
+    if word.endswith("e"):
+        stem_ = word[:-1]
+        m = _measure(stem_)
+        if m > 1 or (m == 1 and not _ends_cvc(stem_)):
+            word = stem_
+    if word.endswith("ll") and _measure(word) > 1:
+        word = word[:-1]
+    return word
+
+
+def analyze(text: str, start: int = 0) -> List[Tuple[str, int]]:
+    """
+    Split text into (term, position) pairs.
+
+    Stop words are dropped but still take up a position, so "right to life" keeps
+    "life" two positions after "right".
+    """
+    return [
+        (stem(word), position)
+        for position, word in enumerate(_WORD.findall(text.lower()), start)
+        if word not in STOP_WORDS
+    ]
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[Tuple[str, int]]]]:
+    """
+    Split a query into its scoring terms and its quoted phrases.
+
+    Returns:
+        (terms, phrases): every distinct term of the query, and for each phrase its
+        (term, offset from the phrase's first term) pairs
+    """
+    phrases = []
+    for phrase in _PHRASE.findall(query):
+        tokens = analyze(phrase)
+        if len(tokens) > 1:
+            first = tokens[0][1]
+            phrases.append([(term, position - first) for term, position in tokens])
+    terms = list(dict.fromkeys(term for term, _ in analyze(query.replace('"', " "))))
+    return terms, phrases
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+class _Postings:
+    """Documents containing one term, in ascending document order."""
+
+    __slots__ = ("docs", "freqs", "offsets", "positions")
+
+    def __init__(self):
+        self.docs = array("I")
+        self.freqs = array("H")
+        # positions[offsets[i]:offsets[i + 1]] are the positions in docs[i]
+        self.offsets = array("I", [0])
+        self.positions = array("I")
+
+    def add(self, doc: int, freq: int, positions: List[int]):
+        self.docs.append(doc)
+        self.freqs.append(min(freq, 0xFFFF))
+        self.positions.extend(positions)
+        self.offsets.append(len(self.positions))
+
+    def positions_of(self, i: int) -> array:
+        return self.positions[self.offsets[i]:self.offsets[i + 1]]
+
+
+class InvertedIndex:
+    """Positional inverted index over documents numbered 0..n-1, ranked with BM25."""
+
+    def __init__(self):
+        self.postings: Dict[str, _Postings] = {}
+        self.doc_lengths = array("I")
+        self.priors = array("f")
+        self._norms: List[float] = []
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, title: str, content: str, tags: Iterable[str] = (), prior: float = 1.0) -> int:
+        """
+        Index a document.
+
+        Args:
+            title: Title (weighted TITLE_WEIGHT times)
+            content: Body text
+            tags: Tags (weighted like the title)
+            prior: Multiplier applied to the document's score (e.g. from its importance)
+
+        Returns:
+            The document's number
+        """
+        doc = len(self.doc_lengths)
+        heading = analyze(" ".join([title, *tags]))
+        body = analyze(content, CONTENT_OFFSET)
+
+        positions: Dict[str, List[int]] = {}
+        freqs: Dict[str, int] = {}
+        for weight, tokens in ((TITLE_WEIGHT, heading), (1, body)):
+            for term, position in tokens:
+                positions.setdefault(term, []).append(position)
+                freqs[term] = freqs.get(term, 0) + weight
+        for term, term_positions in positions.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = _Postings()
+            postings.add(doc, freqs[term], term_positions)
+
+        self.doc_lengths.append(len(heading) * TITLE_WEIGHT + len(body))
+        self.priors.append(prior)
+        self._dirty = True
+        return doc
+
+    def _length_norms(self) -> List[float]:
+        """K1 * (1 - B + B * length / average length) for every document."""
+        if self._dirty:
+            average = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 1.0
+            self._norms = [K1 * (1 - B + B * length / (average or 1.0)) for length in self.doc_lengths]
+            self._dirty = False
+        return self._norms
+
+    def idf(self, term: str) -> float:
+        postings = self.postings.get(term)
+        df = len(postings.docs) if postings else 0
+        return math.log(1 + (len(self.doc_lengths) - df + 0.5) / (df + 0.5))
+
+    def _phrase_matches(self, phrase: List[Tuple[str, int]], allowed: Optional[Set[int]]) -> Set[int]:
+        """Documents containing the phrase's terms at the phrase's relative positions."""
+        lists = [(self.postings.get(term), offset) for term, offset in phrase]
+        if any(postings is None for postings, _ in lists):
+            return set()
+        # Walk the rarest term's postings; find each document in the others by bisection
+        lists.sort(key=lambda item: len(item[0].docs))
+        (rarest, rarest_offset), others = lists[0], lists[1:]
+        cursors = [0] * len(others)
+
+        matches = set()
+        for i, doc in enumerate(rarest.docs):
+            if allowed is not None and doc not in allowed:
+                continue
+            starts = None
+            for k, (postings, offset) in enumerate(others):
+                j = bisect_left(postings.docs, doc, cursors[k])
+                cursors[k] = j
+                if j == len(postings.docs) or postings.docs[j] != doc:
+                    starts = None
+                    break
+                if starts is None:
+                    starts = {position - rarest_offset for position in rarest.positions_of(i)}
+                starts &= {position - offset for position in postings.positions_of(j)}
+                if not starts:
+                    break
+            if starts:
+                matches.add(doc)
+        return matches
+
+    def search(self, query: str, limit: int = 10, allowed: Optional[Set[int]] = None) -> List[Tuple[int, float]]:
+        """
+        Rank documents against a query.
+
+        Any query term makes a document a candidate; every quoted phrase must appear.
+        Cost grows with the postings of the query's terms, not with the corpus.
+
+        Args:
+            query: Free text, optionally with "quoted phrases"
+            limit: Maximum number of results
+            allowed: Only consider these document numbers (None: all)
+
+        Returns:
+            (document number, BM25 score) pairs, best first
+        """
+        terms, phrases = parse_query(query)
+        if not terms:
+            return []
+        for phrase in phrases:
+            matches = self._phrase_matches(phrase, allowed)
+            allowed = matches if allowed is None else allowed & matches
+            if not allowed:
+                return []
+
+        norms = self._length_norms()
+        scores: Dict[int, float] = {}
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            weight = self.idf(term) * (K1 + 1)
+            for doc, freq in zip(postings.docs, postings.freqs):
+                if allowed is not None and doc not in allowed:
+                    continue
+                scores[doc] = scores.get(doc, 0.0) + weight * freq / (freq + norms[doc])
+
+        priors = self.priors
+        return heapq.nlargest(
+            limit,
+            ((doc, score * priors[doc]) for doc, score in scores.items()),
+            key=lambda item: item[1]
+        )
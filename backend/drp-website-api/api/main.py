@@ -18,7 +18,7 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Depends, Header, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
@@ -30,12 +30,22 @@ from .routers import (
     notifications,
     ai_service,
     explorer,
+    live,
     users,
     ethical_ai
 )
 from .services.blockchain_service import BlockchainService
 from .services.ai_service import AIService
 from .services.cache_service import CacheService
+from .services.chain_index_service import ChainIndexService
+from .services.chain_follower import ChainFollower
+from .services.explorer_stats_service import ExplorerStatsService
+from .services.live_feed_service import LiveFeedService
+from .services.notification_service import NotificationService
+from .services.vote_ledger_service import VoteLedgerService
+from .services.cache_codec import CacheCodec
+from .services.pagination import NEXT_CURSOR_HEADER
+from .services.metrics_service import MetricsService, MetricsMiddleware, CONTENT_TYPE_LATEST
 
 # Configure logging
 logging.basicConfig(
@@ -65,13 +75,42 @@ class Settings(BaseSettings):
     LANGCHAIN_API_KEY: str = os.getenv("LANGCHAIN_API_KEY", "")
     NVIDIA_NIM_API_KEY: str = os.getenv("NVIDIA_NIM_API_KEY", "")
     NVIDIA_NIM_MODEL: str = os.getenv("NVIDIA_NIM_MODEL", "mistralai/Mixtral-8x7B-Instruct-v0.1")
+    # Near-duplicate knowledge questions served from the cache at this similarity (0 disables)
+    QUERY_CACHE_SEMANTIC_THRESHOLD: float = float(os.getenv("QUERY_CACHE_SEMANTIC_THRESHOLD", "0"))
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./drp.db")
     
+    # Chain index (explorer data); run the follower in one process only
+    CHAIN_INDEX_ENABLED: bool = os.getenv("CHAIN_INDEX_ENABLED", "true").lower() == "true"
+    CHAIN_INDEX_URL: str = os.getenv("CHAIN_INDEX_URL", os.getenv("DATABASE_URL", "sqlite:///./drp.db"))
+    CHAIN_FOLLOWER_ENABLED: bool = os.getenv("CHAIN_FOLLOWER_ENABLED", "false").lower() == "true"
+    CHAIN_FOLLOWER_POLL_INTERVAL: float = float(os.getenv("CHAIN_FOLLOWER_POLL_INTERVAL", "2.0"))
+    CHAIN_CONFIRMATIONS: int = int(os.getenv("CHAIN_CONFIRMATIONS", "0"))
+    EXPLORER_STATS_WINDOW: int = int(os.getenv("EXPLORER_STATS_WINDOW", "300"))
+    EXPLORER_STATS_RECONCILE_INTERVAL: int = int(os.getenv("EXPLORER_STATS_RECONCILE_INTERVAL", "300"))
+    
+    # Live feed (SSE/WebSocket)
+    LIVE_BUFFER_SIZE: int = int(os.getenv("LIVE_BUFFER_SIZE", "256"))
+    LIVE_SLOW_CONSUMER_POLICY: str = os.getenv("LIVE_SLOW_CONSUMER_POLICY", "drop_oldest")  # drop_oldest, disconnect
+    
+    # Notifications
+    NOTIFICATIONS_DATABASE_URL: str = os.getenv("NOTIFICATIONS_DATABASE_URL", os.getenv("DATABASE_URL", "sqlite:///./drp.db"))
+    NOTIFICATIONS_BATCH_SIZE: int = int(os.getenv("NOTIFICATIONS_BATCH_SIZE", "1000"))
+    NOTIFICATIONS_QUEUE_SIZE: int = int(os.getenv("NOTIFICATIONS_QUEUE_SIZE", "100"))
+    
+    # Governance vote ledger and tallies
+    VOTE_LEDGER_URL: str = os.getenv("VOTE_LEDGER_URL", os.getenv("DATABASE_URL", "sqlite:///./drp.db"))
+    
     # Cache
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
     CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_LOCAL_MAX_ENTRIES: int = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "10000"))
+    CACHE_LOCAL_MAX_BYTES: int = int(os.getenv("CACHE_LOCAL_MAX_BYTES", str(64 * 1024 * 1024)))
+    CACHE_LOCAL_TTL: int = int(os.getenv("CACHE_LOCAL_TTL", "60"))
+    CACHE_SERIALIZER: str = os.getenv("CACHE_SERIALIZER", "orjson")  # json, orjson, msgpack
+    CACHE_COMPRESSION: str = os.getenv("CACHE_COMPRESSION", "zstd")  # none, zlib, zstd, lz4
+    CACHE_COMPRESS_THRESHOLD: int = int(os.getenv("CACHE_COMPRESS_THRESHOLD", "1024"))
     
     # CORS
     ALLOWED_ORIGINS: str = os.getenv(
@@ -86,6 +125,9 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
+# Metrics are created before the app so the middleware can record every request
+metrics_service = MetricsService()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -93,17 +135,109 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting DRP Website API...")
     
+    # Initialize cache first so services can read through it
+    if settings.CACHE_ENABLED:
+        try:
+            cache_service = CacheService(
+                redis_url=settings.REDIS_URL,
+                local_max_entries=settings.CACHE_LOCAL_MAX_ENTRIES,
+                local_max_bytes=settings.CACHE_LOCAL_MAX_BYTES,
+                local_ttl=settings.CACHE_LOCAL_TTL,
+                codec=CacheCodec(
+                    serializer=settings.CACHE_SERIALIZER,
+                    compression=settings.CACHE_COMPRESSION,
+                    compress_threshold=settings.CACHE_COMPRESS_THRESHOLD
+                )
+            )
+            await cache_service.start()
+            app.state.cache_service = cache_service
+            logger.info("Cache service initialized")
+        except Exception as e:
+            logger.warning(f"Failed to initialize cache service: {e}")
+            app.state.cache_service = None
+    else:
+        app.state.cache_service = None
+    
+    # One upstream subscription per worker, shared by all live clients
+    try:
+        cache_service = app.state.cache_service
+        app.state.live_feed = LiveFeedService(
+            redis_client=cache_service.redis_client if cache_service and cache_service.redis_enabled else None,
+            buffer_size=settings.LIVE_BUFFER_SIZE,
+            slow_consumer_policy=settings.LIVE_SLOW_CONSUMER_POLICY
+        )
+        await app.state.live_feed.start()
+    except Exception as e:
+        logger.warning(f"Failed to initialize live feed: {e}")
+        app.state.live_feed = None
+    
+    # Stored notifications, pushed through the live feed
+    try:
+        app.state.notification_service = NotificationService(
+            settings.NOTIFICATIONS_DATABASE_URL,
+            live_feed=app.state.live_feed,
+            batch_size=settings.NOTIFICATIONS_BATCH_SIZE,
+            queue_size=settings.NOTIFICATIONS_QUEUE_SIZE
+        )
+        await app.state.notification_service.start()
+    except Exception as e:
+        logger.warning(f"Failed to initialize notifications: {e}")
+        app.state.notification_service = None
+    
+    # Local block/transaction store serving explorer reads
+    app.state.chain_index = None
+    app.state.explorer_stats = None
+    if settings.CHAIN_INDEX_ENABLED:
+        try:
+            app.state.chain_index = ChainIndexService(settings.CHAIN_INDEX_URL)
+            app.state.explorer_stats = ExplorerStatsService(
+                app.state.chain_index,
+                cache_service=app.state.cache_service,
+                window_seconds=settings.EXPLORER_STATS_WINDOW,
+                reconcile_interval=settings.EXPLORER_STATS_RECONCILE_INTERVAL
+            )
+            logger.info("Chain index initialized")
+        except Exception as e:
+            logger.warning(f"Failed to initialize chain index: {e}")
+    
+    try:
+        app.state.vote_ledger = VoteLedgerService(settings.VOTE_LEDGER_URL)
+    except Exception as e:
+        logger.warning(f"Failed to initialize vote ledger: {e}")
+        app.state.vote_ledger = None
+    
     # Initialize services
     try:
         blockchain_service = BlockchainService(
             rpc_url=settings.BLOCKCHAIN_RPC_URL,
-            contract_address=settings.CONTRACT_ADDRESS
+            contract_address=settings.CONTRACT_ADDRESS,
+            cache_service=app.state.cache_service,
+            chain_index=app.state.chain_index,
+            explorer_stats=app.state.explorer_stats,
+            vote_ledger=app.state.vote_ledger
         )
         app.state.blockchain_service = blockchain_service
         logger.info("Blockchain service initialized")
     except Exception as e:
         logger.error(f"Failed to initialize blockchain service: {e}")
     
+    app.state.chain_follower = None
+    if settings.CHAIN_FOLLOWER_ENABLED and app.state.chain_index and hasattr(app.state, "blockchain_service"):
+        app.state.chain_follower = ChainFollower(
+            app.state.blockchain_service,
+            app.state.chain_index,
+            poll_interval=settings.CHAIN_FOLLOWER_POLL_INTERVAL,
+            confirmations=settings.CHAIN_CONFIRMATIONS,
+            stats=app.state.explorer_stats,
+            live_feed=app.state.live_feed
+        )
+        # The follower process maintains the stats; other workers read its snapshots
+        try:
+            await app.state.explorer_stats.start()
+        except Exception as e:
+            logger.error(f"Failed to start explorer stats: {e}")
+        app.state.chain_follower.start()
+    
     # Initialize AI service if enabled
     if settings.AI_ENABLED:
         try:
@@ -114,7 +248,9 @@ async def lifespan(app: FastAPI):
                 google_key=settings.GOOGLE_AI_API_KEY,
                 langchain_key=settings.LANGCHAIN_API_KEY,
                 nvidia_nim_key=settings.NVIDIA_NIM_API_KEY,
-                use_ethical_ai=True
+                use_ethical_ai=True,
+                cache_service=app.state.cache_service,
+                semantic_cache_threshold=settings.QUERY_CACHE_SEMANTIC_THRESHOLD
             )
             app.state.ai_service = ai_service
             logger.info(f"AI service initialized with provider: {settings.AI_PROVIDER}")
@@ -125,22 +261,33 @@ async def lifespan(app: FastAPI):
         app.state.ai_service = None
         logger.info("AI service disabled")
     
-    # Initialize cache if enabled
-    if settings.CACHE_ENABLED:
-        try:
-            cache_service = CacheService(redis_url=settings.REDIS_URL)
-            app.state.cache_service = cache_service
-            logger.info("Cache service initialized")
-        except Exception as e:
-            logger.warning(f"Failed to initialize cache service: {e}")
-            app.state.cache_service = None
-    else:
-        app.state.cache_service = None
+    # Time calls into backing services
+    app.state.metrics_service = metrics_service
+    metrics_service.instrument(getattr(app.state, "blockchain_service", None), "blockchain")
+    metrics_service.instrument(app.state.ai_service, "ai")
+    if app.state.ai_service:
+        metrics_service.instrument(app.state.ai_service.ethical_ai_service, "ethical_langchain")
+    metrics_service.instrument(app.state.cache_service, "cache")
+    metrics_service.track_cache(app.state.cache_service)
+    metrics_service.track_live_feed(app.state.live_feed)
     
     yield
     
     # Shutdown
     logger.info("Shutting down DRP Website API...")
+    if app.state.chain_follower:
+        await app.state.chain_follower.stop()
+        await app.state.explorer_stats.stop()
+    if app.state.chain_index:
+        app.state.chain_index.close()
+    if app.state.vote_ledger:
+        app.state.vote_ledger.close()
+    if app.state.notification_service:
+        await app.state.notification_service.close()
+    if app.state.live_feed:
+        await app.state.live_feed.close()
+    if app.state.cache_service:
+        await app.state.cache_service.close()
 
 
 # Create FastAPI app
@@ -161,7 +308,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+app.add_middleware(MetricsMiddleware, metrics=metrics_service)
 
 
 # Error handlers
@@ -197,6 +346,13 @@ async def health_check():
     }
 
 
+# Prometheus metrics
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request, upstream and cache metrics in Prometheus text format."""
+    return Response(content=metrics_service.render(), media_type=CONTENT_TYPE_LATEST)
+
+
 # Include routers
 app.include_router(tokens.router, prefix=f"{settings.API_PREFIX}/tokens", tags=["Tokens"])
 app.include_router(activities.router, prefix=f"{settings.API_PREFIX}/activities", tags=["Activities"])
@@ -205,6 +361,7 @@ app.include_router(notifications.router, prefix=f"{settings.API_PREFIX}/notifica
 app.include_router(ai_service.router, prefix=f"{settings.API_PREFIX}/ai", tags=["AI"])
 app.include_router(ethical_ai.router, prefix=f"{settings.API_PREFIX}/ethical-ai", tags=["Ethical AI"])
 app.include_router(explorer.router, prefix=f"{settings.API_PREFIX}/explorer", tags=["Explorer"])
+app.include_router(live.router, prefix=f"{settings.API_PREFIX}/live", tags=["Live"])
 app.include_router(users.router, prefix=f"{settings.API_PREFIX}/users", tags=["Users"])
 
 
@@ -217,6 +374,7 @@ async def root():
         "version": settings.API_VERSION,
         "docs": "/docs",
         "health": "/health",
+        "metrics": "/metrics",
         "endpoints": {
             "tokens": f"{settings.API_PREFIX}/tokens",
             "activities": f"{settings.API_PREFIX}/activities",
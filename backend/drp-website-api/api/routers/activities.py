@@ -6,11 +6,14 @@ import logging
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from uuid import uuid4
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request, Response
 from pydantic import BaseModel, Field
 
 from ..services.blockchain_service import BlockchainService
 from ..services.ai_service import AIService
+from ..services.live_feed_service import LiveFeedService
+from ..services.notification_service import NotificationService
+from ..services.pagination import NEXT_CURSOR_HEADER, InvalidCursor, next_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -74,12 +77,24 @@ def get_ai_service(request: Request) -> Optional[AIService]:
     return getattr(request.app.state, "ai_service", None)
 
 
+def get_live_feed(request: Request) -> Optional[LiveFeedService]:
+    """Dependency to get the live feed hub (optional)."""
+    return getattr(request.app.state, "live_feed", None)
+
+
+def get_notification_service(request: Request) -> Optional[NotificationService]:
+    """Dependency to get the notification service (optional)."""
+    return getattr(request.app.state, "notification_service", None)
+
+
 @router.post("/submit", response_model=SubmissionResponse)
 async def submit_activity(
     submission: ActivitySubmission,
     background_tasks: BackgroundTasks,
     blockchain_service: BlockchainService = Depends(get_blockchain_service),
-    ai_service: Optional[AIService] = Depends(get_ai_service)
+    ai_service: Optional[AIService] = Depends(get_ai_service),
+    live_feed: Optional[LiveFeedService] = Depends(get_live_feed),
+    notification_service: Optional[NotificationService] = Depends(get_notification_service)
 ):
     """
     Submit an activity (PoAT) or status (PoST) claim.
@@ -111,9 +126,21 @@ async def submit_activity(
                 submission_id,
                 submission_data,
                 ai_service,
-                blockchain_service
+                blockchain_service,
+                live_feed,
+                notification_service
             )
         
+        if live_feed:
+            await live_feed.publish("submissions", {
+                "submission_id": submission_id,
+                "type": submission.activity_type,
+                "actor_id": submission.actor_id,
+                "title": submission.title,
+                "status": "pending",
+                "timestamp": submission_data["timestamp"]
+            })
+        
         return SubmissionResponse(
             submission_id=submission_id,
             status="pending",
@@ -130,7 +157,9 @@ async def verify_activity_async(
     submission_id: str,
     submission_data: Dict[str, Any],
     ai_service: AIService,
-    blockchain_service: BlockchainService
+    blockchain_service: BlockchainService,
+    live_feed: Optional[LiveFeedService] = None,
+    notification_service: Optional[NotificationService] = None
 ):
     """Background task to verify activity with AI."""
     try:
@@ -148,6 +177,33 @@ async def verify_activity_async(
             )
         
         logger.info(f"Activity {submission_id} verified: {assessment['verdict']}")
+        
+        actor_id = submission_data["data"]["actor_id"]
+        if live_feed:
+            await live_feed.publish("submissions", {
+                "submission_id": submission_id,
+                "actor_id": actor_id,
+                "status": assessment["verdict"],
+                "timestamp": datetime.utcnow().isoformat()
+            })
+        if notification_service:
+            # Stored, counted and pushed to the user's notification stream
+            if assessment["verdict"] == "approved":
+                await notification_service.notify(
+                    actor_id,
+                    type="activity_verified",
+                    title="Activity Verified",
+                    message=f"Your activity submission has been verified and you've received {reward_amount:g} DERI tokens.",
+                    metadata={"submission_id": submission_id, "reward_amount": reward_amount}
+                )
+            else:
+                await notification_service.notify(
+                    actor_id,
+                    type="activity_rejected",
+                    title="Activity Rejected",
+                    message="Your activity submission could not be verified.",
+                    metadata={"submission_id": submission_id, "verdict": assessment["verdict"]}
+                )
     except Exception as e:
         logger.error(f"Error verifying activity {submission_id}: {e}")
 
@@ -179,14 +235,25 @@ async def get_activity_status(
 @router.get("/user/{actor_id}", response_model=List[ActivityStatus])
 async def get_user_activities(
     actor_id: str,
+    response: Response,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
     blockchain_service: BlockchainService = Depends(get_blockchain_service)
 ):
-    """Get all activities for a specific user."""
+    """
+    Get all activities for a specific user.
+    
+    - **limit**: Maximum number of activities
+    - **offset**: Pagination offset (deprecated, use cursor)
+    - **cursor**: Value of the X-Next-Cursor header of the previous page
+    """
     try:
-        activities = await blockchain_service.get_user_activities(actor_id, limit, offset)
+        activities = await blockchain_service.get_user_activities(actor_id, limit, offset, cursor=cursor)
         
+        cursor = next_cursor(activities, limit, lambda act: (act.get("timestamp"), act["submission_id"]))
+        if cursor:
+            response.headers[NEXT_CURSOR_HEADER] = cursor
         return [
             ActivityStatus(
                 submission_id=act["submission_id"],
@@ -200,6 +267,8 @@ async def get_user_activities(
             )
             for act in activities
         ]
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching user activities: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch activities: {str(e)}")
@@ -272,7 +272,8 @@ async def query_knowledge(
     try:
         result = await ai_service.ethical_ai_service.query_knowledge(
             query=request.query,
-            context=request.context
+            context=request.context,
+            k=request.max_results
         )
         
         # Format results
@@ -282,7 +283,7 @@ async def query_knowledge(
                 content=r.get("content", ""),
                 source=r.get("source", "Unknown"),
                 title=r.get("title", "Untitled"),
-                relevance=r.get("relevance", 0.8)
+                relevance=r.get("relevance", 0.0)
             ))
         
         return KnowledgeQueryResponse(
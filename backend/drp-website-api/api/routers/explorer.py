@@ -5,10 +5,12 @@ Explorer Routes - Handle blockchain explorer data and transaction queries.
 import logging
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from pydantic import BaseModel, Field
 
 from ..services.blockchain_service import BlockchainService
+from ..services.pagination import NEXT_CURSOR_HEADER, InvalidCursor, next_cursor
+from .fanout import fan_out
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +28,7 @@ class Transaction(BaseModel):
     type: str = Field(..., description="transfer, mint, burn, governance, etc.")
     status: str = Field(default="pending", description="pending, confirmed, failed")
     block_number: Optional[int] = None
+    tx_index: Optional[int] = None
     timestamp: str
     gas_used: Optional[int] = None
     ai_verdict: Optional[str] = None
@@ -61,9 +64,11 @@ def get_blockchain_service(request: Request) -> BlockchainService:
 
 @router.get("/transactions", response_model=List[Transaction])
 async def get_transactions(
+    response: Response,
     address: Optional[str] = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
     blockchain_service: BlockchainService = Depends(get_blockchain_service)
 ):
     """
@@ -71,15 +76,20 @@ async def get_transactions(
     
     - **address**: Filter by address (optional)
     - **limit**: Maximum number of transactions
-    - **offset**: Pagination offset
+    - **offset**: Pagination offset (deprecated, use cursor)
+    - **cursor**: Value of the X-Next-Cursor header of the previous page
     """
     try:
         transactions_data = await blockchain_service.get_transactions(
             address=address,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor
         )
         
+        cursor = next_cursor(transactions_data, limit, lambda tx: (tx["block_number"], tx["tx_index"]))
+        if cursor:
+            response.headers[NEXT_CURSOR_HEADER] = cursor
         return [
             Transaction(
                 tx_hash=tx["tx_hash"],
@@ -90,12 +100,15 @@ async def get_transactions(
                 type=tx.get("type", "transfer"),
                 status=tx.get("status", "confirmed"),
                 block_number=tx.get("block_number"),
+                tx_index=tx.get("tx_index"),
                 timestamp=tx.get("timestamp", datetime.utcnow().isoformat()),
                 gas_used=tx.get("gas_used"),
                 ai_verdict=tx.get("ai_verdict")
             )
             for tx in transactions_data
         ]
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching transactions: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch transactions: {str(e)}")
@@ -122,6 +135,7 @@ async def get_transaction(
             type=tx_data.get("type", "transfer"),
             status=tx_data.get("status", "confirmed"),
             block_number=tx_data.get("block_number"),
+            tx_index=tx_data.get("tx_index"),
             timestamp=tx_data.get("timestamp", datetime.utcnow().isoformat()),
             gas_used=tx_data.get("gas_used"),
             ai_verdict=tx_data.get("ai_verdict")
@@ -135,14 +149,25 @@ async def get_transaction(
 
 @router.get("/blocks", response_model=List[Block])
 async def get_blocks(
+    response: Response,
     limit: int = 20,
     offset: int = 0,
+    cursor: Optional[str] = None,
     blockchain_service: BlockchainService = Depends(get_blockchain_service)
 ):
-    """Get recent blocks."""
+    """
+    Get recent blocks.
+    
+    - **limit**: Maximum number of blocks
+    - **offset**: Pagination offset (deprecated, use cursor)
+    - **cursor**: Value of the X-Next-Cursor header of the previous page
+    """
     try:
-        blocks_data = await blockchain_service.get_blocks(limit, offset)
+        blocks_data = await blockchain_service.get_blocks(limit=limit, offset=offset, cursor=cursor)
         
+        cursor = next_cursor(blocks_data, limit, lambda block: (block["block_number"],))
+        if cursor:
+            response.headers[NEXT_CURSOR_HEADER] = cursor
         return [
             Block(
                 block_number=block["block_number"],
@@ -154,6 +179,8 @@ async def get_blocks(
             )
             for block in blocks_data
         ]
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching blocks: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch blocks: {str(e)}")
@@ -200,3 +227,31 @@ async def get_explorer_stats(
         raise HTTPException(status_code=500, detail=f"Failed to fetch stats: {str(e)}")
 
 
+@router.get("/dashboard")
+async def get_explorer_dashboard(
+    limit: int = 10,
+    blockchain_service: BlockchainService = Depends(get_blockchain_service)
+):
+    """
+    Get everything the explorer landing page shows in one request.
+    
+    Stats, latest blocks, latest transactions and the activity feed are fetched
+    concurrently; sections that fail or time out are listed in `unavailable`.
+    """
+    results = await fan_out({
+        "stats": blockchain_service.get_explorer_stats(),
+        "blocks": blockchain_service.get_blocks(limit, 0),
+        "transactions": blockchain_service.get_transactions(None, limit, 0),
+        "activity": blockchain_service.get_activity_feed(limit)
+    })
+    if not results.values:
+        raise HTTPException(status_code=503, detail="Explorer data unavailable")
+    
+    return {
+        "stats": results.get("stats", {}),
+        "blocks": results.get("blocks", []),
+        "transactions": results.get("transactions", []),
+        "activity": results.get("activity", []),
+        "unavailable": list(results.errors),
+        "timestamp": datetime.utcnow().isoformat()
+    }
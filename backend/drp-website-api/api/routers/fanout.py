@@ -0,0 +1,74 @@
+"""
+Fan-out helper - run independent service calls from a route concurrently.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds a single call may take before its result is dropped from the response
+DEFAULT_CALL_TIMEOUT = 5.0
+
+
+class FanOutResult:
+    """Results of a fan-out: values of the calls that succeeded and errors of the rest."""
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+
+    @property
+    def partial(self) -> bool:
+        """True if at least one call failed or timed out."""
+        return bool(self.errors)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.values.get(name, default)
+
+
+async def _call_with_timeout(name: str, call: Awaitable, timeout: float):
+    try:
+        return await asyncio.wait_for(call, timeout=timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"{name} timed out after {timeout}s")
+
+
+async def fan_out(
+    calls: Dict[str, Awaitable],
+    timeout: Optional[float] = None,
+    timeouts: Optional[Dict[str, float]] = None
+) -> FanOutResult:
+    """
+    Await independent calls concurrently, so latency is that of the slowest call.
+
+    A call that raises or exceeds its timeout does not fail the others; it is
+    recorded in `errors` and left out of `values`.
+
+    Args:
+        calls: Name -> awaitable (e.g. blockchain_service.get_rights(address))
+        timeout: Per-call timeout in seconds (DEFAULT_CALL_TIMEOUT if None)
+        timeouts: Per-name overrides of `timeout`
+
+    Returns:
+        FanOutResult with `values` and `errors` keyed by call name
+    """
+    timeout = DEFAULT_CALL_TIMEOUT if timeout is None else timeout
+    timeouts = timeouts or {}
+    names = list(calls)
+    outcomes = await asyncio.gather(
+        *[_call_with_timeout(name, calls[name], timeouts.get(name, timeout)) for name in names],
+        return_exceptions=True
+    )
+
+    result = FanOutResult()
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, asyncio.CancelledError):
+            raise outcome
+        if isinstance(outcome, Exception):
+            logger.warning(f"Fan-out call {name} failed: {outcome}")
+            result.errors[name] = str(outcome)
+        else:
+            result.values[name] = outcome
+    return result
@@ -6,10 +6,14 @@ import logging
 from typing import List, Optional
 from datetime import datetime
 from uuid import uuid4
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request, Response
 from pydantic import BaseModel, Field
 
-from ..services.blockchain_service import BlockchainService
+from ..services.blockchain_service import BlockchainService, SnapshotUnavailable
+from ..services.live_feed_service import LiveFeedService
+from ..services.notification_service import NotificationService
+from ..services.pagination import NEXT_CURSOR_HEADER, InvalidCursor, next_cursor
+from ..services.vote_ledger_service import WEIGHTINGS, DuplicateVote, UnknownProposal, VoteRejected
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +43,7 @@ class CreateProposalRequest(BaseModel):
     proposer: str
     proposal_type: str
     voting_period_days: int = Field(default=7, ge=1, le=30)
+    weighting: str = Field(default="token", description="'token' (RIGHTS balance) or 'post' (PoST level) at the snapshot block")
 
 
 class VoteRequest(BaseModel):
@@ -53,6 +58,8 @@ class VoteResponse(BaseModel):
     """Vote response."""
     success: bool
     tx_hash: Optional[str] = None
+    receipt: Optional[str] = Field(default=None, description="Hash of the vote's ledger entry")
+    weight: Optional[str] = None
     message: str
 
 
@@ -63,10 +70,23 @@ def get_blockchain_service(request: Request) -> BlockchainService:
     return request.app.state.blockchain_service
 
 
+def get_live_feed(request: Request) -> Optional[LiveFeedService]:
+    """Dependency to get the live feed hub (optional)."""
+    return getattr(request.app.state, "live_feed", None)
+
+
+def get_notification_service(request: Request) -> Optional[NotificationService]:
+    """Dependency to get the notification service (optional)."""
+    return getattr(request.app.state, "notification_service", None)
+
+
 @router.post("/proposals", response_model=Proposal)
 async def create_proposal(
     request: CreateProposalRequest,
-    blockchain_service: BlockchainService = Depends(get_blockchain_service)
+    background_tasks: BackgroundTasks,
+    blockchain_service: BlockchainService = Depends(get_blockchain_service),
+    live_feed: Optional[LiveFeedService] = Depends(get_live_feed),
+    notification_service: Optional[NotificationService] = Depends(get_notification_service)
 ):
     """
     Create a new governance proposal.
@@ -77,6 +97,8 @@ async def create_proposal(
     - Parameter adjustments
     - Ecosystem initiatives
     """
+    if request.weighting not in WEIGHTINGS:
+        raise HTTPException(status_code=400, detail=f"Invalid weighting: {request.weighting}")
     try:
         proposal_id = str(uuid4())
         
@@ -86,10 +108,11 @@ async def create_proposal(
             description=request.description,
             proposer=request.proposer,
             proposal_type=request.proposal_type,
-            voting_period_days=request.voting_period_days
+            voting_period_days=request.voting_period_days,
+            weighting=request.weighting
         )
         
-        return Proposal(
+        proposal = Proposal(
             proposal_id=proposal_id,
             title=request.title,
             description=request.description,
@@ -102,6 +125,21 @@ async def create_proposal(
             votes_against=0,
             abstain=0
         )
+        if live_feed:
+            await live_feed.publish("governance", {"event": "proposal_created", **proposal.dict()})
+        if notification_service:
+            # Protocol-wide: fans out to every user after the response is sent
+            background_tasks.add_task(
+                notification_service.broadcast,
+                type="proposal_created",
+                title="New Proposal",
+                message=f"A new governance proposal is open for voting: {request.title}",
+                metadata={"proposal_id": proposal_id, "voting_end": proposal.voting_end}
+            )
+        return proposal
+    except SnapshotUnavailable as e:
+        logger.error(f"Error creating proposal: {e}")
+        raise HTTPException(status_code=503, detail="Chain head unavailable, try again later")
     except Exception as e:
         logger.error(f"Error creating proposal: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to create proposal: {str(e)}")
@@ -109,9 +147,11 @@ async def create_proposal(
 
 @router.get("/proposals", response_model=List[Proposal])
 async def get_proposals(
+    response: Response,
     status: Optional[str] = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
     blockchain_service: BlockchainService = Depends(get_blockchain_service)
 ):
     """
@@ -119,11 +159,15 @@ async def get_proposals(
     
     - **status**: Filter by status (draft, active, passed, rejected)
     - **limit**: Maximum number of proposals to return
-    - **offset**: Pagination offset
+    - **offset**: Pagination offset (deprecated, use cursor)
+    - **cursor**: Value of the X-Next-Cursor header of the previous page
     """
     try:
-        proposals_data = await blockchain_service.get_proposals(status, limit, offset)
+        proposals_data = await blockchain_service.get_proposals(status, limit, offset, cursor=cursor)
         
+        cursor = next_cursor(proposals_data, limit, lambda prop: (prop.get("created_at"), prop["proposal_id"]))
+        if cursor:
+            response.headers[NEXT_CURSOR_HEADER] = cursor
         return [
             Proposal(
                 proposal_id=prop["proposal_id"],
@@ -140,6 +184,8 @@ async def get_proposals(
             )
             for prop in proposals_data
         ]
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching proposals: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch proposals: {str(e)}")
@@ -181,13 +227,17 @@ async def get_proposal(
 async def vote_on_proposal(
     proposal_id: str,
     vote_request: VoteRequest,
-    blockchain_service: BlockchainService = Depends(get_blockchain_service)
+    blockchain_service: BlockchainService = Depends(get_blockchain_service),
+    live_feed: Optional[LiveFeedService] = Depends(get_live_feed)
 ):
     """
     Vote on a governance proposal.
     
     - **vote**: 'for', 'against', or 'abstain'
     - **signature**: Cryptographic signature for vote verification
+    
+    Each address votes once per proposal (409 on a second vote); the vote weighs
+    the voter's balance or PoST level at the proposal's snapshot block.
     """
     try:
         # Validate vote
@@ -202,11 +252,32 @@ async def vote_on_proposal(
             signature=vote_request.signature
         )
         
+        if live_feed and result["success"]:
+            await live_feed.publish("governance", {
+                "event": "vote_cast",
+                "proposal_id": proposal_id,
+                "voter": vote_request.voter,
+                "vote": vote_request.vote,
+                "weight": result.get("weight"),
+                "tx_hash": result.get("tx_hash"),
+                "receipt": result.get("receipt")
+            })
+        
         return VoteResponse(
             success=result["success"],
             tx_hash=result.get("tx_hash"),
+            receipt=result.get("receipt"),
+            weight=result.get("weight"),
             message=result.get("message", "Vote submitted successfully")
         )
+    except HTTPException:
+        raise
+    except UnknownProposal as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DuplicateVote as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except VoteRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error voting on proposal: {e}")
         raise HTTPException(status_code=500, detail=f"Vote failed: {str(e)}")
@@ -217,12 +288,40 @@ async def get_proposal_results(
     proposal_id: str,
     blockchain_service: BlockchainService = Depends(get_blockchain_service)
 ):
-    """Get detailed voting results for a proposal."""
+    """
+    Get detailed voting results for a proposal.
+    
+    Served from the proposal's running tally: weighted totals, voter counts per
+    choice and the hash of the latest vote ledger entry.
+    """
     try:
         results = await blockchain_service.get_proposal_results(proposal_id)
-        return results
     except Exception as e:
         logger.error(f"Error fetching proposal results: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch results: {str(e)}")
+    if results is None:
+        raise HTTPException(status_code=404, detail="Proposal not found")
+    return results
 
 
+@router.get("/proposals/{proposal_id}/results/recount")
+async def recount_proposal_results(
+    proposal_id: str,
+    blockchain_service: BlockchainService = Depends(get_blockchain_service)
+):
+    """
+    Recount a proposal from its vote ledger.
+    
+    Checks the ledger's hash chain, re-fetches every voter's snapshot weight and
+    reports whether the recount matches the running tally. Cost grows with the
+    number of votes; use for audits, not for display. Reports are cached until
+    the ledger changes, so repeated calls do not reach the RPC node.
+    """
+    try:
+        report = await blockchain_service.recount_proposal(proposal_id)
+    except Exception as e:
+        logger.error(f"Error recounting proposal: {e}")
+        raise HTTPException(status_code=500, detail=f"Recount failed: {str(e)}")
+    if report is None:
+        raise HTTPException(status_code=404, detail="Proposal not found")
+    return report
@@ -0,0 +1,132 @@
+"""
+Live Routes - Server-Sent Events and WebSocket streams of live events.
+"""
+
+import asyncio
+import json
+import logging
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from ..services.live_feed_service import LiveFeedService, Subscription, SubscriptionClosed
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+DEFAULT_TOPICS = "blocks,transactions,submissions,governance"
+
+
+def get_live_feed(request: Request) -> LiveFeedService:
+    """Dependency to get the live feed hub."""
+    live_feed = getattr(request.app.state, "live_feed", None)
+    if live_feed is None:
+        raise HTTPException(status_code=503, detail="Live feed not available")
+    return live_feed
+
+
+def parse_topics(topics: str) -> List[str]:
+    return [topic.strip() for topic in topics.split(",") if topic.strip()]
+
+
+async def sse_events(live_feed: LiveFeedService, subscription: Subscription):
+    """
+    Format a subscription as a text/event-stream body.
+
+    Messages already buffered are written in one chunk, so a client that fell
+    behind catches up in one send instead of one per event.
+    """
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                messages = await subscription.next_batch()
+            except SubscriptionClosed as e:
+                yield f"event: closed\ndata: {json.dumps({'reason': str(e)})}\n\n"
+                return
+            yield "".join(
+                ": keepalive\n\n" if topic == "heartbeat" else f"event: {topic}\ndata: {data}\n\n"
+                for topic, data in messages
+            )
+    finally:
+        live_feed.unsubscribe(subscription)
+
+
+async def stream_to_websocket(websocket: WebSocket, live_feed: LiveFeedService, subscription: Subscription):
+    """
+    Send a subscription's events to an accepted WebSocket until either side closes.
+
+    Each frame is {"topic": ..., "data": ...}; any text received is answered with a pong.
+    """
+    async def send_events():
+        while True:
+            topic, data = await subscription.next()
+            if topic == "heartbeat":
+                # The server's WebSocket pings keep the connection alive
+                continue
+            # The event is already JSON; wrap it without decoding it again
+            await websocket.send_text(f'{{"topic":{json.dumps(topic)},"data":{data}}}')
+
+    async def answer_pings():
+        while True:
+            await websocket.receive_text()
+            await websocket.send_json({"message": "pong"})
+
+    tasks = [asyncio.create_task(send_events()), asyncio.create_task(answer_pings())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        # Not awaited: the server may be cancelling this handler too
+        for task in tasks:
+            task.cancel()
+        live_feed.unsubscribe(subscription)
+
+    error = next(iter(done)).exception()
+    if isinstance(error, SubscriptionClosed):
+        # 1013: try again later; the client should reconnect and resync
+        await websocket.close(code=1013, reason=str(error))
+    elif error is not None and not isinstance(error, WebSocketDisconnect):
+        logger.error(f"WebSocket error: {error}")
+
+
+@router.get("/sse")
+async def live_sse(
+    topics: str = DEFAULT_TOPICS,
+    live_feed: LiveFeedService = Depends(get_live_feed)
+):
+    """
+    Stream live events as Server-Sent Events.
+
+    - **topics**: Comma-separated topics (blocks, transactions, submissions, governance,
+      notifications:<address>)
+
+    Each event's SSE `event` field is its topic. A `dropped` event reports how many
+    events this client missed because it fell behind.
+    """
+    try:
+        subscription = live_feed.subscribe(parse_topics(topics))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        sse_events(live_feed, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def live_websocket(websocket: WebSocket, topics: str = DEFAULT_TOPICS):
+    """WebSocket stream of live events for the given comma-separated topics."""
+    live_feed = getattr(websocket.app.state, "live_feed", None)
+    if live_feed is None:
+        await websocket.close(code=1013, reason="Live feed not available")
+        return
+    try:
+        subscription = live_feed.subscribe(parse_topics(topics))
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    await websocket.accept()
+    await stream_to_websocket(websocket, live_feed, subscription)
@@ -4,11 +4,14 @@ Notifications Routes - Handle notifications for verified/rejected activities and
 
 import logging
 from typing import List, Optional
-from datetime import datetime
-from uuid import uuid4
-from fastapi import APIRouter, HTTPException, Depends, Request, WebSocket
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, WebSocket
 from pydantic import BaseModel, Field
 
+from ..services.live_feed_service import LiveFeedService
+from ..services.notification_service import NotificationService
+from ..services.pagination import NEXT_CURSOR_HEADER, InvalidCursor, decode_cursor, next_cursor
+from .live import stream_to_websocket
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -36,79 +39,123 @@ class NotificationSettings(BaseModel):
     governance_notifications: bool = True
 
 
+class NotificationCounts(BaseModel):
+    """Unread and total notifications for a user."""
+    user_address: str
+    unread: int
+    total: int
+
+
+def get_notification_service(request: Request) -> NotificationService:
+    """Dependency to get the notification service."""
+    notification_service = getattr(request.app.state, "notification_service", None)
+    if notification_service is None:
+        raise HTTPException(status_code=503, detail="Notifications not available")
+    return notification_service
+
+
 @router.get("/{user_address}", response_model=List[Notification])
 async def get_notifications(
     user_address: str,
+    response: Response,
     unread_only: bool = False,
-    limit: int = 50
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    notification_service: NotificationService = Depends(get_notification_service)
 ):
     """
-    Get notifications for a user.
+    Get notifications for a user, newest first.
     
     - **user_address**: User's wallet address
     - **unread_only**: Only return unread notifications
     - **limit**: Maximum number of notifications to return
+    - **cursor**: Value of the X-Next-Cursor header of the previous page
     """
     try:
-        # In production, this would query a database
-        # For now, return mock data
-        notifications = []
-        
-        # Add example notifications
-        notifications.append(Notification(
-            notification_id=str(uuid4()),
-            user_address=user_address,
-            type="activity_verified",
-            title="Activity Verified",
-            message="Your activity submission has been verified and you've received 50 DERI tokens.",
-            read=False,
-            timestamp=datetime.utcnow().isoformat(),
-            metadata={"submission_id": "123", "reward_amount": 50}
-        ))
-        
-        if unread_only:
-            notifications = [n for n in notifications if not n.read]
-        
-        return notifications[:limit]
+        position = decode_cursor(cursor, 2)
+        notifications = await notification_service.get_notifications(
+            user_address, unread_only=unread_only, limit=limit, before=position
+        )
+        cursor = next_cursor(notifications, limit, lambda n: (n["timestamp"], n["notification_id"]))
+        if cursor:
+            response.headers[NEXT_CURSOR_HEADER] = cursor
+        return notifications
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching notifications: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch notifications: {str(e)}")
 
 
+@router.get("/{user_address}/unread-count", response_model=NotificationCounts)
+async def get_unread_count(
+    user_address: str,
+    notification_service: NotificationService = Depends(get_notification_service)
+):
+    """Get the number of unread (and total) notifications for a user."""
+    try:
+        counts = await notification_service.get_counts(user_address)
+        return NotificationCounts(user_address=user_address, **counts)
+    except Exception as e:
+        logger.error(f"Error fetching notification counts: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch notification counts: {str(e)}")
+
+
 @router.post("/{notification_id}/read")
-async def mark_notification_read(notification_id: str):
+async def mark_notification_read(
+    notification_id: str,
+    notification_service: NotificationService = Depends(get_notification_service)
+):
     """Mark a notification as read."""
     try:
-        # In production, update database
-        return {"success": True, "message": "Notification marked as read"}
+        found = await notification_service.mark_read(notification_id)
     except Exception as e:
         logger.error(f"Error marking notification as read: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to update notification: {str(e)}")
+    if not found:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return {"success": True, "message": "Notification marked as read"}
+
+
+@router.post("/{user_address}/read-all")
+async def mark_all_notifications_read(
+    user_address: str,
+    notification_service: NotificationService = Depends(get_notification_service)
+):
+    """Mark every notification of a user as read."""
+    try:
+        updated = await notification_service.mark_all_read(user_address)
+        return {"success": True, "updated": updated}
+    except Exception as e:
+        logger.error(f"Error marking notifications as read: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to update notifications: {str(e)}")
 
 
 @router.delete("/{notification_id}")
-async def delete_notification(notification_id: str):
+async def delete_notification(
+    notification_id: str,
+    notification_service: NotificationService = Depends(get_notification_service)
+):
     """Delete a notification."""
     try:
-        # In production, delete from database
-        return {"success": True, "message": "Notification deleted"}
+        found = await notification_service.delete(notification_id)
     except Exception as e:
         logger.error(f"Error deleting notification: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to delete notification: {str(e)}")
+    if not found:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    return {"success": True, "message": "Notification deleted"}
 
 
 @router.get("/{user_address}/settings", response_model=NotificationSettings)
-async def get_notification_settings(user_address: str):
+async def get_notification_settings(
+    user_address: str,
+    notification_service: NotificationService = Depends(get_notification_service)
+):
     """Get notification settings for a user."""
     try:
-        # In production, fetch from database
-        return NotificationSettings(
-            user_address=user_address,
-            email_enabled=True,
-            push_enabled=True,
-            activity_notifications=True,
-            governance_notifications=True
-        )
+        settings = await notification_service.get_settings(user_address)
+        return NotificationSettings(user_address=user_address, **settings)
     except Exception as e:
         logger.error(f"Error fetching notification settings: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch settings: {str(e)}")
@@ -117,12 +164,18 @@ async def get_notification_settings(user_address: str):
 @router.post("/{user_address}/settings", response_model=NotificationSettings)
 async def update_notification_settings(
     user_address: str,
-    settings: NotificationSettings
+    settings: NotificationSettings,
+    notification_service: NotificationService = Depends(get_notification_service)
 ):
-    """Update notification settings for a user."""
+    """
+    Update notification settings for a user.
+
+    Settings apply when notifications are sent: disabled types are never stored,
+    and push_enabled=false stores notifications without pushing them.
+    """
     try:
-        # In production, update database
-        return settings
+        saved = await notification_service.update_settings(user_address, settings.dict())
+        return NotificationSettings(user_address=user_address, **saved)
     except Exception as e:
         logger.error(f"Error updating notification settings: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to update settings: {str(e)}")
@@ -131,8 +184,14 @@ async def update_notification_settings(
 @router.websocket("/ws/{user_address}")
 async def websocket_notifications(websocket: WebSocket, user_address: str):
     """WebSocket endpoint for real-time notifications."""
-    await websocket.accept()
+    live_feed: LiveFeedService = getattr(websocket.app.state, "live_feed", None)
+    if live_feed is not None:
+        subscription = live_feed.subscribe([f"notifications:{user_address.lower()}"])
+        await websocket.accept()
+        await stream_to_websocket(websocket, live_feed, subscription)
+        return
     
+    await websocket.accept()
     try:
         while True:
             # In production, this would push notifications from a message queue
@@ -3,17 +3,21 @@ Token Routes - Handle token balances, rights, and token-related operations.
 """
 
 import logging
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, Depends, Header, Request
 from pydantic import BaseModel, Field
 
 from ..services.blockchain_service import BlockchainService
+from .fanout import fan_out
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Upper bound on addresses in one /balances:batch request
+MAX_BATCH_ADDRESSES = 1000
+
 
 # Pydantic Models
 class TokenBalance(BaseModel):
@@ -35,6 +39,14 @@ class RightsInfo(BaseModel):
     verification_level: int = Field(0, ge=0, le=5)
 
 
+class BatchBalanceRequest(BaseModel):
+    """Balances for many addresses at once."""
+    addresses: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_ADDRESSES)
+    token_types: List[Literal["RIGHTS", "DERI"]] = Field(
+        default_factory=lambda: ["RIGHTS", "DERI"], min_length=1, description="'RIGHTS' and/or 'DERI'"
+    )
+
+
 class TransferRequest(BaseModel):
     """Token transfer request."""
     from_address: str
@@ -79,6 +91,8 @@ async def get_token_balance(
         
         # Get balance from blockchain
         balance_data = await blockchain_service.get_token_balance(address, token_type)
+        if balance_data is None:
+            raise HTTPException(status_code=503, detail="Balance unavailable, try again later")
         
         return TokenBalance(
             address=address,
@@ -89,6 +103,8 @@ async def get_token_balance(
             network=balance_data.get("network", "mainnet"),
             last_updated=datetime.utcnow().isoformat()
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching token balance: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch balance: {str(e)}")
@@ -104,36 +120,27 @@ async def get_all_balances(
     """
     try:
         balances = []
+        token_types = ("RIGHTS", "DERI")
         
-        # Get RIGHTS balance
-        try:
-            rights_balance = await blockchain_service.get_token_balance(address, "RIGHTS")
-            balances.append(TokenBalance(
-                address=address,
-                token_type="RIGHTS",
-                balance=rights_balance["balance"],
-                balance_formatted=rights_balance["balance_formatted"],
-                symbol=rights_balance["symbol"],
-                network=rights_balance.get("network", "mainnet"),
-                last_updated=datetime.utcnow().isoformat()
-            ))
-        except Exception as e:
-            logger.warning(f"Failed to fetch RIGHTS balance: {e}")
-        
-        # Get DERI balance
-        try:
-            deri_balance = await blockchain_service.get_token_balance(address, "DERI")
+        # Fetch every token type at once; a failed or slow one is left out
+        results = await fan_out({
+            token_type: blockchain_service.get_token_balance(address, token_type)
+            for token_type in token_types
+        })
+        for token_type in token_types:
+            data = results.get(token_type)
+            if not data:
+                logger.warning(f"Failed to fetch {token_type} balance: {results.errors.get(token_type)}")
+                continue
             balances.append(TokenBalance(
                 address=address,
-                token_type="DERI",
-                balance=deri_balance["balance"],
-                balance_formatted=deri_balance["balance_formatted"],
-                symbol=deri_balance["symbol"],
-                network=deri_balance.get("network", "mainnet"),
+                token_type=token_type,
+                balance=data["balance"],
+                balance_formatted=data["balance_formatted"],
+                symbol=data["symbol"],
+                network=data.get("network", "mainnet"),
                 last_updated=datetime.utcnow().isoformat()
             ))
-        except Exception as e:
-            logger.warning(f"Failed to fetch DERI balance: {e}")
         
         return balances
     except Exception as e:
@@ -141,6 +148,50 @@ async def get_all_balances(
         raise HTTPException(status_code=500, detail=f"Failed to fetch balances: {str(e)}")
 
 
+@router.post("/balances:batch", response_model=List[TokenBalance])
+async def get_balances_batch(
+    request: BatchBalanceRequest,
+    blockchain_service: BlockchainService = Depends(get_blockchain_service)
+):
+    """
+    Get token balances for many addresses (wallet dashboards, leaderboards).
+    
+    Lookups are packed into JSON-RPC batch requests instead of one request each;
+    repeated addresses are looked up once. Returns one entry per requested address
+    and token type, in request order (repeats included); lookups the blockchain
+    failed to answer are left out, and 503 is returned if none could be answered.
+    """
+    try:
+        for addr in request.addresses:
+            if not addr.startswith("0x") or len(addr) != 42:
+                raise HTTPException(status_code=400, detail=f"Invalid address format: {addr}")
+        
+        token_types = list(dict.fromkeys(request.token_types))
+        balances = await blockchain_service.get_token_balances(list(dict.fromkeys(request.addresses)), token_types)
+        if not balances:
+            raise HTTPException(status_code=503, detail="Balances unavailable")
+        last_updated = datetime.utcnow().isoformat()
+        
+        return [
+            TokenBalance(
+                address=address,
+                token_type=token_type,
+                balance=data["balance"],
+                balance_formatted=data["balance_formatted"],
+                symbol=data["symbol"],
+                network=data.get("network", "mainnet"),
+                last_updated=last_updated
+            )
+            for address in request.addresses
+            for token_type, data in balances.get(address, {}).items()
+        ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching balance batch: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch balances: {str(e)}")
+
+
 @router.get("/rights/{address}", response_model=RightsInfo)
 async def get_rights(
     address: str,
@@ -3,11 +3,12 @@ User Routes - Handle user profiles and related operations.
 """
 
 import logging
-from typing import Optional
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Depends, Request
 from pydantic import BaseModel, Field
 
 from ..services.blockchain_service import BlockchainService
+from .fanout import fan_out
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,9 @@ class UserProfile(BaseModel):
     total_rewards: float = 0.0
     verification_level: int = Field(0, ge=0, le=5)
     badges: list = Field(default_factory=list)
+    rights: List[str] = Field(default_factory=list, description="List of rights identifiers")
+    verified: bool = False
+    unavailable: List[str] = Field(default_factory=list, description="Sections that could not be loaded")
 
 
 class UpdateProfileRequest(BaseModel):
@@ -53,8 +57,15 @@ async def get_user_profile(
         if not address.startswith("0x") or len(address) != 42:
             raise HTTPException(status_code=400, detail="Invalid address format")
         
-        # Get user data
-        user_data = await blockchain_service.get_user_profile(address)
+        # Profile and rights are independent lookups, fetched together
+        results = await fan_out({
+            "profile": blockchain_service.get_user_profile(address),
+            "rights": blockchain_service.get_rights(address)
+        })
+        if "profile" in results.errors:
+            raise HTTPException(status_code=504, detail=f"Failed to fetch profile: {results.errors['profile']}")
+        user_data = results.get("profile")
+        rights_data = results.get("rights", {})
         
         return UserProfile(
             address=address,
@@ -64,8 +75,13 @@ async def get_user_profile(
             joined_date=user_data.get("joined_date", ""),
             total_activities=user_data.get("total_activities", 0),
             total_rewards=user_data.get("total_rewards", 0.0),
-            verification_level=user_data.get("verification_level", 0),
-            badges=user_data.get("badges", [])
+            verification_level=max(
+                user_data.get("verification_level", 0), rights_data.get("verification_level", 0)
+            ),
+            badges=user_data.get("badges", []),
+            rights=rights_data.get("rights", []),
+            verified=rights_data.get("verified", False),
+            unavailable=list(results.errors)
         )
     except HTTPException:
         raise
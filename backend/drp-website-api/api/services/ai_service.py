@@ -20,7 +20,9 @@ class AIService:
         google_key: Optional[str] = None,
         langchain_key: Optional[str] = None,
         nvidia_nim_key: Optional[str] = None,
-        use_ethical_ai: bool = True
+        use_ethical_ai: bool = True,
+        cache_service=None,
+        semantic_cache_threshold: float = 0.0
     ):
         """
         Initialize AI service.
@@ -33,6 +35,8 @@ class AIService:
             langchain_key: LangChain API key
             nvidia_nim_key: NVIDIA NIM API key
             use_ethical_ai: Whether to use Ethical LangChain Service for enhanced AI
+            cache_service: CacheService for repeated knowledge queries and explanations
+            semantic_cache_threshold: Similarity at which near-duplicate questions hit the cache (0: off)
         """
         self.provider = provider
         self.huggingface_key = huggingface_key
@@ -51,7 +55,9 @@ class AIService:
                     provider=provider,
                     huggingface_key=huggingface_key,
                     openai_key=openai_key,
-                    nvidia_nim_key=nvidia_nim_key
+                    nvidia_nim_key=nvidia_nim_key,
+                    cache_service=cache_service,
+                    semantic_cache_threshold=semantic_cache_threshold
                 )
                 logger.info(f"Ethical AI service initialized with provider: {provider}")
             except ImportError as e:
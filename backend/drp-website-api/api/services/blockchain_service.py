@@ -2,31 +2,119 @@
 Blockchain Service - Handles all blockchain interactions with Dr-Blockchain.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 import httpx
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from .cache_service import CacheService, SingleFlight, read_through
+from .chain_index_service import ChainIndexService
+from .explorer_stats_service import ExplorerStatsService
+from .pagination import decode_cursor
+from .vote_ledger_service import UnknownProposal, VoteLedgerService
 
 logger = logging.getLogger(__name__)
 
+TOKEN_TYPES = ("RIGHTS", "DERI")
+# Token whose balance weighs governance votes
+GOVERNANCE_TOKEN = "RIGHTS"
+
+# Balance lookups per JSON-RPC batch request
+BALANCE_BATCH_SIZE = 100
+# Blocks per JSON-RPC batch request when following the chain
+BLOCK_BATCH_SIZE = 50
+
+# Read-through cache TTLs (seconds)
+BALANCE_TTL = 10
+RIGHTS_TTL = 60
+PROFILE_TTL = 60
+ACTIVITY_TTL = 15
+PROPOSAL_TTL = 30
+PROPOSAL_RESULTS_TTL = 10
+TRANSACTIONS_TTL = 15
+BLOCKS_TTL = 10
+EXPLORER_STATS_TTL = 30
+NEGATIVE_TTL = 15
+FINALIZED_TX_TTL = 3600
+# A recount only changes when the ledger does (new votes change its hash)
+RECOUNT_TTL = 600
+
+
+class SnapshotUnavailable(RuntimeError):
+    """No snapshot block is known (RPC node and chain index both unavailable)."""
+
+
+def transaction_ttl(tx: Dict[str, Any]) -> int:
+    """Finalized transactions never change; pending ones are cached briefly."""
+    if tx.get("status") in ("confirmed", "finalized"):
+        return FINALIZED_TX_TTL
+    return TRANSACTIONS_TTL
+
 
 class BlockchainService:
     """Service for interacting with the DRP blockchain."""
     
-    def __init__(self, rpc_url: str, contract_address: str):
+    def __init__(
+        self,
+        rpc_url: str,
+        contract_address: str,
+        cache_service: Optional[CacheService] = None,
+        chain_index: Optional[ChainIndexService] = None,
+        explorer_stats: Optional[ExplorerStatsService] = None,
+        vote_ledger: Optional[VoteLedgerService] = None
+    ):
         """
         Initialize blockchain service.
         
         Args:
             rpc_url: RPC endpoint URL for blockchain
             contract_address: Smart contract address
+            cache_service: Cache for read methods (reads go straight to the RPC if None)
+            chain_index: Local block/transaction store serving explorer reads
+            explorer_stats: Precomputed explorer statistics
+            vote_ledger: Governance vote ledger and tallies
         """
         self.rpc_url = rpc_url
         self.contract_address = contract_address
         self.client = httpx.AsyncClient(timeout=30.0)
+        self.cache_service = cache_service
+        self.chain_index = chain_index
+        self.explorer_stats = explorer_stats
+        self.vote_ledger = vote_ledger
+        self._single_flight = SingleFlight()
         logger.info(f"BlockchainService initialized with RPC: {rpc_url}")
     
-    async def get_token_balance(self, address: str, token_type: str) -> Dict[str, Any]:
+    async def _invalidate(self, method_name: str, *args, **kwargs):
+        """Drop the cached result of one read method call."""
+        if self.cache_service is None:
+            return
+        method = getattr(type(self), method_name)
+        await self.cache_service.delete(method.cache_key(self, *args, **kwargs))
+    
+    async def _invalidate_all(self, method_name: str, *leading_args):
+        """
+        Invalidate every cached result of a generational read method whose first
+        arguments are `leading_args`.
+        
+        Used for list queries whose remaining arguments (filters, paging) are not
+        known at write time. Bumps the method's generation (one cache write) rather
+        than sweeping the keyspace, so it is cheap enough for every vote.
+        """
+        await getattr(type(self), method_name).bump_generation(self, *leading_args)
+    
+    def _format_balance(self, token_type: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Balance information from an RPC balance result (zero if unavailable)."""
+        data = data or {}
+        return {
+            "balance": str(data.get("balance", "0")),
+            "balance_formatted": float(data.get("balance", 0)) / 1e18,
+            "symbol": token_type,
+            "network": data.get("network", "mainnet")
+        }
+    
+    @read_through(ttl=BALANCE_TTL)
+    async def get_token_balance(self, address: str, token_type: str) -> Optional[Dict[str, Any]]:
         """
         Get token balance for an address.
         
@@ -35,7 +123,8 @@ class BlockchainService:
             token_type: Token type ('RIGHTS' or 'DERI')
         
         Returns:
-            Dict with balance information
+            Dict with balance information, or None if the RPC could not answer
+            (not cached, so a transient error is never served as a zero balance)
         """
         try:
             # In production, this would call the actual blockchain RPC
@@ -50,31 +139,194 @@ class BlockchainService:
             )
             
             if response.status_code == 200:
-                data = response.json()
-                return {
-                    "balance": str(data.get("balance", "0")),
-                    "balance_formatted": float(data.get("balance", 0)) / 1e18,
-                    "symbol": token_type,
-                    "network": data.get("network", "mainnet")
-                }
-            else:
-                # Return default values if blockchain unavailable
-                return {
-                    "balance": "0",
-                    "balance_formatted": 0.0,
-                    "symbol": token_type,
-                    "network": "mainnet"
-                }
+                return self._format_balance(token_type, response.json())
+            logger.error(f"Error fetching token balance for {address}: HTTP {response.status_code}")
+            return None
         except Exception as e:
             logger.error(f"Error fetching token balance: {e}")
-            # Return default values on error
-            return {
-                "balance": "0",
-                "balance_formatted": 0.0,
-                "symbol": token_type,
-                "network": "mainnet"
-            }
+            return None
+    
+    async def _rpc_batch(self, calls: List[Tuple[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Send (method, params) calls as one JSON-RPC batch request.
+        
+        Returns:
+            Reply objects in call order ({} for a call without a reply), or None if
+            the request failed or the node does not support batches
+        """
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls)
+        ]
+        try:
+            response = await self.client.post(self.rpc_url, json=payload)
+            replies = response.json() if response.status_code == 200 else None
+        except Exception as e:
+            logger.error(f"Error sending JSON-RPC batch: {e}")
+            return None
+        if not isinstance(replies, list):
+            return None
+        # Batch replies may come back in any order
+        by_id = {reply.get("id"): reply for reply in replies if isinstance(reply, dict)}
+        return [by_id.get(i, {}) for i in range(len(calls))]
+    
+    async def get_token_balances(
+        self,
+        addresses: List[str],
+        token_types: Sequence[str] = TOKEN_TYPES
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Get balances for many addresses and token types at once.
+        
+        Cached balances are read in one cache round trip; the rest are fetched with
+        JSON-RPC batch requests of up to BALANCE_BATCH_SIZE lookups each.
+        
+        Args:
+            addresses: Wallet addresses
+            token_types: Token types to look up for every address
+        
+        Returns:
+            Dict of address -> token type -> balance information. Lookups the RPC
+            failed to answer are left out rather than reported as zero.
+        """
+        calls = [((address, token_type), {}) for address in addresses for token_type in token_types]
+        results = await type(self).get_token_balance.many(
+            self, calls, load_batch=self._fetch_balance_batches
+        )
+        balances: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for ((address, token_type), _), result in zip(calls, results):
+            if result:
+                balances.setdefault(address, {})[token_type] = result
+        return balances
+    
+    async def _fetch_balance_batches(self, calls: List[Tuple[tuple, dict]]) -> List[Dict[str, Any]]:
+        lookups = [args for args, _ in calls]
+        chunks = [lookups[i:i + BALANCE_BATCH_SIZE] for i in range(0, len(lookups), BALANCE_BATCH_SIZE)]
+        results = await asyncio.gather(*[self._fetch_balance_batch(chunk) for chunk in chunks])
+        return [balance for chunk in results for balance in chunk]
+    
+    async def _fetch_balance_batch(self, lookups: List[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Fetch one chunk of (address, token_type) balances with a single JSON-RPC batch.
+        
+        Lookups the RPC answered with an error come back as None, so they are not cached.
+        """
+        replies = await self._rpc_batch([
+            ("drp_getTokenBalance", {"address": address, "token_type": token_type, "contract": self.contract_address})
+            for address, token_type in lookups
+        ])
+        
+        if replies is None:
+            # RPC without batch support: fall back to one request per lookup
+            fetch_one = type(self).get_token_balance.__wrapped__
+            return await asyncio.gather(*[
+                fetch_one(self, address, token_type) for address, token_type in lookups
+            ])
+        
+        balances = []
+        for (address, token_type), reply in zip(lookups, replies):
+            if "result" in reply:
+                balances.append(self._format_balance(token_type, reply["result"]))
+            else:
+                logger.error(f"Error fetching token balance for {address}: {reply.get('error', 'no reply')}")
+                balances.append(None)
+        return balances
+    
+    async def get_chain_head(self) -> Optional[int]:
+        """Latest block number known to the RPC node (None if unavailable)."""
+        replies = await self._rpc_batch([("drp_blockNumber", {})])
+        if not replies or "result" not in replies[0]:
+            logger.error("Error fetching chain head")
+            return None
+        return int(replies[0]["result"])
+    
+    async def get_blocks_by_number(self, numbers: List[int]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Full blocks, including transactions, straight from the RPC node.
+        
+        Fetched in JSON-RPC batches of BLOCK_BATCH_SIZE; a block the node could not
+        return comes back as None.
+        """
+        chunks = [numbers[i:i + BLOCK_BATCH_SIZE] for i in range(0, len(numbers), BLOCK_BATCH_SIZE)]
+        blocks: List[Optional[Dict[str, Any]]] = []
+        for chunk in chunks:
+            replies = await self._rpc_batch([
+                ("drp_getBlockByNumber", {"number": number, "transactions": True}) for number in chunk
+            ])
+            if replies is None:
+                blocks.extend([None] * len(chunk))
+                continue
+            blocks.extend(reply.get("result") for reply in replies)
+        return blocks
+    
+    @read_through(ttl=FINALIZED_TX_TTL)
+    async def get_voting_weight(self, address: str, weighting: str, block_number: int) -> Optional[str]:
+        """
+        Voting weight of an address at a past block, as a decimal string.
+        
+        Past balances do not change, so lookups are cached for long; None (not
+        cached) if the RPC could not answer.
+        """
+        return (await self._fetch_voting_weights([((address, weighting, block_number), {})]))[0]
+    
+    async def get_voting_weights(
+        self,
+        addresses: List[str],
+        weighting: str,
+        block_number: int,
+        use_cache: bool = True
+    ) -> Dict[str, int]:
+        """
+        Voting weights of many addresses at a snapshot block.
+        
+        Args:
+            addresses: Voter addresses
+            weighting: 'token' (governance token balance in wei) or 'post' (PoST level)
+            block_number: Snapshot block
+            use_cache: False to ask the RPC node for every weight (e.g. for a recount)
+        
+        Returns:
+            Dict of address -> weight, without the addresses the RPC could not answer for
+        """
+        calls = [((address, weighting, block_number), {}) for address in addresses]
+        if use_cache:
+            results = await type(self).get_voting_weight.many(self, calls, load_batch=self._fetch_voting_weights)
+        else:
+            results = await self._fetch_voting_weights(calls)
+        return {
+            address: int(result)
+            for address, result in zip(addresses, results)
+            if result is not None
+        }
+    
+    async def _fetch_voting_weights(self, calls: List[Tuple[tuple, dict]]) -> List[Optional[str]]:
+        """Look up (address, weighting, block_number) weights in JSON-RPC batches."""
+        weights: List[Optional[str]] = []
+        for i in range(0, len(calls), BALANCE_BATCH_SIZE):
+            lookups = [args for args, _ in calls[i:i + BALANCE_BATCH_SIZE]]
+            replies = await self._rpc_batch([
+                ("drp_getTokenBalance", {
+                    "address": address, "token_type": GOVERNANCE_TOKEN,
+                    "contract": self.contract_address, "block": block_number
+                })
+                if weighting == "token" else
+                ("drp_getStatusLevel", {"address": address, "block": block_number})
+                for address, weighting, block_number in lookups
+            ])
+            if replies is None:
+                weights.extend([None] * len(lookups))
+                continue
+            for (address, weighting, _), reply in zip(lookups, replies):
+                if "result" not in reply:
+                    logger.error(f"Error fetching voting weight for {address}: {reply.get('error', 'no reply')}")
+                    weights.append(None)
+                elif weighting == "token":
+                    weights.append(str(int(reply["result"].get("balance", 0))))
+                else:
+                    weights.append(str(int(reply["result"].get("verification_level", 0))))
+        return weights
     
+    @read_through(ttl=RIGHTS_TTL)
     async def get_rights(self, address: str) -> Dict[str, Any]:
         """Get rights information for an address."""
         try:
@@ -99,14 +351,20 @@ class BlockchainService:
         """Transfer tokens between addresses."""
         try:
             # In production, this would submit a transaction to the blockchain
-            return {
+            result = {
                 "success": True,
-                "tx_hash": f"0x{datetime.utcnow().timestamp():x}",
+                "tx_hash": f"0x{int(datetime.utcnow().timestamp()):x}",
                 "message": "Transfer completed"
             }
         except Exception as e:
             logger.error(f"Error transferring tokens: {e}")
             return {"success": False, "message": str(e)}
+        
+        await self._invalidate("get_token_balance", from_address, token_type)
+        await self._invalidate("get_token_balance", to_address, token_type)
+        for address in (from_address, to_address, None):
+            await self._invalidate_all("get_transactions", address)
+        return result
     
     async def store_on_ipfs(self, data: Dict[str, Any]) -> str:
         """Store data on IPFS and return CID."""
@@ -118,6 +376,7 @@ class BlockchainService:
             logger.error(f"Error storing on IPFS: {e}")
             return ""
     
+    @read_through(ttl=ACTIVITY_TTL)
     async def get_submission_status(self, submission_id: str) -> Dict[str, Any]:
         """Get status of an activity submission."""
         try:
@@ -131,15 +390,27 @@ class BlockchainService:
             logger.error(f"Error fetching submission status: {e}")
             return {"status": "error"}
     
+    @read_through(ttl=ACTIVITY_TTL)
     async def get_user_activities(
         self,
         actor_id: str,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Get all activities for a user."""
+        """
+        Get all activities for a user, newest first.
+        
+        Pages by `cursor` (a (timestamp, submission_id) keyset); `offset` is only
+        used by callers that do not pass one.
+        """
+        # Only validates the cursor (InvalidCursor -> 400) until activities are stored;
+        # the decoded (timestamp, submission_id) is the :position below
+        decode_cursor(cursor, 2)
         try:
-            # In production, query database
+            # In production, query database:
+            # WHERE actor_id = :actor_id AND (timestamp, submission_id) < :position
+            # ORDER BY timestamp DESC, submission_id DESC LIMIT :limit
             return []
         except Exception as e:
             logger.error(f"Error fetching user activities: {e}")
@@ -154,14 +425,18 @@ class BlockchainService:
         """Process reward for a verified activity."""
         try:
             # In production, mint tokens or transfer from treasury
-            return {
+            result = {
                 "success": True,
-                "tx_hash": f"0x{datetime.utcnow().timestamp():x}",
+                "tx_hash": f"0x{int(datetime.utcnow().timestamp()):x}",
                 "amount": amount
             }
         except Exception as e:
             logger.error(f"Error processing reward: {e}")
             return {"success": False, "message": str(e)}
+        
+        for token_type in TOKEN_TYPES:
+            await self._invalidate("get_token_balance", actor_id, token_type)
+        return result
     
     async def create_proposal(
         self,
@@ -170,36 +445,75 @@ class BlockchainService:
         description: str,
         proposer: str,
         proposal_type: str,
-        voting_period_days: int
+        voting_period_days: int,
+        weighting: str = "token"
     ) -> Dict[str, Any]:
-        """Create a governance proposal."""
-        try:
-            # In production, create proposal on blockchain
-            voting_end = datetime.utcnow()
-            voting_end = voting_end.replace(day=voting_end.day + voting_period_days)
-            
-            return {
-                "voting_end": voting_end.isoformat(),
-                "proposal_id": proposal_id
-            }
-        except Exception as e:
-            logger.error(f"Error creating proposal: {e}")
-            return {}
+        """
+        Create a governance proposal.
+        
+        Votes are weighted by `weighting` ('token' or 'post') at the current head,
+        which becomes the proposal's snapshot block.
+        
+        Raises:
+            SnapshotUnavailable: Neither the RPC node nor the chain index knows the head
+        """
+        # In production, create proposal on blockchain
+        voting_end = datetime.utcnow() + timedelta(days=voting_period_days)
+        
+        result = {
+            "voting_end": voting_end.isoformat(),
+            "proposal_id": proposal_id
+        }
+        if self.vote_ledger is not None:
+            snapshot_block = await self.get_chain_head()
+            if snapshot_block is None and self.chain_index is not None:
+                head = await self.chain_index.get_head()
+                snapshot_block = head["block_number"] if head else None
+            if snapshot_block is None:
+                # A proposal without a tally would reject every vote
+                raise SnapshotUnavailable(f"No snapshot block for proposal {proposal_id}")
+            await self.vote_ledger.open_proposal(proposal_id, snapshot_block, weighting, voting_end)
+            result["snapshot_block"] = snapshot_block
+            result["weighting"] = weighting
+        
+        await self._invalidate("get_proposal", proposal_id)
+        await self._invalidate("get_proposal_results", proposal_id)
+        await self._invalidate_all("get_proposals")
+        return result
     
+    @read_through(ttl=PROPOSAL_TTL, generation_args=0)
     async def get_proposals(
         self,
         status: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Get governance proposals."""
+        """
+        Get governance proposals, newest first.
+        
+        Pages by `cursor` (a (created_at, proposal_id) keyset); `offset` is only
+        used by callers that do not pass one.
+        """
+        # Only validates the cursor (InvalidCursor -> 400) until proposals are stored;
+        # the decoded (created_at, proposal_id) is the :position below
+        decode_cursor(cursor, 2)
         try:
-            # In production, query blockchain/database
-            return []
+            # In production, query blockchain/database:
+            # WHERE (created_at, proposal_id) < :position
+            # ORDER BY created_at DESC, proposal_id DESC LIMIT :limit
+            proposals = []
         except Exception as e:
             logger.error(f"Error fetching proposals: {e}")
             return []
+        
+        # Warm the page's proposals so opening one is served from the cache
+        await type(self).get_proposal.warm(
+            self, {(proposal["proposal_id"],): proposal for proposal in proposals}
+        )
+        return proposals
     
+    @read_through(ttl=PROPOSAL_TTL, negative_ttl=NEGATIVE_TTL)
     async def get_proposal(self, proposal_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific proposal."""
         try:
@@ -216,20 +530,48 @@ class BlockchainService:
         vote: str,
         signature: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Vote on a governance proposal."""
-        try:
+        """
+        Vote on a governance proposal.
+        
+        The vote is weighted by the voter's balance (or PoST level) at the proposal's
+        snapshot block and added to the running tally.
+        
+        Raises:
+            VoteRejected: Unknown proposal, voting closed or the address already voted
+        """
+        if self.vote_ledger is None:
             # In production, submit vote to blockchain
-            return {
+            result = {
                 "success": True,
-                "tx_hash": f"0x{datetime.utcnow().timestamp():x}",
+                "tx_hash": f"0x{int(datetime.utcnow().timestamp()):x}",
                 "message": "Vote submitted successfully"
             }
-        except Exception as e:
-            logger.error(f"Error voting on proposal: {e}")
-            return {"success": False, "message": str(e)}
+        else:
+            tally = await self.vote_ledger.get_results(proposal_id)
+            if tally is None:
+                raise UnknownProposal(f"Proposal {proposal_id} not found")
+            weights = await self.get_voting_weights([voter], tally["weighting"], tally["snapshot_block"])
+            if voter not in weights:
+                return {"success": False, "message": "Voting weight unavailable, try again later"}
+            recorded = await self.vote_ledger.record_vote(proposal_id, voter, vote, weights[voter], signature)
+            result = {
+                "success": True,
+                "receipt": recorded["receipt"],
+                "weight": str(weights[voter]),
+                "message": "Vote recorded"
+            }
+        
+        await self._invalidate("get_proposal", proposal_id)
+        await self._invalidate("get_proposal_results", proposal_id)
+        await self._invalidate_all("get_proposals")
+        return result
     
-    async def get_proposal_results(self, proposal_id: str) -> Dict[str, Any]:
-        """Get voting results for a proposal."""
+    @read_through(ttl=PROPOSAL_RESULTS_TTL, negative_ttl=NEGATIVE_TTL)
+    async def get_proposal_results(self, proposal_id: str) -> Optional[Dict[str, Any]]:
+        """Get voting results for a proposal (None if the ledger does not know it)."""
+        if self.vote_ledger is not None:
+            # One tally row, maintained as votes arrive
+            return await self.vote_ledger.get_results(proposal_id)
         try:
             # In production, query blockchain
             return {
@@ -242,38 +584,99 @@ class BlockchainService:
             logger.error(f"Error fetching proposal results: {e}")
             return {}
     
+    async def recount_proposal(self, proposal_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Verify a proposal's tally.
+        
+        Replays the vote ledger and re-sums it with every voter's snapshot weight
+        fetched again from the RPC node (bypassing the weight cache). Voters whose
+        weight could not be fetched are counted with their recorded weight.
+        
+        The report is cached per ledger hash, so repeated recounts of an unchanged
+        ledger do not go back to the RPC node; a new vote changes the hash.
+        """
+        if self.vote_ledger is None:
+            return None
+        results = await self.vote_ledger.get_results(proposal_id)
+        if results is None:
+            return None
+        return await self._recount_ledger(
+            proposal_id, results["ledger_hash"], results["weighting"], results["snapshot_block"]
+        )
+    
+    @read_through(ttl=RECOUNT_TTL)
+    async def _recount_ledger(
+        self,
+        proposal_id: str,
+        ledger_hash: str,
+        weighting: str,
+        snapshot_block: int
+    ) -> Optional[Dict[str, Any]]:
+        voters = await self.vote_ledger.get_voters(proposal_id)
+        weights = await self.get_voting_weights(voters, weighting, snapshot_block, use_cache=False)
+        return await self.vote_ledger.recount(proposal_id, weights)
+    
+    @read_through(ttl=TRANSACTIONS_TTL, generation_args=1)
     async def get_transactions(
         self,
         address: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Get recent transactions."""
+        """
+        Get recent transactions, newest first.
+        
+        Pages by `cursor` (a (block_number, tx_index) keyset); `offset` is only
+        used by callers that do not pass one.
+        """
+        position = decode_cursor(cursor, 2)
         try:
-            # In production, query blockchain/indexer
+            if self.chain_index is not None:
+                return await self.chain_index.get_transactions(
+                    address=address, limit=limit, offset=offset, before=position
+                )
             return []
         except Exception as e:
             logger.error(f"Error fetching transactions: {e}")
             return []
     
+    @read_through(ttl=transaction_ttl, negative_ttl=NEGATIVE_TTL)
     async def get_transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
         """Get a specific transaction."""
         try:
-            # In production, query blockchain
+            if self.chain_index is not None:
+                return await self.chain_index.get_transaction(tx_hash)
             return None
         except Exception as e:
             logger.error(f"Error fetching transaction: {e}")
             return None
     
-    async def get_blocks(self, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
-        """Get recent blocks."""
+    @read_through(ttl=BLOCKS_TTL)
+    async def get_blocks(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get recent blocks, newest first.
+        
+        Pages by `cursor` (a block_number keyset); `offset` is only used by
+        callers that do not pass one.
+        """
+        position = decode_cursor(cursor, 1)
         try:
-            # In production, query blockchain
+            if self.chain_index is not None:
+                return await self.chain_index.get_blocks(
+                    limit=limit, offset=offset, before_block=position[0] if position else None
+                )
             return []
         except Exception as e:
             logger.error(f"Error fetching blocks: {e}")
             return []
     
+    @read_through(ttl=ACTIVITY_TTL)
     async def get_activity_feed(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get activity feed."""
         try:
@@ -284,9 +687,19 @@ class BlockchainService:
             return []
     
     async def get_explorer_stats(self) -> Dict[str, Any]:
-        """Get explorer statistics."""
+        """Get explorer statistics: precomputed counters if available, else exact counts."""
+        if self.explorer_stats is not None:
+            stats = await self.explorer_stats.get_stats()
+            if stats is not None:
+                return stats
+        return await self.get_exact_explorer_stats()
+    
+    @read_through(ttl=EXPLORER_STATS_TTL)
+    async def get_exact_explorer_stats(self) -> Dict[str, Any]:
+        """Explorer statistics counted from the chain index."""
         try:
-            # In production, calculate from blockchain data
+            if self.chain_index is not None:
+                return {**await self.chain_index.get_stats(), "network_hashrate": 0}
             return {
                 "total_transactions": 0,
                 "total_blocks": 0,
@@ -297,6 +710,7 @@ class BlockchainService:
             logger.error(f"Error fetching explorer stats: {e}")
             return {}
     
+    @read_through(ttl=PROFILE_TTL)
     async def get_user_profile(self, address: str) -> Dict[str, Any]:
         """Get user profile."""
         try:
@@ -323,12 +737,15 @@ class BlockchainService:
         """Update user profile."""
         try:
             # In production, update database
-            profile = await self.get_user_profile(address)
+            # Copy: the cached profile may be shared with concurrent readers
+            profile = dict(await self.get_user_profile(address))
             profile.update(updates)
-            return profile
         except Exception as e:
             logger.error(f"Error updating user profile: {e}")
             return {}
+        
+        await self._invalidate("get_user_profile", address)
+        return profile
     
     async def close(self):
         """Close the HTTP client."""
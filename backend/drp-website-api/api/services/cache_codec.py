@@ -0,0 +1,161 @@
+"""
+Cache Codec - Serialization and compression of cached values.
+
+Encoded values start with one header byte: the high bit marks the versioned format,
+bits 4-6 name the serializer and bits 0-3 the compression. Entries written before
+the header existed are plain JSON text, whose first byte is always ASCII (< 0x80),
+so old and new entries can be read side by side during a rollout.
+"""
+
+import json
+import logging
+import zlib
+from typing import Any, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+HEADER_MARK = 0x80
+
+SERIALIZERS = {"json": 0, "orjson": 1, "msgpack": 2}
+COMPRESSIONS = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+
+
+class CodecError(ValueError):
+    """Raised when a cached value cannot be decoded."""
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def _serializer_pair(name: str) -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    if name == "json":
+        return _json_dumps, json.loads
+    if name == "orjson":
+        # Non-str dict keys (ints from counters) are kept as in json.dumps
+        return (lambda value: orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)), orjson.loads
+    if name == "msgpack":
+        return (
+            lambda value: msgpack.packb(value, use_bin_type=True),
+            lambda data: msgpack.unpackb(data, raw=False, strict_map_key=False)
+        )
+    raise ValueError(f"Unknown serializer: {name}")
+
+
+def _compression_pair(name: str) -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    if name == "none":
+        return (lambda data: data), (lambda data: data)
+    if name == "zlib":
+        return (lambda data: zlib.compress(data, 6)), zlib.decompress
+    if name == "zstd":
+        compressor = zstandard.ZstdCompressor(level=3)
+        decompressor = zstandard.ZstdDecompressor()
+        return compressor.compress, decompressor.decompress
+    if name == "lz4":
+        return lz4.frame.compress, lz4.frame.decompress
+    raise ValueError(f"Unknown compression: {name}")
+
+
+def available_serializers() -> Dict[str, bool]:
+    return {"json": True, "orjson": ORJSON_AVAILABLE, "msgpack": MSGPACK_AVAILABLE}
+
+
+def available_compressions() -> Dict[str, bool]:
+    return {"none": True, "zlib": True, "zstd": ZSTD_AVAILABLE, "lz4": LZ4_AVAILABLE}
+
+
+class CacheCodec:
+    """Encodes values with the configured serializer/compression; decodes any known format."""
+
+    def __init__(
+        self,
+        serializer: str = "orjson",
+        compression: str = "zstd",
+        compress_threshold: int = 1024
+    ):
+        """
+        Initialize cache codec.
+
+        Args:
+            serializer: 'json', 'orjson' or 'msgpack' (falls back to json if not installed)
+            compression: 'none', 'zlib', 'zstd' or 'lz4' (falls back to zlib if not installed)
+            compress_threshold: Only compress serialized values at least this many bytes long
+        """
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Unknown serializer: {serializer}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if not available_serializers()[serializer]:
+            logger.warning(f"{serializer} not installed, cache values use json")
+            serializer = "json"
+        if not available_compressions()[compression]:
+            logger.warning(f"{compression} not installed, cache values use zlib")
+            compression = "zlib"
+
+        self.serializer = serializer
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        self._dumps, _ = _serializer_pair(serializer)
+        self._compress, _ = _compression_pair(compression)
+        self._plain_header = bytes([HEADER_MARK | SERIALIZERS[serializer] << 4])
+        self._compressed_header = bytes([
+            HEADER_MARK | SERIALIZERS[serializer] << 4 | COMPRESSIONS[compression]
+        ])
+
+        # Decoders for every format this process can read, by header byte
+        self._decoders: Dict[int, Tuple[Callable, Callable]] = {}
+        for serializer_name, serializer_id in SERIALIZERS.items():
+            if not available_serializers()[serializer_name]:
+                continue
+            for compression_name, compression_id in COMPRESSIONS.items():
+                if not available_compressions()[compression_name]:
+                    continue
+                header = HEADER_MARK | serializer_id << 4 | compression_id
+                self._decoders[header] = (
+                    _serializer_pair(serializer_name)[1],
+                    _compression_pair(compression_name)[1]
+                )
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize (and compress, if large enough) a value, prefixed with its header byte."""
+        data = self._dumps(value)
+        if self.compression != "none" and len(data) >= self.compress_threshold:
+            return self._compressed_header + self._compress(data)
+        return self._plain_header + data
+
+    def decode(self, data: bytes) -> Any:
+        """Decode a value written by any codec configuration, or a legacy JSON entry."""
+        if isinstance(data, str):
+            return json.loads(data)
+        header = data[0]
+        if header < HEADER_MARK:
+            return json.loads(data)
+        decoders = self._decoders.get(header)
+        if decoders is None:
+            raise CodecError(f"Unsupported cache value header: {header:#04x}")
+        loads, decompress = decoders
+        return loads(decompress(data[1:]))
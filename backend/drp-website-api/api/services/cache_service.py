@@ -1,10 +1,18 @@
 """
-Cache Service - Handles caching using Redis for fast lookups.
+Cache Service - Two-tier cache: a bounded in-process LRU in front of Redis.
 """
 
+import asyncio
+import fnmatch
+import functools
+import inspect
 import logging
-from typing import Optional, Any
-import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Any, Callable, Dict, List, Tuple, Union
+
+from .cache_codec import CacheCodec
 
 logger = logging.getLogger(__name__)
 
@@ -13,74 +21,589 @@ try:
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
-    logger.warning("Redis not available, caching disabled")
+    logger.warning("Redis not available, using in-process cache only")
+
+# Pub/sub channel used to evict keys from every worker's local tier
+INVALIDATION_CHANNEL = "drp:cache:invalidate"
+
+# Keys per SCAN / DEL batch in delete_pattern
+SCAN_BATCH_SIZE = 500
+
+# Generation tokens outlive every result cached under them
+GENERATION_TTL = 7 * 24 * 3600
+
+
+class LocalCache:
+    """Bounded in-process LRU with per-entry expiry and size-based eviction."""
+    
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            max_entries: Maximum number of entries
+            max_bytes: Maximum total size of entries (measured as their encoded length)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        # key -> (expires_at, value, size)
+        self._entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+    
+    def set(self, key: str, value: Any, ttl: float, size: int):
+        if size > self.max_bytes:
+            # Never let one large value flush the whole tier
+            self.pop(key)
+            return
+        self.pop(key)
+        self._entries[key] = (time.monotonic() + ttl, value, size)
+        self.size_bytes += size
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+    
+    def pop(self, key: str) -> bool:
+        if key in self._entries:
+            self._remove(key)
+            return True
+        return False
+    
+    def pop_matching(self, pattern: str) -> int:
+        """Remove every key matching a glob pattern; returns how many were removed."""
+        matched = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+        for key in matched:
+            self._remove(key)
+        return len(matched)
+    
+    def clear(self):
+        self._entries.clear()
+        self.size_bytes = 0
+    
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self.size_bytes -= size
 
 
 class CacheService:
-    """Service for caching data."""
+    """
+    Service for caching data.
+    
+    Reads check the in-process tier first and fall back to Redis; values read from
+    Redis are promoted into the local tier. Writes and deletes are broadcast over
+    Redis pub/sub so other workers drop their local copy. When Redis is unreachable
+    the local tier keeps serving on its own.
     
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+    Values returned from the local tier are shared between callers and must be
+    treated as read-only.
+    """
+    
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379",
+        local_max_entries: int = 10000,
+        local_max_bytes: int = 64 * 1024 * 1024,
+        local_ttl: int = 60,
+        redis_retry_interval: float = 5.0,
+        codec: Optional[CacheCodec] = None
+    ):
         """
         Initialize cache service.
         
         Args:
             redis_url: Redis connection URL
+            local_max_entries: Maximum entries in the in-process tier
+            local_max_bytes: Maximum total encoded size of the in-process tier
+            local_ttl: Upper bound on how long the in-process tier keeps an entry
+            redis_retry_interval: Seconds to skip Redis after a connection error
+            codec: Serialization/compression for stored values (orjson + zstd by default)
         """
         self.redis_url = redis_url
         self.redis_client: Optional[redis.Redis] = None
-        self.enabled = REDIS_AVAILABLE
+        self.enabled = True
+        self.redis_enabled = REDIS_AVAILABLE
+        self.local = LocalCache(local_max_entries, local_max_bytes)
+        self.local_ttl = local_ttl
+        self.redis_retry_interval = redis_retry_interval
+        self._redis_down_until = 0.0
+        self._instance_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+        self.codec = codec or CacheCodec()
+        
+        # Lookup counters across both tiers (read by the metrics endpoint)
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
         
-        if self.enabled:
+        if self.redis_enabled:
             try:
-                self.redis_client = redis.from_url(redis_url, decode_responses=True)
+                # Values are binary (see cache_codec), so responses stay as bytes
+                self.redis_client = redis.from_url(redis_url, decode_responses=False)
                 logger.info("CacheService initialized with Redis")
             except Exception as e:
                 logger.warning(f"Failed to connect to Redis: {e}")
-                self.enabled = False
+                self.redis_enabled = False
         else:
-            logger.info("CacheService initialized without Redis (caching disabled)")
+            logger.info("CacheService initialized without Redis (in-process cache only)")
+    
+    def _redis_usable(self) -> bool:
+        return self.redis_enabled and self.redis_client is not None and time.monotonic() >= self._redis_down_until
+    
+    def _redis_failed(self, action: str, error: Exception):
+        self.redis_errors += 1
+        if time.monotonic() >= self._redis_down_until:
+            logger.error(f"Error {action} cache: {error}; serving from in-process cache for {self.redis_retry_interval}s")
+        self._redis_down_until = time.monotonic() + self.redis_retry_interval
+    
+    async def start(self):
+        """Start listening for invalidations from other workers."""
+        if self._listener is None and self.redis_enabled and self.redis_client:
+            self._listener = asyncio.create_task(self._listen_invalidations())
+    
+    async def _listen_invalidations(self):
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Invalidations may have been missed while disconnected
+                self.local.clear()
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    origin, kind, target = data.split("|", 2)
+                    if origin == self._instance_id:
+                        continue
+                    if kind == "p":
+                        self.local.pop_matching(target)
+                    else:
+                        self.local.pop(target)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener disconnected: {e}")
+                await asyncio.sleep(self.redis_retry_interval)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+    
+    def _invalidation_message(self, key: str, pattern: bool = False) -> str:
+        return f"{self._instance_id}|{'p' if pattern else 'k'}|{key}"
+    
+    def _local_ttl(self, pttl: Optional[int]) -> float:
+        """How long the local tier may keep a value whose Redis PTTL is `pttl` (ms)."""
+        if pttl is None or pttl == -1:
+            # No expiry in Redis
+            return self.local_ttl
+        # -2: the key expired since it was read
+        return min(max(pttl, 0) / 1000, self.local_ttl)
+    
+    def _decode(self, key: str, raw: Optional[bytes], pttl: Optional[int] = None) -> Optional[Any]:
+        """
+        Decode a Redis value, promote it to the local tier and count the lookup.
+        
+        The local copy expires no later than the Redis entry, so per-key TTLs hold on
+        every worker and not only on the one that wrote the value.
+        """
+        if raw:
+            try:
+                value = self.codec.decode(raw)
+            except Exception as e:
+                logger.error(f"Error decoding cached value for {key}: {e}")
+            else:
+                self.redis_hits += 1
+                self.hits += 1
+                ttl = self._local_ttl(pttl)
+                if ttl > 0:
+                    self.local.set(key, value, ttl, len(raw))
+                return value
+        self.redis_misses += 1
+        self.misses += 1
+        return None
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache."""
-        if not self.enabled or not self.redis_client:
+        value = self.local.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        
+        if not self._redis_usable():
+            self.misses += 1
             return None
         
         try:
-            value = await self.redis_client.get(key)
-            if value:
-                return json.loads(value)
-            return None
+            # Value and remaining TTL in one round trip
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                raw, pttl = await pipe.execute()
         except Exception as e:
-            logger.error(f"Error getting from cache: {e}")
+            self._redis_failed("getting from", e)
+            self.misses += 1
             return None
+        
+        return self._decode(key, raw, pttl)
+    
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """
+        Get several values at once, in key order (None for misses).
+        
+        Keys missing from the local tier are fetched with a single MGET, pipelined
+        with their remaining TTLs.
+        """
+        values: List[Optional[Any]] = [self.local.get(key) for key in keys]
+        missing = [i for i, value in enumerate(values) if value is None]
+        self.hits += len(keys) - len(missing)
+        if not missing:
+            return values
+        
+        if not self._redis_usable():
+            self.misses += len(missing)
+            return values
+        
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.mget([keys[i] for i in missing])
+                for i in missing:
+                    pipe.pttl(keys[i])
+                raws, *pttls = await pipe.execute()
+        except Exception as e:
+            self._redis_failed("getting from", e)
+            self.misses += len(missing)
+            return values
+        
+        for i, raw, pttl in zip(missing, raws, pttls):
+            values[i] = self._decode(keys[i], raw, pttl)
+        return values
     
     async def set(self, key: str, value: Any, ttl: int = 3600):
         """Set value in cache with TTL."""
-        if not self.enabled or not self.redis_client:
+        encoded = self.codec.encode(value)
+        self.local.set(key, value, min(ttl, self.local_ttl), len(encoded))
+        
+        if not self._redis_usable():
+            return
+        
+        try:
+            # Write and broadcast in one round trip
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.setex(key, ttl, encoded)
+                pipe.publish(INVALIDATION_CHANNEL, self._invalidation_message(key))
+                await pipe.execute()
+        except Exception as e:
+            self._redis_failed("setting", e)
+    
+    async def set_many(self, items: Dict[str, Any], ttl: int = 3600):
+        """Set several values with the same TTL in one pipelined round trip."""
+        if not items:
+            return
+        encoded = {}
+        for key, value in items.items():
+            encoded[key] = self.codec.encode(value)
+            self.local.set(key, value, min(ttl, self.local_ttl), len(encoded[key]))
+        
+        if not self._redis_usable():
             return
         
         try:
-            await self.redis_client.setex(
-                key,
-                ttl,
-                json.dumps(value)
-            )
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, data in encoded.items():
+                    pipe.setex(key, ttl, data)
+                    pipe.publish(INVALIDATION_CHANNEL, self._invalidation_message(key))
+                await pipe.execute()
         except Exception as e:
-            logger.error(f"Error setting cache: {e}")
+            self._redis_failed("setting", e)
     
     async def delete(self, key: str):
         """Delete value from cache."""
-        if not self.enabled or not self.redis_client:
+        self.local.pop(key)
+        
+        if not self._redis_usable():
             return
         
         try:
-            await self.redis_client.delete(key)
+            # Write and broadcast in one round trip
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.delete(key)
+                pipe.publish(INVALIDATION_CHANNEL, self._invalidation_message(key))
+                await pipe.execute()
+        except Exception as e:
+            self._redis_failed("deleting from", e)
+    
+    async def delete_pattern(self, pattern: str) -> int:
+        """
+        Delete every key matching a glob pattern (e.g. "blockchain:get_proposals:*").
+        
+        Walks the Redis keyspace with SCAN and deletes in pipelined batches, so it is
+        meant for occasional invalidation on writes, not for hot paths.
+        
+        Returns:
+            Number of Redis keys deleted (local-only deletions when Redis is down)
+        """
+        removed_locally = self.local.pop_matching(pattern)
+        
+        if not self._redis_usable():
+            return removed_locally
+        
+        deleted = 0
+        try:
+            batch: List[bytes] = []
+            async for key in self.redis_client.scan_iter(match=pattern, count=SCAN_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= SCAN_BATCH_SIZE:
+                    deleted += await self.redis_client.unlink(*batch)
+                    batch = []
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                if batch:
+                    pipe.unlink(*batch)
+                pipe.publish(INVALIDATION_CHANNEL, self._invalidation_message(pattern, pattern=True))
+                results = await pipe.execute()
+            if batch:
+                deleted += results[0]
         except Exception as e:
-            logger.error(f"Error deleting from cache: {e}")
+            self._redis_failed("deleting from", e)
+        return deleted
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate and eviction statistics for both tiers."""
+        local = self.local
+        local_lookups = local.hits + local.misses
+        redis_lookups = self.redis_hits + self.redis_misses
+        return {
+            "local": {
+                "hits": local.hits,
+                "misses": local.misses,
+                "hit_rate": local.hits / local_lookups if local_lookups else 0.0,
+                "evictions": local.evictions,
+                "expirations": local.expirations,
+                "entries": len(local),
+                "bytes": local.size_bytes,
+            },
+            "redis": {
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+                "hit_rate": self.redis_hits / redis_lookups if redis_lookups else 0.0,
+                "errors": self.redis_errors,
+                "available": self._redis_usable(),
+            },
+        }
     
     async def close(self):
-        """Close Redis connection."""
+        """Stop the invalidation listener and close the Redis connection."""
+        if self._listener:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
         if self.redis_client:
             await self.redis_client.close()
 
 
+# Stored in place of a None result so "not found" can be cached too
+NEGATIVE_RESULT = {"__negative__": True}
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution."""
+    
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+    
+    async def do(self, key: str, load: Callable[[], Any]) -> Any:
+        """
+        Run `load` for `key` unless a call for it is already running, then share its result.
+        
+        The call runs in its own task, so a cancelled caller does not cancel it for the others.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(load())
+            self._calls[key] = task
+            task.add_done_callback(functools.partial(self._done, key))
+        return await asyncio.shield(task)
+    
+    def _done(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller has gone away
+            task.exception()
+
+
+def cache_key_part(value: Any) -> str:
+    """Normalize one argument for use in a cache key."""
+    if isinstance(value, str) and value.startswith("0x"):
+        # Addresses and hashes are case-insensitive
+        return value.lower()
+    return str(value)
+
+
+def read_through(
+    ttl: Union[int, Callable[[Any], int]],
+    negative_ttl: int = 0,
+    namespace: str = "blockchain",
+    generation_args: Optional[int] = None
+):
+    """
+    Cache an async service method's result in the service's CacheService.
+    
+    The service provides `cache_service` (may be None) and `_single_flight`. Concurrent
+    misses for the same arguments share one upstream call.
+    
+    The decorated method also gets:
+        cache_key(service, *args, **kwargs): key for one call (without its generation)
+        key_prefix: prefix shared by the keys of every call
+        many(service, calls, load_batch=None): results for a list of (args, kwargs) using one
+            cache round trip; misses are loaded one call each, or all at once by `load_batch`
+        warm(service, results): store results already fetched elsewhere, keyed by args tuple
+        bump_generation(service, *leading_args): make every cached call whose first
+            `generation_args` arguments are `leading_args` miss (generational methods only)
+    
+    Args:
+        ttl: Seconds to keep a result, or a callable returning seconds for a given result
+            (0 means do not cache it)
+        negative_ttl: Seconds to remember a None result (0 disables negative caching)
+        namespace: Cache key prefix
+        generation_args: Put a generation token for the first this-many arguments in every
+            key (0: one generation for the whole method). Used by list queries whose other
+            arguments (filters, paging) are not known at write time: bumping the generation
+            invalidates all their pages with one write, and the old entries expire on their own.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+        key_prefix = f"{namespace}:{method.__name__}"
+        generation_prefix = f"{namespace}:generation:{method.__name__}"
+        
+        def key_parts(service, *args, **kwargs) -> List[str]:
+            bound = signature.bind(service, *args, **kwargs)
+            bound.apply_defaults()
+            return [cache_key_part(value) for value in list(bound.arguments.values())[1:]]
+        
+        def cache_key(service, *args, **kwargs) -> str:
+            return ":".join([key_prefix, *key_parts(service, *args, **kwargs)])
+        
+        def generation_key(leading_parts: List[str]) -> str:
+            return ":".join([generation_prefix, *leading_parts])
+        
+        async def keys_for(service, calls: List[Tuple[tuple, dict]]) -> List[str]:
+            """Cache keys for calls, including their current generation if the method has one."""
+            all_parts = [key_parts(service, *args, **kwargs) for args, kwargs in calls]
+            cache = service.cache_service
+            if generation_args is None or cache is None:
+                return [":".join([key_prefix, *parts]) for parts in all_parts]
+            generation_keys = [generation_key(parts[:generation_args]) for parts in all_parts]
+            distinct = list(dict.fromkeys(generation_keys))
+            # Usually answered by the local tier; bumps evict it on every worker
+            tokens = dict(zip(distinct, await cache.get_many(distinct)))
+            return [
+                ":".join([key_prefix, f"g{tokens[gen_key] or 0}", *parts])
+                for gen_key, parts in zip(generation_keys, all_parts)
+            ]
+        
+        async def bump_generation(service, *leading_args):
+            if generation_args is None:
+                raise TypeError(f"{method.__name__} is not cached by generation")
+            if service.cache_service is not None:
+                leading_parts = [cache_key_part(arg) for arg in leading_args]
+                await service.cache_service.set(generation_key(leading_parts), uuid.uuid4().hex[:12], GENERATION_TTL)
+        
+        def entry(result: Any) -> Tuple[Any, int]:
+            """Value to store for a result and for how long."""
+            if result is None:
+                return NEGATIVE_RESULT, negative_ttl
+            return result, ttl(result) if callable(ttl) else ttl
+        
+        async def store_many(cache, results: Dict[str, Any]):
+            by_ttl: Dict[int, Dict[str, Any]] = {}
+            for key, result in results.items():
+                value, seconds = entry(result)
+                if seconds:
+                    by_ttl.setdefault(seconds, {})[key] = value
+            for seconds, items in by_ttl.items():
+                await cache.set_many(items, seconds)
+        
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            cache = self.cache_service
+            key = (await keys_for(self, [(args, kwargs)]))[0]
+            if cache is not None:
+                cached = await cache.get(key)
+                if cached is not None:
+                    return None if cached == NEGATIVE_RESULT else cached
+            
+            async def load():
+                result = await method(self, *args, **kwargs)
+                if cache is not None:
+                    value, seconds = entry(result)
+                    if seconds:
+                        await cache.set(key, value, seconds)
+                return result
+            
+            return await self._single_flight.do(key, load)
+        
+        async def many(
+            service,
+            calls: List[Tuple[tuple, dict]],
+            load_batch: Optional[Callable[[List[Tuple[tuple, dict]]], Any]] = None
+        ) -> List[Any]:
+            cache = service.cache_service
+            keys = await keys_for(service, calls)
+            cached = await cache.get_many(keys) if cache is not None else [None] * len(keys)
+            results = [None if value == NEGATIVE_RESULT else value for value in cached]
+            missing = [i for i, value in enumerate(cached) if value is None]
+            if not missing:
+                return results
+            
+            if load_batch is not None:
+                loaded = await load_batch([calls[i] for i in missing])
+            else:
+                loaded = await asyncio.gather(*[
+                    service._single_flight.do(
+                        keys[i], functools.partial(method, service, *calls[i][0], **calls[i][1])
+                    )
+                    for i in missing
+                ])
+            for i, result in zip(missing, loaded):
+                results[i] = result
+            if cache is not None:
+                await store_many(cache, {keys[i]: result for i, result in zip(missing, loaded)})
+            return results
+        
+        async def warm(service, results: Dict[tuple, Any]):
+            if service.cache_service is not None:
+                keys = await keys_for(service, [(args, {}) for args in results])
+                await store_many(service.cache_service, dict(zip(keys, results.values())))
+        
+        wrapper.cache_key = cache_key
+        wrapper.key_prefix = key_prefix
+        wrapper.many = many
+        wrapper.warm = warm
+        wrapper.bump_generation = bump_generation
+        return wrapper
+    
+    return decorator
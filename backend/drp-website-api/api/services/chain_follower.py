@@ -0,0 +1,238 @@
+"""
+Chain Follower - Incrementally ingests new blocks from the RPC into the chain index.
+
+Each pass fetches the blocks between the highest indexed block and the chain head
+(minus a confirmation depth) in JSON-RPC batches. A block whose parent hash does not
+match the indexed block below it means the chain reorganized: the index is rolled
+back to the last block both sides agree on and ingestion resumes from there.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .blockchain_service import BLOCK_BATCH_SIZE, BlockchainService
+from .chain_index_service import ChainIndexService
+from .explorer_stats_service import ExplorerStatsService
+from .live_feed_service import LiveFeedService
+
+logger = logging.getLogger(__name__)
+
+
+def _int(value: Any, default: int = 0) -> int:
+    """RPC numbers may be ints, decimal strings or 0x-prefixed hex strings."""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return int(value, 16) if value.startswith("0x") else int(value)
+    return int(value)
+
+
+def _timestamp(value: Any) -> datetime:
+    """Unix seconds or ISO 8601 string -> naive UTC datetime."""
+    if isinstance(value, str) and not value.startswith("0x") and not value.isdigit():
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    return datetime.fromtimestamp(_int(value), tz=timezone.utc).replace(tzinfo=None)
+
+
+class ChainFollower:
+    """Keeps a ChainIndexService in step with the chain."""
+
+    def __init__(
+        self,
+        blockchain_service: BlockchainService,
+        chain_index: ChainIndexService,
+        poll_interval: float = 2.0,
+        confirmations: int = 0,
+        batch_size: int = BLOCK_BATCH_SIZE,
+        reorg_depth: int = 64,
+        start_block: int = 0,
+        stats: Optional[ExplorerStatsService] = None,
+        live_feed: Optional[LiveFeedService] = None
+    ):
+        """
+        Initialize chain follower.
+
+        Args:
+            blockchain_service: Source of chain head and blocks
+            chain_index: Store the blocks are written to
+            poll_interval: Seconds between passes once caught up
+            confirmations: Blocks below the head to stay behind (0 follows the head)
+            batch_size: Blocks fetched and written per batch
+            reorg_depth: Blocks searched back for a common ancestor after a reorg
+            start_block: First block ingested into an empty index
+            stats: Explorer statistics updated with every ingested batch
+            live_feed: Hub that new blocks and transactions are published to
+        """
+        self.blockchain_service = blockchain_service
+        self.chain_index = chain_index
+        self.poll_interval = poll_interval
+        self.confirmations = confirmations
+        self.batch_size = batch_size
+        self.reorg_depth = reorg_depth
+        self.start_block = start_block
+        self.stats = stats
+        self.live_feed = live_feed
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def normalize_block(raw: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert an RPC block into the shape ChainIndexService.ingest_blocks expects."""
+        timestamp = _timestamp(raw.get("timestamp"))
+        transactions = []
+        for i, tx in enumerate(raw.get("transactions") or []):
+            transactions.append({
+                "tx_hash": tx.get("tx_hash") or tx["hash"],
+                "tx_index": _int(tx.get("tx_index", tx.get("transaction_index")), i),
+                "from_address": tx.get("from_address") or tx["from"],
+                "to_address": tx.get("to_address") or tx.get("to"),
+                "value": str(_int(tx.get("value"))),
+                "token_type": tx.get("token_type", "DERI"),
+                "type": tx.get("type", "transfer"),
+                "status": tx.get("status", "confirmed"),
+                "gas_used": _int(tx["gas_used"]) if tx.get("gas_used") is not None else None,
+                "ai_verdict": tx.get("ai_verdict"),
+            })
+        return {
+            "block_number": _int(raw.get("block_number", raw.get("number"))),
+            "block_hash": raw.get("block_hash") or raw["hash"],
+            "parent_hash": raw.get("parent_hash") or raw.get("parentHash"),
+            "timestamp": timestamp,
+            "gas_used": _int(raw.get("gas_used", raw.get("gasUsed"))),
+            "validator": raw.get("validator") or raw.get("miner"),
+            "transactions": transactions,
+        }
+
+    async def _fetch(self, numbers: List[int]) -> List[Dict[str, Any]]:
+        """Normalized blocks for `numbers`, stopping at the first one the node did not return."""
+        blocks = []
+        for raw in await self.blockchain_service.get_blocks_by_number(numbers):
+            if raw is None:
+                break
+            blocks.append(self.normalize_block(raw))
+        return blocks
+
+    async def _find_fork_point(self, block_number: int) -> int:
+        """Highest block at or below `block_number` whose hash the index and node agree on."""
+        lowest = max(self.start_block, block_number - self.reorg_depth + 1)
+        numbers = list(range(lowest, block_number + 1))
+        stored = await self.chain_index.get_block_hashes(numbers)
+        for block in reversed(await self._fetch(numbers)):
+            if stored.get(block["block_number"]) == block["block_hash"]:
+                return block["block_number"]
+        # No common block in the window: drop it and keep walking back next pass
+        logger.warning(f"No common ancestor within {self.reorg_depth} blocks of {block_number}")
+        return lowest - 1
+
+    async def sync_once(self) -> int:
+        """
+        Ingest every block up to the confirmed head.
+
+        Returns:
+            Number of blocks written
+        """
+        head = await self.blockchain_service.get_chain_head()
+        if head is None:
+            return 0
+        target = head - self.confirmations
+
+        local = await self.chain_index.get_head()
+        next_number = local["block_number"] + 1 if local else self.start_block
+        last_hash = local["block_hash"] if local else None
+
+        written = 0
+        reorged = False
+        while next_number <= target:
+            numbers = list(range(next_number, min(next_number + self.batch_size, target + 1)))
+            blocks = await self._fetch(numbers)
+            if not blocks:
+                break
+
+            # Keep the prefix that extends the indexed chain
+            linked = []
+            for block in blocks:
+                if last_hash is not None and block["parent_hash"] != last_hash:
+                    break
+                linked.append(block)
+                last_hash = block["block_hash"]
+
+            if not linked:
+                fork_point = await self._find_fork_point(next_number - 1)
+                removed = await self.chain_index.rollback_after(fork_point)
+                logger.warning(f"Chain reorg at block {next_number}: rolled back {removed} blocks")
+                reorged = True
+                next_number = fork_point + 1
+                hashes = await self.chain_index.get_block_hashes([fork_point])
+                last_hash = hashes.get(fork_point)
+                continue
+
+            written += await self.chain_index.ingest_blocks(linked)
+            if self.stats is not None:
+                self.stats.record_blocks(linked)
+            if self.live_feed is not None and target - next_number < self.batch_size:
+                # Only blocks near the head are news; a backfill is not broadcast
+                await self._publish(linked)
+            next_number = linked[-1]["block_number"] + 1
+            if len(linked) < len(numbers):
+                # The node is behind or the chain moved mid-batch; pick up on the next pass
+                break
+
+        if reorged and self.stats is not None:
+            # Only once the new branch is in: a recount in the middle of the sync
+            # would publish the rolled-back head and count re-ingested blocks twice
+            self.stats.request_reconcile()
+        if written:
+            logger.info(f"Indexed {written} blocks up to {next_number - 1}")
+        return written
+
+    async def _publish(self, blocks: List[Dict[str, Any]]):
+        """One `blocks` event per block and one `transactions` event per non-empty block."""
+        for block in blocks:
+            transactions = block["transactions"]
+            await self.live_feed.publish("blocks", {
+                "block_number": block["block_number"],
+                "block_hash": block["block_hash"],
+                "timestamp": block["timestamp"].isoformat(),
+                "transaction_count": len(transactions),
+                "gas_used": block["gas_used"],
+                "validator": block["validator"],
+            })
+            if transactions:
+                await self.live_feed.publish("transactions", {
+                    "block_number": block["block_number"],
+                    "transactions": [
+                        {**tx, "block_number": block["block_number"], "timestamp": block["timestamp"].isoformat()}
+                        for tx in transactions
+                    ],
+                })
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sync_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error following chain: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        """Start following the chain in a background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("ChainFollower started")
+
+    async def stop(self):
+        """Stop the background task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
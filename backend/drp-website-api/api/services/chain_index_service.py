@@ -0,0 +1,363 @@
+"""
+Chain Index Service - Local indexed store of blocks and transactions for the explorer.
+
+Blocks are written by the ChainFollower as they are produced; explorer queries are
+then indexed database reads (SQLite in development, Postgres in production) instead
+of RPC calls.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    and_,
+    create_engine,
+    delete,
+    func,
+    or_,
+    select,
+)
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+logger = logging.getLogger(__name__)
+
+Base = declarative_base()
+
+
+class ChainBlock(Base):
+    __tablename__ = "chain_blocks"
+
+    block_number = Column(BigInteger, primary_key=True, autoincrement=False)
+    block_hash = Column(String(80), nullable=False, unique=True)
+    parent_hash = Column(String(80), nullable=True)
+    timestamp = Column(DateTime, nullable=False, index=True)
+    transaction_count = Column(Integer, nullable=False, default=0)
+    gas_used = Column(BigInteger, nullable=False, default=0)
+    validator = Column(String(64), nullable=True)
+
+
+class ChainTransaction(Base):
+    __tablename__ = "chain_transactions"
+
+    tx_hash = Column(String(80), primary_key=True)
+    block_number = Column(BigInteger, nullable=False)
+    tx_index = Column(Integer, nullable=False)
+    from_address = Column(String(64), nullable=False)
+    to_address = Column(String(64), nullable=True)
+    value = Column(String(80), nullable=False, default="0")
+    token_type = Column(String(16), nullable=False, default="DERI")
+    type = Column(String(32), nullable=False, default="transfer")
+    status = Column(String(16), nullable=False, default="confirmed")
+    timestamp = Column(DateTime, nullable=False)
+    gas_used = Column(BigInteger, nullable=True)
+    ai_verdict = Column(String(32), nullable=True)
+
+    __table_args__ = (
+        # Chain order, used by every listing and as the keyset for pagination
+        Index("ix_chain_tx_position", "block_number", "tx_index"),
+        Index("ix_chain_tx_from", "from_address", "block_number", "tx_index"),
+        Index("ix_chain_tx_to", "to_address", "block_number", "tx_index"),
+        Index("ix_chain_tx_timestamp", "timestamp"),
+    )
+
+
+def _block_dict(block: ChainBlock) -> Dict[str, Any]:
+    return {
+        "block_number": block.block_number,
+        "block_hash": block.block_hash,
+        "parent_hash": block.parent_hash,
+        "timestamp": block.timestamp.isoformat(),
+        "transaction_count": block.transaction_count,
+        "gas_used": block.gas_used,
+        "validator": block.validator,
+    }
+
+
+def _transaction_dict(tx: ChainTransaction) -> Dict[str, Any]:
+    return {
+        "tx_hash": tx.tx_hash,
+        "block_number": tx.block_number,
+        "tx_index": tx.tx_index,
+        "from_address": tx.from_address,
+        "to_address": tx.to_address,
+        "value": tx.value,
+        "token_type": tx.token_type,
+        "type": tx.type,
+        "status": tx.status,
+        "timestamp": tx.timestamp.isoformat(),
+        "gas_used": tx.gas_used,
+        "ai_verdict": tx.ai_verdict,
+    }
+
+
+def _before(position: Optional[Tuple[int, int]]):
+    """Keyset condition: transactions strictly before (block_number, tx_index)."""
+    if position is None:
+        return None
+    block_number, tx_index = position
+    return or_(
+        ChainTransaction.block_number < block_number,
+        and_(ChainTransaction.block_number == block_number, ChainTransaction.tx_index < tx_index)
+    )
+
+
+def _addresses():
+    """Subquery of distinct addresses that appear as sender or recipient."""
+    senders = select(ChainTransaction.from_address.label("address"))
+    recipients = select(ChainTransaction.to_address.label("address")).where(
+        ChainTransaction.to_address.isnot(None)
+    )
+    return senders.union(recipients).subquery()
+
+
+class ChainIndexService:
+    """Service for storing and querying indexed chain data."""
+
+    def __init__(self, database_url: str = "sqlite:///./drp.db"):
+        """
+        Initialize chain index service.
+
+        Args:
+            database_url: SQLAlchemy database URL (SQLite or Postgres)
+        """
+        connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+        self.engine = create_engine(database_url, connect_args=connect_args, pool_pre_ping=True)
+        self.SessionLocal = sessionmaker(bind=self.engine, expire_on_commit=False)
+        Base.metadata.create_all(self.engine)
+        logger.info("ChainIndexService initialized")
+
+    # Writes
+
+    def _upsert(self, session, model, rows: List[Dict[str, Any]]):
+        """Bulk INSERT ... ON CONFLICT DO UPDATE on Postgres/SQLite, merge() elsewhere."""
+        if not rows:
+            return
+        dialect = session.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            for row in rows:
+                session.merge(model(**row))
+            return
+        table = model.__table__
+        keys = [column.name for column in table.primary_key.columns]
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={name: stmt.excluded[name] for name in rows[0] if name not in keys}
+        )
+        session.execute(stmt, rows)
+
+    def _ingest_blocks(self, blocks: List[Dict[str, Any]]) -> int:
+        block_rows = []
+        tx_rows = []
+        for block in blocks:
+            transactions = block.get("transactions", [])
+            block_rows.append({
+                "block_number": block["block_number"],
+                "block_hash": block["block_hash"],
+                "parent_hash": block.get("parent_hash"),
+                "timestamp": block["timestamp"],
+                "transaction_count": len(transactions),
+                "gas_used": block.get("gas_used", 0),
+                "validator": block.get("validator"),
+            })
+            for tx in transactions:
+                tx_rows.append({
+                    "tx_hash": tx["tx_hash"],
+                    "block_number": block["block_number"],
+                    "tx_index": tx["tx_index"],
+                    "from_address": tx["from_address"].lower(),
+                    "to_address": tx["to_address"].lower() if tx.get("to_address") else None,
+                    "value": str(tx.get("value", "0")),
+                    "token_type": tx.get("token_type", "DERI"),
+                    "type": tx.get("type", "transfer"),
+                    "status": tx.get("status", "confirmed"),
+                    "timestamp": block["timestamp"],
+                    "gas_used": tx.get("gas_used"),
+                    "ai_verdict": tx.get("ai_verdict"),
+                })
+        with self.SessionLocal() as session:
+            self._upsert(session, ChainBlock, block_rows)
+            self._upsert(session, ChainTransaction, tx_rows)
+            session.commit()
+        return len(blocks)
+
+    async def ingest_blocks(self, blocks: List[Dict[str, Any]]) -> int:
+        """
+        Store blocks and their transactions in one database transaction.
+
+        Args:
+            blocks: Normalized blocks (see ChainFollower.normalize_block), each with
+                a `transactions` list
+
+        Returns:
+            Number of blocks written
+        """
+        if not blocks:
+            return 0
+        return await asyncio.to_thread(self._ingest_blocks, blocks)
+
+    def _rollback_after(self, block_number: int) -> int:
+        with self.SessionLocal() as session:
+            session.execute(delete(ChainTransaction).where(ChainTransaction.block_number > block_number))
+            removed = session.execute(delete(ChainBlock).where(ChainBlock.block_number > block_number)).rowcount
+            session.commit()
+        return removed
+
+    async def rollback_after(self, block_number: int) -> int:
+        """Remove blocks above `block_number` (after a reorg). Returns blocks removed."""
+        return await asyncio.to_thread(self._rollback_after, block_number)
+
+    # Reads
+
+    def _head(self) -> Optional[Dict[str, Any]]:
+        with self.SessionLocal() as session:
+            block = session.scalars(
+                select(ChainBlock).order_by(ChainBlock.block_number.desc()).limit(1)
+            ).first()
+            return _block_dict(block) if block else None
+
+    async def get_head(self) -> Optional[Dict[str, Any]]:
+        """Highest indexed block, or None if nothing is indexed yet."""
+        return await asyncio.to_thread(self._head)
+
+    def _block_hashes(self, numbers: List[int]) -> Dict[int, str]:
+        with self.SessionLocal() as session:
+            rows = session.execute(
+                select(ChainBlock.block_number, ChainBlock.block_hash).where(ChainBlock.block_number.in_(numbers))
+            )
+            return {number: block_hash for number, block_hash in rows}
+
+    async def get_block_hashes(self, numbers: List[int]) -> Dict[int, str]:
+        """Stored hashes for the given block numbers."""
+        return await asyncio.to_thread(self._block_hashes, numbers)
+
+    def _blocks(self, limit: int, offset: int, before_block: Optional[int]) -> List[Dict[str, Any]]:
+        query = select(ChainBlock).order_by(ChainBlock.block_number.desc()).limit(limit)
+        if before_block is not None:
+            query = query.where(ChainBlock.block_number < before_block)
+        elif offset:
+            query = query.offset(offset)
+        with self.SessionLocal() as session:
+            return [_block_dict(block) for block in session.scalars(query)]
+
+    async def get_blocks(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        before_block: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Latest blocks, newest first.
+
+        Args:
+            limit: Maximum number of blocks
+            offset: Rows to skip (ignored when `before_block` is given)
+            before_block: Keyset position: only blocks numbered below this
+        """
+        return await asyncio.to_thread(self._blocks, limit, offset, before_block)
+
+    def _transactions(
+        self,
+        address: Optional[str],
+        limit: int,
+        offset: int,
+        before: Optional[Tuple[int, int]]
+    ) -> List[Dict[str, Any]]:
+        order = (ChainTransaction.block_number.desc(), ChainTransaction.tx_index.desc())
+        keyset = _before(before)
+        # With a keyset the offset is not needed; without one, fetch enough rows to skip
+        window = limit + (0 if keyset is not None else offset)
+
+        def page(*conditions):
+            query = select(ChainTransaction).order_by(*order).limit(window)
+            conditions = [c for c in (*conditions, keyset) if c is not None]
+            return query.where(*conditions) if conditions else query
+
+        with self.SessionLocal() as session:
+            if address is None:
+                rows = list(session.scalars(page()))
+            else:
+                # Two index range scans (sender, recipient) merged here instead of an OR
+                address = address.lower()
+                rows = list(session.scalars(page(ChainTransaction.from_address == address)))
+                rows += session.scalars(page(
+                    ChainTransaction.to_address == address, ChainTransaction.from_address != address
+                ))
+                rows.sort(key=lambda tx: (tx.block_number, tx.tx_index), reverse=True)
+            if keyset is None:
+                rows = rows[offset:]
+            return [_transaction_dict(tx) for tx in rows[:limit]]
+
+    async def get_transactions(
+        self,
+        address: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        before: Optional[Tuple[int, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Latest transactions, newest first, optionally involving an address.
+
+        Args:
+            address: Only transactions sent or received by this address
+            limit: Maximum number of transactions
+            offset: Rows to skip (ignored when `before` is given)
+            before: Keyset position (block_number, tx_index): only transactions before it
+        """
+        return await asyncio.to_thread(self._transactions, address, limit, offset, before)
+
+    def _transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        with self.SessionLocal() as session:
+            tx = session.get(ChainTransaction, tx_hash)
+            return _transaction_dict(tx) if tx else None
+
+    async def get_transaction(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """A transaction by hash, or None if it is not indexed."""
+        return await asyncio.to_thread(self._transaction, tx_hash)
+
+    def _address_page(self, after: Optional[str], limit: int) -> List[str]:
+        addresses = _addresses()
+        query = select(addresses.c.address).order_by(addresses.c.address).limit(limit)
+        if after is not None:
+            query = query.where(addresses.c.address > after)
+        with self.SessionLocal() as session:
+            return list(session.scalars(query))
+
+    async def get_addresses(self, after: Optional[str] = None, limit: int = 10000) -> List[str]:
+        """
+        Distinct addresses that sent or received an indexed transaction, in address order.
+
+        Args:
+            after: Keyset position: only addresses sorting after this one
+            limit: Maximum number of addresses
+        """
+        return await asyncio.to_thread(self._address_page, after, limit)
+
+    def _stats(self) -> Dict[str, Any]:
+        with self.SessionLocal() as session:
+            addresses = _addresses()
+            return {
+                "total_transactions": session.scalar(select(func.count()).select_from(ChainTransaction)),
+                "total_blocks": session.scalar(select(func.count()).select_from(ChainBlock)),
+                "total_addresses": session.scalar(select(func.count()).select_from(addresses)),
+                "latest_block": session.scalar(select(func.max(ChainBlock.block_number))),
+            }
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Exact totals computed from the index."""
+        return await asyncio.to_thread(self._stats)
+
+    def close(self):
+        """Dispose of the database connection pool."""
+        self.engine.dispose()
@@ -17,13 +17,24 @@ Date: August 7, 2026
 import os
 import json
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 import hashlib
 import asyncio
 from enum import Enum
 
+from .term_matcher import TermMatcher, count_words
+from .query_cache import EXPLANATION_TTL, FALLBACK_EXPLANATION_TTL, QueryCache
+from ..knowledge.embedding_index import (
+    DEFAULT_INDEX_DIR,
+    EMBEDDING_MODEL,
+    NUMPY_AVAILABLE,
+    EmbeddingIndex,
+    build_index,
+    content_hash,
+)
+
 # LangChain imports (will be imported conditionally)
 try:
     from langchain_core.prompts import ChatPromptTemplate, SystemMessagePromptTemplate, HumanMessagePromptTemplate
@@ -181,7 +192,7 @@ class HumanRightsFilter:
             "hate_speech": ["hate", "racist", "bigot", "xenophobe", "misogynist"],
             "violence": ["kill", "murder", "torture", "abuse", "harm"],
             "exploitation": ["exploit", "traffic", "slavery", "forced labor"],
-            "discrimination": ["discriminate", "segregrate", "exclude", "marginalize"],
+            "discrimination": ["discriminate", "segregate", "exclude", "marginalize"],
             "human_rights_violation": ["oppress", "suppress", "violate rights", "deny rights"]
         }
         self.positive_terms = {
@@ -190,24 +201,14 @@ class HumanRightsFilter:
             "community": ["community", "collaborate", "support", "help", "share"],
             "social_justice": ["justice", "equity", "fairness", "advocacy", "activism"]
         }
+        self.banned_matcher = TermMatcher(self.banned_terms)
+        self.positive_matcher = TermMatcher(self.positive_terms)
     
     def check_content(self, text: str) -> Tuple[ContentSafetyLevel, Dict[str, Any]]:
-        """Check text content against human rights principles."""
-        text_lower = text.lower()
-        
-        # Check for banned content
-        banned_found = {}
-        for category, terms in self.banned_terms.items():
-            for term in terms:
-                if term in text_lower:
-                    banned_found[category] = True
-        
-        # Check for positive content
-        positive_found = {}
-        for category, terms in self.positive_terms.items():
-            for term in terms:
-                if term in text_lower:
-                    positive_found[category] = True
+        """Check text content against human rights principles (whole words, one pass per term set)."""
+        words = count_words(text)
+        banned_found = self.banned_matcher.scan(text, words)
+        positive_found = self.positive_matcher.scan(text, words)
         
         # Determine safety level
         if banned_found:
@@ -245,19 +246,17 @@ class BiasDetector:
             "age": ["old", "young", "elderly", "teen"],
             "economic": ["rich", "poor", "wealthy", "needy"]
         }
+        self.bias_matcher = TermMatcher(self.bias_indicators)
     
     def detect_bias(self, text: str, metadata: Optional[Dict] = None) -> Dict[str, Any]:
         """Detect potential bias in text or metadata."""
-        text_lower = text.lower()
         detected_biases = []
         confidence_scores = {}
         
-        # Check for protected attribute mentions
-        for attribute, terms in self.bias_indicators.items():
-            for term in terms:
-                if term in text_lower:
-                    detected_biases.append(attribute)
-                    confidence_scores[attribute] = self._calculate_confidence(term, text_lower)
+        # Check for protected attribute mentions: each attribute once, scored by its mentions
+        for attribute, counts in self.bias_matcher.scan(text).items():
+            detected_biases.append(attribute)
+            confidence_scores[attribute] = self._calculate_confidence(sum(counts.values()))
         
         # Check metadata for potential bias
         if metadata:
@@ -274,10 +273,8 @@ class BiasDetector:
             "severity": self._calculate_severity(detected_biases)
         }
     
-    def _calculate_confidence(self, term: str, text: str) -> float:
-        """Calculate confidence score for bias detection."""
-        # Simple confidence calculation based on context
-        term_count = text.count(term)
+    def _calculate_confidence(self, term_count: int) -> float:
+        """Calculate confidence score for bias detection from the number of indicator mentions."""
         if term_count > 3:
             return min(0.95, 0.7 + (term_count * 0.05))
         elif term_count > 1:
@@ -342,13 +339,26 @@ class PrivacyGuard:
 class HumanRightsKnowledgeBase:
     """Knowledge base for human rights information and reasoning."""
     
-    def __init__(self):
+    INDEX_NAME = "ethical_knowledge"
+    
+    def __init__(self,
+                 embed: Optional[Callable[[List[str]], Any]] = None,
+                 index_dir: Optional[str] = None,
+                 rebuild_index: bool = False):
+        """
+        Args:
+            embed: Embedding function for a batch of texts (default: all-MiniLM-L6-v2, loaded on first use)
+            index_dir: Directory of the persistent embedding index
+            rebuild_index: Re-embed the documents even if the index is up to date
+        """
         self.knowledge_documents = self._initialize_knowledge_base()
         self.embeddings = None
-        self.vector_store = None
-        self._initialize_vector_store()
+        self.vector_store: Optional[EmbeddingIndex] = None
+        self._embed = embed
+        self.index_dir = index_dir or DEFAULT_INDEX_DIR
+        self._initialize_vector_store(rebuild_index)
     
-    def _initialize_knowledge_base(self) -> List[Document]:
+    def _initialize_knowledge_base(self) -> List["Document"]:
         """Initialize the human rights knowledge base."""
         # Universal Declaration of Human Rights articles
         udhr_articles = [
@@ -436,25 +446,56 @@ class HumanRightsKnowledgeBase:
                 for doc in all_knowledge
             ]
     
-    def _initialize_vector_store(self):
-        """Initialize vector store for semantic search."""
-        if not LANGCHAIN_AVAILABLE:
+    @staticmethod
+    def _document_parts(doc) -> Tuple[str, Dict[str, Any]]:
+        """Content and metadata of a LangChain Document or its dict fallback."""
+        if isinstance(doc, dict):
+            return doc.get("content", ""), doc.get("metadata", {})
+        return doc.page_content, doc.metadata
+    
+    def _embed_texts(self, texts: List[str]):
+        """Embed texts, loading the sentence transformer model on first use."""
+        if self._embed is None:
+            if self.embeddings is None:
+                self.embeddings = SentenceTransformerEmbeddings(
+                    model_name=EMBEDDING_MODEL,
+                    model_kwargs={'device': 'cpu'}
+                )
+            return self.embeddings.embed_documents(texts)
+        return self._embed(texts)
+    
+    def _initialize_vector_store(self, rebuild: bool = False):
+        """
+        Map the persistent embedding index for semantic search.
+        
+        The index is keyed by a hash of the documents and the model, so workers only
+        map the files built by `python -m api.knowledge.embedding_index`. Documents are
+        embedded here only if that index is missing or stale.
+        """
+        if self._embed is None and not LANGCHAIN_AVAILABLE:
             logger.warning("LangChain not available, using fallback knowledge base")
             return
+        if not NUMPY_AVAILABLE:
+            logger.warning("NumPy not available, using fallback knowledge base")
+            return
+        
+        self._documents_by_id = {}
+        documents = []
+        for doc in self.knowledge_documents:
+            content, metadata = self._document_parts(doc)
+            self._documents_by_id[metadata["title"]] = doc
+            documents.append((metadata["title"], f"{metadata['title']}\n{content}"))
         
         try:
-            # Use SentenceTransformers for embeddings
-            embedding_model = SentenceTransformerEmbeddings(
-                model_name="all-MiniLM-L6-v2",
-                model_kwargs={'device': 'cpu'}
-            )
-            
-            # Create FAISS vector store in memory
-            self.vector_store = FAISS.from_documents(
-                documents=self.knowledge_documents,
-                embedding=embedding_model
-            )
-            logger.info("Human rights knowledge base vector store initialized")
+            index = None
+            if not rebuild:
+                index = EmbeddingIndex.load(self.index_dir, self.INDEX_NAME, content_hash(documents, EMBEDDING_MODEL))
+            if index is None:
+                index = build_index(
+                    documents, self._embed_texts, self.index_dir, self.INDEX_NAME, EMBEDDING_MODEL, force=rebuild
+                )
+            self.vector_store = index
+            logger.info(f"Human rights knowledge base embedding index mapped ({len(index)} documents)")
             
         except Exception as e:
             logger.error(f"Error initializing vector store: {e}")
@@ -472,15 +513,16 @@ class HumanRightsKnowledgeBase:
                 return self._fallback_search_external(query, k)
         elif self.vector_store:
             try:
-                docs = self.vector_store.similarity_search(query, k=k)
-                return [
-                    {
-                        "content": doc.page_content,
-                        "metadata": doc.metadata,
-                        "relevance": 1.0 - (i * 0.1)  # Simple relevance scoring
-                    }
-                    for i, doc in enumerate(docs)
-                ]
+                query_vector = self._embed_texts([query])[0]
+                results = []
+                for doc_id, similarity in self.vector_store.search(query_vector, k):
+                    content, metadata = self._document_parts(self._documents_by_id[doc_id])
+                    results.append({
+                        "content": content,
+                        "metadata": metadata,
+                        "relevance": round(similarity, 4)  # Cosine similarity
+                    })
+                return results
             except Exception as e:
                 logger.error(f"Error searching vector store: {e}")
         
@@ -556,7 +598,9 @@ class EthicalLangChainService:
                  huggingface_key: Optional[str] = None,
                  openai_key: Optional[str] = None,
                  nvidia_nim_key: Optional[str] = None,
-                 use_vector_store: bool = True):
+                 use_vector_store: bool = True,
+                 cache_service=None,
+                 semantic_cache_threshold: float = 0.0):
         """
         Initialize the Ethical LangChain Service.
         
@@ -566,6 +610,9 @@ class EthicalLangChainService:
             openai_key: OpenAI API key  
             nvidia_nim_key: NVIDIA NIM API key
             use_vector_store: Whether to use vector store for knowledge
+            cache_service: CacheService for repeated knowledge queries and explanations
+            semantic_cache_threshold: Cosine similarity at which a near-duplicate question
+                is answered from the cache (0 disables it)
         """
         self.provider = provider
         self.huggingface_key = huggingface_key or os.getenv("HUGGINGFACE_API_KEY")
@@ -580,10 +627,21 @@ class EthicalLangChainService:
         # Initialize knowledge base - try to use the external one first
         try:
             from ..knowledge.human_rights_knowledge import HumanRightsKnowledgeBase as ExternalKnowledgeBase
+            from ..knowledge.hybrid_retriever import HybridRetriever
             self.knowledge_base = ExternalKnowledgeBase(load_from_file=False) if use_vector_store else None
+            self.retriever = HybridRetriever(self.knowledge_base) if self.knowledge_base else None
         except ImportError:
             # Fallback to internal knowledge base
             self.knowledge_base = self.HumanRightsKnowledgeBase() if use_vector_store else None
+            self.retriever = None
+        
+        # Repeated questions are answered from the cache until the knowledge base changes
+        self.query_cache = QueryCache(
+            cache_service,
+            version=lambda: getattr(self.knowledge_base, "version", "static"),
+            embed_query=self.retriever.embed_query if self.retriever else None,
+            semantic_threshold=semantic_cache_threshold
+        )
         
         # Initialize AI models
         self.llm = self._initialize_llm()
@@ -1044,14 +1102,25 @@ Provide a clear, educational explanation.
         return assessment.to_dict()
     
     async def explain_concept(self, concept: str, user_level: str = "beginner") -> str:
-        """Explain a human rights or DRP concept."""
+        """Explain a human rights or DRP concept (cached per normalized concept and level)."""
+        result, _ = await self.query_cache.get_or_compute(
+            "explain", concept,
+            lambda: self._explain_concept(concept, user_level),
+            context={"provider": self.provider},
+            user_level=user_level,
+            ttl=lambda result: EXPLANATION_TTL if result["generated"] else FALLBACK_EXPLANATION_TTL
+        )
+        return result["explanation"]
+    
+    async def _explain_concept(self, concept: str, user_level: str) -> Dict[str, Any]:
+        """Explanation of a concept, and whether the LLM generated it."""
         if self.explanation_chain:
             try:
                 result = await self.explanation_chain.ainvoke({
                     "concept": concept,
                     "user_level": user_level
                 })
-                return result
+                return {"explanation": result, "generated": True}
             except Exception as e:
                 logger.error(f"Error explaining concept: {e}")
         
@@ -1078,16 +1147,41 @@ Provide a clear, educational explanation.
         concept_lower = concept.lower()
         for key, levels in explanations.items():
             if key in concept_lower:
-                return levels.get(user_level, levels["beginner"])
+                return {"explanation": levels.get(user_level, levels["beginner"]), "generated": False}
         
-        return f"I can provide an explanation of {concept} at the {user_level} level. This is a concept related to human rights, blockchain, or the Decentralized Rights Protocol."
+        return {
+            "explanation": f"I can provide an explanation of {concept} at the {user_level} level. This is a concept related to human rights, blockchain, or the Decentralized Rights Protocol.",
+            "generated": False
+        }
+    
+    async def query_knowledge(self, query: str, context: Optional[Dict] = None, k: int = 5) -> Dict[str, Any]:
+        """Query the human rights knowledge base (cached per normalized query, context and k)."""
+        result, _ = await self.query_cache.get_or_compute(
+            "query", query,
+            lambda: self._query_knowledge(query, context, k),
+            context={"context": context, "k": k}
+        )
+        # A cached result may have been asked with other casing or spacing
+        return {**result, "query": query}
     
-    async def query_knowledge(self, query: str, context: Optional[Dict] = None) -> Dict[str, Any]:
-        """Query the human rights knowledge base."""
+    async def _query_knowledge(self, query: str, context: Optional[Dict], k: int) -> Dict[str, Any]:
+        """
+        Query the human rights knowledge base.
+        
+        BM25 and semantic search run concurrently and are fused by the hybrid retriever.
+        The context may narrow the search with a "category" and "tags".
+        """
+        context = context or {}
+        tags = context.get("tags")
+        if isinstance(tags, str):
+            tags = [tags]
+        
         # Search knowledge base
         results = []
-        if self.knowledge_base:
-            results = self.knowledge_base.search_knowledge(query, k=5)
+        if self.retriever:
+            results = await self.retriever.asearch(query, k=k, category=context.get("category"), tags=tags)
+        elif self.knowledge_base:
+            results = self.knowledge_base.search_knowledge(query, k=k)
         
         # Format results
         formatted_results = []
@@ -1097,7 +1191,7 @@ Provide a clear, educational explanation.
                     "content": result.get("content", ""),
                     "source": result.get("metadata", {}).get("source", "Unknown"),
                     "title": result.get("metadata", {}).get("title", "Untitled"),
-                    "relevance": result.get("relevance", 0.8)
+                    "relevance": result.get("relevance", 0.0)
                 })
         
         return {
@@ -1122,6 +1216,7 @@ Provide a clear, educational explanation.
             "provider": self.provider,
             "langchain_available": LANGCHAIN_AVAILABLE,
             "knowledge_base_available": self.knowledge_base is not None,
+            "query_cache": self.query_cache.stats(),
             "capabilities": capabilities,
             "timestamp": datetime.utcnow().isoformat()
         }
@@ -0,0 +1,251 @@
+"""
+Explorer Stats Service - Precomputed explorer statistics.
+
+Counters are updated as the ChainFollower ingests blocks, so serving /explorer/stats
+costs no database work:
+
+- block and transaction totals are plain counters
+- unique addresses are estimated with a HyperLogLog sketch (about 0.8% error),
+  seeded once with every address already in the index so that returning
+  addresses are not counted as new
+- TPS and blocks per minute come from a rolling window over block timestamps
+
+A background job periodically replaces the counters with exact counts from the
+chain index, which also corrects drift after reorgs. The process running the
+follower publishes snapshots to the cache; other workers serve the cached snapshot.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .cache_service import CacheService
+from .chain_index_service import ChainIndexService
+
+logger = logging.getLogger(__name__)
+
+STATS_CACHE_KEY = "explorer:stats"
+# Seconds between snapshot publications when no blocks arrive
+PUBLISH_INTERVAL = 30
+# Recent blocks read from the index to fill the rolling window on startup
+WINDOW_SEED_BLOCKS = 1000
+# Addresses read from the index per query when seeding the sketch
+ADDRESS_SEED_PAGE = 10000
+
+
+class HyperLogLog:
+    """Fixed-memory distinct-count sketch (Flajolet et al. with small-range correction)."""
+
+    def __init__(self, precision: int = 14):
+        """
+        Initialize sketch.
+
+        Args:
+            precision: log2 of the register count (4-18); error is about 1.04 / sqrt(2 ** precision)
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+        self._estimate: Optional[int] = 0
+
+    def add(self, value: str):
+        h = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+        index = h >> (64 - self.precision)
+        width = 64 - self.precision
+        rank = width - (h & ((1 << width) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            self._estimate = None
+
+    def count(self) -> int:
+        """Estimated number of distinct values added (cached until a register changes)."""
+        if self._estimate is None:
+            m = len(self.registers)
+            alpha = 0.7213 / (1 + 1.079 / m)
+            estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+            zeros = self.registers.count(0)
+            if estimate <= 2.5 * m and zeros:
+                estimate = m * math.log(m / zeros)
+            self._estimate = round(estimate)
+        return self._estimate
+
+
+class ExplorerStatsService:
+    """Incremental explorer statistics fed by the chain follower."""
+
+    def __init__(
+        self,
+        chain_index: ChainIndexService,
+        cache_service: Optional[CacheService] = None,
+        window_seconds: int = 300,
+        reconcile_interval: int = 300,
+        precision: int = 14
+    ):
+        """
+        Initialize explorer stats service.
+
+        Args:
+            chain_index: Source of exact counts for reconciliation
+            cache_service: Where snapshots are shared with other workers
+            window_seconds: Span of the TPS / blocks-per-minute window (chain time)
+            reconcile_interval: Seconds between exact recounts
+            precision: HyperLogLog precision for unique addresses
+        """
+        self.chain_index = chain_index
+        self.cache_service = cache_service
+        self.window_seconds = window_seconds
+        self.reconcile_interval = reconcile_interval
+
+        self.total_blocks = 0
+        self.total_transactions = 0
+        self.latest_block: Optional[int] = None
+        self.addresses = HyperLogLog(precision)
+        self._addresses_seeded = False
+        # Exact unique addresses at the last reconcile, and the sketch estimate at that moment
+        self._exact_addresses = 0
+        self._addresses_at_reconcile = 0
+        self.reconciled_at: Optional[str] = None
+
+        # (block timestamp, transaction count) for blocks inside the window
+        self._window: Deque[Tuple[float, int]] = deque()
+        self._window_transactions = 0
+
+        self._reconcile_requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    # Updates
+
+    def _add_to_window(self, timestamp: float, transaction_count: int):
+        self._window.append((timestamp, transaction_count))
+        self._window_transactions += transaction_count
+        horizon = timestamp - self.window_seconds
+        while self._window and self._window[0][0] <= horizon:
+            _, count = self._window.popleft()
+            self._window_transactions -= count
+
+    def record_blocks(self, blocks: List[Dict[str, Any]]):
+        """Count newly ingested blocks (normalized, as passed to ChainIndexService.ingest_blocks)."""
+        for block in blocks:
+            transactions = block.get("transactions", [])
+            self.total_blocks += 1
+            self.total_transactions += len(transactions)
+            self.latest_block = max(self.latest_block or 0, block["block_number"])
+            for tx in transactions:
+                self.addresses.add(tx["from_address"].lower())
+                if tx.get("to_address"):
+                    self.addresses.add(tx["to_address"].lower())
+            self._add_to_window(block["timestamp"].timestamp(), len(transactions))
+
+    def request_reconcile(self):
+        """Recount soon (e.g. after a reorg removed counted blocks)."""
+        self._reconcile_requested.set()
+
+    async def _seed_addresses(self):
+        """Add every address already in the index to the sketch."""
+        after = None
+        while True:
+            page = await self.chain_index.get_addresses(after=after, limit=ADDRESS_SEED_PAGE)
+            for address in page:
+                self.addresses.add(address)
+            if len(page) < ADDRESS_SEED_PAGE:
+                return
+            after = page[-1]
+
+    async def reconcile(self):
+        """Replace the counters with exact counts from the chain index."""
+        if not self._addresses_seeded:
+            # Afterwards record_blocks sees every address the index gains
+            await self._seed_addresses()
+            self._addresses_seeded = True
+        exact = await self.chain_index.get_stats()
+        self.total_blocks = exact["total_blocks"]
+        self.total_transactions = exact["total_transactions"]
+        self.latest_block = exact["latest_block"]
+        self._exact_addresses = exact["total_addresses"]
+        self._addresses_at_reconcile = self.addresses.count()
+        self.reconciled_at = datetime.utcnow().isoformat()
+
+        if not self._window:
+            blocks = await self.chain_index.get_blocks(limit=WINDOW_SEED_BLOCKS)
+            for block in reversed(blocks):
+                self._add_to_window(
+                    datetime.fromisoformat(block["timestamp"]).timestamp(), block["transaction_count"]
+                )
+        logger.info(f"Explorer stats reconciled at block {self.latest_block}")
+
+    # Reads
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current statistics; O(1) apart from a cached sketch estimate."""
+        # New addresses since the last exact count, as estimated by the sketch
+        new_addresses = max(0, self.addresses.count() - self._addresses_at_reconcile)
+        return {
+            "total_transactions": self.total_transactions,
+            "total_blocks": self.total_blocks,
+            "total_addresses": self._exact_addresses + new_addresses,
+            "latest_block": self.latest_block,
+            "tps": round(self._window_transactions / self.window_seconds, 3),
+            "blocks_per_minute": round(len(self._window) * 60 / self.window_seconds, 3),
+            "network_hashrate": 0,
+            "reconciled_at": self.reconciled_at,
+        }
+
+    async def publish(self):
+        """Share the current snapshot with workers that do not run the follower."""
+        if self.cache_service is not None:
+            await self.cache_service.set(STATS_CACHE_KEY, self.snapshot(), ttl=PUBLISH_INTERVAL * 3)
+
+    async def get_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Latest statistics: the local counters in the process that maintains them,
+        the published snapshot elsewhere (None if none is available).
+        """
+        if self._task is not None:
+            return self.snapshot()
+        if self.cache_service is None:
+            return None
+        return await self.cache_service.get(STATS_CACHE_KEY)
+
+    # Background job
+
+    async def _run(self):
+        last_reconcile = time.monotonic()
+        while True:
+            try:
+                await asyncio.wait_for(self._reconcile_requested.wait(), timeout=PUBLISH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                if self._reconcile_requested.is_set() or time.monotonic() - last_reconcile >= self.reconcile_interval:
+                    self._reconcile_requested.clear()
+                    await self.reconcile()
+                    last_reconcile = time.monotonic()
+                await self.publish()
+            except Exception as e:
+                logger.error(f"Error updating explorer stats: {e}")
+
+    async def start(self):
+        """Count the index once, then keep reconciling and publishing in the background."""
+        if self._task is not None:
+            return
+        await self.reconcile()
+        await self.publish()
+        self._task = asyncio.create_task(self._run())
+        logger.info("ExplorerStatsService started")
+
+    async def stop(self):
+        """Stop the background job."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -0,0 +1,307 @@
+"""
+Live Feed Service - Pub/sub hub fanning out live events to WebSocket/SSE clients.
+
+Publishers send each event to one Redis channel. Every worker holds a single
+subscription to that channel and broadcasts what arrives to its own connected
+clients, so upstream load does not grow with the number of clients. Without Redis,
+events reach the clients of the publishing worker only.
+
+Each client has a bounded send buffer. When a client cannot keep up, the slow
+consumer policy either drops its oldest buffered events (the client then receives
+a `dropped` notice telling it how many it missed) or disconnects it. Idle clients
+get a `heartbeat` message from one hub-wide timer rather than a timer per client.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Pub/sub channel carrying live events between workers
+LIVE_CHANNEL = "drp:live"
+
+# Topics clients can subscribe to; "notifications" is per user ("notifications:<address>")
+TOPICS = ("blocks", "transactions", "submissions", "governance", "notifications")
+
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "disconnect")
+
+# Events sent per Redis pipeline (one round trip) by publish_many
+PUBLISH_BATCH_SIZE = 500
+
+# (topic, JSON-encoded event); events are encoded once, not per client
+Message = Tuple[str, str]
+
+HEARTBEAT: Message = ("heartbeat", "")
+
+
+class SubscriptionClosed(Exception):
+    """Raised by Subscription.next() once the hub has closed the subscription."""
+
+
+def validate_topic(topic: str) -> str:
+    """Check a topic name and return it in the form events are published under."""
+    base, _, scope = topic.partition(":")
+    if base not in TOPICS or (base == "notifications") != bool(scope):
+        raise ValueError(f"Unknown topic: {topic}")
+    if base == "notifications":
+        # Notifications are published to the lowercased address
+        return f"{base}:{scope.lower()}"
+    return topic
+
+
+class Subscription:
+    """One client's bounded buffer of messages for its topics."""
+
+    def __init__(self, topics: Set[str], buffer_size: int):
+        self.topics = topics
+        self.buffer_size = buffer_size
+        self.dropped = 0
+        self.close_reason: Optional[str] = None
+        self._buffer: Deque[Message] = deque()
+        self._ready = asyncio.Event()
+        self._unreported_drops = 0
+        self._heartbeat_due = False
+        self.last_active = time.monotonic()
+
+    @property
+    def closed(self) -> bool:
+        return self.close_reason is not None
+
+    def offer(self, message: Message, policy: str) -> bool:
+        """Buffer a message; False if the client is too slow and must be disconnected."""
+        if len(self._buffer) >= self.buffer_size:
+            if policy == "disconnect":
+                return False
+            self._buffer.popleft()
+            self.dropped += 1
+            self._unreported_drops += 1
+        self._buffer.append(message)
+        self._ready.set()
+        return True
+
+    def close(self, reason: str):
+        if self.close_reason is None:
+            self.close_reason = reason
+            self._ready.set()
+
+    def heartbeat(self):
+        """Wake an idle client with a HEARTBEAT message (keeps proxies from timing out)."""
+        self._heartbeat_due = True
+        self._ready.set()
+
+    async def next_batch(self, limit: int = 64) -> List[Message]:
+        """
+        Wait for messages and return up to `limit` of them, oldest first.
+
+        After events were dropped, a ("dropped", '{"count": n}') message comes first
+        so the client knows to resync. A client with nothing to receive gets
+        [HEARTBEAT] when the hub's heartbeat finds it idle.
+
+        Raises:
+            SubscriptionClosed: The hub closed the subscription
+        """
+        while not self._buffer:
+            if self.closed:
+                raise SubscriptionClosed(self.close_reason)
+            if self._heartbeat_due:
+                self._heartbeat_due = False
+                self.last_active = time.monotonic()
+                return [HEARTBEAT]
+            self._ready.clear()
+            await self._ready.wait()
+        self._heartbeat_due = False
+        self.last_active = time.monotonic()
+        messages = []
+        if self._unreported_drops:
+            messages.append(("dropped", json.dumps({"count": self._unreported_drops})))
+            self._unreported_drops = 0
+        while self._buffer and len(messages) < limit:
+            messages.append(self._buffer.popleft())
+        return messages
+
+    async def next(self) -> Message:
+        """Wait for the next message (see next_batch)."""
+        return (await self.next_batch(limit=1))[0]
+
+
+class LiveFeedService:
+    """Broadcasts published events to subscribed clients."""
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        buffer_size: int = 256,
+        slow_consumer_policy: str = "drop_oldest",
+        retry_interval: float = 5.0,
+        heartbeat_interval: float = 15.0
+    ):
+        """
+        Initialize live feed service.
+
+        Args:
+            redis_client: redis.asyncio client carrying events between workers
+                (events stay in this worker if None)
+            buffer_size: Messages buffered per client before the slow consumer policy applies
+            slow_consumer_policy: 'drop_oldest' or 'disconnect'
+            retry_interval: Seconds before resubscribing after a Redis error
+            heartbeat_interval: Seconds a client may be idle before it gets a heartbeat
+        """
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {slow_consumer_policy}")
+        self.redis_client = redis_client
+        self.buffer_size = buffer_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.retry_interval = retry_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._heartbeats: Optional[asyncio.Task] = None
+
+        # Counters read by the metrics endpoint
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.disconnected = 0
+        logger.info("LiveFeedService initialized" + (" with Redis" if redis_client else ""))
+
+    @property
+    def connections(self) -> int:
+        return len({sub for subs in self._subscribers.values() for sub in subs})
+
+    def subscribe(self, topics: Iterable[str], buffer_size: Optional[int] = None) -> Subscription:
+        """
+        Register a client for the given topics.
+
+        Raises:
+            ValueError: An unknown topic was requested
+        """
+        topics = {validate_topic(topic) for topic in topics}
+        if not topics:
+            raise ValueError("At least one topic is required")
+        subscription = Subscription(topics, buffer_size or self.buffer_size)
+        for topic in topics:
+            self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription, reason: str = "unsubscribed"):
+        for topic in subscription.topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[topic]
+        subscription.close(reason)
+
+    def dispatch(self, topic: str, data: str):
+        """Deliver an encoded event to this worker's subscribers of `topic`."""
+        for subscription in list(self._subscribers.get(topic, ())):
+            dropped = subscription.dropped
+            if subscription.offer((topic, data), self.slow_consumer_policy):
+                self.delivered += 1
+                self.dropped += subscription.dropped - dropped
+            else:
+                self.disconnected += 1
+                self.unsubscribe(subscription, "slow consumer")
+
+    async def publish(self, topic: str, event: Dict[str, Any]):
+        """
+        Publish an event to every worker's subscribers of `topic`.
+
+        Never raises: a live feed failure must not fail the request that caused it.
+        """
+        try:
+            data = json.dumps(event, default=str)
+            self.published += 1
+            if self._listener is not None:
+                try:
+                    await self.redis_client.publish(LIVE_CHANNEL, f"{topic}|{data}")
+                    return
+                except Exception as e:
+                    logger.warning(f"Error publishing live event, delivering locally: {e}")
+            self.dispatch(topic, data)
+        except Exception as e:
+            logger.error(f"Error publishing live event: {e}")
+
+    async def publish_many(self, events: Iterable[Tuple[str, Dict[str, Any]]]):
+        """
+        Publish many (topic, event) pairs, e.g. one notification per recipient.
+
+        With Redis, events are sent in pipelines of PUBLISH_BATCH_SIZE, one round trip
+        each, rather than one round trip per event. Never raises.
+        """
+        try:
+            messages = [(topic, json.dumps(event, default=str)) for topic, event in events]
+            self.published += len(messages)
+            for i in range(0, len(messages), PUBLISH_BATCH_SIZE):
+                chunk = messages[i:i + PUBLISH_BATCH_SIZE]
+                if self._listener is not None:
+                    try:
+                        async with self.redis_client.pipeline(transaction=False) as pipe:
+                            for topic, data in chunk:
+                                pipe.publish(LIVE_CHANNEL, f"{topic}|{data}")
+                            await pipe.execute()
+                        continue
+                    except Exception as e:
+                        logger.warning(f"Error publishing live events, delivering locally: {e}")
+                for topic, data in chunk:
+                    self.dispatch(topic, data)
+        except Exception as e:
+            logger.error(f"Error publishing live events: {e}")
+
+    async def start(self):
+        """Start heartbeats and subscribe to the shared channel (if Redis is configured)."""
+        if self._heartbeats is None:
+            self._heartbeats = asyncio.create_task(self._send_heartbeats())
+        if self._listener is None and self.redis_client is not None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _send_heartbeats(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            idle_since = time.monotonic() - self.heartbeat_interval
+            for subscription in {sub for subs in self._subscribers.values() for sub in subs}:
+                if subscription.last_active <= idle_since:
+                    subscription.heartbeat()
+
+    async def _listen(self):
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(LIVE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    topic, payload = data.split("|", 1)
+                    self.dispatch(topic, payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Live feed listener disconnected: {e}")
+                await asyncio.sleep(self.retry_interval)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def close(self):
+        """Stop listening and disconnect every client."""
+        for task in (self._listener, self._heartbeats):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._listener = None
+        self._heartbeats = None
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                self.unsubscribe(subscription, "server shutdown")
@@ -0,0 +1,272 @@
+"""
+Metrics Service - Prometheus metrics for requests, upstream services, caching and live feeds.
+"""
+
+import time
+import logging
+import functools
+import inspect
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import (
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        CONTENT_TYPE_LATEST,
+    )
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+    logger.warning("prometheus_client not available, metrics disabled")
+
+# Latency buckets (seconds) covering cache hits through slow LLM calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _CacheStatsCollector:
+    """Reads CacheService counters at scrape time, so cache lookups pay nothing extra."""
+
+    def __init__(self):
+        self.cache_service = None
+
+    def collect(self):
+        cache = self.cache_service
+        if cache is None:
+            return
+        requests = CounterMetricFamily(
+            "drp_cache_requests", "Cache lookups by result", labels=["result"]
+        )
+        requests.add_metric(["hit"], cache.hits)
+        requests.add_metric(["miss"], cache.misses)
+        yield requests
+        total = cache.hits + cache.misses
+        yield GaugeMetricFamily(
+            "drp_cache_hit_ratio", "Cache hit ratio since startup", value=cache.hits / total if total else 0.0
+        )
+        if not hasattr(cache, "stats"):
+            return
+        stats = cache.stats()
+        tier_requests = CounterMetricFamily(
+            "drp_cache_tier_requests", "Cache lookups by tier and result", labels=["tier", "result"]
+        )
+        tier_ratio = GaugeMetricFamily(
+            "drp_cache_tier_hit_ratio", "Cache hit ratio by tier", labels=["tier"]
+        )
+        for tier in ("local", "redis"):
+            tier_requests.add_metric([tier, "hit"], stats[tier]["hits"])
+            tier_requests.add_metric([tier, "miss"], stats[tier]["misses"])
+            tier_ratio.add_metric([tier], stats[tier]["hit_rate"])
+        yield tier_requests
+        yield tier_ratio
+        yield CounterMetricFamily(
+            "drp_cache_local_evictions", "Entries evicted from the in-process tier", value=stats["local"]["evictions"]
+        )
+        yield GaugeMetricFamily(
+            "drp_cache_local_entries", "Entries in the in-process tier", value=stats["local"]["entries"]
+        )
+        yield GaugeMetricFamily(
+            "drp_cache_local_bytes", "Encoded size of the in-process tier", value=stats["local"]["bytes"]
+        )
+        yield CounterMetricFamily(
+            "drp_cache_redis_errors", "Failed Redis cache operations", value=stats["redis"]["errors"]
+        )
+
+
+class _LiveFeedCollector:
+    """Reads LiveFeedService counters at scrape time."""
+
+    def __init__(self):
+        self.live_feed = None
+
+    def collect(self):
+        live_feed = self.live_feed
+        if live_feed is None:
+            return
+        yield GaugeMetricFamily(
+            "drp_live_connections", "Clients subscribed to the live feed", value=live_feed.connections
+        )
+        events = CounterMetricFamily(
+            "drp_live_events", "Live feed events by outcome", labels=["outcome"]
+        )
+        events.add_metric(["published"], live_feed.published)
+        events.add_metric(["delivered"], live_feed.delivered)
+        events.add_metric(["dropped"], live_feed.dropped)
+        yield events
+        yield CounterMetricFamily(
+            "drp_live_slow_consumer_disconnects", "Clients disconnected for falling behind",
+            value=live_feed.disconnected
+        )
+
+
+class MetricsService:
+    """Service collecting Prometheus metrics for the API."""
+
+    def __init__(self, registry: Optional["CollectorRegistry"] = None):
+        """
+        Initialize metrics service.
+
+        Args:
+            registry: Prometheus registry to use (a private one by default)
+        """
+        self.enabled = PROMETHEUS_AVAILABLE
+        if not self.enabled:
+            logger.info("MetricsService initialized without prometheus_client (metrics disabled)")
+            return
+
+        self.registry = registry or CollectorRegistry()
+        self.requests_total = Counter(
+            "drp_http_requests", "HTTP requests by route and status",
+            ["method", "route", "status"], registry=self.registry
+        )
+        self.request_duration = Histogram(
+            "drp_http_request_duration_seconds", "HTTP request latency by route",
+            ["method", "route"], buckets=LATENCY_BUCKETS, registry=self.registry
+        )
+        self.requests_in_flight = Gauge(
+            "drp_http_requests_in_flight", "HTTP requests currently being served", registry=self.registry
+        )
+        self.upstream_duration = Histogram(
+            "drp_upstream_call_duration_seconds", "Latency of calls into backing services",
+            ["service", "method"], buckets=LATENCY_BUCKETS, registry=self.registry
+        )
+        self.upstream_errors = Counter(
+            "drp_upstream_call_errors", "Failed calls into backing services",
+            ["service", "method"], registry=self.registry
+        )
+        self._cache_collector = _CacheStatsCollector()
+        self.registry.register(self._cache_collector)
+        self._live_feed_collector = _LiveFeedCollector()
+        self.registry.register(self._live_feed_collector)
+
+        # Labelled children are resolved once per label set, then reused
+        self._request_children: Dict[Tuple[str, str], Any] = {}
+        self._status_children: Dict[Tuple[str, str, int], Any] = {}
+        logger.info("MetricsService initialized")
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        """Record one finished HTTP request."""
+        key = (method, route)
+        histogram = self._request_children.get(key)
+        if histogram is None:
+            histogram = self._request_children[key] = self.request_duration.labels(method, route)
+        histogram.observe(seconds)
+
+        status_key = (method, route, status)
+        counter = self._status_children.get(status_key)
+        if counter is None:
+            counter = self._status_children[status_key] = self.requests_total.labels(method, route, str(status))
+        counter.inc()
+
+    def instrument(self, service: Any, name: str):
+        """
+        Time every public coroutine method of a service instance.
+
+        Args:
+            service: Service instance (BlockchainService, AIService, ...)
+            name: Value of the `service` label
+        """
+        if not self.enabled or service is None:
+            return
+        for attr in dir(type(service)):
+            if attr.startswith("_") or attr == "close":
+                continue
+            method = getattr(service, attr, None)
+            if not inspect.iscoroutinefunction(method) or getattr(method, "_drp_instrumented", False):
+                continue
+            setattr(service, attr, self._wrap(method, name, attr))
+
+    def _wrap(self, method, service_name: str, method_name: str):
+        histogram = self.upstream_duration.labels(service_name, method_name)
+        errors = self.upstream_errors.labels(service_name, method_name)
+
+        @functools.wraps(method)
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        timed._drp_instrumented = True
+        return timed
+
+    def track_cache(self, cache_service: Any):
+        """Expose a CacheService's hit/miss counters."""
+        if self.enabled:
+            self._cache_collector.cache_service = cache_service
+
+    def track_live_feed(self, live_feed: Any):
+        """Expose a LiveFeedService's connection and event counters."""
+        if self.enabled:
+            self._live_feed_collector.live_feed = live_feed
+
+    def render(self) -> bytes:
+        """Metrics in Prometheus text exposition format."""
+        if not self.enabled:
+            return b"# prometheus_client not installed\n"
+        return generate_latest(self.registry)
+
+
+def route_label(scope) -> str:
+    """Path template of the matched route, e.g. /api/v1/tokens/balance/{address}."""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    # Routes from included routers may only carry their own suffix; restore the prefix
+    # from the request path, which has the same number of segments
+    suffix_segments = template.count("/")
+    path_segments = scope["path"].rstrip("/").split("/")
+    if len(path_segments) - 1 > suffix_segments:
+        return "/".join(path_segments[:len(path_segments) - suffix_segments]) + template
+    return template
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route request count, latency and in-flight requests.
+
+    Routes are labelled by their path template (e.g. /api/v1/tokens/balance/{address})
+    so label cardinality stays bounded.
+    """
+
+    def __init__(self, app, metrics: MetricsService):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = self.metrics.requests_in_flight
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            self.metrics.observe_request(
+                scope["method"],
+                route_label(scope),
+                status_code,
+                time.perf_counter() - started
+            )
@@ -0,0 +1,490 @@
+"""
+Notification Service - Stored notifications with batched fan-out and live pushes.
+
+Notifications are rows indexed by (user_address, created_at), so a user's feed is an
+index range scan. Unread and total counts live in a per-user counter row that is
+updated in the same transaction as the notifications, never recomputed.
+
+Writes go through a bounded queue drained by one writer task: each flush expands
+the queued events to their recipients, drops the ones whose NotificationSettings
+opt out, inserts all rows in one transaction and then pushes them to connected
+clients in pipelined batches. When the writer falls behind, the queue fills and
+producers wait, which keeps a protocol-wide event from overwhelming the database.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    and_,
+    create_engine,
+    delete,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from .live_feed_service import LiveFeedService
+
+logger = logging.getLogger(__name__)
+
+Base = declarative_base()
+
+# Settings flag that controls each notification type (types not listed are always delivered)
+TYPE_SETTINGS = {
+    "activity_verified": "activity_notifications",
+    "activity_rejected": "activity_notifications",
+    "reward_received": "activity_notifications",
+    "proposal_created": "governance_notifications",
+    "proposal_passed": "governance_notifications",
+    "proposal_rejected": "governance_notifications",
+    "vote_required": "governance_notifications",
+}
+
+DEFAULT_SETTINGS = {
+    "email_enabled": True,
+    "push_enabled": True,
+    "activity_notifications": True,
+    "governance_notifications": True,
+}
+
+# Recipients per settings lookup / users per broadcast page
+RECIPIENT_CHUNK_SIZE = 500
+
+
+class NotificationRecord(Base):
+    __tablename__ = "notifications"
+
+    notification_id = Column(String(36), primary_key=True)
+    user_address = Column(String(64), nullable=False)
+    type = Column(String(64), nullable=False)
+    title = Column(String(256), nullable=False)
+    message = Column(String(2000), nullable=False)
+    read = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, nullable=False)
+    extra = Column("metadata", JSON, nullable=True)
+
+    __table_args__ = (
+        # Feed order, also the keyset for pagination
+        Index("ix_notifications_user_created", "user_address", "created_at", "notification_id"),
+        Index("ix_notifications_user_unread", "user_address", "read", "created_at"),
+    )
+
+
+class NotificationCounter(Base):
+    __tablename__ = "notification_counters"
+
+    user_address = Column(String(64), primary_key=True)
+    unread = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+
+
+class NotificationPreferences(Base):
+    __tablename__ = "notification_settings"
+
+    user_address = Column(String(64), primary_key=True)
+    email_enabled = Column(Boolean, nullable=False, default=True)
+    push_enabled = Column(Boolean, nullable=False, default=True)
+    activity_notifications = Column(Boolean, nullable=False, default=True)
+    governance_notifications = Column(Boolean, nullable=False, default=True)
+
+
+def _notification_dict(record: NotificationRecord) -> Dict[str, Any]:
+    return {
+        "notification_id": record.notification_id,
+        "user_address": record.user_address,
+        "type": record.type,
+        "title": record.title,
+        "message": record.message,
+        "read": record.read,
+        "timestamp": record.created_at.isoformat(),
+        "metadata": record.extra,
+    }
+
+
+def _settings_dict(preferences: Optional[NotificationPreferences]) -> Dict[str, bool]:
+    if preferences is None:
+        return dict(DEFAULT_SETTINGS)
+    return {name: getattr(preferences, name) for name in DEFAULT_SETTINGS}
+
+
+class NotificationService:
+    """Service for storing, counting and delivering user notifications."""
+
+    def __init__(
+        self,
+        database_url: str = "sqlite:///./drp.db",
+        live_feed: Optional[LiveFeedService] = None,
+        batch_size: int = 1000,
+        queue_size: int = 100
+    ):
+        """
+        Initialize notification service.
+
+        Args:
+            database_url: SQLAlchemy database URL (SQLite or Postgres)
+            live_feed: Hub that new notifications are pushed through
+            batch_size: Notification rows written per transaction
+            queue_size: Queued events before producers wait for the writer
+        """
+        connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+        self.engine = create_engine(database_url, connect_args=connect_args, pool_pre_ping=True)
+        self.SessionLocal = sessionmaker(bind=self.engine, expire_on_commit=False)
+        Base.metadata.create_all(self.engine)
+        self.live_feed = live_feed
+        self.batch_size = batch_size
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._writer: Optional[asyncio.Task] = None
+        logger.info("NotificationService initialized")
+
+    # Fan-out writes
+
+    def _increment_counters(self, session, counts: Dict[str, int]):
+        """Add `counts` new unread notifications per user."""
+        rows = [{"user_address": user, "unread": n, "total": n} for user, n in counts.items()]
+        dialect = session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(NotificationCounter)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_address"],
+                set_={
+                    "unread": NotificationCounter.unread + stmt.excluded.unread,
+                    "total": NotificationCounter.total + stmt.excluded.total,
+                }
+            )
+            session.execute(stmt, rows)
+            return
+        for row in rows:
+            counter = session.get(NotificationCounter, row["user_address"])
+            if counter is None:
+                session.add(NotificationCounter(**row))
+            else:
+                counter.unread += row["unread"]
+                counter.total += row["total"]
+
+    def _write(self, events: List[Tuple[List[str], Dict[str, Any]]]) -> List[Tuple[Dict[str, Any], bool]]:
+        """
+        Store queued events for their recipients in one transaction.
+
+        Returns:
+            (notification, push_enabled) for every row written
+        """
+        recipients = {user for users, _ in events for user in users}
+        now = datetime.utcnow()
+        with self.SessionLocal() as session:
+            preferences = {}
+            users = list(recipients)
+            for i in range(0, len(users), RECIPIENT_CHUNK_SIZE):
+                chunk = users[i:i + RECIPIENT_CHUNK_SIZE]
+                for row in session.scalars(
+                    select(NotificationPreferences).where(NotificationPreferences.user_address.in_(chunk))
+                ):
+                    preferences[row.user_address] = _settings_dict(row)
+
+            rows = []
+            pushes = []
+            counts: Dict[str, int] = {}
+            for users, event in events:
+                flag = TYPE_SETTINGS.get(event["type"])
+                for user in users:
+                    settings = preferences.get(user, DEFAULT_SETTINGS)
+                    if flag and not settings[flag]:
+                        continue
+                    notification = {
+                        "notification_id": str(uuid4()),
+                        "user_address": user,
+                        "type": event["type"],
+                        "title": event["title"],
+                        "message": event["message"],
+                        "read": False,
+                        "metadata": event["metadata"],
+                    }
+                    rows.append({**notification, "created_at": now})
+                    counts[user] = counts.get(user, 0) + 1
+                    pushes.append(({**notification, "timestamp": now.isoformat()}, settings["push_enabled"]))
+
+            # Core insert: keys are column names, so "metadata" maps to NotificationRecord.extra
+            table = NotificationRecord.__table__
+            for i in range(0, len(rows), self.batch_size):
+                session.execute(table.insert(), rows[i:i + self.batch_size])
+            if counts:
+                self._increment_counters(session, counts)
+            session.commit()
+        return pushes
+
+    async def _deliver(self, events: List[Tuple[List[str], Dict[str, Any]]]) -> int:
+        pushes = await asyncio.to_thread(self._write, events)
+        if self.live_feed is not None:
+            # Pipelined: a broadcast to many users costs a few round trips, not one per user
+            await self.live_feed.publish_many(
+                (f"notifications:{notification['user_address']}", notification)
+                for notification, push_enabled in pushes
+                if push_enabled
+            )
+        return len(pushes)
+
+    async def notify_many(
+        self,
+        user_addresses: Iterable[str],
+        type: str,
+        title: str,
+        message: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Queue one notification for many users (e.g. a protocol-wide event).
+
+        Waits while the write queue is full. Recipients whose settings disable this
+        type of notification are skipped when the batch is written.
+        """
+        users = sorted({address.lower() for address in user_addresses})
+        event = {"type": type, "title": title, "message": message, "metadata": metadata}
+        for i in range(0, len(users), self.batch_size):
+            job = (users[i:i + self.batch_size], event)
+            if self._writer is None:
+                await self._deliver([job])
+            else:
+                await self._queue.put(job)
+
+    async def notify(
+        self,
+        user_address: str,
+        type: str,
+        title: str,
+        message: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Queue a notification for one user."""
+        await self.notify_many([user_address], type, title, message, metadata)
+
+    def _known_users(self, flag: Optional[str], after: Optional[str]) -> List[str]:
+        """A page of users who ever received a notification and have not disabled `flag`."""
+        query = (
+            select(NotificationCounter.user_address)
+            .outerjoin(NotificationPreferences, NotificationPreferences.user_address == NotificationCounter.user_address)
+            .order_by(NotificationCounter.user_address)
+            .limit(RECIPIENT_CHUNK_SIZE)
+        )
+        if flag:
+            column = getattr(NotificationPreferences, flag)
+            query = query.where(or_(NotificationPreferences.user_address.is_(None), column.is_(True)))
+        if after is not None:
+            query = query.where(NotificationCounter.user_address > after)
+        with self.SessionLocal() as session:
+            return list(session.scalars(query))
+
+    async def broadcast(
+        self,
+        type: str,
+        title: str,
+        message: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        Queue a notification for every known user who has not opted out of its type.
+
+        Returns:
+            Number of recipients queued
+        """
+        flag = TYPE_SETTINGS.get(type)
+        queued = 0
+        after = None
+        while True:
+            users = await asyncio.to_thread(self._known_users, flag, after)
+            if not users:
+                return queued
+            await self.notify_many(users, type, title, message, metadata)
+            queued += len(users)
+            after = users[-1]
+
+    async def _run_writer(self):
+        while True:
+            jobs = [await self._queue.get()]
+            rows = len(jobs[0][0])
+            # Coalesce whatever else is waiting into the same transaction
+            while rows < self.batch_size and not self._queue.empty():
+                job = self._queue.get_nowait()
+                jobs.append(job)
+                rows += len(job[0])
+            try:
+                await self._deliver(jobs)
+            except Exception as e:
+                logger.error(f"Error writing {rows} notifications: {e}")
+            finally:
+                for _ in jobs:
+                    self._queue.task_done()
+
+    async def start(self):
+        """Start the background writer; until then writes happen inline."""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run_writer())
+
+    async def flush(self):
+        """Wait until every queued notification has been written."""
+        await self._queue.join()
+
+    # Reads and updates
+
+    def _list(
+        self,
+        user_address: str,
+        unread_only: bool,
+        limit: int,
+        before: Optional[Tuple[datetime, str]]
+    ) -> List[Dict[str, Any]]:
+        query = (
+            select(NotificationRecord)
+            .where(NotificationRecord.user_address == user_address)
+            .order_by(NotificationRecord.created_at.desc(), NotificationRecord.notification_id.desc())
+            .limit(limit)
+        )
+        if unread_only:
+            query = query.where(NotificationRecord.read.is_(False))
+        if before is not None:
+            created_at, notification_id = before
+            query = query.where(or_(
+                NotificationRecord.created_at < created_at,
+                and_(NotificationRecord.created_at == created_at, NotificationRecord.notification_id < notification_id)
+            ))
+        with self.SessionLocal() as session:
+            return [_notification_dict(record) for record in session.scalars(query)]
+
+    async def get_notifications(
+        self,
+        user_address: str,
+        unread_only: bool = False,
+        limit: int = 50,
+        before: Optional[Tuple[Any, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        A user's notifications, newest first.
+
+        Args:
+            user_address: Recipient address
+            unread_only: Only unread notifications
+            limit: Maximum number of notifications
+            before: Keyset position (timestamp, notification_id): only notifications before it
+        """
+        if before is not None:
+            timestamp, notification_id = before
+            if isinstance(timestamp, str):
+                timestamp = datetime.fromisoformat(timestamp)
+            before = (timestamp, notification_id)
+        return await asyncio.to_thread(self._list, user_address.lower(), unread_only, limit, before)
+
+    def _counts(self, user_address: str) -> Dict[str, int]:
+        with self.SessionLocal() as session:
+            counter = session.get(NotificationCounter, user_address)
+            return {"unread": counter.unread if counter else 0, "total": counter.total if counter else 0}
+
+    async def get_counts(self, user_address: str) -> Dict[str, int]:
+        """Unread and total notifications for a user (one primary key read)."""
+        return await asyncio.to_thread(self._counts, user_address.lower())
+
+    def _change(self, notification_id: str, remove: bool) -> bool:
+        with self.SessionLocal() as session:
+            record = session.get(NotificationRecord, notification_id)
+            if record is None:
+                return False
+            user_address = record.user_address
+            if remove:
+                deleted = session.execute(
+                    delete(NotificationRecord)
+                    .where(NotificationRecord.notification_id == notification_id)
+                    .returning(NotificationRecord.read)
+                ).first()
+                if deleted is None:
+                    return False
+                unread_change, total_change = (0 if deleted.read else -1), -1
+            else:
+                # Only the request that flips the flag moves the counter
+                flipped = session.execute(
+                    update(NotificationRecord)
+                    .where(NotificationRecord.notification_id == notification_id, NotificationRecord.read.is_(False))
+                    .values(read=True)
+                ).rowcount
+                unread_change, total_change = -flipped, 0
+            if unread_change or total_change:
+                session.execute(
+                    update(NotificationCounter)
+                    .where(NotificationCounter.user_address == user_address)
+                    .values(
+                        unread=NotificationCounter.unread + unread_change,
+                        total=NotificationCounter.total + total_change
+                    )
+                )
+            session.commit()
+            return True
+
+    async def mark_read(self, notification_id: str) -> bool:
+        """Mark a notification read. Returns False if it does not exist."""
+        return await asyncio.to_thread(self._change, notification_id, False)
+
+    async def delete(self, notification_id: str) -> bool:
+        """Delete a notification. Returns False if it does not exist."""
+        return await asyncio.to_thread(self._change, notification_id, True)
+
+    def _mark_all_read(self, user_address: str) -> int:
+        with self.SessionLocal() as session:
+            changed = session.execute(
+                update(NotificationRecord)
+                .where(NotificationRecord.user_address == user_address, NotificationRecord.read.is_(False))
+                .values(read=True)
+            ).rowcount
+            session.execute(
+                update(NotificationCounter)
+                .where(NotificationCounter.user_address == user_address)
+                .values(unread=0)
+            )
+            session.commit()
+            return changed
+
+    async def mark_all_read(self, user_address: str) -> int:
+        """Mark every notification of a user read. Returns how many changed."""
+        return await asyncio.to_thread(self._mark_all_read, user_address.lower())
+
+    def _get_settings(self, user_address: str) -> Dict[str, bool]:
+        with self.SessionLocal() as session:
+            return _settings_dict(session.get(NotificationPreferences, user_address))
+
+    async def get_settings(self, user_address: str) -> Dict[str, bool]:
+        """A user's notification settings (defaults if never saved)."""
+        return await asyncio.to_thread(self._get_settings, user_address.lower())
+
+    def _update_settings(self, user_address: str, settings: Dict[str, bool]) -> Dict[str, bool]:
+        values = {name: bool(settings.get(name, default)) for name, default in DEFAULT_SETTINGS.items()}
+        with self.SessionLocal() as session:
+            session.merge(NotificationPreferences(user_address=user_address, **values))
+            session.commit()
+        return values
+
+    async def update_settings(self, user_address: str, settings: Dict[str, bool]) -> Dict[str, bool]:
+        """Save a user's notification settings; they apply to the next fan-out."""
+        return await asyncio.to_thread(self._update_settings, user_address.lower(), settings)
+
+    async def close(self):
+        """Write what is queued, stop the writer and dispose of the connection pool."""
+        if self._writer is not None:
+            await self.flush()
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        self.engine.dispose()
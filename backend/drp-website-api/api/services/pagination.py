@@ -0,0 +1,55 @@
+"""
+Pagination - Opaque keyset cursors for list endpoints.
+
+A cursor encodes the sort key of the last item on a page, e.g. (timestamp, id) or
+(block_number, tx_index). The next page is everything strictly after that key in
+list order (newest first), so an index serves a deep page at the same cost as the
+first one, and items arriving at the head do not shift later pages.
+"""
+
+import base64
+import json
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor is malformed or belongs to a different list."""
+
+
+def encode_cursor(position: Sequence[Any]) -> str:
+    """Encode a sort key as an opaque, URL-safe cursor."""
+    data = json.dumps(list(position), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[Tuple[Any, ...]]:
+    """
+    Decode a cursor back into its sort key.
+
+    Args:
+        cursor: Cursor from a previous page, or None for the first page
+        size: Number of key fields the list sorts by
+
+    Returns:
+        Sort key tuple, or None if `cursor` is None
+    """
+    if cursor is None:
+        return None
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(position, list) or len(position) != size:
+        raise InvalidCursor("Cursor does not match this list")
+    return tuple(position)
+
+
+def next_cursor(items: List[Any], limit: int, key: Callable[[Any], Sequence[Any]]) -> Optional[str]:
+    """Cursor after the last item of a full page, None when the page is the last one."""
+    if not items or len(items) < limit:
+        return None
+    return encode_cursor(key(items[-1]))
+
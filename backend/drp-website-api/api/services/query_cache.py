@@ -0,0 +1,212 @@
+"""
+Query Cache - Normalized-query cache for knowledge queries and concept explanations.
+
+Learn pages repeat the same questions ("what is proof of activity", "Article 19?")
+with different casing, spacing and punctuation. Queries are normalized before they
+are keyed, so those share one entry in the CacheService:
+
+    knowledge:{kind}:{kb_version}:{user_level}:{context hash}:{query hash}
+
+The knowledge base version is part of every key: when the documents change, the old
+entries are never read again and expire on their own, with no invalidation sweep.
+
+Optionally, a miss can also be answered by a near-duplicate question: each worker
+remembers the embeddings of recent queries per key scope, and a cached query whose
+embedding is at least `semantic_threshold` cosine-similar is used instead.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple, Union
+
+from .cache_service import SingleFlight
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Search results follow the knowledge base version, so they can be kept for long
+KNOWLEDGE_QUERY_TTL = 3600
+# LLM explanations cost seconds each; fallback texts are kept briefly so the LLM is retried
+EXPLANATION_TTL = 24 * 3600
+FALLBACK_EXPLANATION_TTL = 300
+# Recent query embeddings kept per scope for near-duplicate lookups
+SEMANTIC_MAX_QUERIES = 1024
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase, collapse whitespace and drop surrounding punctuation ("  What is DRP? " -> "what is drp")."""
+    return _WHITESPACE.sub(" ", text.lower()).strip(" ?!.,;:")
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:24]
+
+
+class QueryCache:
+    """Caches knowledge query and explanation results under normalized-query keys."""
+
+    def __init__(
+        self,
+        cache_service,
+        version: Callable[[], str],
+        embed_query: Optional[Callable[[str], Optional[Sequence[float]]]] = None,
+        semantic_threshold: float = 0.0,
+        semantic_max_queries: int = SEMANTIC_MAX_QUERIES
+    ):
+        """
+        Initialize the query cache.
+
+        Args:
+            cache_service: CacheService storing the results (None disables caching)
+            version: Returns the current knowledge base version
+            embed_query: Embeds a normalized query (None or a None result: exact keys only)
+            semantic_threshold: Minimum cosine similarity for a near-duplicate hit
+                (0 disables near-duplicate lookups)
+            semantic_max_queries: Query embeddings remembered per scope
+        """
+        self.cache_service = cache_service
+        self.version = version
+        self.embed_query = embed_query
+        self.semantic_threshold = semantic_threshold
+        self.semantic_max_queries = semantic_max_queries
+        self._single_flight = SingleFlight()
+        # scope -> normalized query -> unit embedding, least recently added first
+        self._neighbours: Dict[str, "OrderedDict[str, Any]"] = {}
+        self._neighbours_version: Optional[str] = None
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return bool(self.semantic_threshold) and self.embed_query is not None and NUMPY_AVAILABLE
+
+    def scope(self, kind: str, context: Optional[Dict[str, Any]] = None, user_level: Optional[str] = None) -> str:
+        """Key prefix shared by every query of one kind, context, level and knowledge base version."""
+        context_part = _digest(json.dumps(context or {}, sort_keys=True, default=str))[:12]
+        return f"knowledge:{kind}:{self.version()}:{user_level or '-'}:{context_part}"
+
+    def cache_key(self, kind: str, query: str, context: Optional[Dict[str, Any]] = None,
+                  user_level: Optional[str] = None) -> str:
+        return f"{self.scope(kind, context, user_level)}:{_digest(normalize_query(query))}"
+
+    def _scope_neighbours(self, scope: str) -> "OrderedDict[str, Any]":
+        version = self.version()
+        if version != self._neighbours_version:
+            # Embeddings of queries answered from the old documents are useless now
+            self._neighbours.clear()
+            self._neighbours_version = version
+        return self._neighbours.setdefault(scope, OrderedDict())
+
+    async def _embed(self, normalized: str):
+        try:
+            vector = await asyncio.to_thread(self.embed_query, normalized)
+        except Exception as e:
+            logger.warning(f"Query embedding failed, skipping near-duplicate lookup: {e}")
+            return None
+        if vector is None:
+            return None
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _nearest(self, neighbours: "OrderedDict[str, Any]", vector) -> Optional[str]:
+        """Most similar remembered query at or above the threshold."""
+        if not neighbours:
+            return None
+        queries = list(neighbours)
+        similarities = np.stack([neighbours[query] for query in queries]) @ vector
+        best = int(np.argmax(similarities))
+        return queries[best] if similarities[best] >= self.semantic_threshold else None
+
+    def _remember(self, neighbours: "OrderedDict[str, Any]", normalized: str, vector):
+        neighbours[normalized] = vector
+        neighbours.move_to_end(normalized)
+        while len(neighbours) > self.semantic_max_queries:
+            neighbours.popitem(last=False)
+
+    async def get_or_compute(
+        self,
+        kind: str,
+        query: str,
+        compute: Callable[[], Awaitable[Any]],
+        context: Optional[Dict[str, Any]] = None,
+        user_level: Optional[str] = None,
+        ttl: Union[int, Callable[[Any], int]] = KNOWLEDGE_QUERY_TTL
+    ) -> Tuple[Any, str]:
+        """
+        Return the cached result for a query, computing and storing it on a miss.
+
+        Concurrent misses for the same key share one computation.
+
+        Args:
+            kind: Query kind ("query", "explain", ...)
+            query: The query as asked
+            compute: Produces the result on a miss
+            context: Everything else the result depends on
+            user_level: Audience level of the result
+            ttl: Seconds to keep the result, or a callable returning them for a result
+                (0 means do not cache it)
+
+        Returns:
+            (result, how it was served: "hit", "semantic" or "miss")
+        """
+        cache = self.cache_service
+        if cache is None:
+            return await compute(), "miss"
+
+        scope = self.scope(kind, context, user_level)
+        normalized = normalize_query(query)
+        key = f"{scope}:{_digest(normalized)}"
+        cached = await cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached, "hit"
+
+        vector = None
+        if self.semantic_enabled:
+            neighbours = self._scope_neighbours(scope)
+            vector = await self._embed(normalized)
+            nearest = self._nearest(neighbours, vector) if vector is not None else None
+            if nearest is not None:
+                cached = await cache.get(f"{scope}:{_digest(nearest)}")
+                if cached is not None:
+                    self.semantic_hits += 1
+                    return cached, "semantic"
+                # Expired: forget it
+                neighbours.pop(nearest, None)
+
+        self.misses += 1
+
+        async def load():
+            result = await compute()
+            seconds = ttl(result) if callable(ttl) else ttl
+            if seconds:
+                await cache.set(key, result, seconds)
+                if vector is not None:
+                    self._remember(self._scope_neighbours(scope), normalized, vector)
+            return result
+
+        return await self._single_flight.do(key, load), "miss"
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.semantic_hits + self.misses
+        return {
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+            "semantic_enabled": self.semantic_enabled
+        }
@@ -0,0 +1,112 @@
+"""
+Term Matcher - Finds every occurrence of a fixed term list in one pass over a text.
+
+The filters used to test `term in text.lower()` for every term and then re-count
+each hit with `text.count(term)`: O(terms x text) per check, and substring matches
+fire inside unrelated words ("he" in "the", "harm" in "pharmacy").
+
+TermMatcher compiles the terms once into a table keyed by their first word (a
+word-level Aho-Corasick automaton: the terms are at most a few words long). A text
+is split into words and counted once, both in C (bytes.translate + split for ASCII
+text, re.findall otherwise; Counter), and HumanRightsFilter shares one count
+between its banned and positive term sets. The table is then intersected with the
+distinct words, so the Python-level work grows with the number of distinct matching
+words, not with the text or the term list. Phrases are only looked for (with a
+precompiled regex) when their first word occurs.
+
+Terms match whole words. Terms of INFLECT_MIN_LENGTH letters or more also match
+their common inflections ("kill" -> "killed", "killing"; "abuse" -> "abusive";
+"traffic" -> "trafficking"), which the substring test used to catch.
+"""
+
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Pattern, Set, Tuple
+
+_WORD = re.compile(r"\w+")
+# ASCII punctuation -> space: splitting the result gives the same words as _WORD
+_PUNCTUATION = "".join(chr(c) for c in range(128) if not chr(c).isalnum() and chr(c) != "_").encode()
+_ASCII_SEPARATORS = bytes.maketrans(_PUNCTUATION, b" " * len(_PUNCTUATION))
+
+# Shorter terms ("he", "man", "old") match only as written
+INFLECT_MIN_LENGTH = 4
+_SUFFIXES = ("s", "es", "ed", "ing", "er", "ers", "ion", "ions", "ation", "ations", "ive")
+_VOWEL_SUFFIXES = tuple(suffix for suffix in _SUFFIXES if suffix[0] in "aeiou")
+
+
+def inflections(term: str) -> Set[str]:
+    """Forms of a term matched in text: itself, plus inflections of its last word."""
+    *head, last = term.lower().split()
+    forms = {last}
+    if len(last) >= INFLECT_MIN_LENGTH:
+        forms.update(last + suffix for suffix in _SUFFIXES)
+        if last.endswith("e"):
+            # hate -> hated, hating; abuse -> abusive
+            forms.add(last + "d")
+            forms.update(last[:-1] + suffix for suffix in _VOWEL_SUFFIXES)
+        elif last.endswith("y"):
+            # study -> studies, studied
+            forms.update((last[:-1] + "ies", last[:-1] + "ied"))
+        elif last.endswith("c"):
+            # traffic -> trafficking, trafficked
+            forms.update(last + "k" + suffix for suffix in ("ing", "ed", "er", "ers"))
+    return {" ".join([*head, form]) for form in forms}
+
+
+def count_words(text: str) -> Counter:
+    """Occurrences of each lowercased word (run of \\w characters) in a text, as UTF-8 bytes."""
+    text_lower = text.lower()
+    if text_lower.isascii():
+        # Fast path: translate + split run in C without the regex engine
+        return Counter(text_lower.encode().translate(_ASCII_SEPARATORS).split())
+    return Counter(word.encode() for word in _WORD.findall(text_lower))
+
+
+class TermMatcher:
+    """Compiled matcher for categories of terms."""
+
+    def __init__(self, categories: Dict[str, Iterable[str]], inflect: bool = True):
+        """
+        Args:
+            categories: Category name -> terms (single words or short phrases)
+            inflect: Also match inflected forms of longer terms
+        """
+        self.categories = list(categories)
+        # first word (UTF-8) -> [(phrase pattern or None for a single word, category, term)]
+        self._table: Dict[bytes, List[Tuple[Optional[Pattern], str, str]]] = {}
+        for category, terms in categories.items():
+            for term in terms:
+                for form in (inflections(term) if inflect else {term.lower()}):
+                    first, *rest = form.split()
+                    phrase = None
+                    if rest:
+                        phrase = re.compile(r"\b" + r"\W+".join(map(re.escape, [first, *rest])) + r"\b")
+                    self._table.setdefault(first.encode(), []).append((phrase, category, term))
+
+    def scan(self, text: str, words: Optional[Counter] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Count every term occurrence in a text.
+
+        Args:
+            text: The text
+            words: count_words(text), if already computed for another matcher
+
+        Returns:
+            Category -> term -> occurrences, for categories with at least one hit,
+            in the order the categories were given
+        """
+        if words is None:
+            words = count_words(text)
+        hits: Dict[str, Dict[str, int]] = {}
+        text_lower = None
+        for word in words.keys() & self._table.keys():
+            for phrase, category, term in self._table[word]:
+                if phrase is None:
+                    count = words[word]
+                else:
+                    text_lower = text_lower or text.lower()
+                    count = len(phrase.findall(text_lower))
+                if count:
+                    counts = hits.setdefault(category, {})
+                    counts[term] = counts.get(term, 0) + count
+        return {category: hits[category] for category in self.categories if category in hits}
@@ -0,0 +1,370 @@
+"""
+Vote Ledger Service - Governance votes with running, weighted tallies.
+
+Every proposal has one tally row holding its for/against/abstain weights and voter
+counts. Recording a vote inserts the ledger entry and updates that row in the same
+transaction, so results are a single primary key read however many votes exist.
+The (proposal_id, voter) primary key enforces one vote per address.
+
+Weights are the voter's governance token balance or PoST level at the proposal's
+snapshot block, so moving tokens after a proposal opens does not change its
+outcome. Each entry is chained to the previous one by a SHA-256 hash; a recount
+replays the ledger, checks the chain and re-sums the weights (optionally against
+freshly looked-up snapshot weights) to verify the running tallies.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, create_engine, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+logger = logging.getLogger(__name__)
+
+Base = declarative_base()
+
+VOTE_CHOICES = ("for", "against", "abstain")
+# token: governance token balance at the snapshot block; post: PoST verification level
+WEIGHTINGS = ("token", "post")
+
+GENESIS_HASH = "0" * 64
+# Ledger entries read per query during a recount
+RECOUNT_CHUNK_SIZE = 1000
+# Mismatching voters listed in a recount report
+MAX_REPORTED_MISMATCHES = 100
+# Attempts at recording a vote when another worker takes its sequence number first
+VOTE_WRITE_ATTEMPTS = 5
+
+
+class VoteRejected(ValueError):
+    """Base class for votes the ledger refuses to record."""
+
+
+class UnknownProposal(VoteRejected):
+    """The proposal has no tally (it was never opened)."""
+
+
+class DuplicateVote(VoteRejected):
+    """The address already voted on the proposal."""
+
+
+class VotingClosed(VoteRejected):
+    """The proposal's voting period has ended."""
+
+
+class ProposalTally(Base):
+    __tablename__ = "proposal_tallies"
+
+    proposal_id = Column(String(64), primary_key=True)
+    weighting = Column(String(16), nullable=False)
+    snapshot_block = Column(Integer, nullable=False)
+    voting_end = Column(DateTime, nullable=True)
+    # Weights are decimal strings: token balances in wei exceed 64-bit integers
+    for_weight = Column(String(80), nullable=False, default="0")
+    against_weight = Column(String(80), nullable=False, default="0")
+    abstain_weight = Column(String(80), nullable=False, default="0")
+    for_count = Column(Integer, nullable=False, default=0)
+    against_count = Column(Integer, nullable=False, default=0)
+    abstain_count = Column(Integer, nullable=False, default=0)
+    vote_count = Column(Integer, nullable=False, default=0)
+    ledger_hash = Column(String(64), nullable=False, default=GENESIS_HASH)
+    updated_at = Column(DateTime, nullable=False)
+
+
+class VoteEntry(Base):
+    __tablename__ = "vote_ledger"
+
+    proposal_id = Column(String(64), primary_key=True)
+    voter = Column(String(64), primary_key=True)
+    sequence = Column(Integer, nullable=False)
+    choice = Column(String(16), nullable=False)
+    weight = Column(String(80), nullable=False)
+    signature = Column(String(512), nullable=True)
+    entry_hash = Column(String(64), nullable=False)
+    cast_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_vote_ledger_proposal_sequence", "proposal_id", "sequence", unique=True),
+    )
+
+
+def entry_hash(previous_hash: str, sequence: int, voter: str, choice: str, weight: int) -> str:
+    """Hash of a ledger entry, chained to the entry before it."""
+    line = f"{previous_hash}|{sequence}|{voter}|{choice}|{weight}"
+    return hashlib.sha256(line.encode()).hexdigest()
+
+
+def display_weight(weighting: str, weight: int) -> float:
+    """Weight in display units: tokens for token weighting, levels for PoST."""
+    return weight / 1e18 if weighting == "token" else float(weight)
+
+
+def _results(tally: ProposalTally) -> Dict[str, Any]:
+    weights = {choice: int(getattr(tally, f"{choice}_weight")) for choice in VOTE_CHOICES}
+    return {
+        "proposal_id": tally.proposal_id,
+        "weighting": tally.weighting,
+        "snapshot_block": tally.snapshot_block,
+        "votes_for": display_weight(tally.weighting, weights["for"]),
+        "votes_against": display_weight(tally.weighting, weights["against"]),
+        "abstain": display_weight(tally.weighting, weights["abstain"]),
+        "total_votes": tally.vote_count,
+        "voters": {choice: getattr(tally, f"{choice}_count") for choice in VOTE_CHOICES},
+        "weights": {choice: str(weight) for choice, weight in weights.items()},
+        "voting_end": tally.voting_end.isoformat() if tally.voting_end else None,
+        "ledger_hash": tally.ledger_hash,
+        "updated_at": tally.updated_at.isoformat(),
+    }
+
+
+class VoteLedgerService:
+    """Service recording governance votes and maintaining their tallies."""
+
+    def __init__(self, database_url: str = "sqlite:///./drp.db"):
+        """
+        Initialize vote ledger service.
+
+        Args:
+            database_url: SQLAlchemy database URL (SQLite or Postgres)
+        """
+        connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+        self.engine = create_engine(database_url, connect_args=connect_args, pool_pre_ping=True)
+        self.SessionLocal = sessionmaker(bind=self.engine, expire_on_commit=False)
+        Base.metadata.create_all(self.engine)
+        # Serializes this worker's tally updates; Postgres also locks the tally row
+        self._write_lock = threading.Lock()
+        logger.info("VoteLedgerService initialized")
+
+    def _open_proposal(
+        self,
+        proposal_id: str,
+        snapshot_block: int,
+        weighting: str,
+        voting_end: Optional[datetime]
+    ):
+        with self.SessionLocal() as session:
+            session.merge(ProposalTally(
+                proposal_id=proposal_id,
+                weighting=weighting,
+                snapshot_block=snapshot_block,
+                voting_end=voting_end,
+                updated_at=datetime.utcnow(),
+            ))
+            session.commit()
+
+    async def open_proposal(
+        self,
+        proposal_id: str,
+        snapshot_block: int,
+        weighting: str = "token",
+        voting_end: Optional[datetime] = None
+    ):
+        """
+        Start tallying a proposal.
+
+        Args:
+            proposal_id: Proposal ID
+            snapshot_block: Block whose balances weigh the votes
+            weighting: 'token' or 'post'
+            voting_end: Votes after this time are rejected (None: no deadline)
+        """
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"Unknown weighting: {weighting}")
+        await asyncio.to_thread(self._open_proposal, proposal_id, snapshot_block, weighting, voting_end)
+
+    def _get_results(self, proposal_id: str) -> Optional[Dict[str, Any]]:
+        with self.SessionLocal() as session:
+            tally = session.get(ProposalTally, proposal_id)
+            return _results(tally) if tally else None
+
+    async def get_results(self, proposal_id: str) -> Optional[Dict[str, Any]]:
+        """Current tallies of a proposal (None if it was never opened)."""
+        return await asyncio.to_thread(self._get_results, proposal_id)
+
+    def _record_vote(
+        self,
+        proposal_id: str,
+        voter: str,
+        choice: str,
+        weight: int,
+        signature: Optional[str]
+    ) -> Dict[str, Any]:
+        for _ in range(VOTE_WRITE_ATTEMPTS):
+            recorded = self._try_record_vote(proposal_id, voter, choice, weight, signature)
+            if recorded is not None:
+                return recorded
+        raise RuntimeError(f"Could not record vote on proposal {proposal_id}: too many concurrent writes")
+
+    def _try_record_vote(
+        self,
+        proposal_id: str,
+        voter: str,
+        choice: str,
+        weight: int,
+        signature: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Record a vote at the next sequence number (None if another worker took it first)."""
+        now = datetime.utcnow()
+        with self._write_lock, self.SessionLocal() as session:
+            tally = session.scalars(
+                select(ProposalTally).where(ProposalTally.proposal_id == proposal_id).with_for_update()
+            ).first()
+            if tally is None:
+                raise UnknownProposal(f"Proposal {proposal_id} not found")
+            if tally.voting_end is not None and now > tally.voting_end:
+                raise VotingClosed(f"Voting on proposal {proposal_id} ended at {tally.voting_end.isoformat()}")
+
+            sequence = tally.vote_count + 1
+            digest = entry_hash(tally.ledger_hash, sequence, voter, choice, weight)
+            session.add(VoteEntry(
+                proposal_id=proposal_id,
+                voter=voter,
+                sequence=sequence,
+                choice=choice,
+                weight=str(weight),
+                signature=signature,
+                entry_hash=digest,
+                cast_at=now,
+            ))
+            setattr(tally, f"{choice}_weight", str(int(getattr(tally, f"{choice}_weight")) + weight))
+            setattr(tally, f"{choice}_count", getattr(tally, f"{choice}_count") + 1)
+            tally.vote_count = sequence
+            tally.ledger_hash = digest
+            tally.updated_at = now
+            try:
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+                if session.get(VoteEntry, (proposal_id, voter)) is not None:
+                    raise DuplicateVote(f"{voter} already voted on proposal {proposal_id}")
+                # The sequence number was taken by another worker (SQLite has no row
+                # locks and _write_lock is per process): re-read the tally and retry
+                logger.info(f"Sequence {sequence} of proposal {proposal_id} taken, retrying vote")
+                return None
+            return {"receipt": digest, "sequence": sequence, "results": _results(tally)}
+
+    async def record_vote(
+        self,
+        proposal_id: str,
+        voter: str,
+        choice: str,
+        weight: int,
+        signature: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Record a vote and add its weight to the proposal's tally.
+
+        Args:
+            proposal_id: Proposal ID
+            voter: Voter address
+            choice: 'for', 'against' or 'abstain'
+            weight: Voter's weight at the snapshot block
+            signature: Signature submitted with the vote
+
+        Returns:
+            Dict with the entry's hash (receipt), its sequence number and the new results
+
+        Raises:
+            UnknownProposal, VotingClosed, DuplicateVote
+        """
+        if choice not in VOTE_CHOICES:
+            raise ValueError(f"Invalid vote value: {choice}")
+        return await asyncio.to_thread(self._record_vote, proposal_id, voter.lower(), choice, weight, signature)
+
+    def _get_voters(self, proposal_id: str) -> List[str]:
+        with self.SessionLocal() as session:
+            return list(session.scalars(
+                select(VoteEntry.voter).where(VoteEntry.proposal_id == proposal_id).order_by(VoteEntry.sequence)
+            ))
+
+    async def get_voters(self, proposal_id: str) -> List[str]:
+        """Addresses that voted on a proposal, in voting order."""
+        return await asyncio.to_thread(self._get_voters, proposal_id)
+
+    def _recount(self, proposal_id: str, weights: Optional[Dict[str, int]]) -> Optional[Dict[str, Any]]:
+        with self.SessionLocal() as session:
+            tally = session.get(ProposalTally, proposal_id)
+            if tally is None:
+                return None
+            stored = _results(tally)
+
+            sums = {choice: 0 for choice in VOTE_CHOICES}
+            counts = {choice: 0 for choice in VOTE_CHOICES}
+            previous_hash = GENESIS_HASH
+            broken_at = None
+            mismatches = []
+            last_sequence = 0
+            while True:
+                entries = session.scalars(
+                    select(VoteEntry)
+                    .where(VoteEntry.proposal_id == proposal_id, VoteEntry.sequence > last_sequence)
+                    .order_by(VoteEntry.sequence)
+                    .limit(RECOUNT_CHUNK_SIZE)
+                ).all()
+                if not entries:
+                    break
+                for entry in entries:
+                    recorded = int(entry.weight)
+                    expected_hash = entry_hash(previous_hash, entry.sequence, entry.voter, entry.choice, recorded)
+                    if broken_at is None and (
+                        entry.sequence != last_sequence + 1 or entry.entry_hash != expected_hash
+                    ):
+                        broken_at = entry.sequence
+                    previous_hash = entry.entry_hash
+                    last_sequence = entry.sequence
+
+                    weight = recorded
+                    if weights is not None:
+                        weight = weights.get(entry.voter, recorded)
+                        if weight != recorded and len(mismatches) < MAX_REPORTED_MISMATCHES:
+                            mismatches.append({"voter": entry.voter, "recorded": str(recorded), "snapshot": str(weight)})
+                    sums[entry.choice] += weight
+                    counts[entry.choice] += 1
+
+        recounted = {
+            "votes_for": display_weight(tally.weighting, sums["for"]),
+            "votes_against": display_weight(tally.weighting, sums["against"]),
+            "abstain": display_weight(tally.weighting, sums["abstain"]),
+            "total_votes": sum(counts.values()),
+            "voters": counts,
+            "weights": {choice: str(weight) for choice, weight in sums.items()},
+            "ledger_hash": previous_hash,
+        }
+        chain_valid = broken_at is None and previous_hash == tally.ledger_hash
+        return {
+            "proposal_id": proposal_id,
+            "verified": chain_valid and all(
+                recounted[name] == stored[name] for name in ("weights", "voters", "total_votes")
+            ),
+            "chain_valid": chain_valid,
+            "chain_broken_at": broken_at,
+            "weights_checked": weights is not None,
+            "weight_mismatches": mismatches,
+            "stored": stored,
+            "recounted": recounted,
+        }
+
+    async def recount(self, proposal_id: str, weights: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Replay a proposal's ledger and compare the result with its running tally.
+
+        Args:
+            proposal_id: Proposal ID
+            weights: Freshly looked-up snapshot weights by voter; recorded weights
+                are re-summed if None (or for voters missing from it)
+
+        Returns:
+            Report with `verified` (hash chain intact and tallies equal), the stored and
+            recounted tallies, and voters whose recorded weight differs from `weights`
+            (None if the proposal was never opened)
+        """
+        return await asyncio.to_thread(self._recount, proposal_id, weights)
+
+    def close(self):
+        """Dispose of the connection pool."""
+        self.engine.dispose()
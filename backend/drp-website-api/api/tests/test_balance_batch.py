@@ -0,0 +1,158 @@
+"""
+Tests for batched token balance lookups against a local stub JSON-RPC server.
+"""
+
+import asyncio
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.routers import tokens
+from api.services.blockchain_service import BALANCE_BATCH_SIZE, BlockchainService
+
+
+def start_stub_rpc(batch_support=True):
+    """Stub RPC answering /balance and JSON-RPC batches; counts HTTP requests."""
+    stats = {"requests": 0}
+
+    def balance_for(address):
+        return str(int(address[-4:], 16) * 10 ** 18)
+
+    class StubRPC(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            stats["requests"] += 1
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            if self.path == "/balance":
+                reply = {"balance": balance_for(body["address"])}
+            elif batch_support:
+                reply = [
+                    {"jsonrpc": "2.0", "id": call["id"], "result": {"balance": balance_for(call["params"]["address"])}}
+                    if not call["params"]["address"].endswith("dead")
+                    else {"jsonrpc": "2.0", "id": call["id"], "error": {"code": -32000, "message": "unknown"}}
+                    for call in reversed(body)
+                ]
+            else:
+                reply = {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "batch not supported"}}
+            data = json.dumps(reply).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubRPC)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def addresses(count):
+    return [f"0x{i:040x}" for i in range(1, count + 1)]
+
+
+def test_batch_reduces_round_trips():
+    server, stats = start_stub_rpc()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    async def run():
+        service = BlockchainService(url, "0xcontract")
+        wallets = addresses(150)
+
+        for address in wallets:
+            for token_type in ("RIGHTS", "DERI"):
+                await service.get_token_balance(address, token_type)
+        individual = stats["requests"]
+
+        stats["requests"] = 0
+        balances = await service.get_token_balances(wallets, ("RIGHTS", "DERI"))
+        await service.close()
+        return individual, stats["requests"], balances
+
+    individual, batched, balances = asyncio.run(run())
+    server.shutdown()
+
+    assert individual == 300
+    assert batched == -(-300 // BALANCE_BATCH_SIZE)
+    assert balances["0x" + "0" * 37 + "096"]["DERI"]["balance_formatted"] == 0x96
+    assert len(balances) == 150
+
+
+def test_errors_and_servers_without_batch_support():
+    server, stats = start_stub_rpc(batch_support=False)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    async def run():
+        service = BlockchainService(url, "0xcontract")
+        balances = await service.get_token_balances(addresses(3), ("RIGHTS",))
+        await service.close()
+        return balances
+
+    balances = asyncio.run(run())
+    server.shutdown()
+    # One rejected batch, then one request per lookup
+    assert stats["requests"] == 4
+    assert [b["RIGHTS"]["balance_formatted"] for b in balances.values()] == [1.0, 2.0, 3.0]
+
+
+def test_batch_endpoint():
+    server, _ = start_stub_rpc()
+    app = FastAPI()
+    app.include_router(tokens.router, prefix="/tokens")
+    app.state.blockchain_service = BlockchainService(f"http://127.0.0.1:{server.server_address[1]}", "0xcontract")
+    client = TestClient(app)
+
+    wallets = addresses(2)
+    response = client.post("/tokens/balances:batch", json={"addresses": wallets, "token_types": ["DERI"]})
+    assert response.status_code == 200
+    assert [(b["address"], b["balance_formatted"]) for b in response.json()] == [(wallets[0], 1.0), (wallets[1], 2.0)]
+
+    # Repeated addresses are answered once per request position
+    response = client.post("/tokens/balances:batch", json={
+        "addresses": [wallets[0], wallets[1], wallets[0]], "token_types": ["RIGHTS", "DERI"]
+    })
+    assert [(b["address"], b["token_type"]) for b in response.json()] == [
+        (wallets[0], "RIGHTS"), (wallets[0], "DERI"), (wallets[1], "RIGHTS"), (wallets[1], "DERI"),
+        (wallets[0], "RIGHTS"), (wallets[0], "DERI"),
+    ]
+
+    assert client.post("/tokens/balances:batch", json={"addresses": wallets, "token_types": ["ETH"]}).status_code == 422
+    assert client.post("/tokens/balances:batch", json={"addresses": wallets, "token_types": []}).status_code == 422
+    assert client.post("/tokens/balances:batch", json={"addresses": ["nope"]}).status_code == 400
+    assert client.post("/tokens/balances:batch", json={"addresses": []}).status_code == 422
+    server.shutdown()
+
+
+def test_failed_lookups_are_not_reported_as_zero():
+    server, _ = start_stub_rpc()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    dead = "0x" + "0" * 36 + "dead"
+    wallets = [addresses(1)[0], dead]
+
+    balances = asyncio.run(BlockchainService(url, "0xcontract").get_token_balances(wallets, ("DERI",)))
+    assert list(balances) == [wallets[0]]
+
+    app = FastAPI()
+    app.include_router(tokens.router, prefix="/tokens")
+    app.state.blockchain_service = BlockchainService(url, "0xcontract")
+
+    # One event loop for every request, so the service's HTTP pool stays usable
+    with TestClient(app) as client:
+        response = client.post("/tokens/balances:batch", json={"addresses": wallets, "token_types": ["DERI"]})
+        assert response.status_code == 200
+        assert [(b["address"], b["balance_formatted"]) for b in response.json()] == [(wallets[0], 1.0)]
+        # Nothing could be answered: unavailable, not a list of zeros
+        assert client.post("/tokens/balances:batch", json={"addresses": [dead]}).status_code == 503
+    server.shutdown()
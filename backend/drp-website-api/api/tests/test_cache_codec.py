@@ -0,0 +1,60 @@
+"""
+Tests for cache value serialization and compression.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.services.cache_codec import (
+    CacheCodec,
+    CodecError,
+    available_compressions,
+    available_serializers,
+)
+
+PAYLOAD = {
+    "transactions": [
+        {"tx_hash": f"0x{i:064x}", "from": "0xabc", "to": "0xdef", "amount": "1000", "status": "confirmed"}
+        for i in range(50)
+    ],
+    "total": 50,
+}
+
+
+@pytest.mark.parametrize("serializer", [n for n, ok in available_serializers().items() if ok])
+@pytest.mark.parametrize("compression", [n for n, ok in available_compressions().items() if ok])
+def test_round_trip(serializer, compression):
+    codec = CacheCodec(serializer=serializer, compression=compression, compress_threshold=256)
+    encoded = codec.encode(PAYLOAD)
+    assert encoded[0] >= 0x80
+    assert codec.decode(encoded) == PAYLOAD
+    # Small values are stored uncompressed
+    assert codec.decode(codec.encode({"balance": "1"})) == {"balance": "1"}
+
+
+def test_mixed_entries_are_readable_during_rollout():
+    old = json.dumps(PAYLOAD).encode()
+    written_by_other_config = CacheCodec(serializer="json", compression="zlib", compress_threshold=0).encode(PAYLOAD)
+    codec = CacheCodec()
+    assert codec.decode(old) == PAYLOAD
+    assert codec.decode(old.decode()) == PAYLOAD
+    assert codec.decode(written_by_other_config) == PAYLOAD
+
+
+def test_compression_only_above_threshold():
+    codec = CacheCodec(serializer="json", compression="zlib", compress_threshold=1024)
+    small = codec.encode({"k": "v"})
+    large = codec.encode(PAYLOAD)
+    assert small[0] & 0x0F == 0
+    assert large[0] & 0x0F != 0
+    assert len(large) < len(json.dumps(PAYLOAD))
+
+
+def test_unknown_header_is_rejected():
+    with pytest.raises(CodecError):
+        CacheCodec().decode(bytes([0xFF]) + b"junk")
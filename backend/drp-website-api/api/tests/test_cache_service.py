@@ -0,0 +1,270 @@
+"""
+Tests for the two-tier CacheService.
+"""
+
+import asyncio
+import fnmatch
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.services.cache_service import CacheService, LocalCache
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for CacheService, shared between 'workers'."""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.subscribers = []
+        self.gets = 0
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError("redis down")
+
+    async def get(self, key):
+        self._check()
+        self.gets += 1
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self._check()
+        self.data[key] = value
+        self.expires[key] = time.monotonic() + ttl
+
+    async def pttl(self, key):
+        self._check()
+        if key not in self.data:
+            return -2
+        if key not in self.expires:
+            return -1
+        return int((self.expires[key] - time.monotonic()) * 1000)
+
+    async def delete(self, key):
+        self._check()
+        self.data.pop(key, None)
+
+    async def mget(self, keys):
+        self._check()
+        self.gets += 1
+        return [self.data.get(key) for key in keys]
+
+    async def scan_iter(self, match=None, count=None):
+        self._check()
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def unlink(self, *keys):
+        self._check()
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def publish(self, channel, message):
+        self._check()
+        for queue in self.subscribers:
+            queue.put_nowait({"type": "message", "data": message})
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    async def close(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args) for name, args in self.calls]
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.redis.subscribers.append(self.queue)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self):
+        self.redis.subscribers.remove(self.queue)
+
+
+def make_cache(redis, **kwargs):
+    cache = CacheService(**kwargs)
+    cache.redis_enabled = True
+    cache.redis_client = redis
+    return cache
+
+
+def test_local_tier_evicts_lru_by_count_and_size():
+    local = LocalCache(max_entries=3, max_bytes=100)
+    for key in "abc":
+        local.set(key, key, ttl=60, size=10)
+    local.get("a")
+    local.set("d", "d", ttl=60, size=10)
+    assert local.get("b") is None and local.get("a") == "a"
+
+    local.set("big", "x", ttl=60, size=80)
+    assert local.size_bytes <= 100
+    assert local.evictions == 2
+    # A value larger than the whole tier is not stored
+    local.set("huge", "x", ttl=60, size=500)
+    assert local.get("huge") is None
+
+
+def test_local_tier_expires_entries():
+    local = LocalCache()
+    local.set("k", 1, ttl=0.01, size=1)
+    time.sleep(0.02)
+    assert local.get("k") is None
+    assert local.expirations == 1
+
+
+def test_hot_keys_are_served_from_local_tier():
+    async def run():
+        redis = FakeRedis()
+        writer = make_cache(redis)
+        reader = make_cache(redis)
+        await writer.set("proposals:active", [{"id": "p1"}], ttl=30)
+        for _ in range(1000):
+            assert await reader.get("proposals:active") == [{"id": "p1"}]
+        return redis.gets, reader.stats()
+
+    gets, stats = asyncio.run(run())
+    assert gets == 1
+    assert stats["local"]["hits"] == 999
+    assert stats["redis"]["hits"] == 1
+
+
+def test_pubsub_invalidates_other_workers():
+    async def run():
+        redis = FakeRedis()
+        first = make_cache(redis)
+        second = make_cache(redis)
+        await first.start()
+        await second.start()
+        await asyncio.sleep(0)
+
+        await first.set("balance:0xa", {"balance": "1"})
+        assert await second.get("balance:0xa") == {"balance": "1"}
+        await first.set("balance:0xa", {"balance": "2"})
+        await asyncio.sleep(0.01)
+        updated = await second.get("balance:0xa")
+        await first.delete("balance:0xa")
+        await asyncio.sleep(0.01)
+        deleted = await second.get("balance:0xa")
+        await first.close()
+        await second.close()
+        return updated, deleted
+
+    assert asyncio.run(run()) == ({"balance": "2"}, None)
+
+
+def test_local_tier_keeps_serving_when_redis_is_down():
+    async def run():
+        redis = FakeRedis()
+        cache = make_cache(redis, redis_retry_interval=60)
+        await cache.set("stats", {"total_blocks": 7})
+        redis.down = True
+        await cache.set("feed", [1, 2])
+        values = (await cache.get("stats"), await cache.get("feed"))
+        errors_after_first_failure = cache.stats()["redis"]["errors"]
+        # Redis is skipped until the retry interval passes
+        await cache.get("missing")
+        await cache.get("missing")
+        return values, errors_after_first_failure, cache.stats()
+
+    values, errors, stats = asyncio.run(run())
+    assert values == ({"total_blocks": 7}, [1, 2])
+    assert errors == 1 and stats["redis"]["errors"] == 1
+    assert stats["redis"]["available"] is False
+
+
+def test_get_many_reads_local_hits_and_one_mget():
+    async def run():
+        redis = FakeRedis()
+        writer = make_cache(redis)
+        reader = make_cache(redis)
+        await writer.set_many({"balance:0xa:RIGHTS": {"balance": "1"}, "balance:0xa:DERI": {"balance": "2"}}, ttl=10)
+        await reader.set("balance:0xb:RIGHTS", {"balance": "3"})
+        gets_before = redis.gets
+        values = await reader.get_many(["balance:0xa:RIGHTS", "balance:0xb:RIGHTS", "missing", "balance:0xa:DERI"])
+        return values, redis.gets - gets_before
+
+    values, round_trips = asyncio.run(run())
+    assert values == [{"balance": "1"}, {"balance": "3"}, None, {"balance": "2"}]
+    assert round_trips == 1
+
+
+def test_delete_pattern_clears_both_tiers_and_other_workers():
+    async def run():
+        redis = FakeRedis()
+        first = make_cache(redis)
+        second = make_cache(redis)
+        await second.start()
+        await asyncio.sleep(0)
+        await first.set_many({f"proposals:active:{i}": [i] for i in range(3)})
+        await first.set("proposal:p1", {"id": "p1"})
+        await second.get_many([f"proposals:active:{i}" for i in range(3)])
+
+        deleted = await first.delete_pattern("proposals:*")
+        await asyncio.sleep(0.01)
+        remaining = sorted(redis.data)
+        local_left = len(second.local)
+        await second.close()
+        return deleted, remaining, local_left
+
+    assert asyncio.run(run()) == (3, ["proposal:p1"], 0)
+
+
+def test_batch_calls_fall_back_to_local_tier_when_redis_is_down():
+    async def run():
+        redis = FakeRedis()
+        redis.down = True
+        cache = make_cache(redis)
+        await cache.set_many({"a": 1, "b": 2})
+        values = await cache.get_many(["a", "b", "c"])
+        await cache.delete_pattern("a*")
+        return values, await cache.get_many(["a", "b"])
+
+    assert asyncio.run(run()) == ([1, 2, None], [None, 2])
+
+
+def test_local_copy_expires_with_the_redis_entry():
+    async def run():
+        redis = FakeRedis()
+        writer = make_cache(redis, local_ttl=60)
+        reader = make_cache(redis, local_ttl=60)
+        await writer.set("balance:0xa", {"balance": "1"}, ttl=10)
+        await writer.set_many({"proposal:p1": {"id": "p1"}}, ttl=15)
+        await reader.get("balance:0xa")
+        await reader.get_many(["proposal:p1"])
+        return {key: entry[0] - time.monotonic() for key, entry in reader.local._entries.items()}
+
+    remaining = asyncio.run(run())
+    assert 9 < remaining["balance:0xa"] <= 10
+    assert 14 < remaining["proposal:p1"] <= 15
@@ -0,0 +1,134 @@
+"""
+Tests for the local chain index and the follower that fills it.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.routers import explorer
+from api.services.blockchain_service import BlockchainService
+from api.services.chain_follower import ChainFollower
+from api.services.chain_index_service import ChainIndexService
+
+ALICE = "0x" + "a" * 40
+BOB = "0x" + "b" * 40
+CAROL = "0x" + "c" * 40
+
+
+class FakeChain:
+    """RPC stand-in: blocks 0..head with deterministic hashes; `fork` rewrites history."""
+
+    def __init__(self, head):
+        self.head = head
+        self.branch = {}
+
+    def block_hash(self, number):
+        return f"0x{self.branch.get(number, 'main')}{number:04d}"
+
+    def fork(self, from_block, name):
+        for number in range(from_block, self.head + 1):
+            self.branch[number] = name
+
+    def block(self, number):
+        sender, recipient = (ALICE, BOB) if number % 2 else (BOB, CAROL)
+        return {
+            "number": hex(number),
+            "hash": self.block_hash(number),
+            "parentHash": self.block_hash(number - 1) if number else None,
+            "timestamp": 1767225600 + number * 5,
+            "transactions": [
+                {"hash": f"{self.block_hash(number)}-{i}", "from": sender.upper().replace("0X", "0x"), "to": recipient, "value": i}
+                for i in range(2)
+            ],
+        }
+
+    async def get_chain_head(self):
+        return self.head
+
+    async def get_blocks_by_number(self, numbers):
+        return [self.block(n) if n <= self.head else None for n in numbers]
+
+
+def make_index(tmp_path):
+    return ChainIndexService(f"sqlite:///{tmp_path / 'chain.db'}")
+
+
+def test_follower_ingests_and_queries_use_keyset(tmp_path):
+    index = make_index(tmp_path)
+    chain = FakeChain(head=24)
+    follower = ChainFollower(chain, index, confirmations=2, batch_size=10)
+
+    async def run():
+        written = await follower.sync_once()
+        head = await index.get_head()
+        first = await index.get_transactions(limit=5)
+        last = first[-1]
+        second = await index.get_transactions(limit=5, before=(last["block_number"], last["tx_index"]))
+        by_offset = await index.get_transactions(limit=5, offset=5)
+        alice = await index.get_transactions(address=ALICE, limit=100)
+        blocks = await index.get_blocks(limit=3, before_block=10)
+        return written, head, first, second, by_offset, alice, blocks, await index.get_stats()
+
+    written, head, first, second, by_offset, alice, blocks, stats = asyncio.run(run())
+    index.close()
+
+    assert written == 23
+    assert head["block_number"] == 22
+    assert [(tx["block_number"], tx["tx_index"]) for tx in first] == [(22, 1), (22, 0), (21, 1), (21, 0), (20, 1)]
+    assert second == by_offset
+    assert second[0]["block_number"] == 20 and second[0]["tx_index"] == 0
+    # Addresses are stored lowercase, so mixed-case senders are found
+    assert len(alice) == 22 and all(ALICE in (tx["from_address"], tx["to_address"]) for tx in alice)
+    assert [block["block_number"] for block in blocks] == [9, 8, 7]
+    assert stats == {"total_transactions": 46, "total_blocks": 23, "total_addresses": 3, "latest_block": 22}
+
+
+def test_follower_rolls_back_reorged_blocks(tmp_path):
+    index = make_index(tmp_path)
+    chain = FakeChain(head=20)
+    follower = ChainFollower(chain, index, batch_size=8)
+
+    async def run():
+        await follower.sync_once()
+        chain.fork(17, "side")
+        chain.head = 22
+        written = await follower.sync_once()
+        hashes = await index.get_block_hashes(list(range(15, 23)))
+        replaced = await index.get_transaction(f"{FakeChain(0).block_hash(18)}-0")
+        return written, hashes, replaced
+
+    written, hashes, replaced = asyncio.run(run())
+    index.close()
+
+    assert written == 6
+    assert hashes == {number: chain.block_hash(number) for number in range(15, 23)}
+    assert hashes[17].startswith("0xside")
+    assert replaced is None
+
+
+def test_explorer_routes_read_from_index(tmp_path):
+    index = make_index(tmp_path)
+    asyncio.run(ChainFollower(FakeChain(head=4), index).sync_once())
+
+    app = FastAPI()
+    app.include_router(explorer.router, prefix="/explorer")
+    app.state.blockchain_service = BlockchainService("http://127.0.0.1:9", "0xcontract", chain_index=index)
+    client = TestClient(app)
+
+    blocks = client.get("/explorer/blocks", params={"limit": 2}).json()
+    assert [block["block_number"] for block in blocks] == [4, 3]
+    assert blocks[0]["transaction_count"] == 2
+
+    transactions = client.get("/explorer/transactions", params={"address": CAROL}).json()
+    assert {tx["block_number"] for tx in transactions} == {0, 2, 4}
+
+    tx_hash = transactions[0]["tx_hash"]
+    assert client.get(f"/explorer/transactions/{tx_hash}").json()["to_address"] == CAROL
+    assert client.get("/explorer/stats").json()["total_blocks"] == 5
+    index.close()
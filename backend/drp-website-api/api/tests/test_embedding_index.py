@@ -0,0 +1,109 @@
+"""
+Tests for the persistent, memory-mapped knowledge embedding index.
+"""
+
+import hashlib
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.knowledge.embedding_index import EmbeddingIndex, build_index, build_knowledge_indexes, content_hash
+from api.knowledge.human_rights_knowledge import HumanRightsKnowledgeBase as ExternalKnowledgeBase
+from api.knowledge.hybrid_retriever import HybridRetriever
+from api.services.ethical_langchain_service import HumanRightsKnowledgeBase
+
+DIMENSION = 64
+
+
+class FakeEmbedder:
+    """Hashed bag of words: texts sharing words get similar vectors. Counts embedded texts."""
+
+    def __init__(self):
+        self.embedded = []
+
+    def __call__(self, texts):
+        self.embedded.extend(texts)
+        vectors = np.zeros((len(texts), DIMENSION), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"[a-z0-9]+", text.lower()):
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % DIMENSION] += 1
+        return vectors
+
+
+DOCUMENTS = [
+    ("water", "clean drinking water for every community"),
+    ("housing", "adequate housing and shelter"),
+    ("speech", "freedom of opinion and expression"),
+]
+
+
+def test_index_is_rebuilt_only_when_documents_change(tmp_path):
+    embed = FakeEmbedder()
+    index = build_index(DOCUMENTS, embed, str(tmp_path), batch_size=2)
+    assert len(embed.embedded) == 3 and index.ids == ["water", "housing", "speech"]
+
+    # Same content: the existing files are mapped, nothing is embedded
+    again = build_index(DOCUMENTS, embed, str(tmp_path))
+    assert len(embed.embedded) == 3 and again.content_hash == index.content_hash
+
+    changed = DOCUMENTS[:2] + [("speech", "freedom of thought and religion")]
+    assert EmbeddingIndex.load(str(tmp_path), expected_hash=content_hash(changed)) is None
+    rebuilt = build_index(changed, embed, str(tmp_path))
+    assert len(embed.embedded) == 6 and rebuilt.content_hash == content_hash(changed)
+    # A different model invalidates the index too
+    assert content_hash(changed, "other-model") != rebuilt.content_hash
+
+
+def test_mapped_index_is_read_only_and_search_matches_exact_ranking(tmp_path):
+    embed = FakeEmbedder()
+    build_index(DOCUMENTS, embed, str(tmp_path))
+    index = EmbeddingIndex.load(str(tmp_path), expected_hash=content_hash(DOCUMENTS))
+
+    assert isinstance(index.vectors, np.memmap) and not index.vectors.flags.writeable
+    assert np.allclose(np.linalg.norm(index.vectors, axis=1), 1.0)
+
+    query = embed(["freedom of expression"])[0]
+    hits = index.search(query, k=2)
+    exact = embed([text for _, text in DOCUMENTS]) @ query
+    exact /= np.linalg.norm(embed([text for _, text in DOCUMENTS]), axis=1) * np.linalg.norm(query)
+    assert [doc_id for doc_id, _ in hits] == [DOCUMENTS[i][0] for i in np.argsort(-exact)[:2]]
+    assert hits[0][0] == "speech" and np.isclose(hits[0][1], exact.max())
+    assert len(index.search(query, k=10)) == 3
+
+
+def test_knowledge_base_maps_the_built_index(tmp_path):
+    embed = FakeEmbedder()
+    kb = HumanRightsKnowledgeBase(embed=embed, index_dir=str(tmp_path))
+    documents = len(kb.knowledge_documents)
+    assert kb.vector_store is not None and len(embed.embedded) == documents
+
+    results = kb.search_knowledge("freedom of opinion and expression", k=3)
+    assert results[0]["metadata"]["title"] == "UDHR Article 19"
+    relevance = [result["relevance"] for result in results]
+    assert relevance == sorted(relevance, reverse=True) and relevance[0] > relevance[-1]
+
+    # A second worker maps the same files and only embeds its queries
+    embed.embedded.clear()
+    worker = HumanRightsKnowledgeBase(embed=embed, index_dir=str(tmp_path))
+    assert embed.embedded == []
+    assert worker.search_knowledge("proof of activity", k=1)[0]["metadata"]["title"] == "DRP Proof of Activity"
+    assert embed.embedded == ["proof of activity"]
+
+    HumanRightsKnowledgeBase(embed=embed, index_dir=str(tmp_path), rebuild_index=True)
+    assert len(embed.embedded) == 1 + documents
+
+
+def test_offline_build_covers_the_index_the_service_searches(tmp_path):
+    built = build_knowledge_indexes(str(tmp_path), embed=FakeEmbedder())
+    assert set(built) == {HybridRetriever.INDEX_NAME, HumanRightsKnowledgeBase.INDEX_NAME}
+
+    # A worker starting afterwards maps both indexes without embedding a document
+    embed = FakeEmbedder()
+    retriever = HybridRetriever(ExternalKnowledgeBase(load_from_file=False), embed=embed, index_dir=str(tmp_path))
+    fallback = HumanRightsKnowledgeBase(embed=embed, index_dir=str(tmp_path))
+    assert retriever.index is not None and fallback.vector_store is not None
+    assert embed.embedded == []
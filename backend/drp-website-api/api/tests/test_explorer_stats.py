@@ -0,0 +1,101 @@
+"""
+Tests for precomputed explorer statistics.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.services.blockchain_service import BlockchainService
+from api.services.chain_follower import ChainFollower
+from api.services.chain_index_service import ChainIndexService
+from api.services.explorer_stats_service import STATS_CACHE_KEY, ExplorerStatsService, HyperLogLog
+from api.tests.test_chain_index import FakeChain
+from api.tests.test_read_through_cache import MemoryCache
+
+
+def test_hyperloglog_estimates_distinct_values():
+    sketch = HyperLogLog(precision=14)
+    for i in range(100_000):
+        sketch.add(f"0x{i % 50_000:040x}")
+    assert abs(sketch.count() - 50_000) / 50_000 < 0.03
+
+    small = HyperLogLog()
+    for address in ("0xa", "0xb", "0xa", "0xc"):
+        small.add(address)
+    assert small.count() == 3
+
+
+def test_counters_follow_ingestion_and_reorgs(tmp_path):
+    index = ChainIndexService(f"sqlite:///{tmp_path / 'chain.db'}")
+    cache = MemoryCache()
+    stats = ExplorerStatsService(index, cache_service=cache, window_seconds=60)
+    chain = FakeChain(head=9)
+    follower = ChainFollower(chain, index, batch_size=4, stats=stats)
+
+    async def run():
+        await follower.sync_once()
+        await stats.start()
+        chain.head = 40
+        await follower.sync_once()
+        live = await stats.get_stats()
+        exact = await index.get_stats()
+
+        chain.fork(38, "side")
+        chain.head = 41
+        await follower.sync_once()
+        # The reorg wakes the background job, which recounts and publishes
+        await asyncio.sleep(0.05)
+        after_reorg = stats.snapshot()
+        exact_after_reorg = await index.get_stats()
+
+        # A worker without the follower serves the published snapshot
+        reader = BlockchainService("http://127.0.0.1:9", "0xcontract", chain_index=index,
+                                   explorer_stats=ExplorerStatsService(index, cache_service=cache))
+        served = await reader.get_explorer_stats()
+        await stats.stop()
+        await reader.close()
+        return live, exact, after_reorg, exact_after_reorg, served
+
+    live, exact, after_reorg, exact_after_reorg, served = asyncio.run(run())
+    index.close()
+
+    for name in ("total_blocks", "total_transactions", "total_addresses", "latest_block"):
+        assert live[name] == exact[name]
+        assert after_reorg[name] == exact_after_reorg[name]
+    # FakeChain: a block every 5 seconds with 2 transactions
+    assert live["blocks_per_minute"] == 12
+    assert live["tps"] == 0.4
+    assert served == cache.data[STATS_CACHE_KEY] == after_reorg
+
+
+def test_returning_addresses_are_not_counted_as_new(tmp_path):
+    index = ChainIndexService(f"sqlite:///{tmp_path / 'chain.db'}")
+    chain = FakeChain(head=9)
+    # Indexed by an earlier process, so this service's sketch has not seen these blocks
+    asyncio.run(ChainFollower(chain, index).sync_once())
+    stats = ExplorerStatsService(index)
+
+    async def run():
+        await stats.reconcile()
+        chain.head = 30
+        # The same three addresses keep transacting
+        await ChainFollower(chain, index, stats=stats).sync_once()
+        return stats.snapshot(), await index.get_stats()
+
+    live, exact = asyncio.run(run())
+    index.close()
+    assert exact["total_addresses"] == 3
+    assert live["total_addresses"] == 3
+
+
+def test_stats_fall_back_to_exact_counts(tmp_path):
+    index = ChainIndexService(f"sqlite:///{tmp_path / 'chain.db'}")
+    asyncio.run(ChainFollower(FakeChain(head=3), index).sync_once())
+    service = BlockchainService("http://127.0.0.1:9", "0xcontract", chain_index=index,
+                                explorer_stats=ExplorerStatsService(index, cache_service=MemoryCache()))
+    stats = asyncio.run(service.get_explorer_stats())
+    assert stats["total_blocks"] == 4
+    index.close()
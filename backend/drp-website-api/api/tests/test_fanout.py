@@ -0,0 +1,107 @@
+"""
+Tests for concurrent fan-out in multi-call routes.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.routers import explorer, fanout, tokens, users
+from api.routers.fanout import fan_out
+
+ADDRESS = "0x" + "a" * 40
+
+
+class SlowBlockchainService:
+    """Every lookup takes 100 ms; rights never answers."""
+
+    async def get_token_balance(self, address, token_type):
+        await asyncio.sleep(0.1)
+        return {"balance": "1", "balance_formatted": 1e-18, "symbol": token_type}
+
+    async def get_user_profile(self, address):
+        await asyncio.sleep(0.1)
+        return {"username": "ana", "joined_date": "2026-01-01", "verification_level": 1}
+
+    async def get_rights(self, address):
+        await asyncio.sleep(60)
+
+    async def get_explorer_stats(self):
+        await asyncio.sleep(0.1)
+        return {"total_blocks": 3}
+
+    async def get_blocks(self, limit, offset):
+        await asyncio.sleep(0.1)
+        return []
+
+    async def get_transactions(self, address, limit, offset):
+        raise RuntimeError("indexer offline")
+
+    async def get_activity_feed(self, limit):
+        await asyncio.sleep(0.1)
+        return []
+
+
+def make_client():
+    app = FastAPI()
+    app.include_router(tokens.router, prefix="/tokens")
+    app.include_router(users.router, prefix="/users")
+    app.include_router(explorer.router, prefix="/explorer")
+    app.state.blockchain_service = SlowBlockchainService()
+    return TestClient(app)
+
+
+def test_latency_is_the_slowest_call_not_the_sum():
+    async def sleep_then(value, seconds):
+        await asyncio.sleep(seconds)
+        return value
+
+    async def run():
+        start = time.monotonic()
+        result = await fan_out({f"call{i}": sleep_then(i, 0.1) for i in range(5)})
+        return result, time.monotonic() - start
+
+    result, elapsed = asyncio.run(run())
+    assert result.values == {f"call{i}": i for i in range(5)}
+    assert not result.partial
+    assert elapsed < 0.3
+
+
+def test_timeouts_and_errors_give_partial_results():
+    async def run():
+        async def fail():
+            raise ValueError("boom")
+
+        return await fan_out(
+            {"ok": asyncio.sleep(0, result=1), "slow": asyncio.sleep(5), "bad": fail()},
+            timeouts={"slow": 0.05}
+        )
+
+    result = asyncio.run(run())
+    assert result.values == {"ok": 1}
+    assert set(result.errors) == {"slow", "bad"}
+    assert "timed out" in result.errors["slow"]
+
+
+def test_routes_fan_out(monkeypatch):
+    client = make_client()
+
+    start = time.monotonic()
+    balances = client.get(f"/tokens/balances/{ADDRESS}").json()
+    assert [b["token_type"] for b in balances] == ["RIGHTS", "DERI"]
+    assert time.monotonic() - start < 0.19
+
+    monkeypatch.setattr(fanout, "DEFAULT_CALL_TIMEOUT", 0.3)
+    profile = client.get(f"/users/{ADDRESS}").json()
+    assert profile["username"] == "ana"
+    assert profile["unavailable"] == ["rights"]
+
+    dashboard = client.get("/explorer/dashboard").json()
+    assert dashboard["stats"] == {"total_blocks": 3}
+    assert dashboard["unavailable"] == ["transactions"]
@@ -0,0 +1,88 @@
+"""
+Tests for hybrid BM25 + embedding retrieval with reciprocal-rank fusion.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.knowledge.human_rights_knowledge import HumanRightsKnowledgeBase, KnowledgeDocument
+from api.knowledge.hybrid_retriever import HybridRetriever, reciprocal_rank_fusion
+from api.services.ethical_langchain_service import EthicalLangChainService
+from api.tests.test_embedding_index import FakeEmbedder
+
+
+def make_retriever(tmp_path, **kwargs):
+    embed = FakeEmbedder()
+    kb = HumanRightsKnowledgeBase(load_from_file=False)
+    return HybridRetriever(kb, embed=embed, index_dir=str(tmp_path), **kwargs), embed
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([[(1, 9.0), (2, 5.0), (3, 1.0)], [(3, 0.9), (1, 0.8)]], [1.0, 1.0], k=60)
+    assert [doc for doc, _ in fused] == [1, 3, 2]
+    assert fused[0][1] == 1 / 61 + 1 / 62
+    # A weight scales one ranking's say
+    assert reciprocal_rank_fusion([[(1, 0)], [(2, 0)]], [1.0, 2.0])[0][0] == 2
+
+
+def test_hybrid_search_fuses_both_rankings(tmp_path):
+    retriever, _ = make_retriever(tmp_path)
+    results = retriever.search("freedom of opinion and expression", k=3)
+
+    assert results[0]["id"] == "udhr_article_19"
+    assert results[0]["scores"]["bm25"] > 0 and results[0]["scores"]["cosine"] > 0
+    fused = [result["scores"]["rrf"] for result in results]
+    assert fused == sorted(fused, reverse=True)
+    assert all(0 < result["relevance"] < results[0]["relevance"] <= 1.0 for result in results[1:])
+
+    # Lexical only: BM25 order, relevance as a share of the query's best possible score
+    lexical, _ = make_retriever(tmp_path, semantic_weight=0)
+    bm25 = lexical.knowledge_base.search_with_scores("freedom of opinion and expression", limit=3)
+    lexical_results = lexical.search("freedom of opinion and expression", k=3)
+    assert [result["id"] for result in lexical_results] == [doc.id for doc, _ in bm25]
+    assert lexical_results[0]["scores"]["cosine"] is None
+    assert 0 < lexical_results[0]["relevance"] < 1.0
+    assert lexical.search("nothing matches xyzzy") == []
+
+
+def test_filters_apply_to_both_retrievers(tmp_path):
+    retriever, _ = make_retriever(tmp_path)
+
+    in_category = retriever.search("rights", k=10, category="international_law")
+    assert {result["id"] for result in in_category} == {"iccpr_001", "icescr_001"}
+    tagged = retriever.search("freedom", k=10, tags=["religion"])
+    assert {result["id"] for result in tagged} == {"udhr_article_02", "udhr_article_18"}
+
+    assert asyncio.run(retriever.asearch("rights", k=10, category="international_law")) == in_category
+
+
+def test_index_follows_document_changes(tmp_path):
+    retriever, embed = make_retriever(tmp_path)
+    kb = retriever.knowledge_base
+    embedded = len(embed.embedded)
+    assert embedded == len(kb.documents)
+
+    kb.documents.append(KnowledgeDocument(
+        id="water", title="Right to water", content="Safe and clean drinking water and sanitation.",
+        source="test", category="economic_rights", tags=["water"], importance=3
+    ))
+    kb._build_indexes()
+    assert retriever.search("drinking water sanitation", k=1)[0]["id"] == "water"
+    assert len(embed.embedded) == embedded + len(kb.documents) + 1
+
+
+def test_query_knowledge_uses_context_filters(tmp_path):
+    service = EthicalLangChainService(provider="local")
+    service.retriever, _ = make_retriever(tmp_path)
+    service.retriever.knowledge_base = service.knowledge_base
+    service.retriever.refresh()
+
+    result = asyncio.run(service.query_knowledge("covenant", {"tags": "un_treaty"}, k=5))
+    assert {r["source"] for r in result["results"]} == {
+        "International Covenant on Civil and Political Rights",
+        "International Covenant on Economic, Social and Cultural Rights",
+    }
+    assert result["count"] == 2 and all(0 < r["relevance"] <= 1 for r in result["results"])
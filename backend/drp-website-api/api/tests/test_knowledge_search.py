@@ -0,0 +1,68 @@
+"""
+Tests for the knowledge base's inverted index and BM25 search.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.knowledge.human_rights_knowledge import HumanRightsKnowledgeBase, KnowledgeDocument
+from api.knowledge.search_index import InvertedIndex, analyze, parse_query, stem
+
+
+def test_analysis_stems_and_keeps_positions():
+    assert [stem(word) for word in ("rights", "verified", "verification", "ponies", "running")] == [
+        "right", "verifi", "verif", "poni", "run"
+    ]
+    # Stop words are dropped but keep their position
+    assert analyze("The right to life") == [("right", 1), ("life", 3)]
+    terms, phrases = parse_query('"right to life" for everyone')
+    assert terms == ["right", "life", "everyon"]
+    assert phrases == [[("right", 0), ("life", 2)]]
+
+
+def test_bm25_prefers_rare_terms_and_short_documents():
+    index = InvertedIndex()
+    index.add("Water", "clean water access for every community " * 2)
+    index.add("Water", "clean water access for every community and many other long unrelated words here")
+    index.add("Housing", "adequate housing for every community")
+    index.add("Empty", "")
+
+    ranked = index.search("water community")
+    assert [doc for doc, _ in ranked] == [0, 1, 2]
+    assert ranked[0][1] > ranked[1][1] > ranked[2][1] > 0
+    # "community" is in three of four documents; "housing" in one
+    assert index.idf("hous") > index.idf("commun")
+    assert index.search("nothing matches") == []
+
+
+def test_phrase_queries_match_by_position():
+    index = InvertedIndex()
+    index.add("Article 3", "Everyone has the right to life, liberty and security of person.")
+    index.add("Other", "Life is long; the right answer is not always clear.")
+    index.add("Title phrase", "right")
+
+    assert [doc for doc, _ in index.search('"right to life"')] == [0]
+    assert [doc for doc, _ in index.search('"life right"')] == []
+    # Title and content are separate position ranges
+    assert [doc for doc, _ in index.search('"title phrase right"')] == []
+
+
+def test_knowledge_base_search_ranks_and_filters():
+    kb = HumanRightsKnowledgeBase(load_from_file=False)
+    kb.documents.append(KnowledgeDocument(
+        id="extra", title="Water rights", content="Access to safe drinking water.",
+        source="test", category="extra_category", tags=["Water", "water"], importance=1
+    ))
+    kb._build_indexes()
+
+    assert kb.search('"freedom of opinion and expression"')[0].id == "udhr_article_19"
+    assert [doc.id for doc in kb.search("rights", category="extra_category")] == ["extra"]
+    assert [doc.id for doc in kb.search("access", tags=["water"])] == ["extra"]
+    assert kb.get_by_tag("water") == [kb.get_by_id("extra")]
+
+    results = kb.search_knowledge("freedom of expression", k=3)
+    relevance = [result["relevance"] for result in results]
+    assert len(results) == 3 and relevance == sorted(relevance, reverse=True)
+    assert relevance[0] > relevance[-1]
@@ -0,0 +1,160 @@
+"""
+Tests for the live feed hub and its SSE/WebSocket routes.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.routers import governance, live, notifications
+from api.routers.live import sse_events
+from api.services.live_feed_service import HEARTBEAT, LiveFeedService, SubscriptionClosed
+
+ADDRESS = "0x" + "a" * 40
+
+
+def test_events_reach_only_subscribers_of_their_topic():
+    async def run():
+        hub = LiveFeedService()
+        blocks = [hub.subscribe(["blocks"]) for _ in range(3)]
+        governance_only = hub.subscribe(["governance"])
+        await hub.publish("blocks", {"block_number": 7})
+        received = [await sub.next() for sub in blocks]
+        return hub, received, governance_only
+
+    hub, received, governance_only = asyncio.run(run())
+    assert received == [("blocks", '{"block_number": 7}')] * 3
+    assert not governance_only._buffer
+    assert hub.connections == 4 and hub.delivered == 3
+
+    with pytest.raises(ValueError):
+        hub.subscribe(["mempool"])
+    with pytest.raises(ValueError):
+        hub.subscribe(["notifications"])
+
+
+def test_slow_consumers_lose_oldest_events_or_are_disconnected():
+    async def run():
+        hub = LiveFeedService(buffer_size=3)
+        slow = hub.subscribe(["blocks"])
+        for number in range(5):
+            await hub.publish("blocks", {"block_number": number})
+        received = [await slow.next() for _ in range(4)]
+
+        strict = LiveFeedService(buffer_size=3, slow_consumer_policy="disconnect")
+        dropped = strict.subscribe(["blocks"])
+        for number in range(4):
+            await strict.publish("blocks", {"block_number": number})
+        drained = [await dropped.next() for _ in range(3)]
+        with pytest.raises(SubscriptionClosed):
+            await dropped.next()
+        return hub, received, strict, drained
+
+    hub, received, strict, drained = asyncio.run(run())
+    assert received[0] == ("dropped", '{"count": 2}')
+    assert [json.loads(data)["block_number"] for _, data in received[1:]] == [2, 3, 4]
+    assert hub.dropped == 2
+    assert len(drained) == 3
+    assert strict.connections == 0 and strict.disconnected == 1
+
+
+def test_sse_stream_format():
+    async def run():
+        hub = LiveFeedService()
+        subscription = hub.subscribe(["blocks"])
+        stream = sse_events(hub, subscription)
+        chunks = [await stream.__anext__()]
+        await hub.publish("blocks", {"block_number": 1})
+        chunks.append(await stream.__anext__())
+        hub.unsubscribe(subscription, "server shutdown")
+        chunks.append(await stream.__anext__())
+        return hub, chunks
+
+    hub, chunks = asyncio.run(run())
+    assert chunks == [
+        "retry: 3000\n\n",
+        'event: blocks\ndata: {"block_number": 1}\n\n',
+        'event: closed\ndata: {"reason": "server shutdown"}\n\n',
+    ]
+    assert hub.connections == 0
+
+
+def test_idle_clients_get_heartbeats():
+    async def run():
+        hub = LiveFeedService(heartbeat_interval=0.05)
+        await hub.start()
+        idle = hub.subscribe(["governance"])
+        message = await asyncio.wait_for(idle.next(), 1)
+        await hub.close()
+        return message
+
+    assert asyncio.run(run()) == HEARTBEAT
+
+
+class StubBlockchainService:
+    async def create_proposal(self, **kwargs):
+        return {"voting_end": "2026-11-01T00:00:00", "proposal_id": kwargs["proposal_id"]}
+
+
+def make_client():
+    app = FastAPI()
+    app.include_router(live.router, prefix="/live")
+    app.include_router(governance.router, prefix="/governance")
+    app.include_router(notifications.router, prefix="/notifications")
+    app.state.live_feed = LiveFeedService()
+    app.state.blockchain_service = StubBlockchainService()
+
+    @app.post("/publish/{topic}")
+    async def publish(topic: str, event: dict):
+        # Publish from the app's own event loop, as the routes do
+        await app.state.live_feed.publish(topic, event)
+
+    return TestClient(app), app.state.live_feed
+
+
+def test_websocket_receives_published_events():
+    client, hub = make_client()
+    proposal = {
+        "title": "Raise quorum", "description": "...", "proposer": ADDRESS,
+        "proposal_type": "parameter", "voting_period_days": 7
+    }
+    # Entering the client runs every request on one event loop, like a server does
+    with client, client.websocket_connect("/live/ws?topics=governance") as websocket:
+        assert client.post("/governance/proposals", json=proposal).status_code == 200
+        frame = websocket.receive_json()
+        assert frame["topic"] == "governance"
+        assert frame["data"]["event"] == "proposal_created"
+        assert frame["data"]["title"] == "Raise quorum"
+        websocket.send_text("ping")
+        assert websocket.receive_json() == {"message": "pong"}
+
+    with pytest.raises(WebSocketDisconnect), client:
+        with client.websocket_connect("/live/ws?topics=mempool") as websocket:
+            websocket.receive_json()
+
+
+def test_notifications_websocket_is_per_user():
+    client, hub = make_client()
+    with client, client.websocket_connect(f"/notifications/ws/{ADDRESS.upper().replace('0X', '0x')}") as websocket:
+        client.post(f"/publish/notifications:{'0x' + 'b' * 40}", json={"type": "other user"})
+        client.post(f"/publish/notifications:{ADDRESS}", json={"type": "activity_verified"})
+        assert websocket.receive_json() == {"topic": f"notifications:{ADDRESS}", "data": {"type": "activity_verified"}}
+
+
+def test_checksummed_notification_subscriptions_receive_pushes():
+    client, hub = make_client()
+    checksummed = "0x" + "Ab" * 20
+    with client, client.websocket_connect(f"/live/ws?topics=blocks,notifications:{checksummed}") as websocket:
+        client.post(f"/publish/notifications:{checksummed.lower()}", json={"type": "activity_verified"})
+        client.post("/publish/blocks", json={"block_number": 7})
+        frame = websocket.receive_json()
+    # The push arrives ahead of the block event
+    assert frame == {"topic": f"notifications:{checksummed.lower()}", "data": {"type": "activity_verified"}}
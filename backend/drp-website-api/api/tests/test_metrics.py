@@ -0,0 +1,65 @@
+"""
+Tests for the Prometheus metrics service and middleware.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.services.metrics_service import MetricsService, PROMETHEUS_AVAILABLE, route_label
+
+pytestmark = pytest.mark.skipif(not PROMETHEUS_AVAILABLE, reason="prometheus_client not installed")
+
+
+class FakeRoute:
+    def __init__(self, path):
+        self.path = path
+
+
+class FakeService:
+    async def get_balance(self, address):
+        return 1
+
+    async def fail(self):
+        raise RuntimeError("upstream down")
+
+
+class FakeCache:
+    hits = 3
+    misses = 1
+
+
+def test_route_label_restores_router_prefix():
+    scope = {"path": "/api/v1/tokens/balance/0xabc", "route": FakeRoute("/balance/{address}")}
+    assert route_label(scope) == "/api/v1/tokens/balance/{address}"
+    scope = {"path": "/api/v1/tokens/balance/0xabc", "route": FakeRoute("/api/v1/tokens/balance/{address}")}
+    assert route_label(scope) == "/api/v1/tokens/balance/{address}"
+    assert route_label({"path": "/nope"}) == "unmatched"
+
+
+def test_instrumented_service_records_latency_and_errors():
+    metrics = MetricsService()
+    service = FakeService()
+    metrics.instrument(service, "blockchain")
+
+    assert asyncio.run(service.get_balance("0x1")) == 1
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.fail())
+
+    registry = metrics.registry
+    labels = {"service": "blockchain", "method": "get_balance"}
+    assert registry.get_sample_value("drp_upstream_call_duration_seconds_count", labels) == 1
+    assert registry.get_sample_value(
+        "drp_upstream_call_errors_total", {"service": "blockchain", "method": "fail"}
+    ) == 1
+
+
+def test_cache_hit_ratio_is_read_at_scrape_time():
+    metrics = MetricsService()
+    metrics.track_cache(FakeCache())
+    assert metrics.registry.get_sample_value("drp_cache_hit_ratio") == 0.75
+    assert b'drp_cache_requests_total{result="hit"} 3.0' in metrics.render()
@@ -0,0 +1,185 @@
+"""
+Tests for stored notifications: fan-out, settings, counters and the routes.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.routers import notifications
+from api.services.live_feed_service import PUBLISH_BATCH_SIZE, LiveFeedService
+from api.services.notification_service import NotificationService
+from api.tests.test_cache_service import FakeRedis
+
+ALICE = "0x" + "a" * 40
+BOB = "0x" + "b" * 40
+CAROL = "0x" + "c" * 40
+
+
+def make_service(tmp_path, **kwargs) -> NotificationService:
+    return NotificationService(f"sqlite:///{tmp_path / 'notifications.db'}", **kwargs)
+
+
+def test_fan_out_applies_settings_and_counts_incrementally(tmp_path):
+    async def run():
+        hub = LiveFeedService()
+        service = make_service(tmp_path, live_feed=hub, batch_size=2)
+        await service.start()
+        await service.update_settings(BOB, {"governance_notifications": False})
+        await service.update_settings(CAROL, {"push_enabled": False})
+        alice_stream = hub.subscribe([f"notifications:{ALICE}"])
+        carol_stream = hub.subscribe([f"notifications:{CAROL}"])
+
+        await service.notify_many([ALICE, BOB, CAROL.upper().replace("0X", "0x")], "proposal_created", "New", "Vote")
+        await service.notify(BOB, "activity_verified", "Verified", "Rewarded", {"reward_amount": 50})
+        await service.flush()
+
+        counts = {user: await service.get_counts(user) for user in (ALICE, BOB, CAROL)}
+        pushed = await alice_stream.next()
+        await service.close()
+        return counts, pushed, carol_stream
+
+    counts, pushed, carol_stream = asyncio.run(run())
+    assert counts[ALICE] == {"unread": 1, "total": 1}
+    # Bob opted out of governance, but still gets activity notifications
+    assert counts[BOB] == {"unread": 1, "total": 1}
+    # Carol's notification is stored but not pushed
+    assert counts[CAROL] == {"unread": 1, "total": 1}
+    assert not carol_stream._buffer
+    assert pushed[0] == f"notifications:{ALICE}"
+    assert '"type": "proposal_created"' in pushed[1]
+
+
+def test_broadcast_reaches_known_users_who_have_not_opted_out(tmp_path):
+    async def run():
+        service = make_service(tmp_path)
+        for user in (ALICE, BOB, CAROL):
+            await service.notify(user, "welcome", "Welcome", "Hello")
+        await service.update_settings(BOB, {"governance_notifications": False})
+        queued = await service.broadcast("proposal_created", "New", "Vote")
+        return queued, {user: await service.get_counts(user) for user in (ALICE, BOB, CAROL)}
+
+    queued, counts = asyncio.run(run())
+    assert queued == 2
+    assert counts[ALICE]["total"] == 2 and counts[CAROL]["total"] == 2
+    assert counts[BOB]["total"] == 1
+
+
+class CountingRedis(FakeRedis):
+    def __init__(self):
+        super().__init__()
+        self.pipelines = 0
+
+    def pipeline(self, transaction=True):
+        self.pipelines += 1
+        return super().pipeline(transaction)
+
+
+def test_live_pushes_for_many_recipients_are_pipelined(tmp_path):
+    users = [f"0x{i:040x}" for i in range(PUBLISH_BATCH_SIZE + 10)]
+
+    async def run():
+        redis = CountingRedis()
+        hub = LiveFeedService(redis_client=redis)
+        await hub.start()
+        await asyncio.sleep(0)
+        stream = hub.subscribe([f"notifications:{users[-1]}"])
+        service = make_service(tmp_path, live_feed=hub, batch_size=len(users))
+        await service.notify_many(users, "proposal_created", "New", "Vote")
+        pushed = await asyncio.wait_for(stream.next(), timeout=1.0)
+        await hub.close()
+        return redis.pipelines, pushed
+
+    pipelines, pushed = asyncio.run(run())
+    # Two pipelined round trips instead of one per recipient
+    assert pipelines == 2
+    assert pushed[0] == f"notifications:{users[-1]}"
+
+
+def test_read_and_delete_keep_counters_exact(tmp_path):
+    async def run():
+        service = make_service(tmp_path)
+        for n in range(4):
+            await service.notify(ALICE, "welcome", f"#{n}", "Hello")
+        first, second, third, fourth = await service.get_notifications(ALICE)
+
+        assert await service.mark_read(first["notification_id"])
+        # Marking it again does not decrement the counter twice
+        assert await service.mark_read(first["notification_id"])
+        after_read = await service.get_counts(ALICE)
+
+        assert await service.delete(first["notification_id"])
+        assert await service.delete(second["notification_id"])
+        after_delete = await service.get_counts(ALICE)
+        missing = await service.delete(second["notification_id"])
+
+        unread = await service.get_notifications(ALICE, unread_only=True)
+        await service.mark_all_read(ALICE)
+        return after_read, after_delete, missing, unread, await service.get_counts(ALICE)
+
+    after_read, after_delete, missing, unread, after_all = asyncio.run(run())
+    assert after_read == {"unread": 3, "total": 4}
+    assert after_delete == {"unread": 2, "total": 2}
+    assert missing is False
+    assert len(unread) == 2
+    assert after_all == {"unread": 0, "total": 2}
+
+
+def make_client(tmp_path):
+    app = FastAPI()
+    app.include_router(notifications.router, prefix="/notifications")
+    app.state.live_feed = LiveFeedService()
+    app.state.notification_service = make_service(tmp_path, live_feed=app.state.live_feed)
+
+    @app.post("/notify/{user_address}")
+    async def notify(user_address: str):
+        # Notify from the app's own event loop, as the routes do
+        await app.state.notification_service.notify(user_address, "activity_verified", "Verified", "Rewarded")
+
+    return TestClient(app)
+
+
+def test_routes_page_with_cursor_and_update_state(tmp_path):
+    client = make_client(tmp_path)
+    with client:
+        for _ in range(3):
+            client.post(f"/notify/{ALICE}")
+
+        first = client.get(f"/notifications/{ALICE}?limit=2")
+        assert first.status_code == 200 and len(first.json()) == 2
+        rest = client.get(f"/notifications/{ALICE}?limit=2&cursor={first.headers['X-Next-Cursor']}")
+        assert len(rest.json()) == 1 and "X-Next-Cursor" not in rest.headers
+        ids = [n["notification_id"] for n in first.json() + rest.json()]
+        assert len(set(ids)) == 3
+
+        assert client.post(f"/notifications/{ids[0]}/read").status_code == 200
+        assert client.delete(f"/notifications/{ids[1]}").status_code == 200
+        assert client.delete(f"/notifications/{ids[1]}").status_code == 404
+        assert client.get(f"/notifications/{ALICE}/unread-count").json() == {
+            "user_address": ALICE, "unread": 1, "total": 2
+        }
+
+        settings = {"user_address": ALICE, "activity_notifications": False}
+        assert client.post(f"/notifications/{ALICE}/settings", json=settings).json()["activity_notifications"] is False
+        assert client.get(f"/notifications/{ALICE}/settings").json()["activity_notifications"] is False
+        client.post(f"/notify/{ALICE}")
+        assert client.get(f"/notifications/{ALICE}/unread-count").json()["total"] == 2
+
+        assert client.get(f"/notifications/{ALICE}?cursor=bogus").status_code == 400
+
+
+def test_websocket_delivers_stored_notifications(tmp_path):
+    client = make_client(tmp_path)
+    with client, client.websocket_connect(f"/notifications/ws/{ALICE}") as websocket:
+        client.post(f"/notify/{BOB}")
+        client.post(f"/notify/{ALICE}")
+        frame = websocket.receive_json()
+        assert frame["topic"] == f"notifications:{ALICE}"
+        assert frame["data"]["type"] == "activity_verified"
+        stored = client.get(f"/notifications/{ALICE}").json()
+        assert frame["data"]["notification_id"] == stored[0]["notification_id"]
@@ -0,0 +1,103 @@
+"""
+Tests for keyset cursor pagination of list endpoints.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.routers import explorer, notifications
+from api.services.blockchain_service import BlockchainService
+from api.services.chain_follower import ChainFollower
+from api.services.chain_index_service import ChainIndexService
+from api.services.notification_service import NotificationService
+from api.services.pagination import NEXT_CURSOR_HEADER, InvalidCursor, decode_cursor, encode_cursor
+from api.tests.test_chain_index import ALICE, FakeChain
+
+
+def make_client(tmp_path):
+    index = ChainIndexService(f"sqlite:///{tmp_path / 'chain.db'}")
+    asyncio.run(ChainFollower(FakeChain(head=29), index).sync_once())
+
+    app = FastAPI()
+    app.include_router(explorer.router, prefix="/explorer")
+    app.include_router(notifications.router, prefix="/notifications")
+    app.state.blockchain_service = BlockchainService("http://127.0.0.1:9", "0xcontract", chain_index=index)
+    return TestClient(app), index
+
+
+def walk(client, path, **params):
+    """Follow next cursors from the first page to the last."""
+    pages = []
+    cursor = None
+    while True:
+        response = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(("2026-01-01T00:00:00", "abc"))
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 2) == ("2026-01-01T00:00:00", "abc")
+    assert decode_cursor(None, 2) is None
+    for bad in ("not a cursor!", encode_cursor([1])):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(bad, 2)
+
+
+def test_cursor_pages_match_offset_listing(tmp_path):
+    client, index = make_client(tmp_path)
+
+    everything = client.get("/explorer/transactions", params={"limit": 1000}).json()
+    pages = walk(client, "/explorer/transactions", limit=7)
+    assert [tx for page in pages for tx in page] == everything
+    assert len(everything) == 60 and all(len(page) == 7 for page in pages[:-1])
+
+    alice = walk(client, "/explorer/transactions", limit=4, address=ALICE)
+    assert sum(len(page) for page in alice) == 30
+
+    blocks = walk(client, "/explorer/blocks", limit=8)
+    assert [block["block_number"] for page in blocks for block in page] == list(range(29, -1, -1))
+
+    assert client.get("/explorer/blocks", params={"cursor": "garbage"}).status_code == 400
+    index.close()
+
+
+def test_deep_pages_do_not_use_offset(tmp_path):
+    client, index = make_client(tmp_path)
+    statements = []
+    event.listen(index.engine, "before_cursor_execute", lambda *args: statements.append(args[2:4]))
+
+    first = client.get("/explorer/transactions", params={"limit": 5, "offset": 50})
+    statements.clear()
+    client.get("/explorer/transactions", params={"limit": 5, "cursor": first.headers[NEXT_CURSOR_HEADER]})
+
+    # The keyset page reads exactly `limit` rows, whatever its depth
+    statement, parameters = statements[-1]
+    assert "tx_index <" in statement
+    assert tuple(parameters[-2:]) == (5, 0)
+    index.close()
+
+
+def test_notifications_cursor(tmp_path):
+    client, index = make_client(tmp_path)
+    service = NotificationService(f"sqlite:///{tmp_path / 'notifications.db'}")
+    client.app.state.notification_service = service
+    for n in range(3):
+        asyncio.run(service.notify(ALICE, "welcome", f"#{n}", "Hello"))
+    pages = walk(client, f"/notifications/{ALICE}", limit=2)
+    assert [len(page) for page in pages] == [2, 1]
+    ids = [n["notification_id"] for page in pages for n in page]
+    assert len(set(ids)) == 3
+    index.close()
@@ -0,0 +1,133 @@
+"""
+Tests for the normalized-query cache of knowledge queries and concept explanations.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.knowledge.human_rights_knowledge import KnowledgeDocument
+from api.services.ethical_langchain_service import EthicalLangChainService
+from api.services.query_cache import (
+    EXPLANATION_TTL,
+    FALLBACK_EXPLANATION_TTL,
+    QueryCache,
+    normalize_query,
+)
+from api.tests.test_read_through_cache import MemoryCache
+
+
+def test_keys_ignore_case_spacing_and_punctuation():
+    cache = QueryCache(MemoryCache(), version=lambda: "v1")
+    assert normalize_query("  What is\tProof  of Activity? ") == "what is proof of activity"
+
+    key = cache.cache_key("explain", "what is proof of activity", user_level="beginner")
+    assert cache.cache_key("explain", "WHAT IS  proof of activity?", user_level="beginner") == key
+    assert cache.cache_key("explain", "what is proof of activity", user_level="advanced") != key
+    assert cache.cache_key("query", "article 19", {"k": 5}) != cache.cache_key("query", "article 19", {"k": 3})
+    assert cache.cache_key("query", "a", {"x": 1, "y": 2}) == cache.cache_key("query", "a", {"y": 2, "x": 1})
+
+
+def test_results_follow_the_knowledge_base_version():
+    version = ["v1"]
+    cache = QueryCache(MemoryCache(), version=lambda: version[0])
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"answer": len(calls)}
+
+    async def run():
+        # Concurrent misses share one computation
+        first = await asyncio.gather(*[cache.get_or_compute("query", "Article 19", compute) for _ in range(5)])
+        again = await cache.get_or_compute("query", " article   19 ", compute)
+        version[0] = "v2"
+        changed = await cache.get_or_compute("query", "article 19", compute)
+        return first, again, changed
+
+    first, again, changed = asyncio.run(run())
+    assert [result for result, _ in first] == [{"answer": 1}] * 5
+    assert again == ({"answer": 1}, "hit")
+    assert changed == ({"answer": 2}, "miss")
+    assert cache.stats()["hits"] == 1
+
+
+def test_near_duplicate_questions_hit_above_the_threshold():
+    vectors = {
+        "what is proof of activity": [1.0, 0.0, 0.0],
+        "what's proof of activity": [0.99, 0.1, 0.0],
+        "what is proof of status": [0.6, 0.8, 0.0],
+    }
+    cache = QueryCache(MemoryCache(), version=lambda: "v1", embed_query=vectors.get, semantic_threshold=0.95)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return f"answer {len(calls)}"
+
+    async def run():
+        await cache.get_or_compute("explain", "What is proof of activity?", compute, user_level="beginner")
+        near = await cache.get_or_compute("explain", "what's proof of activity", compute, user_level="beginner")
+        other = await cache.get_or_compute("explain", "what is proof of status", compute, user_level="beginner")
+        # Other levels are a separate scope
+        level = await cache.get_or_compute("explain", "what's proof of activity", compute, user_level="advanced")
+        return near, other, level
+
+    near, other, level = asyncio.run(run())
+    assert near == ("answer 1", "semantic")
+    assert other == ("answer 2", "miss")
+    assert level == ("answer 3", "miss")
+    assert cache.stats()["semantic_hits"] == 1
+
+
+class CountingChain:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    async def ainvoke(self, inputs):
+        self.calls.append(inputs)
+        if self.fail:
+            raise RuntimeError("LLM unavailable")
+        return f"Explanation of {inputs['concept']} for {inputs['user_level']}"
+
+
+def test_service_caches_explanations_and_knowledge_queries():
+    memory = MemoryCache()
+    service = EthicalLangChainService(provider="local", cache_service=memory)
+    service.explanation_chain = CountingChain()
+
+    async def run():
+        first = await service.explain_concept("What is Proof of Activity?", "beginner")
+        repeat = await service.explain_concept("  what is proof of activity ", "beginner")
+        query = await service.query_knowledge("Freedom of Expression")
+        repeat_query = await service.query_knowledge("freedom of  expression?")
+        return first, repeat, query, repeat_query
+
+    first, repeat, query, repeat_query = asyncio.run(run())
+    assert first == repeat and len(service.explanation_chain.calls) == 1
+    assert EXPLANATION_TTL in memory.ttls.values()
+    assert repeat_query["results"] == query["results"] and repeat_query["query"] == "freedom of  expression?"
+    assert service.query_cache.stats()["hits"] == 2
+
+    # New documents change the version: the next query is answered from them
+    service.knowledge_base.documents.append(KnowledgeDocument(
+        id="expression_online", title="Freedom of expression online", content="Freedom of expression online.",
+        source="test", category="freedom_rights", importance=5
+    ))
+    service.knowledge_base._build_indexes()
+    fresh = asyncio.run(service.query_knowledge("freedom of expression"))
+    assert "Freedom of expression online" in [r["title"] for r in fresh["results"]]
+
+
+def test_fallback_explanations_are_kept_briefly():
+    memory = MemoryCache()
+    service = EthicalLangChainService(provider="local", cache_service=memory)
+    service.explanation_chain = CountingChain(fail=True)
+
+    explanation = asyncio.run(service.explain_concept("proof of status", "beginner"))
+    assert explanation.startswith("Proof of Status (PoST)")
+    assert list(memory.ttls.values()) == [FALLBACK_EXPLANATION_TTL]
@@ -0,0 +1,178 @@
+"""
+Tests for the BlockchainService read-through cache.
+"""
+
+import asyncio
+import fnmatch
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.services.blockchain_service import BALANCE_TTL, NEGATIVE_TTL, BlockchainService
+from api.services.cache_service import NEGATIVE_RESULT
+
+
+class MemoryCache:
+    """In-process stand-in for CacheService."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl=3600):
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def get_many(self, keys):
+        self.batch_reads = getattr(self, "batch_reads", 0) + 1
+        return [self.data.get(key) for key in keys]
+
+    async def set_many(self, items, ttl=3600):
+        for key, value in items.items():
+            await self.set(key, value, ttl)
+
+    async def delete_pattern(self, pattern):
+        for key in [k for k in self.data if fnmatch.fnmatchcase(k, pattern)]:
+            del self.data[key]
+
+
+def make_service(cache):
+    calls = []
+
+    async def rpc(request):
+        calls.append(request.url.path)
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, json={"balance": "2000000000000000000"})
+
+    service = BlockchainService("http://rpc.test", "0xcontract", cache_service=cache)
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(rpc))
+    return service, calls
+
+
+def test_concurrent_misses_share_one_upstream_call():
+    async def run():
+        service, calls = make_service(MemoryCache())
+        results = await asyncio.gather(*[
+            service.get_token_balance("0xAbC", "RIGHTS") for _ in range(20)
+        ])
+        # Later reads are served from the cache
+        await service.get_token_balance("0xabc", "RIGHTS")
+        await service.close()
+        return results, calls
+
+    results, calls = asyncio.run(run())
+    assert calls == ["/balance"]
+    assert {r["balance_formatted"] for r in results} == {2.0}
+
+
+def test_transfer_invalidates_balances():
+    async def run():
+        cache = MemoryCache()
+        service, calls = make_service(cache)
+        await service.get_token_balance("0xa", "RIGHTS")
+        await service.get_token_balance("0xb", "RIGHTS")
+        await service.transfer_tokens("0xA", "0xB", "1", "RIGHTS")
+        await service.get_token_balance("0xa", "RIGHTS")
+        await service.close()
+        return calls
+
+    assert len(asyncio.run(run())) == 3
+
+
+def test_balance_errors_are_not_cached():
+    async def run():
+        cache = MemoryCache()
+        service, _ = make_service(cache)
+        requests = []
+
+        async def flaky_rpc(request):
+            requests.append(request)
+            if len(requests) == 1:
+                return httpx.Response(502)
+            return httpx.Response(200, json={"balance": "2000000000000000000"})
+
+        service.client = httpx.AsyncClient(transport=httpx.MockTransport(flaky_rpc))
+        failed = await service.get_token_balance("0xa", "RIGHTS")
+        cached_after_failure = dict(cache.data)
+        recovered = await service.get_token_balance("0xa", "RIGHTS")
+        await service.close()
+        return failed, cached_after_failure, recovered
+
+    failed, cached_after_failure, recovered = asyncio.run(run())
+    assert failed is None and cached_after_failure == {}
+    assert recovered["balance_formatted"] == 2.0
+
+
+def test_negative_results_and_per_method_ttls():
+    async def run():
+        cache = MemoryCache()
+        service, _ = make_service(cache)
+        assert await service.get_proposal("p-1") is None
+        negative = dict(cache.data)
+        # A cached "not found" is still returned as None
+        assert await service.get_proposal("p-1") is None
+        await service.vote_on_proposal("p-1", "0xvoter", "for")
+        after_vote = dict(cache.data)
+        await service.get_token_balance("0xa", "DERI")
+        await service.get_transaction("0xfeed")
+        await service.close()
+        return negative, after_vote, cache.ttls
+
+    negative, after_vote, ttls = asyncio.run(run())
+    assert list(negative.values()) == [NEGATIVE_RESULT]
+    # The proposal's entry is gone; only the proposal list generation was written
+    assert list(after_vote) == ["blockchain:generation:get_proposals"]
+    assert ttls["blockchain:get_proposal:p-1"] == NEGATIVE_TTL
+    assert ttls["blockchain:get_token_balance:0xa:DERI"] == BALANCE_TTL
+    assert ttls["blockchain:get_transaction:0xfeed"] == NEGATIVE_TTL
+
+
+def test_balances_for_both_tokens_use_one_cache_read():
+    async def run():
+        cache = MemoryCache()
+        service, calls = make_service(cache)
+        first = await service.get_token_balances(["0xa"])
+        upstream = len(calls)
+        second = await service.get_token_balances(["0xA"])
+        await service.close()
+        return first, second, upstream, len(calls), cache
+
+    first, second, upstream, total_upstream, cache = asyncio.run(run())
+    assert first["0xa"] == second["0xA"]
+    assert set(first["0xa"]) == {"RIGHTS", "DERI"}
+    # The second call is answered by one cache read, without touching the RPC
+    assert total_upstream == upstream
+    assert cache.batch_reads == 2
+
+
+def test_list_invalidation_drops_every_page():
+    async def run():
+        cache = MemoryCache()
+        service, _ = make_service(cache)
+        await service.get_proposals()
+        await service.get_proposals("active", 10, 20)
+        await service.get_transactions("0xa")
+        before = set(cache.data)
+        await service.vote_on_proposal("p-1", "0xvoter", "for")
+        await service.get_proposals()
+        await service.get_proposals("active", 10, 20)
+        await service.get_transactions("0xa")
+        await service.close()
+        return before, set(cache.data) - before
+
+    before, added = asyncio.run(run())
+    assert "blockchain:get_transactions:g0:0xa:50:0:None" in before
+    # One generation write, then both proposal pages miss; other lists keep their entries
+    generation, *pages = sorted(added)
+    assert generation == "blockchain:generation:get_proposals"
+    assert len(pages) == 2 and all(page.startswith("blockchain:get_proposals:g") for page in pages)
+    assert not pages[0].startswith("blockchain:get_proposals:g0:")
@@ -0,0 +1,52 @@
+"""
+Tests for the compiled term matcher behind HumanRightsFilter and BiasDetector.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.services.ethical_langchain_service import BiasDetector, ContentSafetyLevel, HumanRightsFilter
+from api.services.term_matcher import TermMatcher, inflections
+
+
+def test_matches_whole_words_phrases_and_inflections():
+    matcher = TermMatcher({
+        "violence": ["kill", "harm", "abuse"],
+        "exploitation": ["traffic", "forced labor"],
+        "gender": ["he", "she"],
+    })
+    assert {"killed", "killing", "kills"} <= inflections("kill")
+    assert {"abused", "abusing", "abusive"} <= inflections("abuse")
+    assert "trafficking" in inflections("traffic")
+    assert inflections("he") == {"he"}
+
+    text = "He was killed. Killing and abuse; FORCED   labor and trafficking. She, she!"
+    assert matcher.scan(text) == {
+        "violence": {"kill": 2, "abuse": 1},
+        "exploitation": {"forced labor": 1, "traffic": 1},
+        "gender": {"he": 1, "she": 2},
+    }
+    # No hits inside other words
+    assert matcher.scan("The pharmacy shelters them in harmony; forced to labor") == {}
+
+
+def test_filter_and_detector_ignore_words_containing_terms():
+    content_filter = HumanRightsFilter(strict=True)
+    level, details = content_filter.check_content("The pharmacy supports the community with free medicine.")
+    assert level == ContentSafetyLevel.SAFE
+    assert details["positive_categories"] == ["community"]
+
+    level, details = content_filter.check_content("They were trafficked and tortured. We teach human rights.")
+    assert level == ContentSafetyLevel.UNSAFE
+    assert details["banned_categories"] == ["violence", "exploitation"]
+    assert details["positive_categories"] == ["education", "human_rights"]
+
+    detector = BiasDetector()
+    assert not detector.detect_bias("The theme of these other thesis chapters")["bias_detected"]
+    result = detector.detect_bias("She said he was young. She and he and she.")
+    assert result["detected_biases"] == ["gender", "age"]
+    # Five gender mentions in one attribute, scored from the single scan's counts
+    assert result["confidence_scores"] == {"gender": 0.95, "age": 0.4}
+    assert result["severity"] == "medium"
@@ -0,0 +1,269 @@
+"""
+Tests for the governance vote ledger, weighted tallies and the voting routes.
+"""
+
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, update
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from api.routers import governance
+from api.services.blockchain_service import BlockchainService
+from api.services.vote_ledger_service import (
+    DuplicateVote,
+    UnknownProposal,
+    VoteEntry,
+    VoteLedgerService,
+    VotingClosed,
+)
+from api.tests.test_read_through_cache import MemoryCache
+
+ALICE = "0x" + "a" * 40
+BOB = "0x" + "b" * 40
+CAROL = "0x" + "c" * 40
+# 10^24 wei: well beyond a 64-bit integer
+WHALE = 10 ** 24
+
+
+def make_ledger(tmp_path) -> VoteLedgerService:
+    return VoteLedgerService(f"sqlite:///{tmp_path / 'votes.db'}")
+
+
+def test_votes_update_running_tallies_once_per_address(tmp_path):
+    ledger = make_ledger(tmp_path)
+
+    async def run():
+        await ledger.open_proposal("p-1", snapshot_block=100)
+        await ledger.record_vote("p-1", ALICE, "for", WHALE)
+        await ledger.record_vote("p-1", BOB, "against", 3 * 10 ** 18)
+        with pytest.raises(DuplicateVote):
+            await ledger.record_vote("p-1", ALICE.upper().replace("0X", "0x"), "against", 1)
+        await ledger.record_vote("p-1", CAROL, "abstain", 0)
+        with pytest.raises(UnknownProposal):
+            await ledger.record_vote("p-2", ALICE, "for", 1)
+
+        await ledger.open_proposal("closed", snapshot_block=100, voting_end=datetime.utcnow() - timedelta(seconds=1))
+        with pytest.raises(VotingClosed):
+            await ledger.record_vote("closed", ALICE, "for", 1)
+        return await ledger.get_results("p-1"), await ledger.recount("p-1")
+
+    results, report = asyncio.run(run())
+    assert results["weights"] == {"for": str(WHALE), "against": str(3 * 10 ** 18), "abstain": "0"}
+    assert results["votes_for"] == 1e6 and results["votes_against"] == 3.0
+    assert results["voters"] == {"for": 1, "against": 1, "abstain": 1}
+    assert results["total_votes"] == 3
+    assert report["verified"] and report["chain_valid"]
+    assert report["recounted"]["ledger_hash"] == results["ledger_hash"]
+    ledger.close()
+
+
+def test_recount_detects_tampering_and_weight_mismatches(tmp_path):
+    ledger = make_ledger(tmp_path)
+
+    async def run():
+        await ledger.open_proposal("p-1", snapshot_block=100, weighting="post")
+        for voter, level in ((ALICE, 3), (BOB, 1), (CAROL, 2)):
+            await ledger.record_vote("p-1", voter, "for", level)
+        against_chain = await ledger.recount("p-1", {ALICE: 3, BOB: 2})
+
+        # Rewrite a recorded weight behind the ledger's back
+        with ledger.SessionLocal() as session:
+            session.execute(update(VoteEntry).where(VoteEntry.voter == BOB).values(weight="5"))
+            session.commit()
+        return against_chain, await ledger.recount("p-1")
+
+    against_chain, tampered = asyncio.run(run())
+    assert not against_chain["verified"] and against_chain["chain_valid"]
+    assert against_chain["weight_mismatches"] == [{"voter": BOB, "recorded": "1", "snapshot": "2"}]
+    assert against_chain["recounted"]["votes_for"] == 7.0
+    assert not tampered["verified"] and tampered["chain_broken_at"] == 2
+    ledger.close()
+
+
+class FakeRPC:
+    """JSON-RPC node answering balances as of a block; records every lookup."""
+
+    def __init__(self, head: int = 100):
+        self.head = head
+        # address -> [(from_block, balance)]
+        self.history = {}
+        self.lookups = []
+
+    def balance_at(self, address: str, block: int) -> int:
+        balance = 0
+        for from_block, value in self.history.get(address, []):
+            if from_block <= block:
+                balance = value
+        return balance
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        replies = []
+        for call in json.loads(request.content):
+            params = call["params"]
+            if call["method"] == "drp_blockNumber":
+                if self.head is None:
+                    replies.append({"jsonrpc": "2.0", "id": call["id"], "error": {"message": "unavailable"}})
+                    continue
+                result = self.head
+            else:
+                self.lookups.append((params["address"], params["block"]))
+                result = {"balance": str(self.balance_at(params["address"], params["block"]))}
+            replies.append({"jsonrpc": "2.0", "id": call["id"], "result": result})
+        return httpx.Response(200, json=replies)
+
+
+def make_client(tmp_path, cache_service=None):
+    rpc = FakeRPC()
+    service = BlockchainService(
+        "http://rpc.test", "0xcontract", cache_service=cache_service, vote_ledger=make_ledger(tmp_path)
+    )
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(rpc.handler))
+    app = FastAPI()
+    app.include_router(governance.router, prefix="/governance")
+    app.state.blockchain_service = service
+    return TestClient(app), rpc
+
+
+def vote(client, proposal_id, voter, choice):
+    return client.post(f"/governance/proposals/{proposal_id}/vote", json={
+        "proposal_id": proposal_id, "voter": voter, "vote": choice
+    })
+
+
+def test_votes_are_weighted_at_the_snapshot_block(tmp_path):
+    client, rpc = make_client(tmp_path)
+    rpc.history = {ALICE: [(0, 5 * 10 ** 18)], BOB: [(0, 2 * 10 ** 18)]}
+    with client:
+        created = client.post("/governance/proposals", json={
+            "title": "Raise quorum", "description": "...", "proposer": ALICE, "proposal_type": "parameter"
+        })
+        proposal_id = created.json()["proposal_id"]
+
+        # Tokens acquired after the snapshot do not count
+        rpc.head = 120
+        rpc.history[BOB].append((110, 50 * 10 ** 18))
+        first = vote(client, proposal_id, ALICE, "for")
+        assert first.status_code == 200 and first.json()["weight"] == str(5 * 10 ** 18)
+        assert first.json()["receipt"]
+        assert vote(client, proposal_id, BOB, "against").json()["weight"] == str(2 * 10 ** 18)
+        assert vote(client, proposal_id, BOB, "for").status_code == 409
+        assert vote(client, "missing", BOB, "for").status_code == 404
+        assert vote(client, proposal_id, CAROL, "maybe").status_code == 400
+
+        results = client.get(f"/governance/proposals/{proposal_id}/results").json()
+        assert results["snapshot_block"] == 100
+        assert (results["votes_for"], results["votes_against"], results["total_votes"]) == (5.0, 2.0, 2)
+        assert {block for _, block in rpc.lookups} == {100}
+        assert client.get("/governance/proposals/missing/results").status_code == 404
+
+        lookups = len(rpc.lookups)
+        report = client.get(f"/governance/proposals/{proposal_id}/results/recount").json()
+        assert report["verified"] and report["weights_checked"]
+        # The recount asks the node for every voter's weight again
+        assert len(rpc.lookups) == lookups + 2
+
+
+def test_recount_is_cached_until_the_ledger_changes(tmp_path):
+    client, rpc = make_client(tmp_path, cache_service=MemoryCache())
+    rpc.history = {ALICE: [(0, 5 * 10 ** 18)], BOB: [(0, 2 * 10 ** 18)]}
+    with client:
+        created = client.post("/governance/proposals", json={
+            "title": "Raise quorum", "description": "...", "proposer": ALICE, "proposal_type": "parameter"
+        })
+        proposal_id = created.json()["proposal_id"]
+        recount = f"/governance/proposals/{proposal_id}/results/recount"
+        vote(client, proposal_id, ALICE, "for")
+
+        lookups = len(rpc.lookups)
+        first = client.get(recount).json()
+        for _ in range(5):
+            assert client.get(recount).json() == first
+        # Only the first recount reached the node
+        assert len(rpc.lookups) == lookups + 1
+
+        vote(client, proposal_id, BOB, "against")
+        lookups = len(rpc.lookups)
+        report = client.get(recount).json()
+        assert report["recounted"]["total_votes"] == 2
+        assert len(rpc.lookups) == lookups + 2
+
+
+class RecordingFeed:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, channel, event):
+        self.published.append((channel, event))
+
+
+def test_proposal_without_snapshot_block_is_not_created(tmp_path):
+    client, rpc = make_client(tmp_path)
+    feed = RecordingFeed()
+    client.app.state.live_feed = feed
+    rpc.head = None
+    with client:
+        created = client.post("/governance/proposals", json={
+            "title": "Raise quorum", "description": "...", "proposer": ALICE, "proposal_type": "parameter"
+        })
+        assert created.status_code == 503
+        assert feed.published == []
+
+        rpc.head = 100
+        created = client.post("/governance/proposals", json={
+            "title": "Raise quorum", "description": "...", "proposer": ALICE, "proposal_type": "parameter"
+        })
+        assert created.status_code == 200
+        assert [event["event"] for _, event in feed.published] == ["proposal_created"]
+
+
+def test_concurrent_votes_are_all_counted(tmp_path):
+    ledger = make_ledger(tmp_path)
+    voters = [f"0x{i:040x}" for i in range(60)]
+
+    async def run():
+        await ledger.open_proposal("p-1", snapshot_block=1)
+        await asyncio.gather(*[
+            ledger.record_vote("p-1", voter, ("for", "against", "abstain")[i % 3], i)
+            for i, voter in enumerate(voters)
+        ])
+        return await ledger.get_results("p-1"), await ledger.recount("p-1")
+
+    results, report = asyncio.run(run())
+    assert results["total_votes"] == 60
+    assert sum(int(weight) for weight in results["weights"].values()) == sum(range(60))
+    assert report["verified"]
+    ledger.close()
+
+
+def test_sequence_conflict_with_another_worker_is_retried(tmp_path):
+    ledger = make_ledger(tmp_path)
+    # A second worker process: same database, its own write lock
+    other = make_ledger(tmp_path)
+
+    def vote_in_other_worker(session):
+        other._record_vote("p-1", BOB, "against", 2, None)
+
+    async def run():
+        await ledger.open_proposal("p-1", snapshot_block=1)
+        # Bob's vote lands between Alice's tally read and her commit, taking sequence 1
+        event.listen(ledger.SessionLocal, "before_commit", vote_in_other_worker, once=True)
+        recorded = await ledger.record_vote("p-1", ALICE, "for", 3)
+        with pytest.raises(DuplicateVote):
+            await ledger.record_vote("p-1", BOB, "for", 2)
+        return recorded, await ledger.recount("p-1")
+
+    recorded, report = asyncio.run(run())
+    assert recorded["sequence"] == 2
+    assert recorded["results"]["voters"] == {"for": 1, "against": 1, "abstain": 0}
+    assert report["verified"]
+    ledger.close()
+    other.close()
@@ -0,0 +1,263 @@
+"""
+DRP Indexer backfill - re-index historical submissions after a policy change or migration.
+
+Walks IndexedSubmission (or an exported JSONL file of submissions) in keyset-paginated
+chunks, re-running assessment and writing results through the normal batched path.
+A checkpoint cursor is saved after every chunk so a crashed or stopped run resumes
+where it left off. Throughput can be capped so backfill doesn't starve live traffic.
+
+Usage:
+    python backfill.py --name policy-v2 [--source db | --source submissions.jsonl]
+                       [--chunk-size 500] [--max-rate 200] [--concurrency 2] [--reset]
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy.ext.declarative import declarative_base
+
+from indexer import IndexedSubmission, SessionLocal, engine, http_pool, pin_manager, process_batch
+
+BACKFILL_CHUNK_SIZE = int(os.getenv("BACKFILL_CHUNK_SIZE", "500"))
+BACKFILL_MAX_RATE = float(os.getenv("BACKFILL_MAX_RATE", "0"))  # rows/s, 0 = unlimited
+BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", "2"))
+
+CheckpointBase = declarative_base()
+
+
+class BackfillCheckpoint(CheckpointBase):
+    __tablename__ = "indexer_backfill_checkpoints"
+
+    name = Column(String, primary_key=True)
+    source = Column(String)
+    cursor = Column(String, nullable=True)
+    processed = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+CheckpointBase.metadata.create_all(engine)
+
+
+def load_checkpoint(name: str, source: str) -> Tuple[Optional[str], int]:
+    """Return (cursor, rows processed so far) for a named run."""
+    session = SessionLocal()
+    try:
+        checkpoint = session.get(BackfillCheckpoint, name)
+        if not checkpoint:
+            return None, 0
+        if checkpoint.source != source:
+            raise ValueError(
+                f"Checkpoint '{name}' belongs to source {checkpoint.source}; use --reset or another --name"
+            )
+        return checkpoint.cursor, checkpoint.processed or 0
+    finally:
+        session.close()
+
+
+def save_checkpoint(name: str, source: str, cursor: Optional[str], processed: int):
+    session = SessionLocal()
+    try:
+        checkpoint = session.get(BackfillCheckpoint, name) or BackfillCheckpoint(name=name, source=source)
+        checkpoint.cursor = cursor
+        checkpoint.processed = processed
+        checkpoint.updated_at = datetime.utcnow()
+        session.add(checkpoint)
+        session.commit()
+    finally:
+        session.close()
+
+
+def reset_checkpoint(name: str):
+    session = SessionLocal()
+    try:
+        session.query(BackfillCheckpoint).filter(BackfillCheckpoint.name == name).delete()
+        session.commit()
+    finally:
+        session.close()
+
+
+def record_to_submission(record: IndexedSubmission) -> Dict[str, Any]:
+    """Rebuild the submission payload the indexer expects from a stored row."""
+    submission = dict(record.metadata or {})
+    submission["submission_id"] = record.id
+    submission.setdefault("ipfs_cid", record.ipfs_cid)
+    submission.setdefault("type", record.activity_type)
+    submission.setdefault("actor_id", record.actor_id)
+    return submission
+
+
+class DatabaseSource:
+    """IndexedSubmission rows in primary-key order."""
+
+    def __init__(self):
+        self.key = "db"
+
+    def total(self, cursor: Optional[str]) -> int:
+        """Rows left after `cursor` (progress units for this source)."""
+        session = SessionLocal()
+        try:
+            query = session.query(IndexedSubmission.id)
+            if cursor is not None:
+                query = query.filter(IndexedSubmission.id > cursor)
+            return query.count()
+        finally:
+            session.close()
+
+    def fetch(self, cursor: Optional[str], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+        """Return (submissions, next cursor, progress units consumed) for the next chunk."""
+        session = SessionLocal()
+        try:
+            query = session.query(IndexedSubmission)
+            if cursor is not None:
+                query = query.filter(IndexedSubmission.id > cursor)
+            records = query.order_by(IndexedSubmission.id).limit(limit).all()
+            if not records:
+                return [], cursor, 0
+            return [record_to_submission(r) for r in records], records[-1].id, len(records)
+        finally:
+            session.close()
+
+
+class JsonlSource:
+    """An exported JSONL file of submissions; the cursor is a byte offset."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.key = f"jsonl:{os.path.abspath(path)}"
+
+    def total(self, cursor: Optional[str]) -> int:
+        return os.path.getsize(self.path) - int(cursor or 0)
+
+    def fetch(self, cursor: Optional[str], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+        offset = int(cursor or 0)
+        submissions = []
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            position = offset
+            while len(submissions) < limit:
+                line = f.readline()
+                if not line:
+                    break
+                position += len(line)
+                if line.strip():
+                    submissions.append(json.loads(line))
+        return submissions, str(position), position - offset
+
+
+class BackfillProgress:
+    """Rows/s and ETA for a backfill run."""
+
+    def __init__(self, total_units: int, processed: int = 0):
+        self.total_units = max(total_units, 0)
+        self.units_done = 0
+        self.rows = 0
+        self.resumed_rows = processed
+        self.started = time.monotonic()
+
+    def update(self, rows: int, units: int):
+        self.rows += rows
+        self.units_done += units
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        elapsed = time.monotonic() - self.started
+        if not self.units_done or elapsed <= 0:
+            return None
+        remaining = self.total_units - self.units_done
+        return max(0.0, remaining / (self.units_done / elapsed))
+
+    def summary(self) -> str:
+        eta = self.eta_seconds
+        eta_text = "--" if eta is None else f"{int(eta // 3600)}h{int(eta % 3600 // 60):02d}m{int(eta % 60):02d}s"
+        percent = 100.0 * self.units_done / self.total_units if self.total_units else 100.0
+        return (
+            f"{self.resumed_rows + self.rows} rows ({percent:.1f}%), "
+            f"{self.rate:.0f} rows/s, ETA {eta_text}"
+        )
+
+
+async def run_backfill(
+    name: str,
+    source,
+    chunk_size: int = BACKFILL_CHUNK_SIZE,
+    max_rate: float = BACKFILL_MAX_RATE,
+    concurrency: int = BACKFILL_CONCURRENCY
+) -> int:
+    """
+    Re-index every submission in `source`, resuming from the saved checkpoint.
+
+    Args:
+        name: Checkpoint name for this run
+        source: DatabaseSource or JsonlSource
+        chunk_size: Submissions per chunk (and per write transaction)
+        max_rate: Maximum rows per second, 0 for no cap
+        concurrency: Submissions assessed concurrently within a chunk
+
+    Returns:
+        Rows processed by this invocation
+    """
+    cursor, processed = load_checkpoint(name, source.key)
+    progress = BackfillProgress(source.total(cursor), processed)
+    print(f"[Backfill] {name}: starting from cursor {cursor!r} ({processed} rows already done)")
+
+    pin_manager.start()
+    try:
+        while True:
+            chunk_started = time.monotonic()
+            submissions, next_cursor, units = source.fetch(cursor, chunk_size)
+            if not submissions and next_cursor == cursor:
+                break
+
+            written = await process_batch(submissions, concurrency) if submissions else 0
+            if submissions and not written:
+                # Nothing in the chunk could be written (e.g. DB down); don't skip past it
+                raise RuntimeError(f"No rows written for chunk after cursor {cursor!r}")
+
+            cursor = next_cursor
+            progress.update(len(submissions), units)
+            save_checkpoint(name, source.key, cursor, processed + progress.rows)
+            print(f"[Backfill] {name}: {progress.summary()}")
+
+            if max_rate > 0 and submissions:
+                # Pace chunks so the average stays under max_rate
+                min_duration = len(submissions) / max_rate
+                elapsed = time.monotonic() - chunk_started
+                if elapsed < min_duration:
+                    await asyncio.sleep(min_duration - elapsed)
+    finally:
+        await pin_manager.stop()
+        await http_pool.aclose()
+
+    print(f"[Backfill] {name}: done, {progress.rows} rows this run")
+    return progress.rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-index historical DRP submissions")
+    parser.add_argument("--name", required=True, help="Checkpoint name; reuse it to resume")
+    parser.add_argument("--source", default="db", help="'db' or a path to an exported JSONL file")
+    parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK_SIZE)
+    parser.add_argument("--max-rate", type=float, default=BACKFILL_MAX_RATE, help="rows/s, 0 = unlimited")
+    parser.add_argument("--concurrency", type=int, default=BACKFILL_CONCURRENCY)
+    parser.add_argument("--reset", action="store_true", help="Discard the checkpoint and start over")
+    args = parser.parse_args()
+
+    source = DatabaseSource() if args.source == "db" else JsonlSource(args.source)
+    if args.reset:
+        reset_checkpoint(args.name)
+
+    asyncio.run(run_backfill(args.name, source, args.chunk_size, args.max_rate, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
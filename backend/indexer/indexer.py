@@ -8,10 +8,9 @@ This service runs as a background worker (Render worker or separate process).
 import os
 import asyncio
 import time
-import httpx
 from datetime import datetime
-from typing import Dict, Any, Optional
-from sqlalchemy import create_engine, Column, String, Integer, Float, DateTime, Boolean, Text, JSON
+from typing import Dict, Any, List, Optional
+from sqlalchemy import create_engine, Column, String, Integer, Float, DateTime, Boolean, Text, JSON, func, literal
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 import sys
@@ -21,6 +20,10 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from orbit.orbit_client import OrbitClient
+from clients.http_pool import http_pool
+from jobs.work_queue import WorkQueue, Job, get_work_queue, QUEUE_URL
+from pin_manager import PinManager
+from pipeline import Pipeline, Stage
 
 # Environment variables
 DB_URL = os.getenv("DB_URL", "postgresql://localhost/drp_indexer")
@@ -28,6 +31,26 @@ API_URL = os.getenv("API_URL", "https://api.decentralizedrights.com")
 AI_API_URL = os.getenv("AI_API_URL", "https://ai.decentralizedrights.com")
 IPFS_API_URL = os.getenv("IPFS_API_URL", "https://ipfs.decentralizedrights.com/api/v0")
 
+# Worker pool settings: how many submissions are in flight at once, and
+# separate caps for each downstream service so one slow stage can't hog them all.
+INDEXER_CONCURRENCY = int(os.getenv("INDEXER_CONCURRENCY", "4"))
+IPFS_CONCURRENCY = int(os.getenv("IPFS_CONCURRENCY", "4"))
+AI_CONCURRENCY = int(os.getenv("AI_CONCURRENCY", "4"))
+ORBIT_CONCURRENCY = int(os.getenv("ORBIT_CONCURRENCY", "4"))
+
+# Pin batching: CIDs per pin/add request and how long to wait for a batch to fill
+PIN_BATCH_SIZE = int(os.getenv("PIN_BATCH_SIZE", "50"))
+PIN_FLUSH_INTERVAL = float(os.getenv("PIN_FLUSH_INTERVAL", "0.5"))
+
+# Stage pipeline: queue capacity between stages, rows per persist transaction,
+# and how often per-stage metrics are logged
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "100"))
+PERSIST_BATCH_SIZE = int(os.getenv("PERSIST_BATCH_SIZE", "100"))
+PIPELINE_METRICS_INTERVAL = float(os.getenv("PIPELINE_METRICS_INTERVAL", "60"))
+
+# With a work queue configured, polling only sweeps up anything the queue missed
+POLL_INTERVAL = float(os.getenv("INDEXER_POLL_INTERVAL", "300" if QUEUE_URL else "30"))
+
 # Database setup
 Base = declarative_base()
 
@@ -55,40 +78,52 @@ SessionLocal = sessionmaker(bind=engine)
 # OrbitDB client
 orbit_client = OrbitClient()
 
+# Work queue fed by the API gateway (None when QUEUE_URL is unset)
+work_queue = get_work_queue(QUEUE_URL)
+
+# Per-stage concurrency limits
+ipfs_semaphore = asyncio.Semaphore(IPFS_CONCURRENCY)
+ai_semaphore = asyncio.Semaphore(AI_CONCURRENCY)
+orbit_semaphore = asyncio.Semaphore(ORBIT_CONCURRENCY)
+
 async def fetch_pending_submissions(session: Session) -> list:
     """Fetch pending submissions from API or database."""
     # In production, this would poll a queue or database
     # For now, we'll query the API
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{API_URL}/submissions/pending")
-            response.raise_for_status()
-            return response.json().get("items", [])
-        except Exception:
-            # Fallback: query local database
-            records = session.query(IndexedSubmission).filter(
-                IndexedSubmission.status == "pending"
-            ).limit(10).all()
-            return [r.__dict__ for r in records]
-
-async def pin_to_ipfs(cid: str) -> bool:
-    """Pin a CID to IPFS."""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{IPFS_API_URL}/pin/add",
-                params={"arg": cid},
-                timeout=60.0
-            )
-            response.raise_for_status()
-            return True
-        except Exception as e:
-            print(f"[Indexer] Failed to pin {cid}: {str(e)}")
-            return False
+    client = http_pool.get("api")
+    try:
+        response = await client.get(f"{API_URL}/submissions/pending")
+        response.raise_for_status()
+        return response.json().get("items", [])
+    except Exception:
+        # Fallback: query local database
+        records = session.query(IndexedSubmission).filter(
+            IndexedSubmission.status == "pending"
+        ).limit(10).all()
+        return [r.__dict__ for r in records]
+
+async def pin_cids(cids: List[str]):
+    """Pin several CIDs to IPFS in one multi-arg pin/add request. Raises on failure."""
+    client = http_pool.get("ipfs")
+    async with ipfs_semaphore:
+        response = await client.post(
+            f"{IPFS_API_URL}/pin/add",
+            params=[("arg", cid) for cid in cids]
+        )
+        response.raise_for_status()
+
+# Batched, deduplicated background pinning
+pin_manager = PinManager(
+    engine,
+    pin_cids,
+    batch_size=PIN_BATCH_SIZE,
+    flush_interval=PIN_FLUSH_INTERVAL
+)
 
 async def assess_with_ai(submission: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Call AI service to assess submission."""
-    async with httpx.AsyncClient() as client:
+    client = http_pool.get("ai")
+    async with ai_semaphore:
         try:
             claim = submission.get("claim", {})
             activity_type = submission.get("type", "")
@@ -96,14 +131,12 @@ async def assess_with_ai(submission: Dict[str, Any]) -> Optional[Dict[str, Any]]
             if activity_type == "poat":
                 response = await client.post(
                     f"{AI_API_URL}/assess-activity",
-                    json=claim,
-                    timeout=30.0
+                    json=claim
                 )
             elif activity_type == "post":
                 response = await client.post(
                     f"{AI_API_URL}/assess-status",
-                    json=claim,
-                    timeout=30.0
+                    json=claim
                 )
             else:
                 return None
@@ -123,85 +156,306 @@ async def write_ai_summary(submission_id: str, assessment: Dict[str, Any], sessi
     }
     
     try:
-        result = await orbit_client.add("drp.explorer.summaries", summary)
+        async with orbit_semaphore:
+            result = await orbit_client.add("drp.explorer.summaries", summary)
         summary_cid = result.get("hash", "")
         return summary_cid
     except Exception as e:
         print(f"[Indexer] Failed to write summary: {str(e)}")
         return None
 
-async def process_submission(submission: Dict[str, Any], session: Session):
-    """Process a single submission."""
+def new_row(submission: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for a submission's IndexedSubmission row, before assessment."""
     submission_id = submission.get("submission_id") or submission.get("id")
-    ipfs_cid = submission.get("ipfs_cid") or submission.get("cid")
-    
-    print(f"[Indexer] Processing submission {submission_id}")
-    
-    # Pin to IPFS
-    if ipfs_cid:
-        await pin_to_ipfs(ipfs_cid)
-    
-    # Assess with AI
-    assessment = await assess_with_ai(submission)
-    
-    # Update database
-    record = session.query(IndexedSubmission).filter(
-        IndexedSubmission.submission_cid == submission_id
-    ).first()
-    
-    if not record:
-        record = IndexedSubmission(
-            id=submission_id,
-            submission_cid=submission_id,
-            ipfs_cid=ipfs_cid,
-            actor_id=submission.get("actor_id", ""),
-            activity_type=submission.get("type", ""),
-            status="assessed" if assessment else "pending",
-            metadata=submission
-        )
-        session.add(record)
+    return {
+        "id": submission_id,
+        "submission_cid": submission_id,
+        "ipfs_cid": submission.get("ipfs_cid") or submission.get("cid"),
+        "actor_id": submission.get("actor_id", ""),
+        "activity_type": submission.get("type", ""),
+        "status": "pending",
+        "ai_score": None,
+        "ai_verdict": None,
+        "ai_rationale": None,
+        "ai_summary_cid": None,
+        "metadata": submission
+    }
+
+# Pipeline stages. The first takes a submission payload; the rest take and return a work item:
+# {"submission": <payload>, "row": <column values>, "assessment": <AI result or None>}
+
+async def pin_stage(submission: Dict[str, Any]) -> Dict[str, Any]:
+    """Start a work item and hand its CID to the pin manager (batched, skipped if already pinned)."""
+    item = {"submission": submission, "row": new_row(submission), "assessment": None}
+    row = item["row"]
+    print(f"[Indexer] Processing submission {row['id']}")
+    if row["ipfs_cid"]:
+        pin_manager.submit(row["ipfs_cid"])
+    return item
+
+async def assess_stage(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Assess the submission with the AI service."""
+    assessment = await assess_with_ai(item["submission"])
+    item["assessment"] = assessment
+    if assessment:
+        row = item["row"]
+        row["status"] = "assessed"
+        row["ai_score"] = assessment.get("score")
+        row["ai_verdict"] = assessment.get("verdict")
+        row["ai_rationale"] = assessment.get("rationale")
+    return item
+
+async def summarize_stage(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Write the AI summary to OrbitDB."""
+    if item["assessment"]:
+        row = item["row"]
+        row["ai_summary_cid"] = await write_ai_summary(row["id"], item["assessment"], None) or None
+    return item
+
+def _persist_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    session = SessionLocal()
+    try:
+        return write_results(session, rows)
+    finally:
+        session.close()
+
+async def persist_stage(items: List[Dict[str, Any]]) -> Dict[int, Exception]:
+    """
+    Write a batch of rows in one transaction (off the event loop).
+
+    Items whose row could not be written fail (so their queued jobs are retried);
+    the rest complete.
+    """
+    failed = await asyncio.to_thread(_persist_rows, [item["row"] for item in items])
+    failed_ids = {id(row) for row in failed}
+    errors = {}
+    for position, item in enumerate(items):
+        if id(item["row"]) in failed_ids:
+            errors[position] = RuntimeError(f"Failed to write submission {item['row']['id']}")
+        else:
+            print(f"[Indexer] Completed processing {item['row']['id']}")
+    return errors
+
+def build_pipeline(queue_size: int = PIPELINE_QUEUE_SIZE) -> Pipeline:
+    """pin -> assess -> summarize -> persist, each stage with its own concurrency."""
+    return Pipeline([
+        Stage("pin", pin_stage, concurrency=1, queue_size=queue_size),
+        Stage("assess", assess_stage, concurrency=AI_CONCURRENCY, queue_size=queue_size),
+        Stage("summarize", summarize_stage, concurrency=ORBIT_CONCURRENCY, queue_size=queue_size),
+        Stage("persist", persist_stage, concurrency=1, queue_size=queue_size, batch_size=PERSIST_BATCH_SIZE)
+    ])
+
+async def assess_submission(submission: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the network stages for a submission (pin, AI assessment, OrbitDB summary).
+
+    Returns the column values for its IndexedSubmission row; nothing is written
+    to the database here.
+    """
+    item = await pin_stage(submission)
+    item = await assess_stage(item)
+    item = await summarize_stage(item)
+    return item["row"]
+
+# Columns refreshed when a submission is re-processed; identity columns are kept
+UPSERT_UPDATE_COLUMNS = ["ai_score", "ai_verdict", "ai_rationale", "ai_summary_cid"]
+
+def _upsert_statement(dialect_name: str):
+    """INSERT ... ON CONFLICT (submission_cid) DO UPDATE for Postgres and SQLite."""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
     else:
-        record.status = "assessed"
+        return None
     
-    if assessment:
-        record.ai_score = assessment.get("score")
-        record.ai_verdict = assessment.get("verdict")
-        record.ai_rationale = assessment.get("rationale")
-        
-        # Write AI summary to OrbitDB
-        summary_cid = await write_ai_summary(submission_id, assessment, session)
-        if summary_cid:
-            record.ai_summary_cid = summary_cid
+    table = IndexedSubmission.__table__
+    stmt = insert(table)
+    update = {"status": literal("assessed")}
+    for column in UPSERT_UPDATE_COLUMNS:
+        # Keep previous AI results when this run produced none
+        update[column] = func.coalesce(stmt.excluded[column], table.c[column])
+    return stmt.on_conflict_do_update(index_elements=[table.c.submission_cid], set_=update)
+
+def _write_rows(session: Session, rows: List[Dict[str, Any]]):
+    """Write rows with one bulk statement (or one IN lookup plus bulk insert/update)."""
+    stmt = _upsert_statement(session.get_bind().dialect.name)
+    if stmt is not None:
+        session.execute(stmt, rows)
+        return
+    
+    # Generic path: load the existing rows for the whole batch in one query
+    ids = [row["submission_cid"] for row in rows]
+    existing = {
+        r.submission_cid: r for r in session.query(IndexedSubmission).filter(
+            IndexedSubmission.submission_cid.in_(ids)
+        ).all()
+    }
+    for row in rows:
+        record = existing.get(row["submission_cid"])
+        if record is None:
+            session.add(IndexedSubmission(**row))
+        else:
+            record.status = "assessed"
+            for column in UPSERT_UPDATE_COLUMNS:
+                if row[column] is not None:
+                    setattr(record, column, row[column])
+
+def write_results(session: Session, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Upsert a batch of results and commit once.
+
+    If the batch write fails, rows are retried one by one inside savepoints so a
+    single bad row can't drop the rest. Returns the rows that could not be written.
+    """
+    if not rows:
+        return []
+    try:
+        _write_rows(session, rows)
+        session.commit()
+        return []
+    except Exception as e:
+        session.rollback()
+        print(f"[Indexer] Batch write failed, retrying rows individually: {str(e)}")
     
+    failed = []
+    for row in rows:
+        try:
+            with session.begin_nested():
+                _write_rows(session, [row])
+        except Exception as e:
+            print(f"[Indexer] Failed to write submission {row['id']}: {str(e)}")
+            failed.append(row)
     session.commit()
-    print(f"[Indexer] Completed processing {submission_id}")
+    return failed
+
+def persist_results(session: Session, rows: List[Dict[str, Any]]) -> int:
+    """Upsert a batch of results (see write_results). Returns the number of rows written."""
+    return len(rows) - len(write_results(session, rows))
+
+async def process_submission(submission: Dict[str, Any], session: Session):
+    """
+    Process a single submission outside the pipeline.
+
+    The running indexer feeds submissions through build_pipeline(); this is kept
+    for one-off re-processing next to the backfill command (backfill.py).
+    """
+    row = await assess_submission(submission)
+    if not persist_results(session, [row]):
+        raise RuntimeError(f"Failed to write submission {row['id']}")
+    print(f"[Indexer] Completed processing {row['id']}")
+
+async def process_batch(submissions: list, concurrency: int = INDEXER_CONCURRENCY) -> int:
+    """
+    Process a batch of submissions with at most `concurrency` in flight.
+
+    Network stages run concurrently and failures are isolated per submission;
+    all results are then written in one transaction. Returns the number of
+    submissions processed successfully.
+
+    Used by the backfill command (backfill.py), which needs a chunk written before
+    it checkpoints; the running indexer feeds submissions through build_pipeline().
+    """
+    worker_slots = asyncio.Semaphore(max(1, concurrency))
 
-async def run_indexer_loop():
-    """Main indexer loop."""
-    print("[Indexer] Starting DRP indexer...")
+    async def worker(submission: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        async with worker_slots:
+            try:
+                return await assess_submission(submission)
+            except Exception as e:
+                print(f"[Indexer] Error processing submission: {str(e)}")
+                return None
+
+    results = await asyncio.gather(*(worker(s) for s in submissions))
+    rows = [row for row in results if row]
     
+    session = SessionLocal()
+    try:
+        return persist_results(session, rows)
+    finally:
+        session.close()
+
+async def settle_job(queue: WorkQueue, job: Job, done: asyncio.Future):
+    """Acknowledge a queued submission once the pipeline finishes it, or retry it."""
+    try:
+        await done
+        await queue.ack(job)
+    except Exception as e:
+        print(f"[Indexer] Job {job.id} failed (attempt {job.attempts + 1}): {str(e)}")
+        await queue.nack(job, str(e))
+
+async def run_queue_consumer(queue: WorkQueue, consumer: str, pipeline: Pipeline):
+    """Feed submissions from the work queue into the pipeline as soon as they are enqueued."""
+    settling = set()
+    while True:
+        try:
+            job = await queue.consume(consumer)
+            if job:
+                # Blocks while the pipeline is full, so we stop claiming jobs under backpressure
+                done = await pipeline.submit(job.payload)
+                task = asyncio.create_task(settle_job(queue, job, done))
+                settling.add(task)
+                task.add_done_callback(settling.discard)
+        except Exception as e:
+            print(f"[Indexer] Error in queue consumer {consumer}: {str(e)}")
+            await asyncio.sleep(5)
+
+async def run_indexer_loop(pipeline: Pipeline):
+    """Main indexer loop: poll for pending submissions and feed them into the pipeline."""
     while True:
         try:
             session = SessionLocal()
-            submissions = await fetch_pending_submissions(session)
+            try:
+                submissions = await fetch_pending_submissions(session)
+            finally:
+                session.close()
             
             if submissions:
                 print(f"[Indexer] Found {len(submissions)} pending submissions")
-                for submission in submissions:
-                    try:
-                        await process_submission(submission, session)
-                    except Exception as e:
-                        print(f"[Indexer] Error processing submission: {str(e)}")
-            
-            session.close()
+                pending = [await pipeline.submit(item) for item in submissions]
+                # Wait for this poll's items so the next poll doesn't fetch them again
+                results = await asyncio.gather(*pending, return_exceptions=True)
+                processed = sum(1 for r in results if not isinstance(r, Exception))
+                print(f"[Indexer] Processed {processed}/{len(submissions)} submissions")
             
             # Sleep before next poll
-            await asyncio.sleep(30)  # Poll every 30 seconds
+            await asyncio.sleep(POLL_INTERVAL)
         
         except Exception as e:
             print(f"[Indexer] Error in main loop: {str(e)}")
             await asyncio.sleep(60)
 
+async def log_pipeline_metrics(pipeline: Pipeline):
+    """Periodically log per-stage queue depth and latency."""
+    while True:
+        await asyncio.sleep(PIPELINE_METRICS_INTERVAL)
+        print(f"[Indexer] Pipeline {pipeline.format_metrics()}")
+
+async def run_indexer():
+    """Run the stage pipeline fed by queue consumers (if configured) and the polling loop."""
+    print(f"[Indexer] Starting DRP indexer (concurrency={INDEXER_CONCURRENCY})...")
+    
+    pin_manager.start()
+    pipeline = build_pipeline()
+    pipeline.start()
+    tasks = [run_indexer_loop(pipeline), log_pipeline_metrics(pipeline)]
+    if work_queue:
+        print(f"[Indexer] Consuming work queue {work_queue.name}")
+        consumer_prefix = os.getenv("HOSTNAME", "indexer")
+        tasks += [
+            run_queue_consumer(work_queue, f"{consumer_prefix}-{i}", pipeline)
+            for i in range(INDEXER_CONCURRENCY)
+        ]
+    
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        await pipeline.stop()
+        await pin_manager.stop()
+        if work_queue:
+            await work_queue.close()
+        await http_pool.aclose()
+
 if __name__ == "__main__":
-    asyncio.run(run_indexer_loop())
+    asyncio.run(run_indexer())
 
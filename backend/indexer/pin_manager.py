@@ -0,0 +1,216 @@
+"""
+IPFS pin manager for the DRP indexer.
+
+Keeps a persistent record of pinned CIDs so re-processed submissions never re-pin,
+coalesces pending CIDs into multi-arg `pin/add` requests, and runs pinning in the
+background so it never holds up AI assessment. Failed pins go to a backlog that is
+retried with exponential backoff.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable, List, Optional, Set
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+PinBase = declarative_base()
+
+# Signature of the function that actually talks to IPFS: pins all CIDs or raises
+PinBatchFn = Callable[[List[str]], Awaitable[None]]
+
+
+class PinRecord(PinBase):
+    __tablename__ = "pinned_cids"
+
+    cid = Column(String, primary_key=True)
+    status = Column(String, index=True)  # "pinned" or "failed"
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(Float, nullable=True, index=True)
+    last_error = Column(Text, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class PinManager:
+    """Batches, deduplicates and retries IPFS pins."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        pin_batch: PinBatchFn,
+        batch_size: int = 50,
+        flush_interval: float = 0.5,
+        retry_interval: float = 60.0,
+        max_attempts: int = 8
+    ):
+        """
+        Args:
+            engine: SQLAlchemy engine holding the pin-state table
+            pin_batch: Coroutine pinning a list of CIDs in one request; raises on failure
+            batch_size: Maximum CIDs per pin request
+            flush_interval: Seconds to wait for a batch to fill before sending it
+            retry_interval: Seconds between sweeps of the failed-pin backlog
+            max_attempts: Attempts before a CID is left in the backlog for good
+        """
+        PinBase.metadata.create_all(engine)
+        self.SessionLocal = sessionmaker(bind=engine)
+        self.pin_batch = pin_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.max_attempts = max_attempts
+
+        self._pinned: Set[str] = set()
+        self._pending: List[str] = []
+        self._pending_set: Set[str] = set()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self.pin_requests = 0
+
+    def submit(self, cid: str):
+        """Queue a CID for pinning without waiting for it."""
+        if not cid or cid in self._pinned or cid in self._pending_set:
+            return
+        self._pending.append(cid)
+        self._pending_set.add(cid)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _known_pinned(self, cids: Iterable[str]) -> Set[str]:
+        """Look up which of `cids` the pin-state table already has as pinned."""
+        session = self.SessionLocal()
+        try:
+            rows = session.query(PinRecord.cid).filter(
+                PinRecord.cid.in_(list(cids)),
+                PinRecord.status == "pinned"
+            ).all()
+            return {row.cid for row in rows}
+        finally:
+            session.close()
+
+    def _record(self, pinned: List[str], failed: List[str], error: Optional[str] = None):
+        session = self.SessionLocal()
+        try:
+            existing = {
+                r.cid: r for r in session.query(PinRecord).filter(
+                    PinRecord.cid.in_(pinned + failed)
+                ).all()
+            }
+            now = datetime.utcnow()
+            for cid in pinned:
+                record = existing.get(cid) or PinRecord(cid=cid, attempts=0)
+                record.status = "pinned"
+                record.attempts = (record.attempts or 0) + 1
+                record.next_attempt_at = None
+                record.last_error = None
+                record.updated_at = now
+                session.add(record)
+            for cid in failed:
+                record = existing.get(cid) or PinRecord(cid=cid, attempts=0)
+                record.status = "failed"
+                record.attempts = (record.attempts or 0) + 1
+                record.last_error = error
+                record.updated_at = now
+                if record.attempts < self.max_attempts:
+                    record.next_attempt_at = time.time() + min(3600.0, 2 ** record.attempts)
+                else:
+                    record.next_attempt_at = None
+                session.add(record)
+            session.commit()
+        finally:
+            session.close()
+
+    def _due_retries(self, limit: int) -> List[str]:
+        session = self.SessionLocal()
+        try:
+            rows = session.query(PinRecord.cid).filter(
+                PinRecord.status == "failed",
+                PinRecord.next_attempt_at != None,  # noqa: E711
+                PinRecord.next_attempt_at <= time.time()
+            ).limit(limit).all()
+            return [row.cid for row in rows]
+        finally:
+            session.close()
+
+    async def _pin(self, cids: List[str]) -> List[str]:
+        """Pin `cids`, isolating bad CIDs if the batch fails. Returns the failures."""
+        self.pin_requests += 1
+        try:
+            await self.pin_batch(cids)
+            return []
+        except Exception as e:
+            if len(cids) == 1:
+                print(f"[Indexer] Failed to pin {cids[0]}: {str(e)}")
+                return cids
+        # One bad CID fails the whole request; split so the rest still get pinned
+        middle = len(cids) // 2
+        left, right = await asyncio.gather(self._pin(cids[:middle]), self._pin(cids[middle:]))
+        return left + right
+
+    async def flush(self) -> int:
+        """Pin everything currently pending. Returns the number of CIDs pinned."""
+        pinned_total = 0
+        while self._pending:
+            batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+            self._pending_set.difference_update(batch)
+
+            already = await asyncio.to_thread(self._known_pinned, batch)
+            self._pinned.update(already)
+            to_pin = [cid for cid in batch if cid not in already]
+            if not to_pin:
+                continue
+
+            failed = await self._pin(to_pin)
+            failed_set = set(failed)
+            pinned = [cid for cid in to_pin if cid not in failed_set]
+            await asyncio.to_thread(self._record, pinned, failed, "pin/add failed" if failed else None)
+            self._pinned.update(pinned)
+            pinned_total += len(pinned)
+        return pinned_total
+
+    async def retry_failed(self) -> int:
+        """Re-queue failed pins whose backoff has elapsed. Returns how many were queued."""
+        due = await asyncio.to_thread(self._due_retries, self.batch_size * 10)
+        for cid in due:
+            self.submit(cid)
+        return len(due)
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[Indexer] Pin flush failed: {str(e)}")
+
+    async def _retry_loop(self):
+        while True:
+            await asyncio.sleep(self.retry_interval)
+            try:
+                queued = await self.retry_failed()
+                if queued:
+                    print(f"[Indexer] Retrying {queued} failed pins")
+            except Exception as e:
+                print(f"[Indexer] Pin retry sweep failed: {str(e)}")
+
+    def start(self):
+        """Start the background flush and retry tasks."""
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._flush_loop()),
+                asyncio.create_task(self._retry_loop())
+            ]
+
+    async def stop(self):
+        """Stop background tasks and pin whatever is still pending."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.flush()
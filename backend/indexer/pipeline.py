@@ -0,0 +1,226 @@
+"""
+Asyncio stage pipeline for the DRP indexer.
+
+Each stage owns a bounded input queue and a fixed number of workers. Items flow
+stage to stage, so different submissions can be pinned, assessed and summarized
+at the same time; a full queue blocks the stage in front of it (backpressure).
+End-to-end throughput is then bounded by the slowest stage rather than by the sum
+of all stage latencies.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Handler for a single item; returns the (possibly updated) item
+ItemHandler = Callable[[Any], Awaitable[Any]]
+# Handler for a batch of items (batch_size > 1); returns None, or the exceptions of
+# items that failed keyed by their position in the batch (the rest complete)
+BatchHandler = Callable[[List[Any]], Awaitable[Optional[Dict[int, Exception]]]]
+
+_STOP = object()
+
+
+class StageMetrics:
+    """Counters and handler latency for one stage."""
+
+    __slots__ = ("calls", "processed", "failed", "in_flight", "latency_total", "latency_max")
+
+    def __init__(self):
+        self.calls = 0
+        self.processed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def observe(self, seconds: float, items: int = 1):
+        self.calls += 1
+        self.processed += items
+        self.latency_total += seconds
+        self.latency_max = max(self.latency_max, seconds)
+
+
+class Stage:
+    """A named pipeline stage with its own workers and bounded input queue."""
+
+    def __init__(
+        self,
+        name: str,
+        handler,
+        concurrency: int = 1,
+        queue_size: int = 100,
+        batch_size: int = 1,
+        batch_timeout: float = 0.05
+    ):
+        """
+        Args:
+            name: Stage name used in metrics
+            handler: ItemHandler, or BatchHandler when batch_size > 1
+            concurrency: Number of workers running the handler
+            queue_size: Capacity of the input queue
+            batch_size: Items handed to the handler at once
+            batch_timeout: Seconds to wait for a batch to fill
+        """
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.batch_size = max(1, batch_size)
+        self.batch_timeout = batch_timeout
+        self.metrics = StageMetrics()
+        self.next: Optional["Stage"] = None
+
+
+class _Envelope:
+    """An item travelling through the pipeline plus its completion future."""
+
+    __slots__ = ("item", "future")
+
+    def __init__(self, item: Any, future: asyncio.Future):
+        self.item = item
+        self.future = future
+
+
+class Pipeline:
+    """Chain of stages connected by bounded queues."""
+
+    def __init__(self, stages: List[Stage]):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        for current, following in zip(stages, stages[1:]):
+            current.next = following
+        self._workers: Dict[str, List[asyncio.Task]] = {}
+        self.started_at: Optional[float] = None
+        self.completed = 0
+
+    def start(self):
+        """Start worker tasks for every stage."""
+        if self._workers:
+            return
+        self.started_at = time.monotonic()
+        for stage in self.stages:
+            self._workers[stage.name] = [
+                asyncio.create_task(self._run_worker(stage)) for _ in range(stage.concurrency)
+            ]
+
+    async def submit(self, item: Any) -> asyncio.Future:
+        """
+        Feed an item into the first stage, waiting while it is full.
+
+        Returns a future resolved with the final item once the last stage has handled
+        it, or with the exception of the stage that failed it.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.stages[0].queue.put(_Envelope(item, future))
+        return future
+
+    async def _forward(self, stage: Stage, envelope: _Envelope):
+        if stage.next is None:
+            self.completed += 1
+            if not envelope.future.done():
+                envelope.future.set_result(envelope.item)
+        else:
+            await stage.next.queue.put(envelope)
+
+    def _fail(self, stage: Stage, envelope: _Envelope, error: Exception):
+        stage.metrics.failed += 1
+        if not envelope.future.done():
+            envelope.future.set_exception(error)
+
+    async def _next_batch(self, stage: Stage, first: _Envelope) -> List[_Envelope]:
+        batch = [first]
+        deadline = time.monotonic() + stage.batch_timeout
+        while len(batch) < stage.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                envelope = stage.queue.get_nowait() if remaining <= 0 else await asyncio.wait_for(
+                    stage.queue.get(), timeout=remaining
+                )
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if envelope is _STOP:
+                # Leave the sentinel for this worker's next loop iteration
+                stage.queue.put_nowait(envelope)
+                break
+            batch.append(envelope)
+        return batch
+
+    async def _run_worker(self, stage: Stage):
+        while True:
+            envelope = await stage.queue.get()
+            if envelope is _STOP:
+                return
+
+            if stage.batch_size > 1:
+                batch = await self._next_batch(stage, envelope)
+                stage.metrics.in_flight += len(batch)
+                started = time.perf_counter()
+                try:
+                    errors = await stage.handler([e.item for e in batch]) or {}
+                except Exception as e:
+                    for failed in batch:
+                        self._fail(stage, failed, e)
+                else:
+                    stage.metrics.observe(time.perf_counter() - started, len(batch) - len(errors))
+                    for position, done in enumerate(batch):
+                        if position in errors:
+                            self._fail(stage, done, errors[position])
+                        else:
+                            await self._forward(stage, done)
+                finally:
+                    stage.metrics.in_flight -= len(batch)
+                continue
+
+            stage.metrics.in_flight += 1
+            started = time.perf_counter()
+            try:
+                envelope.item = await stage.handler(envelope.item)
+            except Exception as e:
+                self._fail(stage, envelope, e)
+            else:
+                stage.metrics.observe(time.perf_counter() - started)
+                await self._forward(stage, envelope)
+            finally:
+                stage.metrics.in_flight -= 1
+
+    async def stop(self):
+        """Let queued items finish, then stop all workers stage by stage."""
+        for stage in self.stages:
+            workers = self._workers.get(stage.name, [])
+            for _ in workers:
+                await stage.queue.put(_STOP)
+            await asyncio.gather(*workers, return_exceptions=True)
+        self._workers = {}
+
+    def metrics(self) -> Dict[str, Any]:
+        """Per-stage queue depth, in-flight count, throughput counters and latency."""
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        stages = {}
+        for stage in self.stages:
+            m = stage.metrics
+            stages[stage.name] = {
+                "queue_depth": stage.queue.qsize(),
+                "queue_capacity": stage.queue.maxsize,
+                "in_flight": m.in_flight,
+                "processed": m.processed,
+                "failed": m.failed,
+                "latency_avg_ms": round(1000 * m.latency_total / m.calls, 3) if m.calls else None,
+                "latency_max_ms": round(1000 * m.latency_max, 3),
+            }
+        return {
+            "completed": self.completed,
+            "throughput_per_s": round(self.completed / elapsed, 3) if elapsed > 0 else 0.0,
+            "stages": stages,
+        }
+
+    def format_metrics(self) -> str:
+        """One-line summary for logs."""
+        metrics = self.metrics()
+        parts = [
+            f"{name}: q={s['queue_depth']}/{s['queue_capacity']} busy={s['in_flight']} "
+            f"ok={s['processed']} err={s['failed']} max={s['latency_max_ms']}ms"
+            for name, s in metrics["stages"].items()
+        ]
+        return f"{metrics['completed']} done, {metrics['throughput_per_s']}/s | " + " | ".join(parts)
@@ -0,0 +1 @@
+# Job queue package
@@ -0,0 +1,388 @@
+"""
+Work queue between the DRP API gateway and the indexer.
+
+The API enqueues a job per submission and the indexer consumes it immediately,
+instead of discovering it on the next poll. Jobs are acknowledged once processed;
+failures are retried with exponential backoff and moved to a dead-letter list
+after too many attempts.
+
+Backends:
+- RedisStreamQueue: Redis Streams + consumer group (production)
+- SQLiteQueue: single-file SQLite table (local development and tests)
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List
+
+try:
+    import redis.asyncio as redis
+    from redis.exceptions import ResponseError
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+QUEUE_URL = os.getenv("QUEUE_URL", "")
+QUEUE_NAME = os.getenv("QUEUE_NAME", "drp:indexer:jobs")
+QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "5"))
+
+# last_error of jobs dead-lettered because consumers kept dying on them
+ABANDONED_ERROR = "Not acknowledged before the visibility timeout"
+
+
+@dataclass
+class Job:
+    """A unit of work handed to a consumer."""
+    id: str
+    payload: Dict[str, Any]
+    attempts: int = 0
+    last_error: Optional[str] = field(default=None, repr=False)
+
+
+def retry_backoff(attempts: int, base: float = 1.0, maximum: float = 300.0) -> float:
+    """Delay in seconds before retry number `attempts` (1-based)."""
+    return min(maximum, base * (2 ** max(0, attempts - 1)))
+
+
+class WorkQueue:
+    """Interface shared by all queue backends."""
+
+    def __init__(
+        self,
+        name: str = QUEUE_NAME,
+        max_attempts: int = QUEUE_MAX_ATTEMPTS,
+        backoff_base: float = 1.0,
+        visibility_timeout: float = 300.0
+    ):
+        """
+        Args:
+            name: Queue name (stream key / table namespace)
+            max_attempts: Attempts before a job is dead-lettered
+            backoff_base: First retry delay in seconds, doubled on each retry
+            visibility_timeout: Seconds before an unacknowledged job is redelivered
+        """
+        self.name = name
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.visibility_timeout = visibility_timeout
+
+    async def enqueue(self, payload: Dict[str, Any]) -> str:
+        """Add a job and return its id."""
+        raise NotImplementedError
+
+    async def consume(self, consumer: str, block: float = 5.0) -> Optional[Job]:
+        """Claim the next available job, waiting up to `block` seconds."""
+        raise NotImplementedError
+
+    async def ack(self, job: Job):
+        """Mark a job as done."""
+        raise NotImplementedError
+
+    async def nack(self, job: Job, error: str = ""):
+        """Mark a job as failed; it is retried later or dead-lettered."""
+        raise NotImplementedError
+
+    async def dead_letters(self, limit: int = 100) -> List[Job]:
+        """List jobs that exhausted their retries."""
+        raise NotImplementedError
+
+    async def close(self):
+        """Release backend resources."""
+
+    def _backoff(self, attempts: int) -> float:
+        return retry_backoff(attempts, base=self.backoff_base)
+
+
+class SQLiteQueue(WorkQueue):
+    """Queue stored in a SQLite table. Safe across processes sharing the file."""
+
+    def __init__(self, path: str = ":memory:", poll_interval: float = 0.05, **kwargs):
+        """
+        Args:
+            path: SQLite database file (":memory:" for a process-local queue)
+            poll_interval: Seconds between checks while waiting for work
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS queue_jobs (
+                id TEXT PRIMARY KEY,
+                queue TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                status TEXT NOT NULL DEFAULT 'ready',
+                available_at REAL NOT NULL,
+                claimed_at REAL,
+                last_error TEXT
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_queue_jobs_ready ON queue_jobs (queue, status, available_at)"
+        )
+        # Wakes in-process consumers as soon as something is enqueued
+        self._wakeup = asyncio.Event()
+
+    def _run(self, fn, *args):
+        with self._lock:
+            return fn(*args)
+
+    def _enqueue(self, job_id: str, payload: str):
+        self._conn.execute(
+            "INSERT INTO queue_jobs (id, queue, payload, available_at) VALUES (?, ?, ?, ?)",
+            (job_id, self.name, payload, time.time())
+        )
+
+    def _claim(self) -> Optional[Job]:
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            while True:
+                row = self._conn.execute(
+                    """
+                    SELECT id, payload, attempts, status FROM queue_jobs
+                    WHERE queue = ? AND (
+                        (status = 'ready' AND available_at <= ?)
+                        OR (status = 'claimed' AND claimed_at <= ?)
+                    )
+                    ORDER BY available_at
+                    LIMIT 1
+                    """,
+                    (self.name, now, now - self.visibility_timeout)
+                ).fetchone()
+                if not row:
+                    break
+                attempts = row[2]
+                if row[3] == "claimed":
+                    # The consumer holding it died without ack or nack: that was a failed attempt
+                    attempts += 1
+                    if attempts >= self.max_attempts:
+                        self._conn.execute(
+                            "UPDATE queue_jobs SET status = 'dead', attempts = ?, last_error = ? WHERE id = ?",
+                            (attempts, ABANDONED_ERROR, row[0])
+                        )
+                        continue
+                self._conn.execute(
+                    "UPDATE queue_jobs SET status = 'claimed', claimed_at = ?, attempts = ? WHERE id = ?",
+                    (now, attempts, row[0])
+                )
+                break
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        if not row:
+            return None
+        return Job(id=row[0], payload=json.loads(row[1]), attempts=attempts)
+
+    def _ack(self, job_id: str):
+        self._conn.execute("DELETE FROM queue_jobs WHERE id = ?", (job_id,))
+
+    def _nack(self, job: Job, error: str):
+        attempts = job.attempts + 1
+        if attempts >= self.max_attempts:
+            self._conn.execute(
+                "UPDATE queue_jobs SET status = 'dead', attempts = ?, last_error = ? WHERE id = ?",
+                (attempts, error, job.id)
+            )
+        else:
+            self._conn.execute(
+                """
+                UPDATE queue_jobs
+                SET status = 'ready', attempts = ?, last_error = ?, available_at = ?, claimed_at = NULL
+                WHERE id = ?
+                """,
+                (attempts, error, time.time() + self._backoff(attempts), job.id)
+            )
+
+    def _dead_letters(self, limit: int) -> List[Job]:
+        rows = self._conn.execute(
+            "SELECT id, payload, attempts, last_error FROM queue_jobs "
+            "WHERE queue = ? AND status = 'dead' ORDER BY available_at LIMIT ?",
+            (self.name, limit)
+        ).fetchall()
+        return [Job(id=r[0], payload=json.loads(r[1]), attempts=r[2], last_error=r[3]) for r in rows]
+
+    async def enqueue(self, payload: Dict[str, Any]) -> str:
+        job_id = str(uuid.uuid4())
+        await asyncio.to_thread(self._run, self._enqueue, job_id, json.dumps(payload, default=str))
+        self._wakeup.set()
+        return job_id
+
+    async def consume(self, consumer: str, block: float = 5.0) -> Optional[Job]:
+        deadline = time.monotonic() + block
+        while True:
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self._run, self._claim)
+            remaining = deadline - time.monotonic()
+            if job or remaining <= 0:
+                return job
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=min(self.poll_interval, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    async def ack(self, job: Job):
+        await asyncio.to_thread(self._run, self._ack, job.id)
+
+    async def nack(self, job: Job, error: str = ""):
+        await asyncio.to_thread(self._run, self._nack, job, error)
+
+    async def dead_letters(self, limit: int = 100) -> List[Job]:
+        return await asyncio.to_thread(self._run, self._dead_letters, limit)
+
+    async def close(self):
+        self._conn.close()
+
+
+class RedisStreamQueue(WorkQueue):
+    """
+    Queue backed by a Redis Stream and consumer group.
+
+    Retries are parked in a sorted set scored by their due time and re-added to
+    the stream when due. Dead jobs are pushed onto a list.
+    """
+
+    def __init__(self, redis_url: str, group: str = "indexer", **kwargs):
+        """
+        Args:
+            redis_url: Redis connection URL
+            group: Consumer group name
+        """
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis package is required for RedisStreamQueue")
+        super().__init__(**kwargs)
+        self.client = redis.from_url(redis_url, decode_responses=True)
+        self.group = group
+        self.delayed_key = f"{self.name}:delayed"
+        self.dead_key = f"{self.name}:dead"
+        self._group_ready = False
+
+    async def _ensure_group(self):
+        if self._group_ready:
+            return
+        try:
+            await self.client.xgroup_create(self.name, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def _promote_due(self):
+        """Move retries whose backoff has elapsed back onto the stream."""
+        due = await self.client.zrangebyscore(self.delayed_key, "-inf", time.time(), start=0, num=100)
+        for entry in due:
+            # ZREM succeeds for exactly one worker, so each retry is re-added once
+            if await self.client.zrem(self.delayed_key, entry):
+                data = json.loads(entry)
+                await self.client.xadd(self.name, {
+                    "payload": json.dumps(data["payload"]),
+                    "attempts": data["attempts"]
+                })
+
+    @staticmethod
+    def _to_job(entry_id: str, fields: Dict[str, str]) -> Job:
+        return Job(id=entry_id, payload=json.loads(fields["payload"]), attempts=int(fields.get("attempts", 0)))
+
+    async def enqueue(self, payload: Dict[str, Any]) -> str:
+        await self._ensure_group()
+        return await self.client.xadd(self.name, {"payload": json.dumps(payload, default=str), "attempts": 0})
+
+    async def consume(self, consumer: str, block: float = 5.0) -> Optional[Job]:
+        await self._ensure_group()
+        await self._promote_due()
+
+        # Reclaim jobs left unacknowledged by a crashed consumer
+        claimed = await self.client.xautoclaim(
+            self.name, self.group, consumer,
+            min_idle_time=int(self.visibility_timeout * 1000), start_id="0-0", count=1
+        )
+        if claimed and claimed[1]:
+            entry_id, fields = claimed[1][0]
+            if fields:
+                job = self._to_job(entry_id, fields)
+                # Every earlier delivery of this entry ended without ack or nack: count each
+                # as a failed attempt, so a job that crashes its consumer is dead-lettered
+                pending = await self.client.xpending_range(self.name, self.group, entry_id, entry_id, 1)
+                deliveries = pending[0]["times_delivered"] if pending else 1
+                attempts = job.attempts + max(0, deliveries - 1)
+                if attempts < self.max_attempts:
+                    job.attempts = attempts
+                    return job
+                await self._fail(job, attempts, ABANDONED_ERROR)
+
+        result = await self.client.xreadgroup(
+            self.group, consumer, {self.name: ">"}, count=1, block=int(block * 1000)
+        )
+        if not result:
+            return None
+        _, entries = result[0]
+        entry_id, fields = entries[0]
+        return self._to_job(entry_id, fields)
+
+    async def ack(self, job: Job):
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.xack(self.name, self.group, job.id)
+            pipe.xdel(self.name, job.id)
+            await pipe.execute()
+
+    async def nack(self, job: Job, error: str = ""):
+        await self._fail(job, job.attempts + 1, error)
+
+    async def _fail(self, job: Job, attempts: int, error: str):
+        """Park a failed job for a retry, or dead-letter it after max_attempts."""
+        record = json.dumps({"payload": job.payload, "attempts": attempts, "error": error, "id": job.id})
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.xack(self.name, self.group, job.id)
+            pipe.xdel(self.name, job.id)
+            if attempts >= self.max_attempts:
+                pipe.lpush(self.dead_key, record)
+            else:
+                pipe.zadd(self.delayed_key, {record: time.time() + self._backoff(attempts)})
+            await pipe.execute()
+
+    async def dead_letters(self, limit: int = 100) -> List[Job]:
+        entries = await self.client.lrange(self.dead_key, 0, limit - 1)
+        jobs = []
+        for entry in entries:
+            data = json.loads(entry)
+            jobs.append(Job(
+                id=data["id"],
+                payload=data["payload"],
+                attempts=data["attempts"],
+                last_error=data.get("error")
+            ))
+        return jobs
+
+    async def close(self):
+        await self.client.close()
+
+
+def get_work_queue(url: str = QUEUE_URL, **kwargs) -> Optional[WorkQueue]:
+    """
+    Create a queue from a URL.
+
+    Args:
+        url: "redis://..." / "rediss://..." for Redis Streams, "sqlite:///path" for SQLite
+
+    Returns:
+        WorkQueue instance, or None if no URL is configured
+    """
+    if not url:
+        return None
+    if url.startswith(("redis://", "rediss://")):
+        return RedisStreamQueue(url, **kwargs)
+    if url.startswith("sqlite://"):
+        return SQLiteQueue(url[len("sqlite:///"):] or ":memory:", **kwargs)
+    raise ValueError(f"Unsupported queue URL: {url}")
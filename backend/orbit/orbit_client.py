@@ -4,26 +4,43 @@ Connects to remote IPFS node and manages OrbitDB instances.
 """
 
 import os
+import sys
 import json
-import httpx
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from clients.http_pool import HttpClientPool, http_pool as shared_http_pool
+
 IPFS_API_URL = os.getenv("IPFS_API_URL", "https://ipfs.decentralizedrights.com/api/v0")
 ORBITDB_ADDR = os.getenv("ORBITDB_ADDR", "")
 
 class OrbitClient:
     """Client for interacting with OrbitDB instances."""
     
-    def __init__(self, orbit_service_url: Optional[str] = None):
+    def __init__(
+        self,
+        orbit_service_url: Optional[str] = None,
+        http_pool: Optional[HttpClientPool] = None,
+        own_pool: bool = False
+    ):
         """
         Initialize OrbitDB client.
         
         Args:
             orbit_service_url: URL of OrbitDB service (if separate). Otherwise uses ORBITDB_ADDR.
+            http_pool: HTTP client pool to use (owned and closed by the caller).
+                Defaults to the process-wide shared pool.
+            own_pool: Create a private pool for this client instead, closed by close()
         """
+        if http_pool is not None and own_pool:
+            raise ValueError("Pass either http_pool or own_pool, not both")
         self.orbit_url = orbit_service_url or ORBITDB_ADDR or "http://localhost:3002"
         self.ipfs_url = IPFS_API_URL
+        self._owns_pool = own_pool
+        self.http_pool = HttpClientPool() if own_pool else http_pool or shared_http_pool
         
         # OrbitDB database addresses (persisted)
         self.db_addresses = {
@@ -68,50 +85,49 @@ class OrbitClient:
         """
         # If OrbitDB service is available, use it
         if self.orbit_url and self.orbit_url != "":
-            async with httpx.AsyncClient() as client:
-                try:
-                    response = await client.post(
-                        f"{self.orbit_url}/orbit/add",
-                        json={"db": db_name, "payload": payload},
-                        timeout=30.0
-                    )
-                    response.raise_for_status()
-                    result = response.json()
-                    
-                    # Update database address if provided
-                    if "db_address" in result:
-                        self.db_addresses[db_name] = result["db_address"]
-                        self._save_addresses()
-                    
-                    return result
-                except Exception as e:
-                    # Fallback: store directly in IPFS
-                    return await self._fallback_add(db_name, payload)
-        
-        # Fallback: store directly in IPFS
-        return await self._fallback_add(db_name, payload)
-    
-    async def _fallback_add(self, db_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Fallback: store payload directly in IPFS."""
-        async with httpx.AsyncClient() as client:
+            client = self.http_pool.get("orbit")
             try:
-                # Upload to IPFS
                 response = await client.post(
-                    f"{self.ipfs_url}/add",
-                    files={"file": (None, json.dumps(payload))},
-                    timeout=30.0
+                    f"{self.orbit_url}/orbit/add",
+                    json={"db": db_name, "payload": payload}
                 )
                 response.raise_for_status()
                 result = response.json()
-                cid = result.get("Hash") or result.get("cid", "")
                 
-                return {
-                    "hash": cid,
-                    "db_address": f"/orbitdb/{cid}/{db_name}",
-                    "fallback": True
-                }
+                # Update database address if provided
+                if "db_address" in result:
+                    self.db_addresses[db_name] = result["db_address"]
+                    self._save_addresses()
+                
+                return result
             except Exception as e:
-                raise Exception(f"Failed to add to OrbitDB/IPFS: {str(e)}")
+                # Fallback: store directly in IPFS
+                return await self._fallback_add(db_name, payload)
+        
+        # Fallback: store directly in IPFS
+        return await self._fallback_add(db_name, payload)
+    
+    async def _fallback_add(self, db_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Fallback: store payload directly in IPFS."""
+        client = self.http_pool.get("ipfs")
+        try:
+            # Upload to IPFS
+            response = await client.post(
+                f"{self.ipfs_url}/add",
+                files={"file": (None, json.dumps(payload))},
+                timeout=30.0
+            )
+            response.raise_for_status()
+            result = response.json()
+            cid = result.get("Hash") or result.get("cid", "")
+            
+            return {
+                "hash": cid,
+                "db_address": f"/orbitdb/{cid}/{db_name}",
+                "fallback": True
+            }
+        except Exception as e:
+            raise Exception(f"Failed to add to OrbitDB/IPFS: {str(e)}")
     
     async def get(self, db_name: str, entry_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
@@ -125,21 +141,20 @@ class OrbitClient:
             Entry data or None
         """
         if self.orbit_url and self.orbit_url != "":
-            async with httpx.AsyncClient() as client:
-                try:
-                    params = {"db": db_name}
-                    if entry_hash:
-                        params["hash"] = entry_hash
-                    
-                    response = await client.get(
-                        f"{self.orbit_url}/orbit/get",
-                        params=params,
-                        timeout=30.0
-                    )
-                    response.raise_for_status()
-                    return response.json()
-                except Exception:
-                    return None
+            client = self.http_pool.get("orbit")
+            try:
+                params = {"db": db_name}
+                if entry_hash:
+                    params["hash"] = entry_hash
+                
+                response = await client.get(
+                    f"{self.orbit_url}/orbit/get",
+                    params=params
+                )
+                response.raise_for_status()
+                return response.json()
+            except Exception:
+                return None
         
         return None
     
@@ -160,4 +175,8 @@ class OrbitClient:
         elif result:
             return [result]
         return []
-
+    
+    async def close(self):
+        """Close HTTP connections if this client created its own pool."""
+        if self._owns_pool:
+            await self.http_pool.aclose()
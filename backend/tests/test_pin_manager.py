@@ -0,0 +1,77 @@
+"""
+Tests for the indexer's batched IPFS pin manager.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "indexer"))
+
+from pin_manager import PinManager, PinRecord
+
+
+class StubIPFS:
+    """Records pin/add calls; fails any request containing a CID in `bad`."""
+
+    def __init__(self, bad=()):
+        self.calls = []
+        self.bad = set(bad)
+
+    async def pin(self, cids):
+        self.calls.append(list(cids))
+        if self.bad.intersection(cids):
+            raise RuntimeError("pin failed")
+
+
+def make_manager(tmp_path, ipfs, **kwargs):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pins.db'}")
+    return PinManager(engine, ipfs.pin, **kwargs)
+
+
+def test_coalesces_cids_into_batches(tmp_path):
+    ipfs = StubIPFS()
+    manager = make_manager(tmp_path, ipfs, batch_size=10)
+    for i in range(25):
+        manager.submit(f"Qm{i}")
+    manager.submit("Qm0")  # duplicate while pending
+
+    assert asyncio.run(manager.flush()) == 25
+    assert [len(call) for call in ipfs.calls] == [10, 10, 5]
+
+
+def test_skips_cids_already_pinned_across_restarts(tmp_path):
+    ipfs = StubIPFS()
+    manager = make_manager(tmp_path, ipfs)
+    manager.submit("QmA")
+    asyncio.run(manager.flush())
+
+    # A fresh manager (new process) on the same database doesn't re-pin
+    restarted = make_manager(tmp_path, ipfs)
+    restarted.submit("QmA")
+    restarted.submit("QmB")
+    asyncio.run(restarted.flush())
+    assert ipfs.calls == [["QmA"], ["QmB"]]
+
+
+def test_bad_cid_is_isolated_and_retried(tmp_path):
+    ipfs = StubIPFS(bad={"QmBad"})
+    manager = make_manager(tmp_path, ipfs)
+    for cid in ["QmA", "QmBad", "QmC", "QmD"]:
+        manager.submit(cid)
+
+    assert asyncio.run(manager.flush()) == 3
+    session = manager.SessionLocal()
+    statuses = {r.cid: r.status for r in session.query(PinRecord).all()}
+    failed = session.get(PinRecord, "QmBad")
+    failed.next_attempt_at = 0  # make the retry due now
+    session.commit()
+    session.close()
+    assert statuses == {"QmA": "pinned", "QmBad": "failed", "QmC": "pinned", "QmD": "pinned"}
+
+    ipfs.bad.clear()
+    assert asyncio.run(manager.retry_failed()) == 1
+    assert asyncio.run(manager.flush()) == 1
+    assert ipfs.calls[-1] == ["QmBad"]
@@ -0,0 +1,96 @@
+"""
+Tests for the indexer stage pipeline.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "indexer"))
+
+from pipeline import Pipeline, Stage
+
+
+def sleeper(seconds):
+    async def handler(item):
+        await asyncio.sleep(seconds)
+        return item
+    return handler
+
+
+def test_throughput_is_bounded_by_slowest_stage():
+    async def run():
+        pipeline = Pipeline([
+            Stage("a", sleeper(0.02), concurrency=1),
+            Stage("b", sleeper(0.02), concurrency=1),
+            Stage("c", sleeper(0.02), concurrency=1),
+        ])
+        pipeline.start()
+        start = time.monotonic()
+        pending = [await pipeline.submit(i) for i in range(20)]
+        assert await asyncio.gather(*pending) == list(range(20))
+        elapsed = time.monotonic() - start
+        await pipeline.stop()
+        return elapsed
+
+    # Sequential would take 20 * 3 * 20 ms = 1.2 s; overlapped stages take ~20 * 20 ms
+    assert asyncio.run(run()) < 0.8
+
+
+def test_failed_item_resolves_with_error_and_others_continue():
+    async def run():
+        async def explode_on_odd(item):
+            if item % 2:
+                raise ValueError(f"bad {item}")
+            return item
+
+        pipeline = Pipeline([Stage("check", explode_on_odd), Stage("tail", sleeper(0))])
+        pipeline.start()
+        pending = [await pipeline.submit(i) for i in range(4)]
+        results = await asyncio.gather(*pending, return_exceptions=True)
+        metrics = pipeline.metrics()
+        await pipeline.stop()
+        return results, metrics
+
+    results, metrics = asyncio.run(run())
+    assert results[0] == 0 and results[2] == 2
+    assert isinstance(results[1], ValueError)
+    assert metrics["stages"]["check"]["failed"] == 2
+    assert metrics["completed"] == 2
+
+
+def test_batch_stage_and_backpressure():
+    async def run():
+        batches = []
+
+        async def persist(items):
+            batches.append(list(items))
+
+        gate = asyncio.Event()
+
+        async def blocked(item):
+            await gate.wait()
+            return item
+
+        pipeline = Pipeline([
+            Stage("slow", blocked, queue_size=2),
+            Stage("persist", persist, batch_size=10, batch_timeout=0.05),
+        ])
+        pipeline.start()
+        pending = [await pipeline.submit(i) for i in range(3)]
+        # One item is in the worker and two fill the queue, so the next submit waits
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(pipeline.submit(3), timeout=0.05)
+        assert pipeline.metrics()["stages"]["slow"]["queue_depth"] == 2
+
+        gate.set()
+        await asyncio.gather(*pending)
+        await pipeline.stop()
+        return batches
+
+    batches = asyncio.run(run())
+    assert sorted(i for batch in batches for i in batch) == [0, 1, 2]
+    assert len(batches) < 3
@@ -0,0 +1,210 @@
+"""
+Tests for the indexer work queue (SQLite backend).
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from jobs.work_queue import (
+    ABANDONED_ERROR,
+    RedisStreamQueue,
+    SQLiteQueue,
+    get_work_queue,
+    retry_backoff,
+)
+
+
+def test_enqueue_consume_ack():
+    async def run():
+        queue = SQLiteQueue()
+        await queue.enqueue({"submission_id": "s1"})
+        job = await queue.consume("c1", block=0.1)
+        assert job.payload == {"submission_id": "s1"}
+        await queue.ack(job)
+        assert await queue.consume("c1", block=0.1) is None
+        await queue.close()
+
+    asyncio.run(run())
+
+
+def test_consumer_wakes_on_enqueue():
+    async def run():
+        queue = SQLiteQueue(poll_interval=10.0)
+        consumer = asyncio.create_task(queue.consume("c1", block=5.0))
+        await asyncio.sleep(0.05)
+        start = time.monotonic()
+        await queue.enqueue({"submission_id": "s1"})
+        job = await consumer
+        assert job is not None
+        assert time.monotonic() - start < 1.0
+        await queue.close()
+
+    asyncio.run(run())
+
+
+def test_nack_retries_with_backoff_then_dead_letters():
+    async def run():
+        queue = SQLiteQueue(max_attempts=2, backoff_base=0.05)
+        await queue.enqueue({"submission_id": "s1"})
+
+        job = await queue.consume("c1", block=0.1)
+        await queue.nack(job, "ipfs timeout")
+        # Not redelivered until the backoff has elapsed
+        assert await queue.consume("c1", block=0) is None
+        job = await queue.consume("c1", block=1.0)
+        assert job.attempts == 1
+
+        await queue.nack(job, "ipfs timeout")
+        assert await queue.consume("c1", block=0.1) is None
+        dead = await queue.dead_letters()
+        assert [j.payload["submission_id"] for j in dead] == ["s1"]
+        assert dead[0].last_error == "ipfs timeout"
+        await queue.close()
+
+    asyncio.run(run())
+
+
+def test_unacked_job_is_redelivered_after_visibility_timeout():
+    async def run():
+        queue = SQLiteQueue(visibility_timeout=0.05)
+        await queue.enqueue({"submission_id": "s1"})
+        assert await queue.consume("c1", block=0.1) is not None
+        job = await queue.consume("c2", block=1.0)
+        assert job.payload["submission_id"] == "s1"
+        await queue.close()
+
+    asyncio.run(run())
+
+
+def test_job_that_keeps_crashing_its_consumer_is_dead_lettered():
+    async def run():
+        queue = SQLiteQueue(visibility_timeout=0.02, max_attempts=3)
+        await queue.enqueue({"submission_id": "poison"})
+        attempts = []
+        # Each consumer takes the job and dies without ack or nack
+        for consumer in ("c1", "c2", "c3", "c4"):
+            job = await queue.consume(consumer, block=0.2)
+            if job is None:
+                break
+            attempts.append(job.attempts)
+            await asyncio.sleep(0.03)
+        dead = await queue.dead_letters()
+        await queue.close()
+        return attempts, dead
+
+    attempts, dead = asyncio.run(run())
+    assert attempts == [0, 1, 2]
+    assert [(job.payload["submission_id"], job.attempts, job.last_error) for job in dead] == [
+        ("poison", 3, ABANDONED_ERROR)
+    ]
+
+
+class FakeStreamRedis:
+    """Just enough of a Redis Stream consumer group for RedisStreamQueue."""
+
+    def __init__(self):
+        self.entries = {}
+        self.pending = {}
+        self.lists = {}
+        self.next_id = 0
+
+    async def xgroup_create(self, *args, **kwargs):
+        pass
+
+    async def zrangebyscore(self, *args, **kwargs):
+        return []
+
+    async def xadd(self, name, fields):
+        self.next_id += 1
+        entry_id = f"{self.next_id}-0"
+        self.entries[entry_id] = {key: str(value) for key, value in fields.items()}
+        return entry_id
+
+    def _deliver(self, entry_id):
+        times = self.pending.get(entry_id, (0, 0))[1] + 1
+        self.pending[entry_id] = (time.monotonic(), times)
+        return entry_id, self.entries[entry_id]
+
+    async def xautoclaim(self, name, group, consumer, min_idle_time, start_id="0-0", count=None):
+        now = time.monotonic()
+        for entry_id, (delivered_at, _) in self.pending.items():
+            if (now - delivered_at) * 1000 >= min_idle_time:
+                return ["0-0", [self._deliver(entry_id)], []]
+        return ["0-0", [], []]
+
+    async def xpending_range(self, name, group, min, max, count):
+        return [{"message_id": min, "times_delivered": self.pending[min][1]}]
+
+    async def xreadgroup(self, group, consumer, streams, count=1, block=0):
+        for entry_id in self.entries:
+            if entry_id not in self.pending:
+                return [[next(iter(streams)), [self._deliver(entry_id)]]]
+        return []
+
+    async def lrange(self, key, start, end):
+        return self.lists.get(key, [])[start:end + 1]
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class Pipeline:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            def xack(self, name, group, entry_id):
+                redis.pending.pop(entry_id, None)
+
+            def xdel(self, name, entry_id):
+                redis.entries.pop(entry_id, None)
+
+            def lpush(self, key, value):
+                redis.lists.setdefault(key, []).insert(0, value)
+
+            def zadd(self, key, mapping):
+                raise AssertionError("unexpected retry")
+
+            async def execute(self):
+                return []
+
+        return Pipeline()
+
+    async def close(self):
+        pass
+
+
+def test_redis_reclaimed_job_counts_deliveries_towards_dead_letter():
+    async def run():
+        # from_url does not connect; the fake replaces the client before any command
+        queue = RedisStreamQueue("redis://localhost:6379", visibility_timeout=0.02, max_attempts=3)
+        queue.client = FakeStreamRedis()
+
+        await queue.enqueue({"submission_id": "poison"})
+        attempts = []
+        for consumer in ("c1", "c2", "c3", "c4"):
+            job = await queue.consume(consumer, block=0)
+            if job is None:
+                break
+            attempts.append(job.attempts)
+            await asyncio.sleep(0.03)
+        return attempts, await queue.dead_letters()
+
+    attempts, dead = asyncio.run(run())
+    assert attempts == [0, 1, 2]
+    assert [(job.payload["submission_id"], job.attempts, job.last_error) for job in dead] == [
+        ("poison", 3, ABANDONED_ERROR)
+    ]
+
+
+def test_get_work_queue_and_backoff():
+    assert get_work_queue("") is None
+    assert isinstance(get_work_queue("sqlite://"), SQLiteQueue)
+    assert retry_backoff(1) == 1.0
+    assert retry_backoff(4) == 8.0
+    assert retry_backoff(20) == 300.0